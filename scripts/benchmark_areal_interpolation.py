@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark STRtree parcel-to-tract joins and areal interpolation vs gpd.overlay.
+
+Builds a synthetic county: Voronoi "tracts" with ACS-like counts, a jittered
+parcel grid and Voronoi "neighborhoods" (NM State Plane). Times
+
+- join:        join_parcels_to_tracts vs overlay(parcels, tracts) + largest piece
+- interpolate: areal_interpolate(weights="area") vs overlay(tracts, neighborhoods)
+
+and checks that both approaches give the same answers.
+
+Usage:
+    python scripts/benchmark_areal_interpolation.py [--parcels 100000] [--tracts 60]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+import geopandas as gpd
+import shapely
+
+from src.analysis.interpolation import areal_interpolate, join_parcels_to_tracts
+
+EXTENT = (520000.0, 500000.0, 540000.0, 520000.0)
+
+
+def voronoi_zones(n_zones: int, seed: int) -> gpd.GeoSeries:
+    """Voronoi cells of random seeds, clipped to EXTENT."""
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = EXTENT
+    seeds = shapely.multipoints(np.column_stack([
+        rng.uniform(minx, maxx, n_zones), rng.uniform(miny, maxy, n_zones)
+    ]))
+    frame = shapely.box(*EXTENT)
+    cells = shapely.get_parts(shapely.voronoi_polygons(seeds, extend_to=frame))
+    return gpd.GeoSeries(shapely.intersection(cells, frame), crs="EPSG:32113")
+
+
+def synthetic_county(n_parcels: int, n_tracts: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    tracts = gpd.GeoDataFrame(
+        {"GEOID": [f"35049{i:06d}" for i in range(n_tracts)],
+         "total_population": rng.integers(1000, 8000, n_tracts).astype(float),
+         "renter_occupied": rng.integers(100, 2000, n_tracts).astype(float),
+         "median_income": rng.integers(30000, 120000, n_tracts).astype(float)},
+        geometry=voronoi_zones(n_tracts, seed).values, crs="EPSG:32113"
+    )
+    minx, miny, maxx, maxy = EXTENT
+    side = int(np.ceil(np.sqrt(n_parcels)))
+    size = (maxx - minx) / side
+    iy, ix = np.divmod(np.arange(n_parcels), side)
+    x0 = minx + ix * size + rng.uniform(0, size * 0.1, n_parcels)
+    y0 = miny + iy * size + rng.uniform(0, size * 0.1, n_parcels)
+    parcels = gpd.GeoDataFrame(
+        {"parcel_id": np.arange(n_parcels)},
+        geometry=shapely.box(x0, y0, x0 + size * 0.85, y0 + size * 0.85), crs="EPSG:32113"
+    )
+    neighborhoods = gpd.GeoDataFrame(
+        {"name": [f"n{i}" for i in range(n_tracts // 3)]},
+        geometry=voronoi_zones(n_tracts // 3, seed + 1).values, crs="EPSG:32113"
+    )
+    return parcels, tracts, neighborhoods
+
+
+def overlay_join(parcels, tracts):
+    pieces = gpd.overlay(parcels, tracts[["GEOID", "geometry"]], how="intersection")
+    pieces["piece_area"] = pieces.area
+    best = pieces.sort_values("piece_area").drop_duplicates("parcel_id", keep="last")
+    return parcels[["parcel_id"]].merge(best[["parcel_id", "GEOID"]], on="parcel_id", how="left")
+
+
+def overlay_interpolate(tracts, neighborhoods, columns):
+    source = tracts.assign(tract_area=tracts.area)
+    pieces = gpd.overlay(neighborhoods, source, how="intersection")
+    share = pieces.area / pieces["tract_area"]
+    sums = pieces[columns].mul(share, axis=0).groupby(pieces["name"]).sum()
+    return neighborhoods[["name"]].merge(sums, left_on="name", right_index=True, how="left").fillna(0)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--parcels", type=int, default=100_000)
+    parser.add_argument("--tracts", type=int, default=60)
+    args = parser.parse_args()
+
+    parcels, tracts, neighborhoods = synthetic_county(args.parcels, args.tracts)
+    columns = ["total_population", "renter_occupied"]
+    print(f"{len(parcels):,} parcels, {len(tracts)} tracts, {len(neighborhoods)} neighborhoods")
+
+    joined, fast = timed(join_parcels_to_tracts, parcels, tracts, ["GEOID"])
+    naive_joined, naive = timed(overlay_join, parcels, tracts)
+    agree = (joined["GEOID"].to_numpy() == naive_joined["GEOID"].to_numpy()).mean()
+    print(f"  join         strtree {fast:6.2f} s   overlay {naive:6.2f} s   "
+          f"x{naive / fast:5.1f}   same tract: {agree:.2%}")
+
+    estimated, fast = timed(lambda: areal_interpolate(tracts, neighborhoods, extensive=columns))
+    naive_estimated, naive = timed(overlay_interpolate, tracts, neighborhoods, columns)
+    diff = np.abs(estimated[columns].to_numpy() - naive_estimated[columns].to_numpy()).max()
+    print(f"  interpolate  strtree {fast:6.2f} s   overlay {naive:6.2f} s   "
+          f"x{naive / fast:5.1f}   max abs diff: {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark OSM element-to-geometry conversion.
+
+Compares the per-element loop from notebooks/00_exploratory/000_data_prep.ipynb
+(one shapely object per element, a ``nodes`` dict, list-of-dicts frames) with
+src.data.osm.build_osm_batch on a synthetic Overpass payload.
+
+Usage:
+    python scripts/benchmark_osm_convert.py [--elements 500000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+from shapely.geometry import LineString, Point
+
+from src.data.osm import build_osm_batch
+
+
+def synthetic_payload(n_elements: int, seed: int = 0) -> list:
+    """Overpass-style elements: 60% tagged POI nodes, 40% highway ways."""
+    rng = np.random.default_rng(seed)
+    n_ways = int(n_elements * 0.4)
+    n_nodes = n_elements - n_ways
+    highways = ["primary", "secondary", "tertiary", "residential", "service"]
+    amenities = ["school", "cafe", "clinic", "bank", ""]
+
+    elements = []
+    lons = rng.uniform(-106.0, -105.8, n_nodes)
+    lats = rng.uniform(35.6, 35.8, n_nodes)
+    for i in range(n_nodes):
+        amenity = amenities[i % len(amenities)]
+        tags = {"amenity": amenity} if amenity else {"shop": "convenience"}
+        tags["name"] = f"poi {i}"
+        elements.append({"type": "node", "id": i, "lat": lats[i], "lon": lons[i], "tags": tags})
+
+    lengths = rng.integers(2, 12, n_ways)
+    for j in range(n_ways):
+        start = rng.uniform((-106.0, 35.6), (-105.8, 35.8))
+        steps = rng.normal(0, 1e-4, (lengths[j], 2)).cumsum(axis=0) + start
+        elements.append({
+            "type": "way",
+            "id": n_nodes + j,
+            "geometry": [{"lon": x, "lat": y} for x, y in steps],
+            "tags": {"highway": highways[j % len(highways)], "name": f"road {j}"},
+        })
+    return elements
+
+
+def notebook_loop(elements: list) -> gpd.GeoDataFrame:
+    """The per-element conversion from the data prep notebook."""
+    nodes = {}
+    roads = []
+    pois = []
+
+    for element in elements:
+        if element['type'] == 'node':
+            nodes[element['id']] = {
+                'lon': element['lon'],
+                'lat': element['lat'],
+                'tags': element.get('tags', {})
+            }
+
+    for element in elements:
+        if element['type'] == 'way':
+            way_nodes = element.get('geometry', [])
+            if way_nodes:
+                coords = [(node['lon'], node['lat']) for node in way_nodes]
+                if len(coords) >= 2:
+                    geom = LineString(coords)
+                    tags = element.get('tags', {})
+                    if 'highway' in tags:
+                        roads.append({
+                            'geometry': geom,
+                            'highway': tags.get('highway'),
+                            'name': tags.get('name', ''),
+                            'osm_id': element['id']
+                        })
+
+    for node_id, node_data in nodes.items():
+        tags = node_data['tags']
+        if tags:
+            pois.append({
+                'geometry': Point(node_data['lon'], node_data['lat']),
+                'amenity': tags.get('amenity', ''),
+                'shop': tags.get('shop', ''),
+                'name': tags.get('name', ''),
+                'osm_id': node_id
+            })
+
+    roads_gdf = gpd.GeoDataFrame(roads, crs="EPSG:4326")
+    pois_gdf = gpd.GeoDataFrame(pois, crs="EPSG:4326")
+    roads_gdf['feature_type'] = 'road'
+    pois_gdf['feature_type'] = 'poi'
+    return gpd.GeoDataFrame(pd.concat([
+        roads_gdf[['geometry', 'feature_type', 'highway', 'name', 'osm_id']].rename(
+            columns={'highway': 'category'}
+        ),
+        pois_gdf.assign(category=pois_gdf['amenity'].where(pois_gdf['amenity'] != '', pois_gdf['shop']))[
+            ['geometry', 'feature_type', 'category', 'name', 'osm_id']
+        ],
+    ], ignore_index=True), crs="EPSG:4326")
+
+
+def _time(func, *args, repeat: int = 3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--elements", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Generating {args.elements:,} synthetic elements...")
+    elements = synthetic_payload(args.elements)
+
+    loop_s, expected = _time(notebook_loop, elements, repeat=args.repeat)
+    batch_s, result = _time(build_osm_batch, elements, repeat=args.repeat)
+
+    assert len(result) == len(expected)
+    assert (result["osm_id"].to_numpy() == expected["osm_id"].to_numpy()).all()
+    assert result.geometry.geom_equals_exact(expected.geometry, tolerance=0).all()
+
+    print(f"  notebook loop:    {loop_s:6.2f} s")
+    print(f"  build_osm_batch:  {batch_s:6.2f} s  ({loop_s / batch_s:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
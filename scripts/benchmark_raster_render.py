@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark vector vs rasterized rendering of a dense parcel layer.
+
+Renders a synthetic county-scale parcel grid with setup_basemap in "vector"
+mode (one matplotlib patch per parcel) and "raster" mode, saves both at
+MAP_DPI, and reports render time and file size.
+
+Usage:
+    python scripts/benchmark_raster_render.py [--parcels 50000] [--format png]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import geopandas as gpd
+import shapely
+
+from src.config import MAP_DPI
+from src.viz.maps import save_map, setup_basemap
+
+
+def synthetic_parcels(n_parcels: int, seed: int = 0) -> gpd.GeoDataFrame:
+    """Jittered square parcels on a grid around Santa Fe (NM State Plane)."""
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(n_parcels)))
+    size = 60.0
+    ix, iy = np.divmod(np.arange(n_parcels), side)
+    x0 = 520000 + ix * size + rng.uniform(0, 5, n_parcels)
+    y0 = 500000 + iy * size + rng.uniform(0, 5, n_parcels)
+    geoms = shapely.box(x0, y0, x0 + size * 0.9, y0 + size * 0.9)
+    return gpd.GeoDataFrame(
+        {"value": rng.gamma(2.0, 100000, n_parcels)}, geometry=geoms, crs="EPSG:32113"
+    )
+
+
+def render(gdf: gpd.GeoDataFrame, mode: str, output_dir: Path, fmt: str, dpi: int):
+    start = time.perf_counter()
+    fig, ax = setup_basemap(
+        gdf, crs="EPSG:32113", add_basemap=False, render=mode, output_dpi=dpi,
+        plot_kwargs={"column": "value", "cmap": "viridis", "edgecolor": "white",
+                     "linewidth": 0.1}
+    )
+    path = save_map(fig, f"parcels_{mode}.{fmt}", output_dir=output_dir, dpi=dpi)
+    plt.close(fig)
+    return time.perf_counter() - start, path.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--parcels", type=int, default=50_000)
+    parser.add_argument("--format", default="png", choices=["png", "pdf"])
+    parser.add_argument("--dpi", type=int, default=MAP_DPI)
+    args = parser.parse_args()
+
+    gdf = synthetic_parcels(args.parcels)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for mode in ("vector", "raster"):
+            seconds, size = render(gdf, mode, Path(tmpdir), args.format, args.dpi)
+            print(f"  {mode:7s} {seconds:6.2f} s  {size / 1024**2:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ sys.path.insert(0, str(project_root / "src"))
 
 import geopandas as gpd
 import matplotlib.pyplot as plt
+from src.data.crs import reproject
 from src.data.loaders import load_city_limits
 from src.viz.maps import setup_basemap, save_map
 from src.config import LOCAL_CRS
@@ -43,8 +44,9 @@ def create_baseline_basemap():
         add_basemap=True
     )
     
-    # Plot city limits with clean styling
-    city_limits_mercator = city_limits.to_crs("EPSG:3857")
+    # Plot city limits with clean styling (the reprojection done by
+    # setup_basemap is cached, so this is a lookup, not a second transform)
+    city_limits_mercator = reproject(city_limits, "EPSG:3857")
     city_limits_mercator.plot(
         ax=ax,
         color='none',
@@ -0,0 +1,318 @@
+"""
+Parcel-to-tract joins and areal interpolation of ACS counts.
+
+ACS estimates are published per census tract, but the questions in the
+exploratory notebooks are asked of parcels and sub-tract areas
+(neighborhoods, corridors). This module
+
+- joins parcels to the tract they overlap most (join_parcels_to_tracts), and
+- apportions tract counts to other zones (areal_interpolate), weighting each
+  tract/zone piece by its share of the tract's area or of the tract's parcels.
+
+All work happens on arrays of (left, right) intersection pairs from one
+``STRtree`` bulk query (or the layer's persisted spatial index, for
+unfiltered loader reads), with sums done by ``np.bincount``. Features wholly
+inside the other layer's polygon skip the ``intersection`` call. The larger
+layer is processed in chunks of ANALYSIS_CHUNK_SIZE features so a county-wide
+parcel layer never materializes all pairs at once. Compare with ``gpd.overlay``
+using scripts/benchmark_areal_interpolation.py.
+"""
+
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from ..config import ANALYSIS_CHUNK_SIZE, LOCAL_CRS
+from ..data.crs import reproject
+from ..data.spatial_index import SpatialIndex, index_for_frame
+
+WEIGHTS = ("area", "parcels")
+
+
+def _align(frames: Sequence[gpd.GeoDataFrame]) -> List[gpd.GeoDataFrame]:
+    """Bring frames to the first frame's CRS, or LOCAL_CRS if it is geographic."""
+    for gdf in frames:
+        if gdf.crs is None:
+            raise ValueError("Inputs must have a CRS to be joined.")
+    crs = frames[0].crs
+    if crs.is_geographic:
+        crs = LOCAL_CRS
+    return [reproject(gdf, crs) for gdf in frames]
+
+
+def _geoms(gdf: gpd.GeoDataFrame) -> np.ndarray:
+    return np.asarray(gdf.geometry.values)
+
+
+def _check_columns(gdf: gpd.GeoDataFrame, columns: Sequence[str], label: str) -> None:
+    missing = set(columns) - set(gdf.columns)
+    if missing:
+        raise ValueError(f"{label} missing columns: {missing}")
+
+
+def _candidates(tree, index: Optional[SpatialIndex], chunk: np.ndarray, right: np.ndarray,
+                predicate: str = "intersects") -> Tuple[np.ndarray, np.ndarray]:
+    """(chunk, right) pairs satisfying predicate, via the on-disk index if given."""
+    if index is None:
+        return tree.query(chunk, predicate=predicate)
+    li, ri = index.query_bulk(shapely.bounds(chunk))
+    hit = getattr(shapely, predicate)(chunk[li], right[ri])
+    return li[hit], ri[hit]
+
+
+def _chunked_pairs(
+    left: np.ndarray,
+    right: np.ndarray,
+    chunk_size: int,
+    index: Optional[SpatialIndex] = None
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    tree = shapely.STRtree(right) if index is None else None
+    shapely.prepare(right)
+    for start in range(0, len(left), chunk_size):
+        chunk = left[start:start + chunk_size]
+        li, ri = _candidates(tree, index, chunk, right)
+        areas = np.empty(len(li))
+        inside = shapely.contains_properly(right[ri], chunk[li])
+        areas[inside] = shapely.area(chunk[li[inside]])
+        crossing = ~inside
+        areas[crossing] = shapely.area(
+            shapely.intersection(chunk[li[crossing]], right[ri[crossing]])
+        )
+        keep = areas > 0
+        yield li[keep] + start, ri[keep], areas[keep]
+
+
+def intersection_pairs(
+    left: gpd.GeoDataFrame,
+    right: gpd.GeoDataFrame,
+    chunk_size: int = ANALYSIS_CHUNK_SIZE
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Positional index pairs of overlapping polygons and their overlap areas.
+
+    Parameters
+    ----------
+    left, right : gpd.GeoDataFrame
+        Polygon layers in the same projected CRS. ``right`` is indexed in an
+        STRtree, or its spatial index sidecar is used if it is an unfiltered
+        loader read; ``left`` is queried in chunks (pass the larger layer here)
+    chunk_size : int
+        Left features per bulk query
+
+    Returns
+    -------
+    tuple of np.ndarray
+        (left positions, right positions, intersection areas); pairs that
+        only touch are dropped
+    """
+    parts = list(_chunked_pairs(_geoms(left), _geoms(right), chunk_size, index_for_frame(right)))
+    if not parts:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0)
+    return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+
+def largest_overlap(
+    left: gpd.GeoDataFrame,
+    right: gpd.GeoDataFrame,
+    chunk_size: int = ANALYSIS_CHUNK_SIZE
+) -> np.ndarray:
+    """
+    Position of the right polygon overlapping each left polygon the most.
+
+    Parameters
+    ----------
+    left, right : gpd.GeoDataFrame
+        Polygon layers in the same projected CRS
+    chunk_size : int
+        Left features per bulk query
+
+    Returns
+    -------
+    np.ndarray
+        Right position per left row, -1 where nothing overlaps
+    """
+    li, ri, areas = intersection_pairs(left, right, chunk_size)
+    order = np.lexsort((-areas, li))
+    li, ri = li[order], ri[order]
+    first = np.ones(len(li), dtype=bool)
+    first[1:] = li[1:] != li[:-1]
+    positions = np.full(len(left), -1, dtype=np.intp)
+    positions[li[first]] = ri[first]
+    return positions
+
+
+def join_parcels_to_tracts(
+    parcels: gpd.GeoDataFrame,
+    tracts: gpd.GeoDataFrame,
+    columns: Optional[List[str]] = None,
+    chunk_size: int = ANALYSIS_CHUNK_SIZE
+) -> gpd.GeoDataFrame:
+    """
+    Attach tract attributes to each parcel by largest overlap.
+
+    Unlike ``gpd.sjoin`` this returns exactly one row per parcel: parcels
+    straddling a tract boundary take the tract holding most of their area.
+
+    Parameters
+    ----------
+    parcels : gpd.GeoDataFrame
+        Parcel polygons
+    tracts : gpd.GeoDataFrame
+        Tract polygons with attributes (e.g. from load_census_tracts)
+    columns : list of str, optional
+        Tract columns to attach. Defaults to all non-geometry columns
+    chunk_size : int
+        Parcels per bulk query
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Parcels (original CRS and index) with tract columns; NaN where a
+        parcel overlaps no tract
+
+    Raises
+    ------
+    ValueError
+        If an input has no CRS or a requested column is missing
+    """
+    if columns is None:
+        columns = [c for c in tracts.columns if c != tracts.geometry.name]
+    _check_columns(tracts, columns, "Tracts")
+
+    aligned_parcels, aligned_tracts = _align([parcels, tracts])
+    positions = largest_overlap(aligned_parcels, aligned_tracts, chunk_size)
+
+    # Position -1 is absent from the reset index, so unmatched parcels get NaN
+    attributes = tracts[columns].reset_index(drop=True).reindex(positions)
+    result = parcels.copy()
+    for column in columns:
+        result[column] = attributes[column].to_numpy()
+    return result
+
+
+def _point_positions(points: np.ndarray, polygons: gpd.GeoDataFrame, chunk_size: int) -> np.ndarray:
+    """Position of a polygon containing each point, -1 if none."""
+    index = index_for_frame(polygons)
+    polygons = _geoms(polygons)
+    tree = shapely.STRtree(polygons) if index is None else None
+    positions = np.full(len(points), -1, dtype=np.intp)
+    for start in range(0, len(points), chunk_size):
+        pi, gi = _candidates(tree, index, points[start:start + chunk_size], polygons)
+        # Points on a shared edge: keep the first polygon
+        positions[start + pi[::-1]] = gi[::-1]
+    return positions
+
+
+def areal_interpolate(
+    source: gpd.GeoDataFrame,
+    target: gpd.GeoDataFrame,
+    extensive: Sequence[str] = (),
+    intensive: Sequence[str] = (),
+    weights: str = "area",
+    parcels: Optional[gpd.GeoDataFrame] = None,
+    parcel_weight: Optional[str] = None,
+    chunk_size: int = ANALYSIS_CHUNK_SIZE
+) -> gpd.GeoDataFrame:
+    """
+    Apportion source-zone (tract) values to target zones.
+
+    Extensive variables (counts) are split in proportion to each
+    source/target piece's share of the source zone's weight and summed per
+    target zone. Intensive variables (rates, medians) are averaged per
+    target zone, weighted by the pieces' weights.
+
+    Weights are either the pieces' areas (``weights="area"``) or the parcels
+    they contain (``weights="parcels"``): each parcel is placed by its
+    representative point and counts once, or by ``parcel_weight`` (e.g.
+    dwelling units). Parcel weighting keeps population out of open land and
+    arroyos. Counts of tracts without any parcels fall back to area
+    weights; such tracts do not contribute to intensive averages.
+
+    Parameters
+    ----------
+    source : gpd.GeoDataFrame
+        Zones with the values, e.g. census tracts with ACS columns
+    target : gpd.GeoDataFrame
+        Zones to estimate for, e.g. neighborhoods or a corridor buffer
+    extensive : sequence of str
+        Count columns (population, renter_occupied, ...)
+    intensive : sequence of str
+        Rate/median columns (pct_renters, median_income, ...)
+    weights : {"area", "parcels"}
+        Interpolation weights
+    parcels : gpd.GeoDataFrame, optional
+        Parcel polygons, required for weights="parcels"
+    parcel_weight : str, optional
+        Parcel column to weight by instead of counting parcels
+    chunk_size : int
+        Features per bulk query
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Copy of target with one column per interpolated variable
+
+    Raises
+    ------
+    ValueError
+        If inputs have no CRS, columns are missing, or weights is invalid
+    """
+    if weights not in WEIGHTS:
+        raise ValueError(f"Unknown weights: {weights}. Available: {list(WEIGHTS)}")
+    extensive, intensive = list(extensive), list(intensive)
+    _check_columns(source, extensive + intensive, "Source")
+    if weights == "parcels":
+        if parcels is None:
+            raise ValueError("weights='parcels' requires a parcels layer.")
+        if parcel_weight is not None:
+            _check_columns(parcels, [parcel_weight], "Parcels")
+
+    frames = [source, target] + ([parcels] if weights == "parcels" else [])
+    aligned = _align(frames)
+    source_geoms, target_geoms = _geoms(aligned[0]), _geoms(aligned[1])
+    n_source, n_target = len(source_geoms), len(target_geoms)
+
+    # (target, source) pieces with area weights
+    ti, si, piece_weight = intersection_pairs(aligned[1], aligned[0], chunk_size)
+    share = piece_weight / shapely.area(source_geoms)[si]
+
+    if weights == "parcels":
+        parcel_geoms = _geoms(aligned[2])
+        points = shapely.point_on_surface(parcel_geoms)
+        p_source = _point_positions(points, aligned[0], chunk_size)
+        p_target = _point_positions(points, aligned[1], chunk_size)
+        w = (np.ones(len(points)) if parcel_weight is None
+             else parcels[parcel_weight].to_numpy(dtype=float, na_value=0.0))
+        located = p_source >= 0
+        source_total = np.bincount(p_source[located], weights=w[located], minlength=n_source)
+
+        # Parcel pieces for tracts with positive parcel weight, area pieces
+        # for the rest (no parcels, or only zero/missing weights)
+        has_weight = np.zeros(len(points), dtype=bool)
+        has_weight[located] = source_total[p_source[located]] > 0
+        counted = has_weight & (p_target >= 0)
+        parcel_ti, parcel_si = p_target[counted], p_source[counted]
+        parcel_share = w[counted] / source_total[parcel_si]
+        fallback = source_total[si] <= 0
+        ti = np.concatenate([parcel_ti, ti[fallback]])
+        si = np.concatenate([parcel_si, si[fallback]])
+        share = np.concatenate([parcel_share, share[fallback]])
+        piece_weight = np.concatenate([w[counted], np.zeros(fallback.sum())])
+
+    result = target.copy()
+    for column in extensive:
+        values = source[column].to_numpy(dtype=float, na_value=np.nan)[si]
+        valid = ~np.isnan(values)
+        result[column] = np.bincount(
+            ti[valid], weights=values[valid] * share[valid], minlength=n_target
+        )
+    for column in intensive:
+        values = source[column].to_numpy(dtype=float, na_value=np.nan)[si]
+        valid = ~np.isnan(values)
+        weighted = np.bincount(ti[valid], weights=values[valid] * piece_weight[valid], minlength=n_target)
+        total = np.bincount(ti[valid], weights=piece_weight[valid], minlength=n_target)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[column] = np.where(total > 0, weighted / total, np.nan)
+    return result
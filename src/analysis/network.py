@@ -0,0 +1,588 @@
+"""
+Road-network routing over the OSM roads layer.
+
+load_osm_infrastructure returns roads as independent LineStrings. This module
+turns them into a routable graph:
+
+1. vertices are snapped to a NETWORK_SNAP_TOLERANCE grid, so ways that share
+   an OSM node (or nearly coincide at their ends) share a graph vertex
+2. ways are split at every vertex used by more than one way and at their
+   ends; the pieces between those nodes become edges weighted by travel time
+3. the edges are stored as a CSR adjacency (indptr / indices / weights)
+
+Crossings without a shared vertex (bridges, underpasses) stay unconnected.
+
+A multi-source Dijkstra over the CSR arrays gives, in one pass, the travel
+time from every node to the nearest of many sources (e.g. all grocery
+stores). Parcels and amenities are attached to their nearest node with a
+walking connector, so per-parcel access to an amenity class for the whole
+city costs one graph search rather than one search per parcel.
+
+Graphs and access results are cached under NETWORK_CACHE_DIR, keyed by the
+OSM file signature and routing parameters.
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from ..config import (
+    DATASET_FILES, LOCAL_CRS, NETWORK_CACHE_DIR, NETWORK_SNAP_TOLERANCE,
+    WALK_SPEED_MPS, get_data_path
+)
+from ..data.cache import file_signature
+from ..data.crs import reproject
+from ..data.download import update_processed
+from ..data.loaders import load_osm_infrastructure, load_parcels
+
+MODES = ("walk", "drive")
+
+# Driving speeds (km/h) by OSM highway class; unlisted drivable classes use
+# DEFAULT_DRIVE_KMH
+DRIVE_SPEEDS_KMH = {
+    "motorway": 100, "motorway_link": 60, "trunk": 80, "trunk_link": 50,
+    "primary": 60, "primary_link": 40, "secondary": 50, "secondary_link": 35,
+    "tertiary": 40, "tertiary_link": 30, "unclassified": 35, "residential": 30,
+    "living_street": 15, "service": 15,
+}
+DEFAULT_DRIVE_KMH = 30
+NOT_DRIVABLE = ("footway", "path", "pedestrian", "steps", "cycleway", "bridleway", "corridor")
+NOT_WALKABLE = ("motorway", "motorway_link", "trunk", "trunk_link")
+
+# POI categories (OSM amenity/shop values) grouped into amenity classes
+AMENITY_CLASSES = {
+    "grocery": ("supermarket", "grocery", "greengrocer", "convenience", "marketplace"),
+    "school": ("school", "kindergarten", "college"),
+    "health": ("clinic", "doctors", "hospital", "pharmacy"),
+    "library": ("library",),
+    "transit": ("bus_station",),
+}
+
+
+def _speeds_mps(categories: np.ndarray, mode: str) -> np.ndarray:
+    """Travel speed per road (m/s); 0 where the mode may not use the road."""
+    categories = np.asarray(categories, dtype=object)
+    if mode == "walk":
+        return np.where(np.isin(categories, NOT_WALKABLE), 0.0, WALK_SPEED_MPS)
+    kmh = np.array([DRIVE_SPEEDS_KMH.get(c, DEFAULT_DRIVE_KMH) for c in categories], dtype=float)
+    return np.where(np.isin(categories, NOT_DRIVABLE), 0.0, kmh / 3.6)
+
+
+class RoadGraph:
+    """
+    Undirected road graph in CSR form.
+
+    Parameters
+    ----------
+    node_xy : np.ndarray
+        (n, 2) node coordinates
+    indptr, indices, weights : np.ndarray
+        CSR adjacency: neighbours of node i are indices[indptr[i]:indptr[i+1]]
+        with travel times (seconds) in weights
+    coords : np.ndarray
+        (m, 2) snapped road vertex coordinates
+    edge_coords : np.ndarray
+        (edges, 2) [start, end] offsets into coords of each edge's polyline
+    edge_nodes : np.ndarray
+        (edges, 2) node ids at each edge's ends
+    crs : str
+        CRS of the coordinates (WKT)
+    mode : str
+        'walk' or 'drive'
+    """
+
+    ARRAYS = ("node_xy", "indptr", "indices", "weights", "coords", "edge_coords", "edge_nodes")
+
+    def __init__(self, node_xy, indptr, indices, weights, coords, edge_coords, edge_nodes,
+                 crs, mode):
+        self.node_xy = node_xy
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.coords = coords
+        self.edge_coords = edge_coords
+        self.edge_nodes = edge_nodes
+        self.crs = crs
+        self.mode = mode
+        self._tree = None
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_xy)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.edge_nodes)
+
+    def nearest_nodes(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest graph node to each point.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            Shapely points in the graph CRS
+
+        Returns
+        -------
+        tuple of np.ndarray
+            (node ids, distances)
+        """
+        if self._tree is None:
+            self._tree = shapely.STRtree(shapely.points(self.node_xy))
+        nodes = np.zeros(len(points), dtype=np.int64)
+        distances = np.full(len(points), np.inf)
+        if self.n_nodes and len(points):
+            (pi, ni), d = self._tree.query_nearest(points, return_distance=True, all_matches=False)
+            nodes[pi], distances[pi] = ni, d
+        return nodes, distances
+
+    def edge_geometries(self, edges: Optional[np.ndarray] = None) -> np.ndarray:
+        """Polylines of the given edges (all by default)."""
+        if edges is None:
+            edges = np.arange(self.n_edges)
+        starts, ends = self.edge_coords[edges, 0], self.edge_coords[edges, 1]
+        counts = ends - starts + 1
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        coord_index = np.repeat(starts, counts) + offsets
+        return shapely.linestrings(self.coords[coord_index], indices=np.repeat(np.arange(len(edges)), counts))
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez(tmp_path, crs=np.array(self.crs), mode=np.array(self.mode),
+                 **{name: getattr(self, name) for name in self.ARRAYS})
+        tmp_path.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "RoadGraph":
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in cls.ARRAYS}
+            return cls(crs=str(data["crs"]), mode=str(data["mode"]), **arrays)
+
+
+def build_graph(
+    roads: gpd.GeoDataFrame,
+    mode: str = "walk",
+    category_column: str = "category",
+    snap_tolerance: float = NETWORK_SNAP_TOLERANCE
+) -> RoadGraph:
+    """
+    Build a routable graph from road LineStrings.
+
+    Parameters
+    ----------
+    roads : gpd.GeoDataFrame
+        Road lines (e.g. OSM features with feature_type 'road'). Reprojected
+        to LOCAL_CRS if geographic
+    mode : {'walk', 'drive'}
+        Travel mode, selecting usable roads and speeds
+    category_column : str
+        OSM highway class column (for speeds/access); all roads are treated
+        as residential streets if missing
+    snap_tolerance : float
+        Vertex snapping grid in CRS units (metres)
+
+    Returns
+    -------
+    RoadGraph
+
+    Raises
+    ------
+    ValueError
+        If mode is unknown or roads has no CRS
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}. Available: {list(MODES)}")
+    if roads.crs is None:
+        raise ValueError("Roads must have a CRS to build a network.")
+    if roads.crs.is_geographic:
+        roads = reproject(roads, LOCAL_CRS)
+
+    geoms = np.asarray(roads.geometry.values)
+    categories = (roads[category_column].to_numpy(dtype=object)
+                  if category_column in roads.columns else np.full(len(roads), "residential", dtype=object))
+    lines, parts = shapely.get_parts(geoms, return_index=True)
+    is_line = shapely.get_type_id(lines) == 1
+    lines, parts = lines[is_line], parts[is_line]
+    speed = _speeds_mps(categories, mode)[parts]
+    lines, speed = lines[speed > 0], speed[speed > 0]
+
+    coords, line_of = shapely.get_coordinates(lines, return_index=True)
+    keys = np.round(coords / snap_tolerance).astype(np.int64)
+    _, vertex, vertex_counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    vertex = vertex.ravel()
+    coords = (keys * snap_tolerance).astype(np.float64)
+
+    # Graph nodes: line ends and vertices shared by several lines
+    first = np.ones(len(coords), dtype=bool)
+    first[1:] = line_of[1:] != line_of[:-1]
+    last = np.ones(len(coords), dtype=bool)
+    last[:-1] = line_of[1:] != line_of[:-1]
+    is_node_vertex = vertex_counts > 1
+    is_node_vertex[vertex[first | last]] = True
+    at_node = is_node_vertex[vertex]
+
+    # Cumulative length along each line
+    seg = np.zeros(len(coords))
+    seg[1:] = np.hypot(*(coords[1:] - coords[:-1]).T)
+    seg[first] = 0.0
+    cum = np.cumsum(seg)
+
+    # Edges join consecutive node positions on the same line
+    positions = np.flatnonzero(at_node)
+    same_line = line_of[positions[1:]] == line_of[positions[:-1]]
+    starts, ends = positions[:-1][same_line], positions[1:][same_line]
+    lengths = cum[ends] - cum[starts]
+    seconds = lengths / speed[line_of[starts]]
+
+    node_vertices, node_of_vertex = np.unique(vertex[positions], return_inverse=True)
+    vertex_to_node = np.full(vertex.max() + 1 if len(vertex) else 0, -1, dtype=np.int64)
+    vertex_to_node[node_vertices] = np.arange(len(node_vertices))
+    u, v = vertex_to_node[vertex[starts]], vertex_to_node[vertex[ends]]
+    keep = u != v
+    u, v, seconds = u[keep], v[keep], seconds[keep]
+    edge_coords = np.column_stack([starts[keep], ends[keep]])
+
+    node_xy = np.zeros((len(node_vertices), 2))
+    node_xy[vertex_to_node[vertex[positions]]] = coords[positions]
+
+    n = len(node_vertices)
+    src = np.concatenate([u, v])
+    dst = np.concatenate([v, u])
+    weight = np.concatenate([seconds, seconds])
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(src, minlength=n))
+    return RoadGraph(
+        node_xy=node_xy, indptr=indptr, indices=dst[order].astype(np.int64),
+        weights=weight[order], coords=coords, edge_coords=edge_coords,
+        edge_nodes=np.column_stack([u, v]), crs=roads.crs.to_wkt(), mode=mode,
+    )
+
+
+def multi_source_dijkstra(
+    graph: RoadGraph,
+    sources: np.ndarray,
+    initial: Optional[np.ndarray] = None,
+    cutoff: Optional[float] = None
+) -> np.ndarray:
+    """
+    Travel time from every node to its nearest source.
+
+    Parameters
+    ----------
+    graph : RoadGraph
+        Routing graph
+    sources : np.ndarray
+        Source node ids
+    initial : np.ndarray, optional
+        Starting cost per source (seconds), e.g. the walk onto the network
+    cutoff : float, optional
+        Stop searching past this many seconds
+
+    Returns
+    -------
+    np.ndarray
+        Seconds per node; inf where unreachable (or beyond cutoff)
+    """
+    # Plain lists index much faster than NumPy scalars in the inner loop
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    weights = graph.weights.tolist()
+    limit = np.inf if cutoff is None else float(cutoff)
+    dist = [np.inf] * graph.n_nodes
+
+    if initial is None:
+        initial = np.zeros(len(sources))
+    for node, cost in zip(np.asarray(sources).tolist(), np.asarray(initial, dtype=float).tolist()):
+        if cost < dist[node]:
+            dist[node] = cost
+    heap = [(d, node) for node, d in enumerate(dist) if d < np.inf]
+    heapq.heapify(heap)
+
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue
+        if d > limit:
+            break
+        for k in range(indptr[node], indptr[node + 1]):
+            nd = d + weights[k]
+            neighbor = indices[k]
+            if nd < dist[neighbor]:
+                dist[neighbor] = nd
+                heapq.heappush(heap, (nd, neighbor))
+
+    result = np.asarray(dist)
+    result[result > limit] = np.inf
+    return result
+
+
+def _attach(graph: RoadGraph, gdf: gpd.GeoDataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Nearest node of each feature and the walk onto the network (seconds)."""
+    gdf = reproject(gdf, graph.crs)
+    points = shapely.point_on_surface(np.asarray(gdf.geometry.values))
+    nodes, distances = graph.nearest_nodes(points)
+    return nodes, distances / WALK_SPEED_MPS
+
+
+def isochrones(
+    graph: RoadGraph,
+    origins: gpd.GeoDataFrame,
+    minutes: Sequence[float] = (5, 10, 15),
+    buffer: float = 50.0
+) -> gpd.GeoDataFrame:
+    """
+    Areas reachable from any origin within each time budget.
+
+    Parameters
+    ----------
+    graph : RoadGraph
+        Routing graph
+    origins : gpd.GeoDataFrame
+        Starting features (e.g. a clinic, all bus stops)
+    minutes : sequence of float
+        Time budgets
+    buffer : float
+        Width (CRS units) around reachable road edges included in the area
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        One row per budget: minutes, geometry; in the graph CRS
+    """
+    nodes, walk = _attach(graph, origins)
+    times = multi_source_dijkstra(graph, nodes, walk, cutoff=max(minutes) * 60)
+    edge_time = times[graph.edge_nodes].max(axis=1)
+    geometries = []
+    for budget in minutes:
+        edges = np.flatnonzero(edge_time <= budget * 60)
+        lines = graph.edge_geometries(edges)
+        geometries.append(shapely.union_all(shapely.buffer(lines, buffer)) if len(lines) else None)
+    return gpd.GeoDataFrame({"minutes": list(minutes)}, geometry=geometries, crs=graph.crs)
+
+
+def parcel_access(
+    parcels: gpd.GeoDataFrame,
+    graph: RoadGraph,
+    amenities: Dict[str, gpd.GeoDataFrame],
+    cutoff_minutes: Optional[float] = None
+) -> pd.DataFrame:
+    """
+    Travel time from every parcel to the nearest amenity of each class.
+
+    One multi-source Dijkstra per class covers all parcels. Parcels and
+    amenities join the network at their nearest node, walking.
+
+    Parameters
+    ----------
+    parcels : gpd.GeoDataFrame
+        Parcel polygons
+    graph : RoadGraph
+        Routing graph
+    amenities : dict
+        Class name -> amenity features
+    cutoff_minutes : float, optional
+        Leave times above this as NaN (speeds up the search)
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed like parcels, one ``<mode>_min_<class>`` column per class
+        (minutes; NaN if unreachable)
+    """
+    parcel_nodes, parcel_walk = _attach(graph, parcels)
+    cutoff = None if cutoff_minutes is None else cutoff_minutes * 60
+    data = {}
+    for name, features in amenities.items():
+        column = f"{graph.mode}_min_{name}"
+        if len(features) == 0 or graph.n_nodes == 0:
+            data[column] = np.full(len(parcels), np.nan)
+            continue
+        nodes, walk = _attach(graph, features)
+        times = multi_source_dijkstra(graph, nodes, walk, cutoff=cutoff)[parcel_nodes] + parcel_walk
+        if cutoff is not None:
+            times[times > cutoff] = np.inf
+        data[column] = np.where(np.isfinite(times), times / 60, np.nan)
+    return pd.DataFrame(data, index=parcels.index)
+
+
+def _osm_path(data_dir: Optional[Path]) -> Path:
+    if data_dir is None:
+        return get_data_path("osm", processed=True)
+    return Path(data_dir) / DATASET_FILES["osm"]
+
+
+def _digest(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def load_graph(
+    data_dir: Optional[Path] = None,
+    mode: str = "walk",
+    cache_dir: Optional[Path] = None
+) -> RoadGraph:
+    """
+    Routing graph for the processed OSM roads, cached on disk.
+
+    Parameters
+    ----------
+    data_dir : Path, optional
+        Base data directory. Defaults to config DATA_PROCESSED
+    mode : {'walk', 'drive'}
+        Travel mode
+    cache_dir : Path, optional
+        Defaults to config NETWORK_CACHE_DIR
+
+    Returns
+    -------
+    RoadGraph
+
+    Raises
+    ------
+    FileNotFoundError
+        If the OSM dataset doesn't exist
+    """
+    osm = load_osm_infrastructure(data_dir=data_dir)
+    cache_dir = Path(cache_dir) if cache_dir is not None else NETWORK_CACHE_DIR
+    key = _digest({
+        "osm": file_signature(_osm_path(data_dir)), "mode": mode,
+        "snap": NETWORK_SNAP_TOLERANCE, "walk": WALK_SPEED_MPS, "drive": DRIVE_SPEEDS_KMH,
+    })
+    path = cache_dir / f"graph_{mode}_{key}.npz"
+    if path.exists():
+        return RoadGraph.load(path)
+    roads = osm[osm["feature_type"] == "road"] if "feature_type" in osm.columns else osm
+    graph = build_graph(roads, mode=mode)
+    graph.save(path)
+    return graph
+
+
+def amenity_layers(
+    data_dir: Optional[Path] = None,
+    classes: Dict[str, Sequence[str]] = AMENITY_CLASSES
+) -> Dict[str, gpd.GeoDataFrame]:
+    """OSM POIs grouped into amenity classes (see AMENITY_CLASSES)."""
+    osm = load_osm_infrastructure(data_dir=data_dir)
+    if "feature_type" in osm.columns:
+        osm = osm[osm["feature_type"] == "poi"]
+    return {name: osm[osm["category"].isin(categories)] for name, categories in classes.items()}
+
+
+def access_for_parcels(
+    data_dir: Optional[Path] = None,
+    mode: str = "walk",
+    classes: Dict[str, Sequence[str]] = AMENITY_CLASSES,
+    cache_dir: Optional[Path] = None,
+    parcels: Optional[gpd.GeoDataFrame] = None
+) -> pd.DataFrame:
+    """
+    Per-parcel travel times to each amenity class, cached on disk.
+
+    The cache key covers the OSM file, the parcel geometries' bounds,
+    the mode and the class definitions, so adding attribute columns to the
+    parcels does not invalidate it.
+
+    Parameters
+    ----------
+    data_dir : Path, optional
+        Base data directory. Defaults to config DATA_PROCESSED
+    mode : {'walk', 'drive'}
+        Travel mode
+    classes : dict
+        Amenity class -> POI categories
+    cache_dir : Path, optional
+        Defaults to config NETWORK_CACHE_DIR
+    parcels : gpd.GeoDataFrame, optional
+        Parcels to compute times for. Defaults to load_parcels(data_dir)
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed like the parcels (see parcel_access)
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else NETWORK_CACHE_DIR
+    if parcels is None:
+        parcels = load_parcels(data_dir=data_dir, columns=[])
+    bounds = shapely.bounds(np.asarray(parcels.geometry.values))
+    key = _digest({
+        "osm": file_signature(_osm_path(data_dir)), "mode": mode, "classes": classes,
+        "parcels": hashlib.sha256(np.ascontiguousarray(bounds).tobytes()).hexdigest(),
+        "snap": NETWORK_SNAP_TOLERANCE, "walk": WALK_SPEED_MPS, "drive": DRIVE_SPEEDS_KMH,
+    })
+    path = cache_dir / f"access_{mode}_{key}.npz"
+    if path.exists():
+        with np.load(path) as data:
+            return pd.DataFrame({name: data[name] for name in data.files}, index=parcels.index)
+
+    graph = load_graph(data_dir, mode=mode, cache_dir=cache_dir)
+    result = parcel_access(parcels, graph, amenity_layers(data_dir, classes))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, **{column: result[column].to_numpy() for column in result.columns})
+    return result
+
+
+def write_parcel_access(
+    data_dir: Optional[Path] = None,
+    modes: Sequence[str] = ("walk",),
+    classes: Dict[str, Sequence[str]] = AMENITY_CLASSES
+) -> Path:
+    """
+    Save per-parcel travel times to amenity classes on the processed parcels.
+
+    The GeoParquet copy, sidecars, validation report and build manifest
+    entry are updated too (see update_processed).
+
+    Parameters
+    ----------
+    data_dir : Path, optional
+        Base data directory. Defaults to config DATA_PROCESSED
+    modes : sequence of str
+        Travel modes to compute
+    classes : dict
+        Amenity class -> POI categories
+
+    Returns
+    -------
+    Path
+        Updated parcels GeoPackage
+    """
+    output_path = get_data_path("parcels") if data_dir is None else Path(data_dir) / DATASET_FILES["parcels"]
+    if not output_path.exists():
+        raise FileNotFoundError(f"Parcels data not found at {output_path}")
+    # File order, so the build manifest's feature hashes stay aligned
+    parcels = gpd.read_file(output_path)
+    columns = []
+    for mode in modes:
+        access = access_for_parcels(data_dir, mode=mode, classes=classes, parcels=parcels)
+        for column in access.columns:
+            parcels[column] = access[column].to_numpy()
+        columns.extend(access.columns)
+
+    update_processed("parcels", parcels, output_path, columns)
+    return output_path
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Add network travel times to amenities to the processed parcels"
+    )
+    parser.add_argument("--modes", nargs="+", default=["walk"], choices=list(MODES))
+    parser.add_argument("--data-dir", type=Path, default=None)
+    args = parser.parse_args(argv)
+    write_parcel_access(data_dir=args.data_dir, modes=args.modes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Parcel proximity to water and amenities.
+
+For every parcel, computes the distance to the nearest feature of each target
+layer and the number of target features within a set of radii::
+
+    dist_water_m, water_within_100m, water_within_400m, water_within_800m
+    dist_poi_m,   poi_within_100m,   ...
+
+Targets come from load_hydrology (all water, the river, acequias/ditches)
+and load_osm_infrastructure (POIs). Each target layer is indexed once in an
+STRtree; parcels are processed in chunks, each answered with one
+``query_nearest`` bulk call (distances included) and one ``dwithin`` bulk
+query per radius whose pairs are counted with ``np.bincount``. Chunks run on
+a process pool whose workers build the target trees once at startup.
+
+write_parcel_proximity stores the results as columns on the processed parcel
+layer; ``python -m src.analysis.proximity`` does the same from the shell.
+"""
+
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from ..config import DATASET_FILES, get_data_path
+from ..data.download import update_processed
+from ..data.loaders import load_hydrology, load_osm_infrastructure
+from .interpolation import _align
+
+# Radii in metres: next door, ~5 and ~10 minute walks
+DEFAULT_RADII = (100.0, 400.0, 800.0)
+# Waterway types treated as acequias (OSM tags them as canals or ditches)
+ACEQUIA_TYPES = ("canal", "ditch")
+# Below this many parcels, chunks are processed in this process
+MIN_PARALLEL_PARCELS = 20_000
+
+_worker_trees: Dict[str, shapely.STRtree] = {}
+_worker_radii: Sequence[float] = ()
+
+
+def proximity_columns(name: str, radii: Sequence[float] = DEFAULT_RADII) -> list:
+    """Column names written for a target layer."""
+    return [f"dist_{name}_m"] + [f"{name}_within_{r:g}m" for r in radii]
+
+
+def _init_worker(targets: Dict[str, np.ndarray], radii: Sequence[float]) -> None:
+    """Build the target STRtrees once per worker process."""
+    global _worker_radii
+    _worker_trees.clear()
+    for name, geoms in targets.items():
+        _worker_trees[name] = shapely.STRtree(geoms)
+    _worker_radii = tuple(radii)
+
+
+def _proximity_chunk(parcels: np.ndarray) -> Dict[str, np.ndarray]:
+    """Distances and within-radius counts for one chunk of parcel geometries."""
+    n = len(parcels)
+    result = {}
+    for name, tree in _worker_trees.items():
+        columns = proximity_columns(name, _worker_radii)
+        distance = np.full(n, np.nan)
+        if len(tree.geometries):
+            # all_matches=False: one nearest feature per parcel, ties broken arbitrarily
+            (pi, _), d = tree.query_nearest(parcels, return_distance=True, all_matches=False)
+            distance[pi] = d
+        result[columns[0]] = distance
+        for column, radius in zip(columns[1:], _worker_radii):
+            pi, _ = tree.query(parcels, predicate="dwithin", distance=radius)
+            result[column] = np.bincount(pi, minlength=n)
+    return result
+
+
+def parcel_proximity(
+    parcels: gpd.GeoDataFrame,
+    targets: Dict[str, gpd.GeoDataFrame],
+    radii: Sequence[float] = DEFAULT_RADII,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Nearest-feature distances and within-radius counts for every parcel.
+
+    Parameters
+    ----------
+    parcels : gpd.GeoDataFrame
+        Parcel polygons
+    targets : dict
+        Target name -> layer (e.g. {'water': hydrology, 'poi': pois}).
+        Layers are reprojected to the parcels' CRS (LOCAL_CRS if geographic)
+    radii : sequence of float
+        Count radii in CRS units (metres for the project CRSs)
+    chunk_size : int, optional
+        Parcels per task. Defaults to splitting the work 4 ways per worker
+    workers : int, optional
+        Worker processes. Defaults to CPU count; small inputs and
+        workers=1 run in this process
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed like parcels, with proximity_columns(name, radii) per target.
+        Distances are 0 for intersecting features and NaN for empty targets.
+
+    Raises
+    ------
+    ValueError
+        If an input has no CRS
+    """
+    aligned = _align([parcels] + list(targets.values()))
+    geoms = np.asarray(aligned[0].geometry.values)
+    target_geoms = {
+        name: np.asarray(gdf.geometry.values)[~(gdf.geometry.isna() | gdf.geometry.is_empty).to_numpy()]
+        for name, gdf in zip(targets, aligned[1:])
+    }
+
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1000, -(-len(geoms) // (workers * 4)))
+    chunks = [geoms[start:start + chunk_size] for start in range(0, len(geoms), chunk_size)]
+
+    if workers == 1 or len(geoms) < MIN_PARALLEL_PARCELS or len(chunks) < 2:
+        _init_worker(target_geoms, radii)
+        parts = [_proximity_chunk(chunk) for chunk in chunks]
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(target_geoms, tuple(radii)),
+        )
+        with pool:
+            parts = list(pool.map(_proximity_chunk, chunks))
+
+    columns = [c for name in targets for c in proximity_columns(name, radii)]
+    if not parts:
+        return pd.DataFrame({c: pd.Series(dtype=float) for c in columns}, index=parcels.index)
+    data = {c: np.concatenate([part[c] for part in parts]) for c in columns}
+    return pd.DataFrame(data, index=parcels.index)
+
+
+def default_targets(data_dir: Optional[Path] = None) -> Dict[str, gpd.GeoDataFrame]:
+    """
+    Target layers from the processed hydrology and OSM datasets.
+
+    Parameters
+    ----------
+    data_dir : Path, optional
+        Base data directory. Defaults to config DATA_PROCESSED
+
+    Returns
+    -------
+    dict
+        'water' (all hydrology), 'river' and 'acequia' (when tagged) and
+        'poi' (OSM points of interest); missing datasets are skipped
+    """
+    targets = {}
+    try:
+        water = load_hydrology(data_dir=data_dir)
+    except FileNotFoundError as e:
+        print(f"Warning: {e}")
+    else:
+        targets["water"] = water
+        if "waterway_type" in water.columns:
+            for name, types in (("river", ("river",)), ("acequia", ACEQUIA_TYPES)):
+                subset = water[water["waterway_type"].isin(types)]
+                if len(subset):
+                    targets[name] = subset
+    try:
+        osm = load_osm_infrastructure(data_dir=data_dir)
+    except FileNotFoundError as e:
+        print(f"Warning: {e}")
+    else:
+        if "feature_type" in osm.columns:
+            osm = osm[osm["feature_type"] == "poi"]
+        targets["poi"] = osm
+    return targets
+
+
+def write_parcel_proximity(
+    data_dir: Optional[Path] = None,
+    radii: Sequence[float] = DEFAULT_RADII,
+    targets: Optional[Dict[str, gpd.GeoDataFrame]] = None,
+    workers: Optional[int] = None
+) -> Path:
+    """
+    Compute parcel proximity columns and save them on the processed parcels.
+
+    Existing proximity columns with the same names are replaced. The
+    GeoParquet copy, sidecars, validation report and build manifest entry
+    are updated too (see update_processed).
+
+    Parameters
+    ----------
+    data_dir : Path, optional
+        Base data directory. Defaults to config DATA_PROCESSED
+    radii : sequence of float
+        Count radii in metres
+    targets : dict, optional
+        Target layers. Defaults to default_targets(data_dir)
+    workers : int, optional
+        Worker processes. Defaults to CPU count
+
+    Returns
+    -------
+    Path
+        Updated parcels GeoPackage
+
+    Raises
+    ------
+    FileNotFoundError
+        If the parcels dataset doesn't exist
+    ValueError
+        If there are no target layers
+    """
+    if data_dir is None:
+        output_path = get_data_path("parcels", processed=True)
+    else:
+        output_path = Path(data_dir) / DATASET_FILES["parcels"]
+    if not output_path.exists():
+        raise FileNotFoundError(f"Parcels data not found at {output_path}")
+    # File order, so the build manifest's feature hashes stay aligned
+    parcels = gpd.read_file(output_path)
+    if targets is None:
+        targets = default_targets(data_dir)
+    if not targets:
+        raise ValueError("No target layers found. Process hydrology and/or OSM data first.")
+
+    proximity = parcel_proximity(parcels, targets, radii=radii, workers=workers)
+    for column in proximity.columns:
+        parcels[column] = proximity[column]
+
+    update_processed("parcels", parcels, output_path, list(proximity.columns))
+    print(f"Added {len(proximity.columns)} proximity columns for: {', '.join(targets)}")
+    return output_path
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Add water/amenity proximity columns to the processed parcels"
+    )
+    parser.add_argument("--radii", type=float, nargs="+", default=list(DEFAULT_RADII),
+                        help="Count radii in metres")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--data-dir", type=Path, default=None)
+    args = parser.parse_args(argv)
+    write_parcel_proximity(data_dir=args.data_dir, radii=args.radii, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
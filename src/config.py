@@ -37,6 +37,14 @@ LOCAL_CRS = os.getenv("SANTA_FE_LOCAL_CRS", "EPSG:32113")  # NM State Plane Cent
 # Map output settings
 MAPS_DIR = PROJECT_ROOT / "maps" / "static"
 MAP_DPI = 300
+# Polygon/line layers with at least this many features are drawn as a raster
+# in render="auto" mode (see src/viz/raster.py)
+RASTER_MIN_FEATURES = int(os.getenv("SANTA_FE_RASTER_MIN_FEATURES", "5000"))
+
+# On-disk basemap tile cache (see src/viz/tiles.py)
+TILE_CACHE_DIR = Path(os.getenv("SANTA_FE_TILE_CACHE_DIR", DATA_ROOT / "tiles"))
+TILE_CACHE_MAX_BYTES = int(os.getenv("SANTA_FE_TILE_CACHE_BYTES", str(512 * 1024**2)))
+TILES_OFFLINE = os.getenv("SANTA_FE_TILES_OFFLINE", "0").lower() in ("1", "true", "yes")
 
 # Expected dataset filenames
 DATASET_FILES = {
@@ -47,6 +55,109 @@ DATASET_FILES = {
     "city_limits": "city_limits.gpkg",
 }
 
+# Registry metadata per dataset (see src/data/registry.py): display label,
+# raw data source, and the columns and geometry types processing guarantees
+DATASET_INFO = {
+    "parcels": {
+        "label": "Parcels",
+        "description": "City parcels with zoning",
+        "source": "City of Santa Fe GIS",
+        "geometry_types": ("Polygon", "MultiPolygon"),
+    },
+    "census_tracts": {
+        "label": "Census tracts",
+        "description": "Census tracts with ACS demographics",
+        "source": "Census Bureau",
+        "columns": ("GEOID",),
+        "geometry_types": ("Polygon", "MultiPolygon"),
+    },
+    "hydrology": {
+        "label": "Hydrology",
+        "description": "Santa Fe River, arroyos and acequias",
+        "source": "OpenStreetMap (Overpass API) or NM state GIS",
+    },
+    "osm": {
+        "label": "OSM",
+        "description": "Roads and points of interest from OpenStreetMap",
+        "source": "GeoFabrik/Overpass API",
+        "columns": ("osm_id",),
+    },
+    "city_limits": {
+        "label": "City limits",
+        "description": "Santa Fe city limits boundary",
+        "source": "City of Santa Fe GIS",
+        "geometry_types": ("Polygon", "MultiPolygon"),
+    },
+}
+
+# Optional GeoParquet copies of processed datasets (see process_downloaded_data)
+WRITE_PARQUET = os.getenv("SANTA_FE_WRITE_PARQUET", "0").lower() in ("1", "true", "yes")
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("SANTA_FE_PARQUET_ROW_GROUP_SIZE", "20000"))
+
+# Level-of-detail sidecars for processed datasets (see src/data/lod.py).
+# Tolerances are in metres; a level is used when it is at most
+# LOD_PIXEL_FRACTION of an output pixel
+WRITE_LOD = os.getenv("SANTA_FE_WRITE_LOD", "1").lower() in ("1", "true", "yes")
+LOD_TOLERANCES = (1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+LOD_PIXEL_FRACTION = 0.5
+
+# Build manifest in DATA_PROCESSED (see src/data/manifest.py); with
+# incremental builds, unchanged datasets are skipped and changed ones only
+# reprocess the features that changed
+BUILD_MANIFEST_FILE = "build_manifest.json"
+INCREMENTAL_BUILDS = os.getenv("SANTA_FE_INCREMENTAL_BUILDS", "1").lower() in ("1", "true", "yes")
+
+# Streamed processing of very large raw layers (see src/data/chunked.py):
+# features per batch (0 reads the whole layer at once) and worker processes
+PROCESS_CHUNK_SIZE = int(os.getenv("SANTA_FE_PROCESS_CHUNK_SIZE", "0"))
+PROCESS_WORKERS = int(os.getenv("SANTA_FE_PROCESS_WORKERS", "1"))
+
+# Data-quality validation (see src/data/validation.py): processing repairs
+# invalid geometries and caches a report per file; loaders consult it on
+# request. Columns checked for duplicate IDs, first match per dataset
+VALIDATE_PROCESSED = os.getenv("SANTA_FE_VALIDATE_PROCESSED", "1").lower() in ("1", "true", "yes")
+VALIDATE_ON_LOAD = os.getenv("SANTA_FE_VALIDATE_ON_LOAD", "0").lower() in ("1", "true", "yes")
+VALIDATION_BOUNDS_PAD = 2.0
+DATASET_ID_COLUMNS = {
+    "parcels": ("parcel_id", "PARCEL_ID", "APN", "PIN"),
+    "census_tracts": ("GEOID",),
+    "osm": ("osm_id",),
+    "hydrology": ("osm_id",),
+}
+
+# Packed R-tree sidecars for processed datasets (see src/data/spatial_index.py)
+WRITE_SPATIAL_INDEX = os.getenv("SANTA_FE_WRITE_SPATIAL_INDEX", "1").lower() in ("1", "true", "yes")
+SPATIAL_INDEX_NODE_SIZE = 16
+
+# Features per chunk for STRtree joins and areal interpolation
+# (see src/analysis/interpolation.py); bounds peak memory of intersection pairs
+ANALYSIS_CHUNK_SIZE = int(os.getenv("SANTA_FE_ANALYSIS_CHUNK_SIZE", "50000"))
+
+# DuckDB analytics backend (see src/data/analytics.py). Unset threads/memory
+# use DuckDB's defaults (all cores, 80% of RAM); past the memory limit
+# queries spill to DUCKDB_TEMP_DIR
+DUCKDB_THREADS = int(os.getenv("SANTA_FE_DUCKDB_THREADS", "0")) or None
+DUCKDB_MEMORY_LIMIT = os.getenv("SANTA_FE_DUCKDB_MEMORY_LIMIT")
+DUCKDB_TEMP_DIR = Path(os.getenv("SANTA_FE_DUCKDB_TEMP_DIR", DATA_ROOT / "duckdb_tmp"))
+
+# Road-network routing (see src/analysis/network.py). Road vertices closer
+# than the snap tolerance (metres) become one graph node
+NETWORK_CACHE_DIR = Path(os.getenv("SANTA_FE_NETWORK_CACHE_DIR", DATA_ROOT / "network"))
+NETWORK_SNAP_TOLERANCE = float(os.getenv("SANTA_FE_NETWORK_SNAP_TOLERANCE", "0.5"))
+WALK_SPEED_MPS = 1.4
+
+# Census Data API (see src/data/acs.py). Responses are cached per
+# year/dataset/geography under ACS_CACHE_DIR
+CENSUS_API_URL = os.getenv("SANTA_FE_CENSUS_API_URL", "https://api.census.gov/data")
+ACS_CACHE_DIR = Path(os.getenv("SANTA_FE_ACS_CACHE_DIR", DATA_ROOT / "acs_cache"))
+ACS_MAX_WORKERS = int(os.getenv("SANTA_FE_ACS_MAX_WORKERS", "4"))
+# Multi-year tract store in DATA_PROCESSED (see src/data/timeseries.py)
+ACS_TIMESERIES_FILE = "acs_tract_timeseries.parquet"
+
+# In-process loader cache limits (see src/data/cache.py)
+LOADER_CACHE_MAX_ENTRIES = int(os.getenv("SANTA_FE_LOADER_CACHE_ENTRIES", "32"))
+LOADER_CACHE_MAX_BYTES = int(os.getenv("SANTA_FE_LOADER_CACHE_BYTES", str(2 * 1024**3)))
+
 
 def get_data_path(dataset_name: str, processed: bool = True) -> Path:
     """
@@ -74,6 +185,26 @@ def get_data_path(dataset_name: str, processed: bool = True) -> Path:
     return base_dir / DATASET_FILES[dataset_name]
 
 
+def get_parquet_path(dataset_name: str) -> Path:
+    """
+    Get path to the GeoParquet copy of a processed dataset.
+    
+    The Parquet file sits next to the GeoPackage with the same stem,
+    e.g. processed/parcels_zoning.parquet.
+    
+    Parameters
+    ----------
+    dataset_name : str
+        Name of dataset (key in DATASET_FILES)
+    
+    Returns
+    -------
+    Path
+        Full path to the (possibly missing) Parquet file
+    """
+    return get_data_path(dataset_name, processed=True).with_suffix(".parquet")
+
+
 def get_city_limits_path() -> Optional[Path]:
     """
     Get path to city limits boundary file.
@@ -0,0 +1,252 @@
+"""
+Batched, cached client for the Census Data API (ACS).
+
+``ACSClient.get`` accepts any mix of variables (``B25003_003E``) and table
+ids (``B25003``, expanded to the table's estimate variables from the API's
+group metadata). Variables are split into batches under the API's 50-variable
+limit and the batches are fetched concurrently.
+
+Responses are cached under ACS_CACHE_DIR with one Parquet file per
+(dataset, year, geography) that holds every variable fetched so far. A call
+only requests the variables missing from that file, so re-runs and new
+indicators built from already-fetched variables need no network access.
+Table metadata is cached as JSON next to it.
+
+Point CENSUS_API_URL (SANTA_FE_CENSUS_API_URL) at another server, e.g. a
+local stub in tests, to redirect all requests.
+"""
+
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import requests
+
+from .transfer import DEFAULT_TIMEOUT, get_session
+from ..config import ACS_CACHE_DIR, ACS_MAX_WORKERS, CENSUS_API_URL, get_census_api_key
+
+# The API rejects requests with more than 50 variables in ``get``
+MAX_VARIABLES_PER_REQUEST = 50
+DEFAULT_DATASET = "acs/acs5"
+# Geography columns in GEOID order
+GEOGRAPHY_COLUMNS = ("state", "county", "tract", "block group")
+# Annotation values the API returns in place of estimates (e.g. -666666666
+# when a median cannot be computed)
+MISSING_VALUES = (-999999999, -888888888, -666666666, -555555555, -333333333, -222222222)
+
+TABLE_PATTERN = re.compile(r"^[BC]\d{5}[A-Z]{0,2}$")
+ESTIMATE_PATTERN = re.compile(r"_\d{3}[EM]$")
+
+
+def tract_geography(state_fips: str = "35", county_fips: str = "049") -> Dict[str, str]:
+    """API geography parameters for all tracts in a county."""
+    return {"for": "tract:*", "in": f"state:{state_fips} county:{county_fips}"}
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_")
+
+
+def add_geoid(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add a GEOID column built from the API's geography columns.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        API response with state/county/tract/... columns (zero-padded strings)
+
+    Returns
+    -------
+    pd.DataFrame
+        df with GEOID (e.g. state + county + tract)
+    """
+    columns = [c for c in GEOGRAPHY_COLUMNS if c in df.columns]
+    if not columns:
+        raise ValueError("No geography columns (state/county/tract) to build GEOID from")
+    df["GEOID"] = reduce(lambda a, b: a + b, (df[c].astype(str) for c in columns))
+    return df
+
+
+class ACSClient:
+    """
+    Census Data API client with request batching and a local response cache.
+
+    Parameters
+    ----------
+    api_key : str, optional
+        Census API key. Defaults to CENSUS_API_KEY; keyless requests work
+        but are rate-limited by the API
+    base_url : str
+        API root. Defaults to config CENSUS_API_URL
+    cache_dir : Path, optional
+        Response cache directory. Defaults to config ACS_CACHE_DIR
+    max_workers : int
+        Concurrent batch requests
+    session : requests.Session, optional
+        Defaults to the shared session (retries 429/5xx with backoff)
+    timeout : tuple
+        (connect, read) timeout in seconds
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = CENSUS_API_URL,
+        cache_dir: Optional[Path] = None,
+        max_workers: int = ACS_MAX_WORKERS,
+        session: Optional[requests.Session] = None,
+        timeout=DEFAULT_TIMEOUT
+    ):
+        self.api_key = api_key if api_key is not None else get_census_api_key()
+        self.base_url = base_url.rstrip("/")
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else ACS_CACHE_DIR
+        self.max_workers = max(1, max_workers)
+        self.session = session or get_session()
+        self.timeout = timeout
+
+    def _request(self, path: str, params: Optional[dict] = None):
+        params = dict(params or {})
+        if self.api_key:
+            params["key"] = self.api_key
+        response = self.session.get(f"{self.base_url}/{path}", params=params, timeout=self.timeout)
+        if response.status_code == 204:
+            return None
+        if response.status_code != 200:
+            raise ValueError(
+                f"Census API error {response.status_code} for {path}: {response.text.strip()[:200]}"
+            )
+        return response.json()
+
+    def table_variables(self, table: str, year: int, dataset: str = DEFAULT_DATASET) -> Dict[str, str]:
+        """
+        Estimate variables of a table with their labels.
+
+        Parameters
+        ----------
+        table : str
+            Table id, e.g. 'B25003'
+        year : int
+            Data year
+        dataset : str
+            API dataset path
+
+        Returns
+        -------
+        dict
+            Variable -> label (e.g. 'B25003_003E' -> 'Estimate!!Total:!!Renter occupied'),
+            sorted by variable
+        """
+        path = self.cache_dir / "metadata" / f"{_slug(dataset)}_{year}_{table}.json"
+        if path.exists():
+            metadata = json.loads(path.read_text())
+        else:
+            metadata = self._request(f"{year}/{dataset}/groups/{table}.json") or {}
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(metadata))
+        variables = metadata.get("variables", {})
+        return {
+            name: variables[name].get("label", "")
+            for name in sorted(variables) if name.endswith("E") and ESTIMATE_PATTERN.search(name)
+        }
+
+    def expand(self, variables: Sequence[str], year: int, dataset: str = DEFAULT_DATASET) -> List[str]:
+        """Replace table ids with their estimate variables, keeping order and dropping repeats."""
+        expanded = []
+        for name in variables:
+            if TABLE_PATTERN.match(name):
+                expanded.extend(self.table_variables(name, year, dataset))
+            else:
+                expanded.append(name)
+        return list(dict.fromkeys(expanded))
+
+    def _cache_path(self, year: int, dataset: str, geography: Dict[str, str]) -> Path:
+        key = json.dumps(sorted(geography.items()))
+        digest = hashlib.sha256(key.encode()).hexdigest()[:12]
+        return self.cache_dir / f"{_slug(dataset)}_{year}_{digest}.parquet"
+
+    def _fetch_batch(self, variables: List[str], year: int, dataset: str,
+                     geography: Dict[str, str]) -> pd.DataFrame:
+        rows = self._request(f"{year}/{dataset}", {"get": ",".join(variables), **geography})
+        if not rows:
+            return pd.DataFrame(columns=variables)
+        return pd.DataFrame(rows[1:], columns=rows[0], dtype=str)
+
+    def get(
+        self,
+        variables: Sequence[str],
+        year: int,
+        geography: Optional[Dict[str, str]] = None,
+        dataset: str = DEFAULT_DATASET,
+        refresh: bool = False
+    ) -> pd.DataFrame:
+        """
+        Fetch variables for every unit of a geography.
+
+        Parameters
+        ----------
+        variables : sequence of str
+            Variables and/or table ids
+        year : int
+            Data year
+        geography : dict, optional
+            API 'for'/'in' parameters. Defaults to Santa Fe County tracts
+        dataset : str
+            API dataset path, e.g. 'acs/acs5' or 'acs/acs1'
+        refresh : bool
+            Re-fetch the requested variables even if cached
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per unit: geography columns, GEOID and the variables.
+            Estimates and margins (``_E``/``_M``) are numeric, with the API's
+            annotation values as NaN.
+
+        Raises
+        ------
+        ValueError
+            If the API rejects a request (e.g. an unknown variable)
+        """
+        geography = dict(geography or tract_geography())
+        wanted = self.expand(variables, year, dataset)
+        path = self._cache_path(year, dataset, geography)
+        cached = pd.read_parquet(path) if path.exists() else None
+        if cached is not None and refresh:
+            cached = cached.drop(columns=[v for v in wanted if v in cached.columns])
+
+        missing = [v for v in wanted if cached is None or v not in cached.columns]
+        if missing:
+            batches = [missing[i:i + MAX_VARIABLES_PER_REQUEST]
+                       for i in range(0, len(missing), MAX_VARIABLES_PER_REQUEST)]
+            workers = min(self.max_workers, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                frames = list(pool.map(lambda batch: self._fetch_batch(batch, year, dataset, geography), batches))
+            # Batches answered with no content (204) are neither merged nor cached
+            fetched = [frame for frame in frames if len(frame)]
+            frames = ([cached] if cached is not None else []) + fetched
+            if fetched:
+                keys = [c for c in GEOGRAPHY_COLUMNS if all(c in frame.columns for frame in frames)]
+                cached = reduce(lambda a, b: a.merge(b, on=keys, how="outer"), frames)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(path.name + ".tmp")
+                cached.to_parquet(tmp_path, index=False)
+                tmp_path.replace(path)
+            elif cached is None:
+                cached = pd.DataFrame(columns=wanted)
+            cached = cached.assign(**{v: np.nan for v in wanted if v not in cached.columns})
+
+        geo_columns = [c for c in GEOGRAPHY_COLUMNS if c in cached.columns]
+        numeric = [c for c in wanted if ESTIMATE_PATTERN.search(c)]
+        values = cached[numeric].apply(pd.to_numeric, errors="coerce")
+        values = values.mask(values.isin(MISSING_VALUES), np.nan)
+        other = [c for c in geo_columns + wanted if c not in numeric]
+        result = pd.concat([cached[other], values], axis=1)[geo_columns + wanted]
+        result = add_geoid(result) if geo_columns else result
+        return result.sort_values(geo_columns, ignore_index=True) if geo_columns else result
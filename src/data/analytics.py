@@ -0,0 +1,371 @@
+"""
+DuckDB analytics backend for the processed Santa Fe datasets.
+
+Every dataset in DATASET_FILES that exists on disk is registered as a view
+in an in-memory DuckDB database, backed directly by the processed files::
+
+    parcels        -> read_parquet('processed/parcels_zoning.parquet')
+    census_tracts  -> ST_Read('processed/census_tracts_acs.gpkg')
+    ...
+    acs_timeseries -> read_parquet('processed/acs_tract_timeseries.parquet')
+
+The multi-year ACS store (see src/data/timeseries.py) has no geometry; join
+it to census_tracts on GEOID.
+
+GeoParquet copies (see process_downloaded_data) are read natively and are
+preferred when fresh; GeoPackages need DuckDB's ``spatial`` extension. Each
+view exposes its geometry as a GEOMETRY column named ``geometry``.
+
+Queries run on DuckDB's thread pool and stream from the files, so
+aggregations such as renter share by tract or parcel counts by zoning class
+within a corridor never load the full datasets into pandas. Results come back
+as GeoDataFrames when they contain a geometry column::
+
+    db = connect()
+    db.query("SELECT zoning, count(*) AS n FROM parcels GROUP BY zoning")
+"""
+
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional, Union
+
+import duckdb
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from pyproj import CRS
+
+from ..config import (
+    ACS_TIMESERIES_FILE, DATA_PROCESSED, DATASET_FILES,
+    DUCKDB_MEMORY_LIMIT, DUCKDB_TEMP_DIR, DUCKDB_THREADS
+)
+from .cache import file_signature
+from .crs import reproject
+from .loaders import _fresh_parquet, _parquet_crs
+
+SPATIAL_EXTENSION = "spatial"
+
+
+def _quote(value) -> str:
+    """SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _load_spatial(con: duckdb.DuckDBPyConnection) -> bool:
+    """Load the spatial extension, installing it if needed. False if unavailable."""
+    for statements in ([f"LOAD {SPATIAL_EXTENSION}"],
+                       [f"INSTALL {SPATIAL_EXTENSION}", f"LOAD {SPATIAL_EXTENSION}"]):
+        try:
+            for statement in statements:
+                con.execute(statement)
+            return True
+        except duckdb.Error:
+            continue
+    return False
+
+
+def _is_geometry(column_type) -> bool:
+    return str(column_type).upper().startswith("GEOMETRY")
+
+
+def _type_crs(column_type) -> Optional[CRS]:
+    """CRS carried by a GEOMETRY('<crs>') column type, if any."""
+    text = str(column_type)
+    start, end = text.find("('"), text.rfind("')")
+    if start < 0 or end <= start:
+        return None
+    try:
+        return CRS.from_user_input(text[start + 2:end])
+    except Exception:
+        return None
+
+
+class SpatialDB:
+    """
+    In-memory DuckDB database with a view per processed dataset.
+
+    Parameters
+    ----------
+    data_dir : Path, optional
+        Processed data directory. Defaults to config DATA_PROCESSED
+    threads : int, optional
+        DuckDB worker threads. Defaults to config DUCKDB_THREADS (all cores)
+    memory_limit : str, optional
+        e.g. "4GB". Larger intermediates spill to DUCKDB_TEMP_DIR
+    spatial : bool
+        Load the spatial extension (needed for GeoPackage-backed views and
+        exact ST_* predicates). Falls back to core DuckDB if unavailable.
+    """
+
+    def __init__(
+        self,
+        data_dir: Optional[Path] = None,
+        threads: Optional[int] = DUCKDB_THREADS,
+        memory_limit: Optional[str] = DUCKDB_MEMORY_LIMIT,
+        spatial: bool = True
+    ):
+        self.data_dir = Path(data_dir) if data_dir is not None else DATA_PROCESSED
+        self.con = duckdb.connect(":memory:")
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+        if memory_limit:
+            self.con.execute(f"SET memory_limit = {_quote(memory_limit)}")
+        self.con.execute(f"SET temp_directory = {_quote(DUCKDB_TEMP_DIR)}")
+        self.spatial = _load_spatial(self.con) if spatial else False
+        self.datasets: Dict[str, dict] = {}
+        self.refresh()
+
+    def refresh(self) -> Dict[str, dict]:
+        """
+        (Re)register a view for every processed dataset present on disk.
+
+        Returns
+        -------
+        dict
+            Dataset name -> {'path', 'format', 'crs'}
+        """
+        for name in list(self.datasets):
+            self.con.execute(f'DROP VIEW IF EXISTS "{name}"')
+        self.datasets = {}
+
+        for name, filename in DATASET_FILES.items():
+            path = self.data_dir / filename
+            if not path.exists():
+                continue
+            parquet_path = _fresh_parquet(path)
+            if parquet_path is not None:
+                source = f"read_parquet({_quote(parquet_path)})"
+                self._create_view(name, source)
+                self.datasets[name] = {
+                    'path': parquet_path, 'format': 'parquet', 'crs': _parquet_crs(parquet_path)
+                }
+            elif self.spatial:
+                import pyogrio
+                source = f"ST_Read({_quote(path)})"
+                self._create_view(name, source)
+                crs = pyogrio.read_info(path)['crs']
+                self.datasets[name] = {
+                    'path': path, 'format': 'gpkg',
+                    'crs': CRS.from_user_input(crs) if crs else None
+                }
+            else:
+                print(f"Warning: DuckDB spatial extension unavailable; skipping {name} "
+                      f"({path.name}). Write a GeoParquet copy (WRITE_PARQUET) to query it.")
+
+        timeseries = self.data_dir / ACS_TIMESERIES_FILE
+        if timeseries.exists():
+            self._create_view("acs_timeseries", f"read_parquet({_quote(timeseries)})")
+            self.datasets["acs_timeseries"] = {'path': timeseries, 'format': 'parquet', 'crs': None}
+        return self.datasets
+
+    def _create_view(self, name: str, source: str) -> None:
+        described = self.con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+        geometry = next((row[0] for row in described if _is_geometry(row[1])), None)
+        select = "*"
+        if geometry is not None and geometry != "geometry":
+            select = f'* RENAME ("{geometry}" AS geometry)'
+        self.con.execute(f'CREATE OR REPLACE VIEW "{name}" AS SELECT {select} FROM {source}')
+
+    def sql(self, query: str, params=None) -> duckdb.DuckDBPyRelation:
+        """Lazy DuckDB relation for a query (for chaining or .df()/.fetchall())."""
+        return self.con.cursor().sql(query, params=params)
+
+    def query(
+        self,
+        query: str,
+        params=None,
+        crs=None
+    ) -> Union[gpd.GeoDataFrame, pd.DataFrame]:
+        """
+        Run a query and return the result as a (Geo)DataFrame.
+
+        Parameters
+        ----------
+        query : str
+            SQL over the dataset views (parcels, census_tracts, ...)
+        params : list or dict, optional
+            Prepared-statement parameters ($1 / $name)
+        crs : optional
+            CRS for geometry results. Defaults to the CRS carried by the
+            GEOMETRY column, else the datasets' CRS if they all share one.
+
+        Returns
+        -------
+        gpd.GeoDataFrame or pd.DataFrame
+            GeoDataFrame if the result has a geometry column
+        """
+        relation = self.sql(query, params)
+        geometry_columns = [
+            (column, column_type) for column, column_type in zip(relation.columns, relation.types)
+            if _is_geometry(column_type)
+        ]
+        if not geometry_columns:
+            return relation.df()
+
+        replace = ", ".join(f'ST_AsWKB("{column}") AS "{column}"' for column, _ in geometry_columns)
+        df = relation.project(f"* REPLACE ({replace})").df()
+        for column, _ in geometry_columns:
+            df[column] = shapely.from_wkb(df[column].map(bytes, na_action="ignore").to_numpy())
+
+        geometry, column_type = next(
+            ((c, t) for c, t in geometry_columns if c == "geometry"), geometry_columns[0]
+        )
+        if crs is None:
+            crs = _type_crs(column_type) or self._common_crs()
+        return gpd.GeoDataFrame(df, geometry=geometry, crs=crs)
+
+    def _common_crs(self) -> Optional[CRS]:
+        crs_values = {info['crs'] for info in self.datasets.values() if info['crs'] is not None}
+        return crs_values.pop() if len(crs_values) == 1 else None
+
+    def close(self) -> None:
+        self.con.close()
+
+    def __enter__(self) -> "SpatialDB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def connect(data_dir: Optional[Path] = None, **kwargs) -> SpatialDB:
+    """
+    Open a new analytics database over the processed datasets.
+
+    Parameters
+    ----------
+    data_dir : Path, optional
+        Processed data directory. Defaults to config DATA_PROCESSED
+    **kwargs
+        Passed to SpatialDB (threads, memory_limit, spatial)
+
+    Returns
+    -------
+    SpatialDB
+    """
+    return SpatialDB(data_dir, **kwargs)
+
+
+_shared: Dict[str, tuple] = {}
+_shared_lock = Lock()
+
+
+def _dir_signature(data_dir: Path) -> tuple:
+    signature = []
+    for filename in DATASET_FILES.values():
+        for path in (data_dir / filename, (data_dir / filename).with_suffix(".parquet")):
+            if path.exists():
+                signature.append(file_signature(path))
+    if (data_dir / ACS_TIMESERIES_FILE).exists():
+        signature.append(file_signature(data_dir / ACS_TIMESERIES_FILE))
+    return tuple(signature)
+
+
+def get_db(data_dir: Optional[Path] = None) -> SpatialDB:
+    """
+    Shared database for a data directory, re-registering views when files change.
+
+    Parameters
+    ----------
+    data_dir : Path, optional
+        Processed data directory. Defaults to config DATA_PROCESSED
+
+    Returns
+    -------
+    SpatialDB
+    """
+    data_dir = Path(data_dir) if data_dir is not None else DATA_PROCESSED
+    key = str(data_dir.resolve())
+    signature = _dir_signature(data_dir)
+    with _shared_lock:
+        entry = _shared.get(key)
+        if entry is None:
+            entry = (signature, SpatialDB(data_dir))
+        elif entry[0] != signature:
+            entry[1].refresh()
+            entry = (signature, entry[1])
+        _shared[key] = entry
+        return entry[1]
+
+
+def renter_share_by_tract(db: SpatialDB, geometry: bool = False):
+    """
+    Share of occupied housing units that are renter-occupied, per tract.
+
+    Parameters
+    ----------
+    db : SpatialDB
+        Database with a census_tracts view
+    geometry : bool
+        If True, include tract geometries (returns a GeoDataFrame)
+
+    Returns
+    -------
+    pd.DataFrame or gpd.GeoDataFrame
+        GEOID, renter_occupied, total_occupied_units, renter_share (0-1)
+    """
+    return db.query(f"""
+        SELECT GEOID,
+               TRY_CAST(renter_occupied AS DOUBLE) AS renter_occupied,
+               TRY_CAST(total_occupied_units AS DOUBLE) AS total_occupied_units,
+               TRY_CAST(renter_occupied AS DOUBLE)
+                   / NULLIF(TRY_CAST(total_occupied_units AS DOUBLE), 0) AS renter_share
+               {', geometry' if geometry else ''}
+        FROM census_tracts
+        ORDER BY GEOID
+    """)
+
+
+def parcel_counts_by_zoning(
+    db: SpatialDB,
+    corridor,
+    zoning_column: str = "zoning"
+) -> pd.DataFrame:
+    """
+    Count parcels intersecting a corridor, by zoning class.
+
+    The corridor's bounding box is pushed down to DuckDB as an extent test.
+    With the spatial extension the exact intersection test and the grouping
+    also run in DuckDB; without it, only the zoning column and geometry of
+    the bbox candidates are fetched and tested with shapely.
+
+    Parameters
+    ----------
+    db : SpatialDB
+        Database with a parcels view
+    corridor : shapely geometry, GeoDataFrame or GeoSeries
+        Corridor polygon. Bare geometries must be in the parcels CRS; frames
+        are reprojected to it.
+    zoning_column : str
+        Zoning class column in the parcels dataset
+
+    Returns
+    -------
+    pd.DataFrame
+        zoning_column, parcels; sorted by count descending
+    """
+    if isinstance(corridor, (gpd.GeoDataFrame, gpd.GeoSeries)):
+        frame = corridor if isinstance(corridor, gpd.GeoDataFrame) else gpd.GeoDataFrame(geometry=corridor)
+        parcels_crs = db.datasets.get("parcels", {}).get("crs")
+        if parcels_crs is not None and frame.crs is not None:
+            frame = reproject(frame, parcels_crs)
+        corridor = frame.geometry.union_all()
+
+    column = f'"{zoning_column}"'
+    params = {"corridor": shapely.to_wkb(corridor)}
+    extent = "st_intersects_extent(geometry, ST_GeomFromWKB($corridor))"
+    if db.spatial:
+        return db.query(f"""
+            SELECT {column}, count(*) AS parcels
+            FROM parcels
+            WHERE {extent} AND ST_Intersects(geometry, ST_GeomFromWKB($corridor))
+            GROUP BY {column}
+            ORDER BY parcels DESC, {column}
+        """, params)
+
+    candidates = db.query(f"SELECT {column}, geometry FROM parcels WHERE {extent}", params)
+    shapely.prepare(corridor)
+    hits = candidates[shapely.intersects(corridor, np.asarray(candidates.geometry.values))]
+    counts = hits.groupby(zoning_column).size().rename("parcels").reset_index()
+    return counts.sort_values(["parcels", zoning_column], ascending=[False, True], ignore_index=True)
@@ -0,0 +1,114 @@
+"""
+Read vector layers straight out of zip archives.
+
+Raw downloads (TIGER/Line tracts and places, the GeoFabrik extract) are zip
+files. Instead of extracting them, readers open the wanted member through
+GDAL's ``/vsizip/`` virtual file system::
+
+    /vsizip//abs/path/new-mexico-latest-free.shp.zip/gis_osm_roads_free_1.shp
+
+Only the zip's central directory is read to pick the member, and GDAL
+decompresses just the bytes it reads, so bbox-prefiltered reads (see
+src/data/clip.py) stay lazy and nothing is written to disk.
+"""
+
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import List, Optional, Union
+
+import geopandas as gpd
+
+# Members recognised as vector datasets (shapefile sidecars are not listed)
+VECTOR_EXTENSIONS = (".shp", ".gpkg", ".geojson", ".json", ".fgb", ".gml", ".kml")
+
+
+def is_archive(path: Union[str, Path]) -> bool:
+    return str(path).lower().endswith(".zip") and not str(path).startswith("/vsi")
+
+
+def list_layers(path: Union[str, Path]) -> List[str]:
+    """
+    Vector members of a zip archive, shapefiles first.
+
+    Parameters
+    ----------
+    path : str or Path
+        Zip file
+
+    Returns
+    -------
+    list of str
+        Member paths inside the archive
+    """
+    with zipfile.ZipFile(path) as archive:
+        names = [n for n in archive.namelist() if PurePosixPath(n).suffix.lower() in VECTOR_EXTENSIONS]
+    return sorted(names, key=lambda n: (PurePosixPath(n).suffix.lower() != ".shp", n))
+
+
+def vsizip_path(path: Union[str, Path], layer: Optional[str] = None) -> str:
+    """
+    GDAL virtual path of a vector member of a zip archive.
+
+    Parameters
+    ----------
+    path : str or Path
+        Zip file
+    layer : str, optional
+        Member to open, by file name without extension (e.g.
+        'gis_osm_roads_free_1'); a unique partial name also matches.
+        Defaults to the first shapefile (or other vector file)
+
+    Returns
+    -------
+    str
+        ``/vsizip/<absolute zip path>/<member>``
+
+    Raises
+    ------
+    ValueError
+        If the archive has no vector members or layer matches none or
+        several of them
+    """
+    members = list_layers(path)
+    if not members:
+        raise ValueError(f"No vector files found in {path}")
+    if layer is None:
+        member = members[0]
+    else:
+        stems = {m: PurePosixPath(m).stem.lower() for m in members}
+        matches = [m for m in members if stems[m] == layer.lower()]
+        if not matches:
+            matches = [m for m in members if layer.lower() in stems[m]]
+        if len(matches) != 1:
+            problem = "not found" if not matches else "is ambiguous"
+            raise ValueError(
+                f"Layer '{layer}' {problem} in {Path(path).name}. "
+                f"Available: {[PurePosixPath(m).stem for m in members]}"
+            )
+        member = matches[0]
+    return f"/vsizip/{Path(path).resolve().as_posix()}/{member}"
+
+
+def resolve_vector_path(path: Union[str, Path], layer: Optional[str] = None) -> Union[str, Path]:
+    """The path to hand to GDAL: a /vsizip/ path for zips, else path unchanged."""
+    return vsizip_path(path, layer) if is_archive(path) else path
+
+
+def read_vector(path: Union[str, Path], layer: Optional[str] = None, **kwargs) -> gpd.GeoDataFrame:
+    """
+    Read a vector file, or a member of a zip archive without extracting it.
+
+    Parameters
+    ----------
+    path : str or Path
+        Vector file or zip archive
+    layer : str, optional
+        Archive member (see vsizip_path); ignored for plain files
+    **kwargs
+        Passed to gpd.read_file (e.g. bbox, columns)
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+    """
+    return gpd.read_file(resolve_vector_path(path, layer), **kwargs)
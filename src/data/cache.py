@@ -0,0 +1,318 @@
+"""
+In-process cache for loaded Santa Fe datasets.
+
+Notebooks and batch map jobs call the loaders many times per run. Entries are
+keyed on file path, mtime, size and read options so that reprocessing a
+dataset on disk invalidates any cached copy automatically.
+"""
+
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from threading import RLock
+from typing import Callable, Hashable, Optional, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from ..config import LOADER_CACHE_MAX_BYTES, LOADER_CACHE_MAX_ENTRIES
+
+
+def _copy_on_write_enabled() -> bool:
+    """Return True if pandas defers copies until a frame is modified."""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return bool(pd.get_option("mode.copy_on_write"))
+
+
+def _frame_nbytes(gdf: gpd.GeoDataFrame) -> int:
+    """Approximate memory footprint of a frame, including geometry buffers."""
+    nbytes = int(gdf.drop(columns=gdf.geometry.name).memory_usage(deep=True).sum())
+    try:
+        nbytes += int(shapely.get_num_coordinates(gdf.geometry.values).sum()) * 16
+    except Exception:
+        nbytes += len(gdf) * 64
+    return nbytes
+
+
+def file_signature(path: Path) -> Tuple[str, int, int]:
+    """
+    Get the cache signature for a file on disk.
+
+    Parameters
+    ----------
+    path : Path
+        File to inspect
+
+    Returns
+    -------
+    tuple
+        (resolved path, mtime in nanoseconds, size in bytes)
+    """
+    stat = Path(path).stat()
+    return str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def frame_fingerprint(gdf: gpd.GeoDataFrame) -> str:
+    """
+    Digest of a frame's contents: index, columns, values, geometries and CRS.
+
+    pandas copies ``attrs`` (and so a loaded frame's ``cache_key``) to every
+    filtered, sorted or modified frame derived from it. Comparing fingerprints
+    is how derived-data caches tell an unmodified loader result from such a
+    frame.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Frame to fingerprint
+
+    Returns
+    -------
+    str
+        Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    geometry = gdf.geometry.name
+    digest.update(repr((
+        [str(c) for c in gdf.columns], [str(t) for t in gdf.dtypes], geometry,
+        gdf.crs.to_wkt() if gdf.crs is not None else None,
+    )).encode())
+
+    attributes = gdf.drop(columns=geometry)
+    try:
+        hashed = pd.util.hash_pandas_object(attributes, index=True)
+    except TypeError:
+        # Unhashable cell values (lists, dicts): hash their text form
+        hashed = pd.util.hash_pandas_object(attributes.astype(str), index=True)
+    digest.update(hashed.to_numpy().tobytes())
+
+    wkb = shapely.to_wkb(np.asarray(gdf.geometry.values))
+    digest.update(np.fromiter(
+        (-1 if b is None else len(b) for b in wkb), dtype=np.int64, count=len(wkb)
+    ).tobytes())
+    digest.update(b"".join(b for b in wkb if b is not None))
+    return digest.hexdigest()
+
+
+def is_unmodified(gdf: gpd.GeoDataFrame, fingerprint: Optional[str] = None) -> bool:
+    """
+    Check that gdf is exactly the frame the loader cache handed out.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Frame carrying a ``cache_key`` attr
+    fingerprint : str, optional
+        frame_fingerprint(gdf), if already computed
+
+    Returns
+    -------
+    bool
+        False for frames without a ``cache_key`` and for frames that were
+        filtered, reordered or modified after loading
+    """
+    if "cache_key" not in gdf.attrs or "cache_fingerprint" not in gdf.attrs:
+        return False
+    if fingerprint is None:
+        fingerprint = frame_fingerprint(gdf)
+    return gdf.attrs["cache_fingerprint"] == fingerprint
+
+
+def derived_key(
+    gdf: gpd.GeoDataFrame,
+    option: tuple,
+    fingerprint: Optional[str] = None
+) -> Optional[tuple]:
+    """
+    Cache key for a frame derived from gdf (e.g. a reprojected copy).
+
+    The key extends gdf's ``cache_key``, so it is invalidated with the source
+    file, and includes gdf's fingerprint, so subsets and modified copies of a
+    loaded frame get entries of their own.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Source frame
+    option : tuple
+        (name, value) describing the derivation
+    fingerprint : str, optional
+        frame_fingerprint(gdf), if already computed
+
+    Returns
+    -------
+    tuple or None
+        Cache key, or None if gdf did not come from the loader cache
+    """
+    key = gdf.attrs.get("cache_key")
+    if key is None:
+        return None
+    if fingerprint is None:
+        fingerprint = frame_fingerprint(gdf)
+    return key[:3] + (key[3] + (("frame", fingerprint), option),)
+
+
+class LoaderCache:
+    """
+    LRU cache of GeoDataFrames read from processed dataset files.
+
+    Cached frames are never handed out directly. Callers receive a copy that
+    shares memory with the cached frame when pandas copy-on-write is active,
+    and a deep copy otherwise, so mutating a result cannot corrupt the cache.
+
+    Parameters
+    ----------
+    max_entries : int
+        Maximum number of cached frames
+    max_bytes : int
+        Approximate memory cap across all cached frames
+    """
+
+    def __init__(self, max_entries: int = LOADER_CACHE_MAX_ENTRIES,
+                 max_bytes: int = LOADER_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[gpd.GeoDataFrame, int]]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = RLock()
+
+    def get_or_load(
+        self,
+        path: Path,
+        loader: Callable[[], gpd.GeoDataFrame],
+        options: Optional[dict] = None
+    ) -> gpd.GeoDataFrame:
+        """
+        Return the cached frame for path/options, loading it on a miss.
+
+        Parameters
+        ----------
+        path : Path
+            Dataset file the frame is read from
+        loader : callable
+            Zero-argument function that reads the frame
+        options : dict, optional
+            Read options that change the result (columns, filters, ...)
+
+        Returns
+        -------
+        gpd.GeoDataFrame
+            Copy of the cached frame, safe for the caller to modify
+        """
+        key = self._make_key(path, options)
+        return self.get_or_create(key, loader)
+
+    def get_or_create(
+        self,
+        key: tuple,
+        factory: Callable[[], gpd.GeoDataFrame]
+    ) -> gpd.GeoDataFrame:
+        """
+        Return the cached frame for a key, building it on a miss.
+
+        Used directly for frames derived from a cached dataset (e.g. a
+        reprojected copy); such keys come from derived_key, so they are
+        invalidated together with the source file.
+
+        Parameters
+        ----------
+        key : tuple
+            (resolved path, mtime_ns, size, options) as produced for loaded
+            frames, with extra options for derived frames
+        factory : callable
+            Zero-argument function that builds the frame
+
+        Returns
+        -------
+        gpd.GeoDataFrame
+            Copy of the cached frame, safe for the caller to modify
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._view(entry[0])
+            self.misses += 1
+
+        gdf = factory()
+        gdf.attrs["cache_key"] = key
+        gdf.attrs["source_path"] = key[0]
+        gdf.attrs["cache_fingerprint"] = frame_fingerprint(gdf)
+        self._insert(key, gdf)
+        return self._view(gdf)
+
+    def clear(self) -> None:
+        """Drop all cached frames and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns
+        -------
+        dict
+            Hits, misses, entry count and approximate cached bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._nbytes,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _make_key(path: Path, options: Optional[dict]) -> Hashable:
+        opts = tuple(sorted((options or {}).items()))
+        return file_signature(path) + (opts,)
+
+    @staticmethod
+    def _view(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        return gdf.copy(deep=not _copy_on_write_enabled())
+
+    def _insert(self, key: Hashable, gdf: gpd.GeoDataFrame) -> None:
+        nbytes = _frame_nbytes(gdf)
+        if nbytes > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            # Stale entries for the same path (older mtime/size) are dead weight
+            for stale in [k for k in self._entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+                self._nbytes -= self._entries.pop(stale)[1]
+            self._entries[key] = (gdf, nbytes)
+            self._nbytes += nbytes
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._nbytes > self.max_bytes
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._nbytes -= evicted
+
+
+# Shared cache used by all loaders in src.data.loaders
+loader_cache = LoaderCache()
+
+
+def cache_stats() -> dict:
+    """Get hit/miss statistics for the shared loader cache."""
+    return loader_cache.stats()
+
+
+def clear_cache() -> None:
+    """Clear the shared loader cache."""
+    loader_cache.clear()
@@ -0,0 +1,309 @@
+"""
+Chunked, bounded-memory processing of very large raw layers.
+
+process_downloaded_data normally reads a whole raw layer before clipping and
+reprojecting it. Statewide inputs (the GeoFabrik roads, a full-county parcel
+dump) do not fit in a small worker's memory that way, so with a chunk size
+the layer is streamed instead:
+
+1. pyogrio's Arrow stream yields ``chunk_size`` features at a time, with the
+   clip boundary's bbox pushed down to GDAL (zip members via /vsizip/)
+2. each batch is clipped (staged_clip) and reprojected, in this process or
+   in a pool of worker processes
+3. processed batches are appended to the output GeoPackage in input order
+
+Peak memory is bounded by the batch size times the number of batches in
+flight (two per worker). The GeoParquet copy is streamed from the finished
+GeoPackage, one batch at a time.
+"""
+
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+import geopandas as gpd
+import shapely
+
+from .clip import boundary_bbox, staged_clip
+from .crs import choose_clip_order, reproject
+from .validation import repair_geometries
+from ..config import LOCAL_CRS, PARQUET_ROW_GROUP_SIZE, PROCESS_CHUNK_SIZE
+
+# staged_clip counters and timings summed over batches
+_STAT_KEYS = ("intersecting", "inside", "cut", "output",
+              "index_s", "containment_s", "intersection_s")
+
+_worker_boundary: Optional[gpd.GeoDataFrame] = None
+_worker_crs = None
+_worker_repair = False
+
+
+def _init_worker(boundary: Optional[gpd.GeoDataFrame], output_crs, repair: bool = False) -> None:
+    """Set the clip boundary, output CRS and repair flag once per worker process."""
+    global _worker_boundary, _worker_crs, _worker_repair
+    _worker_boundary = boundary
+    _worker_crs = output_crs
+    _worker_repair = repair
+
+
+def _process_batch(gdf: gpd.GeoDataFrame) -> Tuple[gpd.GeoDataFrame, Optional[dict], int]:
+    """Clip one batch to the boundary (if any), reproject and optionally repair it."""
+    stats = None
+    if _worker_boundary is not None and len(gdf):
+        if choose_clip_order(gdf, _worker_boundary)["order"] == "reproject_first":
+            gdf = reproject(gdf, _worker_crs)
+        gdf, stats = staged_clip(gdf, _worker_boundary, report=False)
+    gdf = reproject(gdf, _worker_crs).reset_index(drop=True)
+    repaired = 0
+    if _worker_repair:
+        gdf, repaired = repair_geometries(gdf)
+    return gdf, stats, repaired
+
+
+def _ordered_map(pool: ProcessPoolExecutor, fn, items: Iterable, window: int) -> Iterator:
+    """pool.map that keeps at most `window` items in flight, yielding in order."""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_batches(
+    path: Union[str, Path],
+    chunk_size: int = PROCESS_CHUNK_SIZE,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    crs=None
+) -> Iterator[gpd.GeoDataFrame]:
+    """
+    Stream a vector layer as GeoDataFrames of at most chunk_size features.
+
+    Parameters
+    ----------
+    path : str or Path
+        Vector file (or GDAL virtual path, e.g. from vsizip_path)
+    chunk_size : int
+        Features per batch
+    bbox : tuple, optional
+        (minx, miny, maxx, maxy) in the layer's CRS; only intersecting
+        features are decoded
+    crs : optional
+        CRS to assign when the layer has none
+
+    Yields
+    ------
+    gpd.GeoDataFrame
+        Batches in file order, with a 'geometry' column
+    """
+    import pyarrow as pa
+    import pyogrio
+
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    with pyogrio.open_arrow(path, bbox=bbox, batch_size=chunk_size, use_pyarrow=True) as (meta, reader):
+        geometry_name = meta["geometry_name"] or "wkb_geometry"
+        crs = meta["crs"] or crs
+        for batch in reader:
+            df = pa.Table.from_batches([batch]).to_pandas()
+            geometry = shapely.from_wkb(df.pop(geometry_name).to_numpy())
+            yield gpd.GeoDataFrame(df, geometry=geometry, crs=crs)
+
+
+def process_in_chunks(
+    path: Union[str, Path],
+    output_path: Path,
+    boundary: Optional[gpd.GeoDataFrame] = None,
+    output_crs: str = LOCAL_CRS,
+    chunk_size: int = PROCESS_CHUNK_SIZE,
+    workers: int = 1,
+    repair: bool = False
+) -> dict:
+    """
+    Clip and reproject a vector layer batch by batch into a GeoPackage.
+
+    The output is written to a temporary file and moved into place when
+    complete, so readers never see a partial dataset. Its layer has the
+    generic geometry type, since clipping can turn single parts into
+    multi-part geometries in some batches only.
+
+    Parameters
+    ----------
+    path : str or Path
+        Raw vector file (or GDAL virtual path)
+    output_path : Path
+        GeoPackage to write
+    boundary : gpd.GeoDataFrame, optional
+        Clip boundary (city limits); None only reprojects
+    output_crs : str
+        Target CRS
+    chunk_size : int
+        Features per batch
+    workers : int
+        Worker processes; 1 processes batches in this process
+    repair : bool
+        Make invalid geometries valid (see repair_geometries)
+
+    Returns
+    -------
+    dict
+        'crs' of the raw layer, 'batches', 'repaired', and staged_clip-style
+        counts and timings ('input', 'read_candidates', ..., 'output')
+        summed over batches
+    """
+    import pyogrio
+
+    start = time.perf_counter()
+    output_path = Path(output_path)
+    info = pyogrio.read_info(path)
+    source_crs = info.get("crs")
+    if source_crs is None:
+        print(f"Warning: {path} has no CRS. Assuming EPSG:4326 (WGS84)")
+        source_crs = "EPSG:4326"
+    bbox = boundary_bbox(boundary, source_crs) if boundary is not None else None
+
+    stats = dict({key: 0 for key in _STAT_KEYS}, input=info.get("features", -1),
+                 read_candidates=0, read_s=0.0, batches=0, repaired=0, crs=source_crs)
+
+    def batches():
+        # Reading happens in this process; time it separately from the clip
+        iterator = iter_batches(path, chunk_size, bbox=bbox, crs=source_crs)
+        while True:
+            t = time.perf_counter()
+            gdf = next(iterator, None)
+            stats["read_s"] += time.perf_counter() - t
+            if gdf is None:
+                return
+            stats["read_candidates"] += len(gdf)
+            yield gdf
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.stem + ".partial" + output_path.suffix)
+    tmp_path.unlink(missing_ok=True)
+    template = None
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(boundary, output_crs, repair),
+        )
+        results = _ordered_map(pool, _process_batch, batches(), window=2 * workers)
+    else:
+        _init_worker(boundary, output_crs, repair)
+        results = map(_process_batch, batches())
+
+    try:
+        for gdf, batch_stats, repaired in results:
+            stats["batches"] += 1
+            stats["repaired"] += repaired
+            if batch_stats is not None:
+                for key in _STAT_KEYS:
+                    stats[key] += batch_stats[key]
+            else:
+                stats["intersecting"] += len(gdf)
+                stats["output"] += len(gdf)
+            if template is None:
+                template = gdf.iloc[:0]
+            if len(gdf):
+                gdf.to_file(tmp_path, driver="GPKG", layer=output_path.stem, geometry_type="Unknown",
+                            mode="a" if tmp_path.exists() else "w")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if not tmp_path.exists():
+        # Nothing in the boundary: write an empty layer with the raw fields
+        if template is None:
+            template = gpd.GeoDataFrame({name: [] for name in info["fields"]}, geometry=[],
+                                        crs=output_crs)
+        template.to_file(tmp_path, driver="GPKG", layer=output_path.stem)
+    tmp_path.replace(output_path)
+    stats["total_s"] = time.perf_counter() - start
+    return stats
+
+
+def stream_geoparquet(
+    path: Path,
+    output_path: Path,
+    chunk_size: int = PROCESS_CHUNK_SIZE,
+    row_group_size: int = PARQUET_ROW_GROUP_SIZE
+) -> Path:
+    """
+    Copy a GeoPackage to GeoParquet one batch at a time.
+
+    Writes the same layout as write_geoparquet (WKB 'geometry' column plus a
+    'bbox' covering column) without loading the whole layer. Rows keep
+    file order rather than being Hilbert-sorted, so bbox reads skip fewer
+    row groups than on a write_geoparquet copy.
+
+    Parameters
+    ----------
+    path : Path
+        GeoPackage to copy
+    output_path : Path
+        Output .parquet path
+    chunk_size : int
+        Features read per batch
+    row_group_size : int
+        Maximum rows per Parquet row group
+
+    Returns
+    -------
+    Path
+        Path to written file
+    """
+    import json
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyogrio
+    from pyproj import CRS
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    writer = None
+    try:
+        with pyogrio.open_arrow(path, batch_size=chunk_size, use_pyarrow=True) as (meta, reader):
+            geometry_name = meta["geometry_name"] or "wkb_geometry"
+            crs = CRS.from_user_input(meta["crs"]).to_json_dict() if meta["crs"] else None
+            for batch in reader:
+                table = pa.Table.from_batches([batch])
+                wkb = table.column(geometry_name).combine_chunks()
+                if isinstance(wkb, pa.ExtensionArray):
+                    wkb = wkb.storage
+                bounds = shapely.bounds(shapely.from_wkb(wkb.to_numpy(zero_copy_only=False)))
+                covering = pa.StructArray.from_arrays(
+                    [pa.array(bounds[:, i], type=pa.float64()) for i in range(4)],
+                    names=["xmin", "ymin", "xmax", "ymax"]
+                )
+                table = (table.drop_columns([geometry_name])
+                         .append_column("geometry", wkb.cast(pa.binary()))
+                         .append_column("bbox", covering))
+                if writer is None:
+                    geo = {
+                        "version": "1.1.0",
+                        "primary_column": "geometry",
+                        "columns": {"geometry": {
+                            "encoding": "WKB",
+                            "geometry_types": [],
+                            "crs": crs,
+                            "covering": {"bbox": {k: ["bbox", k] for k in ("xmin", "ymin", "xmax", "ymax")}},
+                        }},
+                    }
+                    schema = table.schema.with_metadata({b"geo": json.dumps(geo).encode()})
+                    writer = pq.ParquetWriter(tmp_path, schema)
+                writer.write_table(table.cast(writer.schema), row_group_size=row_group_size)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        # Empty layer: nothing to stream
+        gpd.read_file(path).to_parquet(tmp_path, index=False, write_covering_bbox=True)
+    tmp_path.replace(output_path)
+    return output_path
@@ -0,0 +1,225 @@
+"""
+Staged clipping of large layers to the Santa Fe city limits.
+
+``gpd.clip`` intersects every feature with the boundary. For statewide inputs
+(TIGER tracts, GeoFabrik roads) nearly all features are far from Santa Fe, and
+most of the rest lie wholly inside it. Clipping is therefore done in stages:
+
+1. bbox prefilter, ideally at read time (see read_clipped)
+2. STRtree ``query(..., predicate="intersects")`` against the boundary
+3. features properly contained in the boundary are kept unchanged
+4. only boundary-crossing features are cut with ``intersection``
+"""
+
+import time
+from pathlib import Path
+from typing import Tuple, Union
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from .crs import reproject
+
+Boundary = Union[gpd.GeoDataFrame, gpd.GeoSeries]
+
+
+def _boundary_geometry(boundary: Boundary, crs) -> shapely.Geometry:
+    """Dissolve the boundary into one prepared geometry in the target CRS."""
+    if crs is not None and boundary.crs is not None:
+        boundary = reproject(boundary, crs)
+    geom = shapely.union_all(np.asarray(boundary.geometry.values))
+    shapely.prepare(geom)
+    return geom
+
+
+def boundary_bbox(boundary: Boundary, crs=None) -> Tuple[float, float, float, float]:
+    """
+    Bounding box of a boundary, optionally in another CRS.
+
+    Parameters
+    ----------
+    boundary : GeoDataFrame or GeoSeries
+        Clip boundary (e.g. city limits)
+    crs : optional
+        CRS to express the bbox in. Defaults to the boundary's CRS
+
+    Returns
+    -------
+    tuple
+        (minx, miny, maxx, maxy)
+    """
+    if crs is not None and boundary.crs is not None:
+        boundary = reproject(boundary, crs)
+    return tuple(float(v) for v in boundary.total_bounds)
+
+
+def staged_clip(
+    gdf: gpd.GeoDataFrame,
+    boundary: Boundary,
+    report: bool = True
+) -> Tuple[gpd.GeoDataFrame, dict]:
+    """
+    Clip features to a boundary, cutting only the features that cross it.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Features to clip
+    boundary : GeoDataFrame or GeoSeries
+        Clip boundary; reprojected to gdf's CRS if needed
+    report : bool
+        Print per-stage feature counts and timings
+
+    Returns
+    -------
+    tuple
+        (clipped GeoDataFrame, stats dict with counts and seconds per stage)
+    """
+    stats = {"input": len(gdf)}
+    start = time.perf_counter()
+    boundary_geom = _boundary_geometry(boundary, gdf.crs)
+    geoms = np.asarray(gdf.geometry.values)
+
+    # Stage 1: spatial index query against the boundary
+    tree = shapely.STRtree(geoms)
+    hits = np.sort(tree.query(boundary_geom, predicate="intersects"))
+    stats["intersecting"] = len(hits)
+    stats["index_s"] = time.perf_counter() - start
+
+    # Stage 2: keep fully-contained features untouched
+    t = time.perf_counter()
+    candidates = geoms[hits]
+    inside = shapely.contains_properly(boundary_geom, candidates)
+    stats["inside"] = int(inside.sum())
+    stats["containment_s"] = time.perf_counter() - t
+
+    # Stage 3: cut the boundary-crossing features
+    t = time.perf_counter()
+    crossing = ~inside
+    clipped = candidates.copy()
+    clipped[crossing] = shapely.intersection(candidates[crossing], boundary_geom)
+    stats["cut"] = int(crossing.sum())
+    stats["intersection_s"] = time.perf_counter() - t
+
+    result = gdf.iloc[hits].copy()
+    result[result.geometry.name] = gpd.GeoSeries(clipped, index=result.index, crs=gdf.crs)
+    result = result[~result.geometry.is_empty]
+    stats["output"] = len(result)
+    stats["total_s"] = time.perf_counter() - start
+
+    if report:
+        print_clip_report(stats)
+    return result, stats
+
+
+def print_clip_report(stats: dict) -> None:
+    """Print feature counts and timings from staged_clip / read_clipped."""
+    lines = [f"  Clip: {stats['input']} features in"]
+    if "read_s" in stats:
+        lines.append(
+            f"    bbox prefilter (read):  {stats['read_candidates']} read "
+            f"in {stats['read_s']:.2f}s"
+        )
+    lines.append(
+        f"    index query:            {stats['intersecting']} intersect "
+        f"in {stats['index_s']:.2f}s"
+    )
+    lines.append(
+        f"    containment test:       {stats['inside']} fully inside "
+        f"in {stats['containment_s']:.2f}s"
+    )
+    lines.append(
+        f"    boundary intersection:  {stats['cut']} cut "
+        f"in {stats['intersection_s']:.2f}s"
+    )
+    lines.append(f"    → {stats['output']} features out ({stats['total_s']:.2f}s)")
+    print("\n".join(lines))
+
+
+def read_prefiltered(
+    path: Union[str, Path],
+    boundary: Boundary,
+    **read_kwargs
+) -> Tuple[gpd.GeoDataFrame, dict]:
+    """
+    Read only the features of a vector file that fall in a boundary's bbox.
+
+    The boundary bbox is transformed to the file's CRS and pushed down to
+    GDAL, so features far from the boundary are never decoded. The result is
+    in the file's CRS (EPSG:4326 if the file has none).
+
+    Parameters
+    ----------
+    path : str or Path
+        Vector file (or GDAL virtual path)
+    boundary : GeoDataFrame or GeoSeries
+        Clip boundary
+    **read_kwargs
+        Passed to gpd.read_file (e.g. layer)
+
+    Returns
+    -------
+    tuple
+        (GeoDataFrame, stats dict with 'input', 'read_candidates', 'read_s')
+    """
+    import pyogrio
+
+    t = time.perf_counter()
+    info = pyogrio.read_info(path, layer=read_kwargs.get("layer"))
+    source_crs = info.get("crs")
+    if source_crs is None:
+        print(f"Warning: {path} has no CRS. Assuming EPSG:4326 (WGS84)")
+        source_crs = "EPSG:4326"
+    bbox = boundary_bbox(boundary, source_crs)
+    gdf = gpd.read_file(path, bbox=bbox, **read_kwargs)
+    if gdf.crs is None:
+        gdf = gdf.set_crs(source_crs, allow_override=True)
+    stats = {
+        "input": info.get("features", -1),
+        "read_candidates": len(gdf),
+        "read_s": time.perf_counter() - t,
+    }
+    return gdf, stats
+
+
+def merge_read_stats(stats: dict, read_stats: dict) -> dict:
+    """Fold read_prefiltered stats into staged_clip stats (in place)."""
+    stats["input"] = read_stats["input"]
+    stats["read_candidates"] = read_stats["read_candidates"]
+    stats["read_s"] = read_stats["read_s"]
+    stats["total_s"] += read_stats["read_s"]
+    return stats
+
+
+def read_clipped(
+    path: Union[str, Path],
+    boundary: Boundary,
+    report: bool = True,
+    **read_kwargs
+) -> Tuple[gpd.GeoDataFrame, dict]:
+    """
+    Read a vector file and clip it, prefiltering by the boundary bbox at read time.
+
+    Parameters
+    ----------
+    path : str or Path
+        Vector file (or GDAL virtual path)
+    boundary : GeoDataFrame or GeoSeries
+        Clip boundary
+    report : bool
+        Print per-stage feature counts and timings
+    **read_kwargs
+        Passed to gpd.read_file (e.g. layer)
+
+    Returns
+    -------
+    tuple
+        (clipped GeoDataFrame, stats dict)
+    """
+    gdf, read_stats = read_prefiltered(path, boundary, **read_kwargs)
+    clipped, stats = staged_clip(gdf, boundary, report=False)
+    merge_read_stats(stats, read_stats)
+    if report:
+        print_clip_report(stats)
+    return clipped, stats
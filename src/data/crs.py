@@ -0,0 +1,180 @@
+"""
+CRS service: cached transformers and memoized reprojection.
+
+Building a ``pyproj.Transformer`` is far more expensive than applying one, and
+the same layers are reprojected to the same web/local CRS over and over
+(``process_downloaded_data``, ``setup_basemap``, per-figure overlays). This
+module caches one transformer per (source, target) pair and keeps reprojected
+copies of loaded datasets in the shared loader cache, keyed by the frame's
+contents, so a layer is never reprojected to the same CRS twice while its
+file is unchanged.
+"""
+
+from functools import lru_cache
+from typing import Tuple
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from pyproj import CRS, Transformer
+
+from .cache import derived_key, loader_cache
+
+# Clip before reprojecting when fewer than this share of features lie in the
+# boundary bbox; otherwise reproject first and clip in the target CRS
+CLIP_FIRST_THRESHOLD = 0.5
+
+
+@lru_cache(maxsize=None)
+def _crs(crs_input: str) -> CRS:
+    return CRS.from_user_input(crs_input)
+
+
+def _as_crs(crs) -> CRS:
+    """Coerce a CRS given as a string, CRS or EPSG code."""
+    return crs if isinstance(crs, CRS) else _crs(str(crs))
+
+
+def _crs_key(crs) -> str:
+    """Stable string key for a CRS."""
+    return _as_crs(crs).to_wkt()
+
+
+@lru_cache(maxsize=64)
+def _transformer(src_wkt: str, dst_wkt: str) -> Transformer:
+    return Transformer.from_crs(src_wkt, dst_wkt, always_xy=True)
+
+
+def get_transformer(src, dst) -> Transformer:
+    """
+    Get a cached transformer from one CRS to another.
+
+    Parameters
+    ----------
+    src, dst : str or pyproj.CRS
+        Source and target CRS
+
+    Returns
+    -------
+    pyproj.Transformer
+        Transformer with (x, y) / (lon, lat) axis order
+    """
+    return _transformer(_crs_key(src), _crs_key(dst))
+
+
+def transform_bounds(
+    bounds: Tuple[float, float, float, float],
+    src,
+    dst
+) -> Tuple[float, float, float, float]:
+    """
+    Transform a bounding box between CRSs using the cached transformer.
+
+    Parameters
+    ----------
+    bounds : tuple
+        (minx, miny, maxx, maxy) in src
+    src, dst : str or pyproj.CRS
+        Source and target CRS
+
+    Returns
+    -------
+    tuple
+        (minx, miny, maxx, maxy) in dst, densified along the edges
+    """
+    return tuple(get_transformer(src, dst).transform_bounds(*bounds, densify_pts=21))
+
+
+def _to_crs(gdf: gpd.GeoDataFrame, crs) -> gpd.GeoDataFrame:
+    """Reproject with a cached transformer (same result as GeoDataFrame.to_crs)."""
+    transformer = get_transformer(gdf.crs, crs)
+
+    def apply(coords: np.ndarray) -> np.ndarray:
+        # pyproj takes length-1 arrays for a single point; pass scalars instead
+        columns = coords.T if len(coords) > 1 else coords[0]
+        return np.column_stack(transformer.transform(*columns))
+
+    geoms = np.asarray(gdf.geometry.values).copy()
+    has_z = shapely.has_z(geoms)
+    if (~has_z).any():
+        geoms[~has_z] = shapely.transform(geoms[~has_z], apply)
+    if has_z.any():
+        geoms[has_z] = shapely.transform(geoms[has_z], apply, include_z=True)
+    result = gdf.copy()
+    result[gdf.geometry.name] = gpd.GeoSeries(geoms, index=gdf.index, crs=crs)
+    return result.set_crs(crs, allow_override=True)
+
+
+def reproject(gdf: gpd.GeoDataFrame, crs) -> gpd.GeoDataFrame:
+    """
+    Reproject a GeoDataFrame, memoizing results for loaded datasets.
+
+    Frames returned by src.data.loaders carry a ``cache_key`` attr; their
+    reprojected copies (and those of subsets or modified copies of them) are
+    cached alongside them, keyed by the frame's fingerprint and target CRS,
+    and invalidated when the file changes. Other frames are reprojected with
+    a cached transformer.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Data with a CRS
+    crs : str or pyproj.CRS
+        Target CRS
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Reprojected data (the input itself if already in crs)
+
+    Raises
+    ------
+    ValueError
+        If gdf has no CRS
+    """
+    if gdf.crs is None:
+        raise ValueError("Cannot reproject a GeoDataFrame without a CRS.")
+    if gdf.crs == _as_crs(crs):
+        return gdf
+
+    key = derived_key(gdf, ("to_crs", _crs_key(crs)))
+    if key is None:
+        return _to_crs(gdf, crs)
+    return loader_cache.get_or_create(key, lambda: _to_crs(gdf, crs))
+
+
+def choose_clip_order(gdf: gpd.GeoDataFrame, boundary: gpd.GeoDataFrame) -> dict:
+    """
+    Decide whether to clip before or after reprojecting.
+
+    Features whose bbox misses the boundary bbox will be dropped by the clip,
+    so reprojecting them first is wasted work. When most features survive,
+    reprojecting first is no more expensive and the boundary cut is computed
+    in the (projected) target CRS.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Features to clip and reproject
+    boundary : gpd.GeoDataFrame
+        Clip boundary
+
+    Returns
+    -------
+    dict
+        {'order': 'clip_first' or 'reproject_first', 'features': int,
+        'in_bbox': int}
+    """
+    bounds = tuple(boundary.total_bounds)
+    if boundary.crs is not None and gdf.crs is not None and boundary.crs != gdf.crs:
+        bounds = transform_bounds(bounds, boundary.crs, gdf.crs)
+
+    minx, miny, maxx, maxy = bounds
+    fb = gdf.geometry.bounds.to_numpy()
+    in_bbox = int((
+        (fb[:, 0] <= maxx) & (fb[:, 2] >= minx) & (fb[:, 1] <= maxy) & (fb[:, 3] >= miny)
+    ).sum())
+
+    n = len(gdf)
+    order = "clip_first" if n and in_bbox / n < CLIP_FIRST_THRESHOLD else "reproject_first"
+    return {"order": order, "features": n, "in_bbox": in_bbox}
@@ -4,22 +4,59 @@ Data download utilities for Santa Fe geospatial datasets.
 Downloads raw data from various sources and saves to data/raw/.
 """
 
+import hashlib
 import requests
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Optional, Tuple
-import zipfile
+from typing import List, Optional, Sequence, Tuple
 import io
-from tqdm import tqdm
+from pyproj import CRS
 
-from ..config import DATA_RAW, DATA_PROCESSED, LOCAL_CRS, get_census_api_key
+from .acs import ACSClient, tract_geography
+from .archive import read_vector, resolve_vector_path
+from .chunked import process_in_chunks, stream_geoparquet
+from .clip import boundary_bbox, merge_read_stats, print_clip_report, read_prefiltered, staged_clip
+from .crs import choose_clip_order, reproject
+from .lod import build_lod
+from .manifest import (
+    MAX_INCREMENTAL_FRACTION, content_hash, feature_hashes, features_path, get_entry,
+    load_feature_hashes, output_matches, params_hash, record_build, save_feature_hashes
+)
+from .spatial_index import build_spatial_index
+from .osm import (
+    BATCH_SIZE as OVERPASS_BATCH_SIZE, BUILDERS as OVERPASS_BUILDERS, count_elements,
+    stream_overpass, write_overpass_layer
+)
+from .transfer import fetch
+from .validation import (
+    dataset_id_columns, repair_geometries, report_issues, report_path, save_report, validate_file,
+    validate_frame
+)
+from ..config import (
+    DATA_RAW, DATA_PROCESSED, INCREMENTAL_BUILDS, LOCAL_CRS, PARQUET_ROW_GROUP_SIZE,
+    PROCESS_CHUNK_SIZE, PROCESS_WORKERS, VALIDATE_PROCESSED, WRITE_LOD, WRITE_PARQUET,
+    WRITE_SPATIAL_INDEX,
+    get_census_api_key
+)
 
 
-def download_file(url: str, output_path: Path, chunk_size: int = 8192) -> Path:
+def download_file(
+    url: str,
+    output_path: Path,
+    chunk_size: int = 8192,
+    force: bool = False,
+    **kwargs
+) -> Path:
     """
     Download a file from URL with progress bar.
     
+    Transfers resume from a ``.part`` file after a dropped connection, large
+    files are fetched as parallel byte ranges, and the finished file gets a
+    ``.sha256`` sidecar. Re-running skips the download while the checksum and
+    the server's ETag/Last-Modified still match. See src.data.transfer.fetch.
+    
     Parameters
     ----------
     url : str
@@ -28,30 +65,36 @@ def download_file(url: str, output_path: Path, chunk_size: int = 8192) -> Path:
         Output file path
     chunk_size : int
         Chunk size for streaming download
+    force : bool
+        Re-download even if the existing file is up to date
+    **kwargs
+        Passed to src.data.transfer.fetch (timeout, max_retries, parallel,
+        max_workers, expected_sha256, session)
     
     Returns
     -------
     Path
         Path to downloaded file
     """
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    response = requests.get(url, stream=True)
-    response.raise_for_status()
-    
-    total_size = int(response.headers.get('content-length', 0))
-    
-    with open(output_path, 'wb') as f:
-        if total_size == 0:
-            f.write(response.content)
-        else:
-            with tqdm(total=total_size, unit='B', unit_scale=True, desc=f"Downloading {output_path.name}") as pbar:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if chunk:
-                        f.write(chunk)
-                        pbar.update(len(chunk))
-    
-    return output_path
+    return fetch(url, output_path, chunk_size=chunk_size, force=force, **kwargs)
+
+
+# Roads member of the GeoFabrik shapefile extract
+GEOFABRIK_ROADS_LAYER = "gis_osm_roads_free_1"
+
+# ACS 5-year variables for the tract demographics, with readable names
+TRACT_ACS_VARIABLES = {
+    'B19013_001E': 'median_income',  # Median household income
+    'B25003_001E': 'total_occupied_units',  # Total occupied housing units
+    'B25003_002E': 'owner_occupied',  # Owner-occupied housing units
+    'B25003_003E': 'renter_occupied',  # Renter-occupied housing units
+    'B01001_001E': 'total_population',  # Total population
+    'B03002_003E': 'white_alone',  # White alone
+    'B03002_004E': 'black_alone',  # Black or African American alone
+    'B03002_005E': 'native_alone',  # American Indian and Alaska Native alone
+    'B03002_006E': 'asian_alone',  # Asian alone
+    'B03002_012E': 'hispanic_latino',  # Hispanic or Latino
+}
 
 
 def download_census_tracts(
@@ -82,7 +125,8 @@ def download_census_tracts(
     Returns
     -------
     tuple[Path, Path]
-        Paths to (tracts shapefile, ACS data CSV)
+        Paths to (tracts zip, ACS data CSV). The zip is read without
+        extraction by process_census_tracts.
     """
     if output_dir is None:
         output_dir = DATA_RAW
@@ -99,100 +143,39 @@ def download_census_tracts(
     print(f"Downloading census tracts from {tiger_url}")
     download_file(tiger_url, tracts_zip)
     
-    # Extract shapefile
-    tracts_dir = output_dir / f"census_tracts_{year}"
-    tracts_dir.mkdir(exist_ok=True)
-    
-    with zipfile.ZipFile(tracts_zip, 'r') as zip_ref:
-        zip_ref.extractall(tracts_dir)
+    # The shapefile is read in place from the zip (see src/data/archive.py)
+    shapefile = tracts_zip
     
-    # Find the shapefile
-    shapefile = list(tracts_dir.glob("*.shp"))[0]
-    
-    # Download ACS data via census package (if available)
+    # Download ACS data via the Census Data API (cached; see src/data/acs.py)
     acs_csv = output_dir / f"acs_{year}_{acs_year}_santa_fe.csv"
     
-    api_key = get_census_api_key()
+    if get_census_api_key() is None:
+        print("\n⚠ CENSUS_API_KEY not found in environment; ACS requests are rate-limited.")
+        print("Set it in .env file or as environment variable.")
     
-    if api_key:
-        try:
-            from census import Census
-            c = Census(api_key)
-            
-            print("\nDownloading ACS demographic data...")
-            
-            # ACS 5-year estimates variables for Santa Fe County tracts
-            # Common variables: income, race, housing tenure, etc.
-            acs_vars = [
-                'B19013_001E',  # Median household income
-                'B25003_002E',  # Owner-occupied housing units
-                'B25003_003E',  # Renter-occupied housing units
-                'B25003_001E',  # Total occupied housing units
-                'B01001_001E',  # Total population
-                'B03002_003E',  # White alone
-                'B03002_004E',  # Black or African American alone
-                'B03002_005E',  # American Indian and Alaska Native alone
-                'B03002_006E',  # Asian alone
-                'B03002_012E',  # Hispanic or Latino
-            ]
-            
-            # Fetch data for Santa Fe County tracts
-            acs_data = c.acs5.get(
-                acs_vars,
-                {
-                    'for': f'tract:*',
-                    'in': f'state:{state_fips} county:{county_fips}'
-                },
-                year=int(year)
-            )
-            
-            # Convert to DataFrame
-            acs_df = pd.DataFrame(acs_data)
-            
-            # Calculate percentages
-            if 'B25003_001E' in acs_df.columns and 'B25003_003E' in acs_df.columns:
-                acs_df['pct_renters'] = (
-                    (acs_df['B25003_003E'].astype(float) / 
-                     acs_df['B25003_001E'].astype(float)) * 100
-                ).round(2)
-            
-            # Rename columns for readability
-            acs_df = acs_df.rename(columns={
-                'B19013_001E': 'median_income',
-                'B25003_001E': 'total_occupied_units',
-                'B25003_002E': 'owner_occupied',
-                'B25003_003E': 'renter_occupied',
-                'B01001_001E': 'total_population',
-                'B03002_003E': 'white_alone',
-                'B03002_004E': 'black_alone',
-                'B03002_005E': 'native_alone',
-                'B03002_006E': 'asian_alone',
-                'B03002_012E': 'hispanic_latino',
-            })
-            
-            # Create GEOID for joining (state + county + tract)
-            acs_df['GEOID'] = (
-                acs_df['state'].astype(str).str.zfill(2) +
-                acs_df['county'].astype(str).str.zfill(3) +
-                acs_df['tract'].astype(str).str.zfill(6)
-            )
-            
-            # Save to CSV
-            acs_df.to_csv(acs_csv, index=False)
-            print(f"✓ ACS data downloaded and saved to: {acs_csv}")
-            print(f"  Downloaded {len(acs_df)} tracts")
-            
-        except ImportError:
-            print("\n⚠ Census package not installed. Install with: pip install census")
-            print("ACS data download skipped.")
-        except Exception as e:
-            print(f"\n⚠ Error downloading ACS data: {e}")
-            print("Continuing with tracts shapefile only.")
-    else:
-        print("\n⚠ CENSUS_API_KEY not found in environment.")
-        print("Set it in .env file or as environment variable to download ACS data.")
-        print(f"\nTracts shapefile saved to: {shapefile}")
-        print(f"ACS data CSV will be created at: {acs_csv} (when API key is set)")
+    try:
+        print("\nDownloading ACS demographic data...")
+        acs_df = ACSClient().get(
+            list(TRACT_ACS_VARIABLES),
+            year=int(year),
+            geography=tract_geography(state_fips, county_fips),
+            dataset="acs/acs5" if acs_year == "5yr" else "acs/acs1"
+        )
+        
+        # Calculate percentages
+        acs_df['pct_renters'] = (acs_df['B25003_003E'] / acs_df['B25003_001E'] * 100).round(2)
+        
+        # Rename columns for readability
+        acs_df = acs_df.rename(columns=TRACT_ACS_VARIABLES)
+        
+        acs_df.to_csv(acs_csv, index=False)
+        print(f"✓ ACS data downloaded and saved to: {acs_csv}")
+        print(f"  Downloaded {len(acs_df)} tracts")
+        
+    except Exception as e:
+        print(f"\n⚠ Error downloading ACS data: {e}")
+        print("Continuing with tracts shapefile only.")
+        print(f"\nTracts zip saved to: {shapefile}")
     
     return shapefile, acs_csv
 
@@ -244,24 +227,16 @@ def download_osm_data(
         out geom;
         """
         
-        overpass_url = "https://overpass-api.de/api/interpreter"
-        
         print("Downloading OSM data via Overpass API...")
-        response = requests.post(overpass_url, data={"data": overpass_query})
-        response.raise_for_status()
-        
-        osm_data = response.json()
-        output_path = output_dir / "osm_santa_fe.json"
-        
-        import json
-        with open(output_path, 'w') as f:
-            json.dump(osm_data, f)
+        output_path = stream_overpass(overpass_query, output_dir / "osm_santa_fe.json")
         
         print(f"OSM data saved to: {output_path}")
         return output_path
     
     else:
         # Alternative: Download from GeoFabrik (New Mexico extract)
+        # One zip with a shapefile per layer; processing reads only
+        # GEOFABRIK_ROADS_LAYER from it (see src/data/archive.py)
         geofabrik_url = "https://download.geofabrik.de/north-america/us/new-mexico-latest-free.shp.zip"
         
         output_path = output_dir / "new-mexico-latest-free.shp.zip"
@@ -320,30 +295,19 @@ def download_hydrology(
         out geom;
         """
         
-        overpass_url = "https://overpass-api.de/api/interpreter"
-        
         try:
-            response = requests.post(overpass_url, data={"data": overpass_query}, timeout=90)
-            response.raise_for_status()
-            
-            osm_data = response.json()
+            output_path = stream_overpass(overpass_query, output_dir / "hydrology_osm.json")
             
-            # Check if we got any data
-            elements = osm_data.get('elements', [])
-            if not elements:
+            # Check if we got any data (counted incrementally, not loaded)
+            n_elements = count_elements(output_path)
+            if not n_elements:
                 print("⚠ No water features found in OSM for this area")
                 print("This might be normal - Santa Fe is in a semi-arid region")
                 print("Consider using alternative sources or expanding the bounding box")
                 return None
             
-            output_path = output_dir / "hydrology_osm.json"
-            
-            import json
-            with open(output_path, 'w') as f:
-                json.dump(osm_data, f)
-            
             print(f"✓ OSM hydrology data saved to: {output_path}")
-            print(f"  Found {len(elements)} water features")
+            print(f"  Found {n_elements} water features")
             return output_path
             
         except requests.exceptions.Timeout:
@@ -492,25 +456,179 @@ def download_city_limits(
         return None
 
 
+def process_city_limits(
+    raw_file: Path,
+    place_fips: str = "70490",
+    place_name: str = "Santa Fe"
+) -> Optional[Path]:
+    """
+    Extract Santa Fe from TIGER/Line places and save as processed city limits.
+    
+    City limits stay in their source CRS; they are the clip boundary for every
+    other dataset and are reprojected on the fly where needed.
+    
+    Parameters
+    ----------
+    raw_file : Path
+        TIGER/Line places zip (or any vector file with PLACEFP/NAME columns)
+    place_fips : str
+        Place FIPS code for Santa Fe city
+    place_name : str
+        Fallback name match if PLACEFP is missing
+    
+    Returns
+    -------
+    Path or None
+        Path to processed city limits, or None if Santa Fe was not found
+    """
+    from ..config import get_data_path
+    
+    places = read_vector(raw_file)
+    
+    selector = pd.Series(False, index=places.index)
+    if 'PLACEFP' in places.columns:
+        selector |= places['PLACEFP'] == place_fips
+    if 'NAME' in places.columns:
+        selector |= places['NAME'].str.contains(place_name, case=False, na=False)
+    santa_fe = places[selector].copy()
+    
+    if len(santa_fe) == 0:
+        print("⚠ Could not find Santa Fe city in places data")
+        if 'NAME' in places.columns:
+            print("Available places:", places['NAME'].head(10).tolist())
+        return None
+    
+    if santa_fe.crs is None:
+        santa_fe = santa_fe.set_crs("EPSG:4326")
+    
+    output_path = get_data_path("city_limits", processed=True)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    santa_fe.to_file(output_path, driver="GPKG")
+    print(f"✓ City limits processed and saved to: {output_path}")
+    return output_path
+
+
+def process_census_tracts(
+    tracts_file: Path,
+    acs_csv: Optional[Path] = None,
+    output_crs: str = None,
+    clip_to_city: bool = True
+) -> Path:
+    """
+    Join ACS demographics to tract boundaries, then clip, reproject and save.
+    
+    Parameters
+    ----------
+    tracts_file : Path
+        TIGER/Line tracts shapefile or zip
+    acs_csv : Path, optional
+        ACS CSV from download_census_tracts. Skipped if missing.
+    output_crs : str, optional
+        Target CRS. Defaults to LOCAL_CRS
+    clip_to_city : bool
+        Whether to clip to city limits
+    
+    Returns
+    -------
+    Path
+        Path to processed file
+    """
+    tracts = read_vector(tracts_file)
+    
+    if acs_csv is not None and Path(acs_csv).exists():
+        acs_df = pd.read_csv(acs_csv, dtype={'GEOID': str, 'state': str, 'county': str, 'tract': str})
+        if 'GEOID' in tracts.columns:
+            tracts = tracts.merge(acs_df, on='GEOID', how='left')
+        else:
+            print("⚠ Cannot join ACS data: GEOID column missing")
+    else:
+        print("⚠ ACS data not available; processing tract boundaries only")
+    
+    return process_downloaded_data(
+        "census_tracts",
+        tracts,
+        output_crs=output_crs,
+        clip_to_city=clip_to_city
+    )
+
+
 def process_downloaded_data(
     dataset_name: str,
     raw_file: Path,
     output_crs: str = None,
-    clip_to_city: bool = True
+    clip_to_city: bool = True,
+    write_parquet: Optional[bool] = None,
+    write_lod: Optional[bool] = None,
+    write_index: Optional[bool] = None,
+    incremental: Optional[bool] = None,
+    layer: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    validate: Optional[bool] = None
 ) -> Path:
     """
     Process downloaded raw data: reproject, clip, and save to processed/.
     
+    The GeoPackage in processed/ is always written. With write_parquet, a
+    GeoParquet copy is written alongside it; loaders prefer that copy while
+    it is at least as new as the GeoPackage.
+    
+    Every build is recorded in the build manifest (see src/data/manifest.py).
+    With incremental builds, a dataset whose raw input, parameters and
+    output are unchanged is skipped without reading it, and when only some
+    raw features changed, only those are clipped and reprojected and
+    upserted into the previous output.
+    
+    With a chunk_size, a raw file is instead streamed in batches that are
+    clipped, reprojected and appended to the output one at a time (see
+    src/data/chunked.py), so memory stays bounded for statewide layers. Such
+    builds are skipped when unchanged but otherwise always rebuild in full.
+    Raw Overpass JSON responses (.json, for 'osm' and 'hydrology') are
+    always streamed this way, with elements built into features by
+    src/data/osm.py.
+    
+    With validation, invalid geometries are repaired with make_valid before
+    writing, and the data-quality report of the output (see
+    src/data/validation.py) is cached next to it, with problems printed
+    as warnings.
+    
     Parameters
     ----------
     dataset_name : str
         Name of dataset (key in DATASET_FILES)
-    raw_file : Path
-        Path to raw downloaded file
+    raw_file : Path or gpd.GeoDataFrame
+        Path to raw downloaded file, or already-loaded raw data
     output_crs : str, optional
         Target CRS. Defaults to LOCAL_CRS
     clip_to_city : bool
         Whether to clip to city limits
+    write_parquet : bool, optional
+        Also write a GeoParquet copy. Defaults to config WRITE_PARQUET
+    write_lod : bool, optional
+        Also write level-of-detail sidecars for map rendering (see
+        src/data/lod.py). Defaults to config WRITE_LOD, except in chunked
+        mode, where building them would load every geometry
+    write_index : bool, optional
+        Also write packed spatial index sidecars for disk-backed bbox and
+        nearest queries (see src/data/spatial_index.py). Defaults to config
+        WRITE_SPATIAL_INDEX
+    incremental : bool, optional
+        Skip or incrementally update based on the build manifest. Defaults
+        to config INCREMENTAL_BUILDS; False always rebuilds in full
+    layer : str, optional
+        For zip archives, the member to read by file name (e.g.
+        'gis_osm_roads_free_1'). Defaults to the first shapefile. Members are
+        read in place through GDAL's /vsizip/, without extraction.
+    chunk_size : int, optional
+        Stream a raw file in batches of this many features. Defaults to
+        config PROCESS_CHUNK_SIZE; 0 reads the whole layer at once (Overpass
+        responses then use osm.BATCH_SIZE)
+    workers : int, optional
+        Processes clipping and reprojecting batches in chunked mode.
+        Defaults to config PROCESS_WORKERS
+    validate : bool, optional
+        Repair invalid geometries and write the validation report. Defaults
+        to config VALIDATE_PROCESSED
     
     Returns
     -------
@@ -521,50 +639,436 @@ def process_downloaded_data(
     
     if output_crs is None:
         output_crs = LOCAL_CRS
+    if incremental is None:
+        incremental = INCREMENTAL_BUILDS
+    from_file = not isinstance(raw_file, gpd.GeoDataFrame)
+    chunk_size = PROCESS_CHUNK_SIZE if chunk_size is None else chunk_size
+    overpass = (from_file and Path(raw_file).suffix == ".json"
+                and dataset_name in OVERPASS_BUILDERS)
+    chunked = from_file and chunk_size > 0 and not overpass
+    write_parquet = WRITE_PARQUET if write_parquet is None else write_parquet
+    write_lod = (WRITE_LOD and not chunked) if write_lod is None else write_lod
+    write_index = WRITE_SPATIAL_INDEX if write_index is None else write_index
+    validate = VALIDATE_PROCESSED if validate is None else validate
+    output_path = get_data_path(dataset_name, processed=True)
+    
+    # City limits (clip boundary), if clipping is requested and available
+    city_limits = None
+    city_limits_path = get_city_limits_path() if clip_to_city else None
+    if clip_to_city:
+        if city_limits_path and city_limits_path.exists():
+            city_limits = gpd.read_file(city_limits_path)
+        else:
+            print(f"Warning: City limits not found. Skipping clip for {dataset_name}")
+    
+    params = {
+        "layer": layer,
+        "output_crs": str(output_crs),
+        "clip_to_city": clip_to_city,
+        "city_limits": content_hash(city_limits_path) if city_limits is not None else None,
+        "write_parquet": bool(write_parquet),
+        "write_lod": bool(write_lod),
+        "write_index": bool(write_index),
+        "validate": bool(validate),
+    }
+    entry = get_entry(output_path, dataset_name)
+    reusable = (incremental and entry.get("params_hash") == params_hash(params)
+                and output_matches(entry, output_path))
+    
+    input_hash = content_hash(raw_file) if from_file else None
+    if reusable and input_hash is not None and entry.get("input_hash") == input_hash:
+        print(f"↷ {dataset_name}: raw input and parameters unchanged, skipping processing")
+        return output_path
+    
+    streamed = dict(
+        output_path=output_path, dataset_name=dataset_name, city_limits=city_limits,
+        output_crs=output_crs, chunk_size=chunk_size or OVERPASS_BATCH_SIZE,
+        write_parquet=write_parquet, write_lod=write_lod, write_index=write_index,
+        validate=validate, input_hash=input_hash, params=params,
+    )
+    if overpass:
+        print(f"Streaming {dataset_name} from Overpass response {Path(raw_file).name}...")
+        stats = write_overpass_layer(
+            raw_file, dataset_name, output_path, city_limits, output_crs,
+            batch_size=chunk_size or OVERPASS_BATCH_SIZE, repair=validate
+        )
+        print(f"Processed {output_path.stem} saved to: {output_path} ({stats['features']} features)")
+        return _finish_streamed(
+            **streamed, input_crs="EPSG:4326", mode="overpass", features=stats["features"],
+            added=stats["elements"], repaired=stats["repaired"]
+        )
+    
+    if chunked:
+        print(f"Processing {dataset_name} in chunks of {chunk_size} features...")
+        stats = process_in_chunks(
+            resolve_vector_path(raw_file, layer), output_path, city_limits, output_crs,
+            chunk_size=chunk_size, workers=PROCESS_WORKERS if workers is None else workers,
+            repair=validate
+        )
+        if city_limits is not None:
+            print_clip_report(stats)
+        print(f"Processed {output_path.stem} saved to: {output_path} ({stats['batches']} batches)")
+        return _finish_streamed(
+            **streamed, input_crs=CRS.from_user_input(stats["crs"]).to_string(), mode="chunked",
+            features=stats["output"], added=stats["read_candidates"], repaired=stats["repaired"]
+        )
+    
+    def read(path):
+        # With a boundary, only features in its bbox are decoded (read-time
+        # prefilter) before the staged clip
+        if city_limits is not None:
+            return read_prefiltered(path, city_limits)
+        return gpd.read_file(path), None
     
     # Load raw data
-    if raw_file.suffix == '.zip':
-        # Extract and find shapefile
-        import zipfile
-        import tempfile
-        
-        with tempfile.TemporaryDirectory() as tmpdir:
-            with zipfile.ZipFile(raw_file, 'r') as zip_ref:
-                zip_ref.extractall(tmpdir)
-            
-            # Find shapefile
-            shp_files = list(Path(tmpdir).rglob("*.shp"))
-            if not shp_files:
-                raise ValueError(f"No shapefile found in {raw_file}")
-            
-            gdf = gpd.read_file(shp_files[0])
+    read_stats = None
+    if not from_file:
+        gdf = raw_file
     else:
-        gdf = gpd.read_file(raw_file)
+        # Zip members are read in place through /vsizip/
+        gdf, read_stats = read(resolve_vector_path(raw_file, layer))
     
     # Set CRS if missing
     if gdf.crs is None:
         print(f"Warning: {dataset_name} has no CRS. Assuming EPSG:4326 (WGS84)")
         gdf = gdf.set_crs("EPSG:4326", allow_override=True)
     
-    # Clip to city limits if requested
-    if clip_to_city:
-        city_limits_path = get_city_limits_path()
-        if city_limits_path and city_limits_path.exists():
-            city_limits = gpd.read_file(city_limits_path)
-            gdf = gpd.clip(gdf, city_limits)
+    # Feature hashes map every output row back to the raw feature it came from
+    gdf = gdf.reset_index(drop=True)
+    hashes = feature_hashes(gdf)
+    input_crs = gdf.crs.to_string()
+    if input_hash is None:
+        input_hash = hashlib.sha256(input_crs.encode() + np.sort(hashes).tobytes()).hexdigest()
+        if reusable and entry.get("input_hash") == input_hash:
+            print(f"↷ {dataset_name}: raw input and parameters unchanged, skipping processing")
+            return output_path
+    
+    # Diff against the previous build's features
+    previous = load_feature_hashes(output_path) if reusable and entry.get("input_crs") == input_crs else None
+    mode, added, removed = "full", np.ones(len(gdf), dtype=bool), None
+    if previous is not None:
+        old_inputs, old_outputs = previous
+        changed = ~np.isin(hashes, old_inputs)
+        removed = np.setdiff1d(old_inputs, hashes)
+        if changed.sum() + len(removed) <= MAX_INCREMENTAL_FRACTION * max(len(gdf), 1):
+            mode, added = "incremental", changed
+            print(f"{dataset_name}: {int(changed.sum())} added/changed and {len(removed)} "
+                  f"removed features; updating previous output")
+    
+    processed = _clip_and_reproject(gdf[added], dataset_name, city_limits, output_crs, read_stats)
+    output_hashes = hashes[processed.index.to_numpy()]
+    processed = processed.reset_index(drop=True)
+    
+    derived_columns = []
+    if mode == "incremental":
+        existing = gpd.read_file(output_path)
+        if len(existing) == len(old_outputs):
+            keep = ~np.isin(old_outputs, removed)
+            processed = pd.concat([existing[keep], processed], ignore_index=True)
+            output_hashes = np.concatenate([old_outputs[keep], output_hashes])
+            # Columns added by update_processed are kept; new features have none yet
+            derived_columns = [c for c in entry.get("derived_columns", []) if c in processed.columns]
+            if derived_columns and added.any():
+                print(f"{dataset_name}: {int(added.sum())} new features have no values for "
+                      f"derived columns ({', '.join(derived_columns)}); recompute them to fill in")
         else:
-            print(f"Warning: City limits not found. Skipping clip for {dataset_name}")
+            print(f"Warning: {output_path.name} does not match its feature hashes; rebuilding")
+            mode = "full"
+            processed = _clip_and_reproject(gdf, dataset_name, city_limits, output_crs, read_stats)
+            output_hashes = hashes[processed.index.to_numpy()]
+            processed = processed.reset_index(drop=True)
     
-    # Reproject to target CRS
-    if str(gdf.crs) != output_crs:
-        gdf = gdf.to_crs(output_crs)
+    report = None
+    if validate:
+        processed, repaired = repair_geometries(processed)
+        report = validate_frame(
+            processed, bounds=_validation_bounds(city_limits, output_crs),
+            id_columns=dataset_id_columns(output_path, processed.columns)
+        )
+        report["repaired"] = repaired
     
     # Save to processed directory
-    output_path = get_data_path(dataset_name, processed=True)
+    save_processed(
+        processed, output_path,
+        write_parquet=write_parquet, write_lod=write_lod, write_index=write_index
+    )
+    save_feature_hashes(output_path, hashes, output_hashes)
+    if mode == "full" and entry.get("derived_columns"):
+        print(f"Warning: {dataset_name} was rebuilt in full; derived columns "
+              f"({', '.join(entry['derived_columns'])}) must be recomputed")
+    entry = record_build(
+        output_path, dataset_name,
+        input_hash=input_hash, input_crs=input_crs,
+        params=params, params_hash=params_hash(params),
+        mode=mode, features=len(processed),
+        added=int(added.sum()), removed=0 if removed is None or mode == "full" else len(removed),
+        derived_columns=derived_columns,
+    )
+    if report is not None:
+        _store_report(output_path, dataset_name, report, entry)
+    return output_path
+
+
+def _finish_streamed(
+    output_path: Path,
+    dataset_name: str,
+    city_limits: Optional[gpd.GeoDataFrame],
+    output_crs: str,
+    chunk_size: int,
+    write_parquet: bool,
+    write_lod: bool,
+    write_index: bool,
+    validate: bool,
+    repaired: int,
+    **fields
+) -> Path:
+    """
+    Write the derived files of a streamed build and record it in the manifest.
+
+    fields are stored in the manifest entry (input_hash, input_crs, params,
+    mode, feature counts).
+    """
+    written = [output_path]
+    if write_parquet:
+        written.append(stream_geoparquet(output_path, output_path.with_suffix(".parquet"), chunk_size))
+        print(f"GeoParquet copy saved to: {written[-1]}")
+    write_sidecars(written, write_lod=write_lod, write_index=write_index)
+    # No per-feature hashes: the next incremental build starts in full
+    features_path(output_path).unlink(missing_ok=True)
+    entry = record_build(
+        output_path, dataset_name, params_hash=params_hash(fields["params"]), removed=0, **fields
+    )
+    if validate:
+        report = validate_file(output_path, bounds=_validation_bounds(city_limits, output_crs))
+        _store_report(output_path, dataset_name, dict(report, repaired=repaired), entry)
+    return output_path
+
+
+def _validation_bounds(city_limits: Optional[gpd.GeoDataFrame], output_crs: str):
+    """Expected extent for validation: the clip boundary, else get_santa_fe_bounds."""
+    return boundary_bbox(city_limits, output_crs) if city_limits is not None else None
+
+
+def _store_report(output_path: Path, dataset_name: str, report: dict, entry: dict) -> None:
+    """Cache the validation report of a build's output and print its problems."""
+    save_report(output_path, report, sha256=entry.get("output_hash"))
+    if report["repaired"]:
+        print(f"{dataset_name}: repaired {report['repaired']} invalid geometries")
+    for issue in report_issues(report):
+        print(f"Warning: {dataset_name}: {issue}")
+
+
+def _clip_and_reproject(
+    gdf: gpd.GeoDataFrame,
+    dataset_name: str,
+    city_limits: Optional[gpd.GeoDataFrame],
+    output_crs: str,
+    read_stats: Optional[dict] = None
+) -> gpd.GeoDataFrame:
+    """Clip to the city limits (if given) and reproject, keeping the input index."""
+    if city_limits is not None and len(gdf):
+        # Clip and reproject, in whichever order touches fewer features: clip
+        # first when most features will be dropped, otherwise reproject first
+        plan = choose_clip_order(gdf, city_limits)
+        print(
+            f"Clipping {dataset_name} to city limits "
+            f"({plan['in_bbox']}/{plan['features']} features in boundary bbox, "
+            f"{plan['order'].replace('_', ' ')})..."
+        )
+        if plan["order"] == "reproject_first":
+            gdf = reproject(gdf, output_crs)
+        gdf, stats = staged_clip(gdf, city_limits, report=False)
+        if read_stats is not None:
+            merge_read_stats(stats, read_stats)
+        print_clip_report(stats)
+    
+    # Reproject to target CRS (no-op if already done)
+    return reproject(gdf, output_crs)
+
+
+def save_processed(
+    gdf: gpd.GeoDataFrame,
+    output_path: Path,
+    write_parquet: Optional[bool] = None,
+    write_lod: Optional[bool] = None,
+    write_index: Optional[bool] = None
+) -> List[Path]:
+    """
+    Write a processed dataset and its derived files.
+    
+    Writes the GeoPackage, then optionally the GeoParquet copy, and the LOD
+    and spatial index sidecars for each written file (sidecars of the old
+    file would otherwise be stale).
+    
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Processed data
+    output_path : Path
+        GeoPackage path in processed/
+    write_parquet : bool, optional
+        Also write a GeoParquet copy. Defaults to config WRITE_PARQUET
+    write_lod : bool, optional
+        Write level-of-detail sidecars. Defaults to config WRITE_LOD
+    write_index : bool, optional
+        Write spatial index sidecars. Defaults to config WRITE_SPATIAL_INDEX
+    
+    Returns
+    -------
+    list of Path
+        Written dataset files (GeoPackage first)
+    """
+    output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     gdf.to_file(output_path, driver="GPKG")
-    print(f"Processed {dataset_name} saved to: {output_path}")
+    print(f"Processed {output_path.stem} saved to: {output_path}")
     
+    if write_parquet is None:
+        write_parquet = WRITE_PARQUET
+    written = [output_path]
+    if write_parquet:
+        parquet_path = write_geoparquet(gdf, output_path.with_suffix(".parquet"))
+        print(f"GeoParquet copy saved to: {parquet_path}")
+        written.append(parquet_path)
+    
+    write_sidecars(written, write_lod=write_lod, write_index=write_index)
+    return written
+
+
+def update_processed(
+    dataset_name: str,
+    gdf: gpd.GeoDataFrame,
+    output_path: Path,
+    derived_columns: Sequence[str]
+) -> Path:
+    """
+    Rewrite a processed dataset with computed columns added.
+
+    Used for analysis results stored on a processed layer (parcel proximity,
+    network access times). The rewrite goes through save_processed with the
+    options of the recorded build, refreshes the validation report and is
+    recorded in the build manifest with the derived column names, so the
+    next process_downloaded_data neither rebuilds the file from raw nor
+    drops the columns on incremental upserts.
+
+    Parameters
+    ----------
+    dataset_name : str
+        Name of dataset (key in DATASET_FILES)
+    gdf : gpd.GeoDataFrame
+        The dataset's rows in file order (as read by gpd.read_file from
+        output_path), with the derived columns set
+    output_path : Path
+        Processed GeoPackage
+    derived_columns : sequence of str
+        Columns added to the dataset
+
+    Returns
+    -------
+    Path
+        Path to processed file
+    """
+    output_path = Path(output_path)
+    entry = get_entry(output_path, dataset_name)
+    params = entry.get("params", {})
+    validate = params.get("validate", False) or report_path(output_path).exists()
+
+    report = None
+    if validate:
+        city_limits = None
+        if params.get("clip_to_city"):
+            from ..config import get_city_limits_path
+            city_limits_path = get_city_limits_path()
+            if city_limits_path is not None and city_limits_path.exists():
+                city_limits = gpd.read_file(city_limits_path)
+        report = validate_frame(
+            gdf, bounds=_validation_bounds(city_limits, params.get("output_crs", LOCAL_CRS)),
+            id_columns=dataset_id_columns(output_path, gdf.columns)
+        )
+        report["repaired"] = 0
+
+    save_processed(
+        gdf, output_path,
+        write_parquet=params.get("write_parquet", output_path.with_suffix(".parquet").exists()),
+        write_lod=params.get("write_lod"), write_index=params.get("write_index")
+    )
+    if entry:
+        fields = {k: v for k, v in entry.items()
+                  if k not in ("output", "output_hash", "output_signature", "built_at")}
+        fields["derived_columns"] = sorted(set(fields.get("derived_columns", [])) | set(derived_columns))
+        entry = record_build(output_path, dataset_name, **fields)
+    if report is not None:
+        _store_report(output_path, dataset_name, report, entry)
+    return output_path
+
+
+def write_sidecars(
+    paths: List[Path],
+    write_lod: Optional[bool] = None,
+    write_index: Optional[bool] = None
+) -> None:
+    """
+    Write the LOD and spatial index sidecars of freshly written dataset files.
+    
+    Parameters
+    ----------
+    paths : list of Path
+        Processed GeoPackage and/or GeoParquet files
+    write_lod : bool, optional
+        Write level-of-detail sidecars. Defaults to config WRITE_LOD
+    write_index : bool, optional
+        Write spatial index sidecars. Defaults to config WRITE_SPATIAL_INDEX
+    """
+    if write_lod is None:
+        write_lod = WRITE_LOD
+    if write_lod:
+        for path in paths:
+            build_lod(path)
+    
+    if write_index is None:
+        write_index = WRITE_SPATIAL_INDEX
+    if write_index:
+        for path in paths:
+            build_spatial_index(path)
+
+
+def write_geoparquet(
+    gdf: gpd.GeoDataFrame,
+    output_path: Path,
+    row_group_size: int = PARQUET_ROW_GROUP_SIZE
+) -> Path:
+    """
+    Write a GeoDataFrame as GeoParquet with per-row-group bbox statistics.
+    
+    Rows are sorted along a Hilbert curve first so that each row group covers
+    a compact area, which lets bbox reads skip most row groups.
+    
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Data to write
+    output_path : Path
+        Output .parquet path
+    row_group_size : int
+        Maximum rows per Parquet row group
+    
+    Returns
+    -------
+    Path
+        Path to written file
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    if len(gdf) > 1 and not (gdf.geometry.isna() | gdf.geometry.is_empty).any():
+        order = gdf.geometry.hilbert_distance().argsort(kind="stable")
+        gdf = gdf.iloc[order.to_numpy()]
+    
+    gdf.to_parquet(
+        output_path,
+        index=False,
+        write_covering_bbox=True,
+        row_group_size=row_group_size
+    )
     return output_path
 
@@ -5,307 +5,800 @@ Data loading utilities for Santa Fe geospatial datasets.
 import geopandas as gpd
 import pandas as pd
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Tuple, Union
 
-from ..config import get_data_path, DATA_PROCESSED, get_city_limits_path
+from pyproj import CRS
 
+from ..config import get_data_path, DATA_PROCESSED, VALIDATE_ON_LOAD, get_city_limits_path
+from .cache import file_signature, loader_cache
+from .registry import dataset_names, dataset_spec
+from .validation import load_report, repair_geometries, report_issues, validation_report
 
-def load_parcels(
-    data_dir: Optional[Path] = None,
-    expected_crs: Optional[str] = None,
-    required_columns: Optional[List[str]] = None
+
+BBox = Union[Tuple[float, float, float, float], dict]
+
+# Validation reports already warned about in this process
+_reported = set()
+
+
+def _normalize_bbox(bbox: Optional[BBox]) -> Optional[Tuple[float, float, float, float]]:
+    """Accept (minx, miny, maxx, maxy) or a get_santa_fe_bounds()-style dict."""
+    if bbox is None:
+        return None
+    if isinstance(bbox, dict):
+        bbox = (bbox['minx'], bbox['miny'], bbox['maxx'], bbox['maxy'])
+    return tuple(float(v) for v in bbox)
+
+
+def _mask_token(mask) -> Optional[tuple]:
+    """Hashable token identifying a mask geometry for cache keys."""
+    if mask is None:
+        return None
+    if isinstance(mask, (gpd.GeoDataFrame, gpd.GeoSeries)):
+        crs = str(mask.crs) if mask.crs is not None else None
+        return ("frame", crs, tuple(mask.geometry.to_wkb()))
+    if isinstance(mask, dict):
+        return ("geojson", repr(sorted(mask.items())))
+    return ("geometry", mask.wkb)
+
+
+def _fresh_parquet(path: Path) -> Optional[Path]:
+    """
+    Return the GeoParquet copy of a GeoPackage if present and not stale.
+    
+    The copy is used only when it is at least as new as the GeoPackage and
+    pyarrow is installed.
+    """
+    parquet_path = Path(path).with_suffix(".parquet")
+    if not parquet_path.exists():
+        return None
+    if parquet_path.stat().st_mtime_ns < Path(path).stat().st_mtime_ns:
+        return None
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return parquet_path
+
+
+def _parquet_crs(path: Path):
+    """Read the geometry CRS from GeoParquet metadata without reading rows."""
+    import json
+    import pyarrow.parquet as pq
+    from pyproj import CRS
+    
+    geo = json.loads(pq.read_schema(path).metadata[b"geo"])
+    crs = geo["columns"][geo["primary_column"]].get("crs", "OGC:CRS84")
+    if crs is None:
+        return None
+    return CRS.from_user_input(crs)
+
+
+def _read_parquet(
+    path: Path,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    mask=None,
+    columns: Optional[List[str]] = None
+) -> gpd.GeoDataFrame:
+    """Read a GeoParquet file, pruning row groups and columns via Arrow."""
+    if columns is not None:
+        columns = list(columns) + (["geometry"] if "geometry" not in columns else [])
+    
+    if mask is not None:
+        if isinstance(mask, (gpd.GeoDataFrame, gpd.GeoSeries)):
+            mask_series = mask.geometry if isinstance(mask, gpd.GeoDataFrame) else mask
+        else:
+            if isinstance(mask, dict):
+                from shapely.geometry import shape
+                mask = shape(mask)
+            mask_series = gpd.GeoSeries([mask])
+        dataset_crs = _parquet_crs(path) if mask_series.crs is not None else None
+        if dataset_crs is not None:
+            mask_series = mask_series.to_crs(dataset_crs)
+        mask_geom = mask_series.union_all()
+        gdf = gpd.read_parquet(path, columns=columns, bbox=tuple(mask_geom.bounds))
+        return gdf[gdf.intersects(mask_geom)]
+    
+    return gpd.read_parquet(path, columns=columns, bbox=bbox)
+
+
+def _read_dataset(
+    path: Path,
+    use_cache: bool = True,
+    bbox: Optional[BBox] = None,
+    mask=None,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    validate: bool = False
 ) -> gpd.GeoDataFrame:
     """
-    Load city parcels + zoning data.
+    Read a processed dataset file, going through the shared loader cache.
+    
+    Spatial and attribute filters are pushed down to GDAL, so a GeoPackage
+    answers them from its R-tree index and SQL attribute filter and only
+    matching rows and fields are decoded.
+    
+    If a fresh GeoParquet copy exists next to the GeoPackage (see
+    process_downloaded_data), it is read through Arrow instead, using
+    row-group bbox statistics and column pruning. SQL ``where`` filters
+    always go to the GeoPackage.
     
     Parameters
     ----------
-    data_dir : Path, optional
-        Base data directory. Defaults to config DATA_PROCESSED
-    expected_crs : str, optional
-        Expected CRS (e.g., 'EPSG:3857'). If provided, validates CRS matches.
-    required_columns : list of str, optional
-        Required column names. If provided, validates columns exist.
+    path : Path
+        Dataset file to read
+    use_cache : bool
+        If False, bypass the cache and always read from disk
+    bbox : tuple or dict, optional
+        (minx, miny, maxx, maxy) in the dataset CRS, or a bounds dict
+    mask : shapely geometry, GeoDataFrame or GeoSeries, optional
+        Only read features intersecting this geometry. CRS of a
+        GeoDataFrame/GeoSeries mask is matched to the dataset.
+    columns : list of str, optional
+        Attribute columns to read (geometry is always included)
+    where : str, optional
+        SQL WHERE clause evaluated by the driver, e.g. "zoning = 'R-1'"
+    validate : bool
+        Check the file against its cached validation report (see
+        src/data/validation.py), warning about problems and repairing
+        invalid geometries in the result
     
     Returns
     -------
     gpd.GeoDataFrame
-        Parcels with zoning information
-    
-    Raises
-    ------
-    FileNotFoundError
-        If dataset file doesn't exist
-    ValueError
-        If CRS or columns don't match expectations
+        Dataset contents (a private copy when served from the cache)
     """
-    if data_dir is None:
-        parcels_path = get_data_path("parcels", processed=True)
+    if bbox is not None and mask is not None:
+        raise ValueError("Provide either bbox or mask, not both.")
+    
+    bbox = _normalize_bbox(bbox)
+    read_kwargs = {}
+    if bbox is not None:
+        read_kwargs['bbox'] = bbox
+    if mask is not None:
+        read_kwargs['mask'] = mask
+    if columns is not None:
+        read_kwargs['columns'] = list(columns)
+    if where is not None:
+        read_kwargs['where'] = where
+    
+    dataset_path = path
+    parquet_path = _fresh_parquet(path) if where is None else None
+    if parquet_path is not None:
+        path = parquet_path
+    
+    def read():
+        if parquet_path is not None:
+            return _read_parquet(parquet_path, bbox=bbox, mask=mask, columns=columns)
+        return gpd.read_file(path, **read_kwargs)
+    
+    if not use_cache:
+        gdf = read()
     else:
-        parcels_path = data_dir / "parcels_zoning.gpkg"
+        options = {
+            'bbox': bbox,
+            'mask': _mask_token(mask),
+            'columns': tuple(columns) if columns is not None else None,
+            'where': where,
+        }
+        gdf = loader_cache.get_or_load(path, read, options)
     
-    if not parcels_path.exists():
-        raise FileNotFoundError(
-            f"Parcels data not found at {parcels_path}. "
-            "Download from City of Santa Fe GIS and process first. "
-            f"Expected location: {get_data_path('parcels', processed=True)}"
-        )
+    if validate:
+        gdf = _check_quality(dataset_path, gdf)
+    return gdf
+
+
+def _check_quality(path: Path, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """Warn about a dataset's validation problems (once) and repair invalid geometries."""
+    report = validation_report(path)
+    if report['sha256'] not in _reported:
+        _reported.add(report['sha256'])
+        for issue in report_issues(report):
+            print(f"Warning: {Path(path).name}: {issue}")
+    if report['invalid_geometry']:
+        gdf, _ = repair_geometries(gdf)
+    return gdf
+
+
+class Dataset:
+    """
+    Lazy handle on a processed dataset.
     
-    gdf = gpd.read_file(parcels_path)
+    Metadata (columns, CRS, row count, bounds) comes from the file header and
+    is re-read only when the file changes; features are read by read(),
+    head() and nearest() only.
     
-    # Validate CRS
-    if expected_crs is not None:
-        if gdf.crs is None:
-            raise ValueError(
-                f"Parcels data has no CRS. Expected {expected_crs}. "
-                "Set CRS during data processing."
-            )
-        if str(gdf.crs) != expected_crs:
-            raise ValueError(
-                f"Parcels CRS mismatch: got {gdf.crs}, expected {expected_crs}. "
-                "Reproject during data processing."
-            )
+    Parameters
+    ----------
+    name : str
+        Registered dataset name (see src/data/registry.py)
+    data_dir : Path, optional
+        Base data directory. Defaults to config DATA_PROCESSED
     
-    # Validate columns
-    if required_columns is not None:
-        missing = set(required_columns) - set(gdf.columns)
-        if missing:
-            raise ValueError(
-                f"Parcels data missing required columns: {missing}. "
-                f"Available columns: {list(gdf.columns)}"
+    Raises
+    ------
+    ValueError
+        If the dataset is not registered
+    """
+    
+    def __init__(self, name: str, data_dir: Optional[Path] = None):
+        self.spec = dataset_spec(name)
+        self.name = name
+        if data_dir is None:
+            self.path = get_data_path(name, processed=True)
+        else:
+            self.path = Path(data_dir) / self.spec['file']
+        self._info = None
+    
+    def __repr__(self) -> str:
+        if not self.exists:
+            return f"<Dataset {self.name}: missing ({self.path})>"
+        return f"<Dataset {self.name}: {len(self)} features, {self.crs}, {self.path.name}>"
+    
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+    
+    def _require(self) -> None:
+        if not self.exists:
+            raise FileNotFoundError(
+                f"{self.spec['label']} data not found at {self.path}. "
+                f"Download from {self.spec['source']} and process first. "
+                f"Expected location: {get_data_path(self.name, processed=True)}"
             )
     
-    return gdf
+    @property
+    def info(self) -> dict:
+        """Layer metadata from pyogrio.read_info (fields, crs, features, total_bounds, ...)."""
+        import pyogrio
+        
+        self._require()
+        signature = file_signature(self.path)
+        if self._info is None or self._info[0] != signature:
+            info = pyogrio.read_info(self.path, force_feature_count=True, force_total_bounds=True)
+            self._info = (signature, info)
+        return self._info[1]
+    
+    @property
+    def columns(self) -> List[str]:
+        """Attribute column names."""
+        return list(self.info['fields'])
+    
+    @property
+    def crs(self) -> Optional[CRS]:
+        crs = self.info['crs']
+        return CRS.from_user_input(crs) if crs else None
+    
+    @property
+    def geometry_type(self) -> str:
+        return self.info['geometry_type']
+    
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """(minx, miny, maxx, maxy) of all features, in the dataset CRS."""
+        return tuple(float(v) for v in self.info['total_bounds'])
+    
+    def __len__(self) -> int:
+        return int(self.info['features'])
+    
+    @property
+    def missing_columns(self) -> List[str]:
+        """Registered columns absent from the file."""
+        columns = set(self.columns)
+        return [c for c in self.spec['columns'] if c not in columns]
+    
+    def read(
+        self,
+        bbox: Optional[BBox] = None,
+        mask=None,
+        columns: Optional[List[str]] = None,
+        where: Optional[str] = None,
+        use_cache: bool = True,
+        validate: Optional[bool] = None,
+        expected_crs: Optional[str] = None,
+        required_columns: Optional[List[str]] = None
+    ) -> gpd.GeoDataFrame:
+        """
+        Read the dataset's features.
+        
+        Parameters
+        ----------
+        bbox : tuple or dict, optional
+            Only read features intersecting (minx, miny, maxx, maxy), given in
+            the dataset CRS. Answered from the GeoPackage spatial index.
+        mask : shapely geometry, GeoDataFrame or GeoSeries, optional
+            Only read features intersecting this geometry (e.g. a neighborhood)
+        columns : list of str, optional
+            Attribute columns to read. Defaults to all columns.
+        where : str, optional
+            SQL WHERE clause pushed down to the driver
+        use_cache : bool
+            If True (default), reuse the in-process copy while the file is unchanged
+        validate : bool, optional
+            Warn about problems in the file's data-quality report and repair
+            invalid geometries. Defaults to config VALIDATE_ON_LOAD
+        expected_crs : str, optional
+            Expected CRS (e.g., 'EPSG:3857'). If provided, validates CRS matches.
+        required_columns : list of str, optional
+            Required column names. If provided, validates columns exist.
+        
+        Returns
+        -------
+        gpd.GeoDataFrame
+            Dataset contents
+        
+        Raises
+        ------
+        FileNotFoundError
+            If dataset file doesn't exist
+        ValueError
+            If CRS or columns don't match expectations
+        """
+        self._require()
+        gdf = _read_dataset(
+            self.path, use_cache=use_cache,
+            bbox=bbox, mask=mask, columns=columns, where=where,
+            validate=VALIDATE_ON_LOAD if validate is None else validate
+        )
+        label = self.spec['label']
+        
+        if expected_crs is not None:
+            if gdf.crs is None:
+                raise ValueError(
+                    f"{label} data has no CRS. Expected {expected_crs}. "
+                    "Set CRS during data processing."
+                )
+            if str(gdf.crs) != expected_crs:
+                raise ValueError(
+                    f"{label} CRS mismatch: got {gdf.crs}, expected {expected_crs}. "
+                    "Reproject during data processing."
+                )
+        
+        if required_columns is not None:
+            missing = set(required_columns) - set(gdf.columns)
+            if missing:
+                raise ValueError(
+                    f"{label} data missing required columns: {missing}. "
+                    f"Available columns: {list(gdf.columns)}"
+                )
+        
+        return gdf
+    
+    def head(self, n: int = 5) -> gpd.GeoDataFrame:
+        """First n features, read without touching the rest of the file."""
+        self._require()
+        return gpd.read_file(self.path, max_features=n)
+    
+    def nearest(self, point, k: int = 1, max_distance: Optional[float] = None,
+                columns: Optional[List[str]] = None) -> gpd.GeoDataFrame:
+        """The k features nearest to a point (see load_nearest)."""
+        return load_nearest(self.name, point, k=k, max_distance=max_distance,
+                            data_dir=self.path.parent, columns=columns)
+    
+    @property
+    def report(self) -> Optional[dict]:
+        """Cached validation report, or None if the file has not been validated."""
+        return load_report(self.path) if self.exists else None
+    
+    def validate(self, refresh: bool = False) -> dict:
+        """Validation report, running the checks only if none is cached (or refresh)."""
+        self._require()
+        return validation_report(self.path, refresh=refresh)
+    
+    def status(self) -> dict:
+        """
+        Summary of the dataset file and its derived files, without reading features.
+        
+        Returns
+        -------
+        dict
+            name, label, exists, path; for existing files also features,
+            crs, geometry_type, bounds, size_mb, modified, missing_columns,
+            parquet / spatial_index / lod (fresh derived files present),
+            issues (validation problems, None if never validated) and
+            built_at (from the build manifest)
+        """
+        from datetime import datetime
+        from .lod import lod_path
+        from .manifest import get_entry
+        from .spatial_index import open_spatial_index
+        
+        status = {'name': self.name, 'label': self.spec['label'],
+                  'exists': self.exists, 'path': str(self.path)}
+        if not self.exists:
+            return status
+        _, mtime_ns, size = file_signature(self.path)
+        lod = lod_path(self.path)
+        report = self.report
+        status.update(
+            features=len(self),
+            crs=self.crs.to_string() if self.crs is not None else None,
+            geometry_type=self.geometry_type,
+            bounds=self.bounds,
+            size_mb=size / 1024**2,
+            modified=datetime.fromtimestamp(mtime_ns / 1e9),
+            missing_columns=self.missing_columns,
+            parquet=_fresh_parquet(self.path) is not None,
+            spatial_index=open_spatial_index(self.path) is not None,
+            lod=lod.exists() and lod.stat().st_mtime_ns >= mtime_ns,
+            issues=None if report is None else len(report_issues(report)),
+            built_at=get_entry(self.path, self.name).get('built_at'),
+        )
+        return status
 
 
-def load_census_tracts(
-    data_dir: Optional[Path] = None,
-    expected_crs: Optional[str] = None,
-    required_columns: Optional[List[str]] = None
-) -> gpd.GeoDataFrame:
+def load(name: str, data_dir: Optional[Path] = None) -> Dataset:
     """
-    Load census tracts with ACS demographics.
+    Lazy handle on a registered dataset.
+    
+    Nothing is read until metadata or features are asked for, e.g.::
+    
+        tracts = load("census_tracts")
+        len(tracts), tracts.crs, tracts.bounds   # from the file header
+        gdf = tracts.read(columns=["GEOID", "median_income"])
     
     Parameters
     ----------
+    name : str
+        Dataset name (see src/data/registry.py)
     data_dir : Path, optional
         Base data directory. Defaults to config DATA_PROCESSED
-    expected_crs : str, optional
-        Expected CRS. If provided, validates CRS matches.
-    required_columns : list of str, optional
-        Required column names. If provided, validates columns exist.
     
     Returns
     -------
-    gpd.GeoDataFrame
-        Census tracts with demographic attributes
+    Dataset
     
     Raises
     ------
-    FileNotFoundError
-        If dataset file doesn't exist
     ValueError
-        If CRS or columns don't match expectations
+        If the dataset is not registered
     """
-    if data_dir is None:
-        tracts_path = get_data_path("census_tracts", processed=True)
-    else:
-        tracts_path = data_dir / "census_tracts_acs.gpkg"
+    return Dataset(name, data_dir)
+
+
+def dataset_status(data_dir: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Status of every registered dataset (see Dataset.status), without loading any.
     
-    if not tracts_path.exists():
-        raise FileNotFoundError(
-            f"Census tracts data not found at {tracts_path}. "
-            "Download from Census Bureau and process first. "
-            f"Expected location: {get_data_path('census_tracts', processed=True)}"
-        )
+    Parameters
+    ----------
+    data_dir : Path, optional
+        Base data directory. Defaults to config DATA_PROCESSED
     
-    gdf = gpd.read_file(tracts_path)
+    Returns
+    -------
+    pd.DataFrame
+        One row per dataset, indexed by name
+    """
+    return pd.DataFrame([load(name, data_dir).status() for name in dataset_names()]).set_index('name')
+
+
+def load_parcels(
+    data_dir: Optional[Path] = None,
+    expected_crs: Optional[str] = None,
+    required_columns: Optional[List[str]] = None,
+    bbox: Optional[BBox] = None,
+    mask=None,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    use_cache: bool = True,
+    validate: Optional[bool] = None
+) -> gpd.GeoDataFrame:
+    """
+    Load city parcels + zoning data.
     
-    if expected_crs is not None:
-        if gdf.crs is None:
-            raise ValueError(
-                f"Census tracts data has no CRS. Expected {expected_crs}. "
-                "Set CRS during data processing."
-            )
-        if str(gdf.crs) != expected_crs:
-            raise ValueError(
-                f"Census tracts CRS mismatch: got {gdf.crs}, expected {expected_crs}. "
-                "Reproject during data processing."
-            )
+    Shorthand for ``load('parcels', data_dir).read(...)``; see Dataset.read
+    for the parameters.
     
-    if required_columns is not None:
-        missing = set(required_columns) - set(gdf.columns)
-        if missing:
-            raise ValueError(
-                f"Census tracts missing required columns: {missing}. "
-                f"Available columns: {list(gdf.columns)}"
-            )
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Parcels with zoning information
+    """
+    return load("parcels", data_dir).read(
+        bbox=bbox, mask=mask, columns=columns, where=where, use_cache=use_cache,
+        validate=validate, expected_crs=expected_crs, required_columns=required_columns
+    )
+
+
+def load_census_tracts(
+    data_dir: Optional[Path] = None,
+    expected_crs: Optional[str] = None,
+    required_columns: Optional[List[str]] = None,
+    bbox: Optional[BBox] = None,
+    mask=None,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    use_cache: bool = True,
+    validate: Optional[bool] = None
+) -> gpd.GeoDataFrame:
+    """
+    Load census tracts with ACS demographics.
     
-    return gdf
+    Shorthand for ``load('census_tracts', data_dir).read(...)``; see
+    Dataset.read for the parameters.
+    
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Census tracts with demographic attributes
+    """
+    return load("census_tracts", data_dir).read(
+        bbox=bbox, mask=mask, columns=columns, where=where, use_cache=use_cache,
+        validate=validate, expected_crs=expected_crs, required_columns=required_columns
+    )
 
 
 def load_hydrology(
     data_dir: Optional[Path] = None,
-    expected_crs: Optional[str] = None
+    expected_crs: Optional[str] = None,
+    bbox: Optional[BBox] = None,
+    mask=None,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    use_cache: bool = True,
+    validate: Optional[bool] = None
 ) -> gpd.GeoDataFrame:
     """
     Load Santa Fe River + arroyos / hydrology layer.
     
-    Parameters
-    ----------
-    data_dir : Path, optional
-        Base data directory. Defaults to config DATA_PROCESSED
-    expected_crs : str, optional
-        Expected CRS. If provided, validates CRS matches.
+    Shorthand for ``load('hydrology', data_dir).read(...)``; see
+    Dataset.read for the parameters.
     
     Returns
     -------
     gpd.GeoDataFrame
         River, arroyos, and flow paths
-    
-    Raises
-    ------
-    FileNotFoundError
-        If dataset file doesn't exist
-    ValueError
-        If CRS doesn't match expectations
     """
-    if data_dir is None:
-        hydro_path = get_data_path("hydrology", processed=True)
-    else:
-        hydro_path = data_dir / "hydrology.gpkg"
-    
-    if not hydro_path.exists():
-        raise FileNotFoundError(
-            f"Hydrology data not found at {hydro_path}. "
-            "Download from source and process first. "
-            f"Expected location: {get_data_path('hydrology', processed=True)}"
-        )
-    
-    gdf = gpd.read_file(hydro_path)
-    
-    if expected_crs is not None:
-        if gdf.crs is None:
-            raise ValueError(
-                f"Hydrology data has no CRS. Expected {expected_crs}. "
-                "Set CRS during data processing."
-            )
-        if str(gdf.crs) != expected_crs:
-            raise ValueError(
-                f"Hydrology CRS mismatch: got {gdf.crs}, expected {expected_crs}. "
-                "Reproject during data processing."
-            )
-    
-    return gdf
+    return load("hydrology", data_dir).read(
+        bbox=bbox, mask=mask, columns=columns, where=where, use_cache=use_cache,
+        validate=validate, expected_crs=expected_crs
+    )
 
 
 def load_osm_infrastructure(
     data_dir: Optional[Path] = None,
-    expected_crs: Optional[str] = None
+    expected_crs: Optional[str] = None,
+    bbox: Optional[BBox] = None,
+    mask=None,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    use_cache: bool = True,
+    validate: Optional[bool] = None
 ) -> gpd.GeoDataFrame:
     """
     Load OSM roads + POIs.
     
-    Parameters
-    ----------
-    data_dir : Path, optional
-        Base data directory. Defaults to config DATA_PROCESSED
-    expected_crs : str, optional
-        Expected CRS. If provided, validates CRS matches.
+    Shorthand for ``load('osm', data_dir).read(...)``; see Dataset.read for
+    the parameters.
     
     Returns
     -------
     gpd.GeoDataFrame
         Roads and points of interest from OpenStreetMap
-    
-    Raises
-    ------
-    FileNotFoundError
-        If dataset file doesn't exist
-    ValueError
-        If CRS doesn't match expectations
     """
-    if data_dir is None:
-        osm_path = get_data_path("osm", processed=True)
-    else:
-        osm_path = data_dir / "osm_roads_pois.gpkg"
-    
-    if not osm_path.exists():
-        raise FileNotFoundError(
-            f"OSM data not found at {osm_path}. "
-            "Download from GeoFabrik/Overpass API and process first. "
-            f"Expected location: {get_data_path('osm', processed=True)}"
-        )
-    
-    gdf = gpd.read_file(osm_path)
+    return load("osm", data_dir).read(
+        bbox=bbox, mask=mask, columns=columns, where=where, use_cache=use_cache,
+        validate=validate, expected_crs=expected_crs
+    )
+
+
+def load_city_limits(
+    data_dir: Optional[Path] = None,
+    bbox: Optional[BBox] = None,
+    mask=None,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    use_cache: bool = True
+) -> Optional[gpd.GeoDataFrame]:
+    """
+    Load Santa Fe city limits boundary.
     
-    if expected_crs is not None:
-        if gdf.crs is None:
-            raise ValueError(
-                f"OSM data has no CRS. Expected {expected_crs}. "
-                "Set CRS during data processing."
-            )
-        if str(gdf.crs) != expected_crs:
-            raise ValueError(
-                f"OSM CRS mismatch: got {gdf.crs}, expected {expected_crs}. "
-                "Reproject during data processing."
-            )
+    The configured processed file is used when it exists, else the one in
+    data_dir. See Dataset.read for the other parameters; the boundary is
+    never validated on load, since validation itself uses it.
     
-    return gdf
+    Returns
+    -------
+    gpd.GeoDataFrame or None
+        City limits boundary if file exists, None otherwise
+    """
+    dataset = load("city_limits", data_dir if get_city_limits_path() is None else None)
+    if not dataset.exists:
+        return None
+    return dataset.read(
+        bbox=bbox, mask=mask, columns=columns, where=where, use_cache=use_cache, validate=False
+    )
+
+
+def _read_rows(path: Path, index, positions, columns: Optional[List[str]] = None) -> gpd.GeoDataFrame:
+    """Read features by file row position: by fid for GeoPackages, row group for Parquet."""
+    import numpy as np
+    
+    positions = np.sort(np.asarray(positions, dtype=np.int64))
+    if path.suffix != ".parquet":
+        return gpd.read_file(path, fids=index.fids[positions], columns=columns)
+    
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import shapely
+    
+    parquet = pq.ParquetFile(path)
+    if columns is None:
+        # Leave out the bbox covering column written by write_geoparquet
+        import json
+        geo = json.loads(parquet.schema_arrow.metadata[b"geo"])
+        covering = geo["columns"][geo["primary_column"]].get("covering", {}).get("bbox", {})
+        skip = {field[0] for field in covering.values()}
+        columns = [name for name in parquet.schema_arrow.names if name not in skip]
+    row_counts = [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)]
+    starts = np.concatenate([[0], np.cumsum(row_counts)])
+    group_of = np.searchsorted(starts, positions, side="right") - 1
+    groups = np.unique(group_of)
+    if columns is not None:
+        columns = list(columns) + (["geometry"] if "geometry" not in columns else [])
+    table = parquet.read_row_groups(groups.tolist(), columns=columns)
+    # Row offset of each selected group within the table that was read
+    group_starts = np.concatenate([[0], np.cumsum([row_counts[g] for g in groups])])
+    local = positions - starts[group_of] + group_starts[np.searchsorted(groups, group_of)]
+    df = table.take(pa.array(local)).to_pandas()
+    geometry = shapely.from_wkb(df.pop("geometry").to_numpy())
+    return gpd.GeoDataFrame(df, geometry=geometry, crs=_parquet_crs(path))
 
 
-def load_city_limits(data_dir: Optional[Path] = None) -> Optional[gpd.GeoDataFrame]:
+def load_nearest(
+    dataset_name: str,
+    point,
+    k: int = 1,
+    max_distance: Optional[float] = None,
+    data_dir: Optional[Path] = None,
+    columns: Optional[List[str]] = None
+) -> gpd.GeoDataFrame:
     """
-    Load Santa Fe city limits boundary.
+    Load the k features of a dataset nearest to a point.
+    
+    Answered from the dataset's packed spatial index sidecar (built on first
+    use if missing; see src/data/spatial_index.py): candidates are taken in
+    bbox-distance order and only those rows are read from disk, so the
+    layer is never loaded or indexed in memory.
     
     Parameters
     ----------
+    dataset_name : str
+        Key in DATASET_FILES (e.g. 'hydrology', 'osm')
+    point : shapely Point or (x, y)
+        Query location in the dataset CRS
+    k : int
+        Number of features to return
+    max_distance : float, optional
+        Ignore features farther than this (dataset CRS units)
     data_dir : Path, optional
         Base data directory. Defaults to config DATA_PROCESSED
+    columns : list of str, optional
+        Attribute columns to read. Defaults to all columns.
     
     Returns
     -------
-    gpd.GeoDataFrame or None
-        City limits boundary if file exists, None otherwise
-    """
-    city_limits_path = get_city_limits_path()
-    if city_limits_path is None:
-        if data_dir is not None:
-            city_limits_path = data_dir / "city_limits.gpkg"
-            if not city_limits_path.exists():
-                return None
-        else:
-            return None
+    gpd.GeoDataFrame
+        Up to k features sorted by distance, with a ``distance`` column
     
-    return gpd.read_file(city_limits_path)
+    Raises
+    ------
+    FileNotFoundError
+        If dataset file doesn't exist
+    ValueError
+        If the dataset name is unknown
+    """
+    import numpy as np
+    import shapely
+    from .spatial_index import build_spatial_index, open_spatial_index
+    
+    dataset = load(dataset_name, data_dir)
+    dataset._require()
+    path = dataset.path
+    parquet_path = _fresh_parquet(path)
+    if parquet_path is not None and open_spatial_index(parquet_path) is not None:
+        path = parquet_path
+    
+    index = open_spatial_index(path)
+    if index is None:
+        print(f"Building spatial index for {path.name}...")
+        build_spatial_index(path)
+        index = open_spatial_index(path)
+    
+    if not isinstance(point, shapely.Geometry):
+        point = shapely.Point(*point)
+    x, y = point.x, point.y
+    
+    def read(positions):
+        gdf = _read_rows(path, index, positions, columns)
+        gdf["distance"] = shapely.distance(np.asarray(gdf.geometry.values), point)
+        return gdf
+    
+    # The true k nearest lie within the k-th exact distance of the k
+    # nearest bboxes, and every feature there has a bbox at least as close
+    first = index.nearest(x, y, k=k, max_distance=max_distance)
+    if len(first) == 0:
+        return read(first)
+    radius = read(first)["distance"].max()
+    if max_distance is not None:
+        radius = min(radius, max_distance)
+    candidates = np.fromiter((p for p, _ in index.iter_nearest(x, y, radius)), dtype=np.int64)
+    result = read(candidates)
+    if max_distance is not None:
+        result = result[result["distance"] <= max_distance]
+    return result.sort_values("distance", kind="stable").head(k).reset_index(drop=True)
 
 
-def get_santa_fe_bounds() -> dict:
+def get_santa_fe_bounds(crs: Optional[str] = None) -> dict:
     """
     Get bounding box for Santa Fe city limits.
     
     Tries to load actual city limits file first, falls back to approximate bounds.
     
+    Parameters
+    ----------
+    crs : str, optional
+        CRS to express the bounds in (e.g. "EPSG:4326" for tile math).
+        Defaults to the city limits' own CRS, or WGS84 for the fallback
+    
     Returns
     -------
     dict
         Bounding box as {'minx', 'miny', 'maxx', 'maxy'}
     """
+    from .crs import transform_bounds
+    
     city_limits = load_city_limits()
     if city_limits is not None:
-        bounds = city_limits.total_bounds
-        return {
-            'minx': bounds[0],
-            'miny': bounds[1],
-            'maxx': bounds[2],
-            'maxy': bounds[3]
-        }
+        bounds = tuple(city_limits.total_bounds)
+        source_crs = city_limits.crs
+    else:
+        # Fallback to approximate bounds for Santa Fe, NM
+        bounds = (-106.0, 35.6, -105.8, 35.8)
+        source_crs = "EPSG:4326"
+    
+    if crs is not None and source_crs is not None:
+        bounds = transform_bounds(bounds, source_crs, crs)
     
-    # Fallback to approximate bounds for Santa Fe, NM
     return {
-        'minx': -106.0,
-        'miny': 35.6,
-        'maxx': -105.8,
-        'maxy': 35.8
+        'minx': bounds[0],
+        'miny': bounds[1],
+        'maxx': bounds[2],
+        'maxy': bounds[3]
     }
 
+
+def load_query(
+    sql: str,
+    params=None,
+    data_dir: Optional[Path] = None,
+    crs=None
+) -> Union[gpd.GeoDataFrame, pd.DataFrame]:
+    """
+    Run SQL over the processed datasets with the DuckDB analytics backend.
+    
+    Each dataset is a view named after its DATASET_FILES key (parcels,
+    census_tracts, hydrology, osm, city_limits) with a ``geometry`` column.
+    The query streams from the files on disk, so aggregations do not load
+    whole datasets into memory. See src/data/analytics.py.
+    
+    Parameters
+    ----------
+    sql : str
+        Query, e.g. "SELECT zoning, count(*) AS n FROM parcels GROUP BY zoning"
+    params : list or dict, optional
+        Prepared-statement parameters ($1 / $name)
+    data_dir : Path, optional
+        Base data directory. Defaults to config DATA_PROCESSED
+    crs : optional
+        CRS for geometry results (defaults to the datasets' CRS)
+    
+    Returns
+    -------
+    gpd.GeoDataFrame or pd.DataFrame
+        GeoDataFrame if the result has a geometry column
+    """
+    from .analytics import get_db
+    
+    return get_db(data_dir).query(sql, params=params, crs=crs)
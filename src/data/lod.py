@@ -0,0 +1,233 @@
+"""
+Level-of-detail (LOD) geometry store for map rendering.
+
+At MAP_DPI a city-wide map spends most of its plotting time and memory on
+parcel, tract and hydrology vertices that fall within one output pixel of
+their neighbours. Each processed dataset therefore gets a sidecar holding the
+same features simplified at several tolerances::
+
+    parcels_zoning.gpkg
+    parcels_zoning.gpkg.lod.parquet   # one WKB column per tolerance
+
+Polygonal layers that form a coverage (parcels, tracts) are simplified with
+``shapely.coverage_simplify`` so shared edges stay shared; other layers use
+topology-preserving ``simplify``. Renderers ask for the level matching their
+output scale (level_of_detail / tolerance_for_scale); levels are served from
+the sidecar for unmodified whole-dataset reads, simplified on the fly
+otherwise, and in both cases kept in the loader cache keyed by the frame's
+contents and tolerance.
+"""
+
+import json
+from pathlib import Path
+from typing import Optional, Sequence
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from pyproj import CRS
+
+from ..config import LOD_PIXEL_FRACTION, LOD_TOLERANCES
+from .cache import derived_key, file_signature, frame_fingerprint, is_unmodified, loader_cache
+
+# Approximate metres per degree, for datasets stored in geographic CRSs
+METERS_PER_DEGREE = 111_320.0
+
+
+def lod_path(path: Path) -> Path:
+    """Sidecar path holding the LOD levels of a dataset file."""
+    path = Path(path)
+    return path.with_name(path.name + ".lod.parquet")
+
+
+def _meters_per_unit(crs) -> float:
+    if crs is None:
+        return 1.0
+    if crs.is_geographic:
+        return METERS_PER_DEGREE
+    return crs.axis_info[0].unit_conversion_factor
+
+
+def simplify_geometries(geoms: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Simplify geometries, keeping shared polygon edges shared where possible.
+
+    Parameters
+    ----------
+    geoms : np.ndarray
+        Shapely geometries
+    tolerance : float
+        Simplification tolerance in the geometries' units
+
+    Returns
+    -------
+    np.ndarray
+        Simplified geometries, same order and length
+    """
+    geoms = np.asarray(geoms, dtype=object)
+    result = geoms.copy()
+    present = ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
+    polygonal = present & np.isin(shapely.get_type_id(geoms), (3, 6))
+    others = present & ~polygonal
+
+    if polygonal.any():
+        polygons = geoms[polygonal]
+        if shapely.coverage_is_valid(polygons):
+            result[polygonal] = shapely.coverage_simplify(polygons, tolerance)
+        else:
+            result[polygonal] = shapely.simplify(polygons, tolerance, preserve_topology=True)
+    if others.any():
+        result[others] = shapely.simplify(geoms[others], tolerance, preserve_topology=True)
+    return result
+
+
+def build_lod(
+    path: Path,
+    tolerances: Sequence[float] = LOD_TOLERANCES
+) -> Optional[Path]:
+    """
+    Precompute LOD levels for a processed dataset file.
+
+    Parameters
+    ----------
+    path : Path
+        Processed GeoPackage or GeoParquet file
+    tolerances : sequence of float
+        Simplification tolerances in metres
+
+    Returns
+    -------
+    Path or None
+        Sidecar path, or None if pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("Warning: pyarrow not installed; skipping level-of-detail sidecar")
+        return None
+
+    path = Path(path)
+    if path.suffix == ".parquet":
+        gdf = gpd.read_parquet(path, columns=["geometry"])
+    else:
+        gdf = gpd.read_file(path, columns=[])
+    geoms = np.asarray(gdf.geometry.values)
+    scale = _meters_per_unit(gdf.crs)
+
+    columns = {}
+    for tolerance in tolerances:
+        simplified = simplify_geometries(geoms, tolerance / scale)
+        columns[f"lod_{tolerance:g}"] = pa.array(shapely.to_wkb(simplified), type=pa.binary())
+
+    _, mtime_ns, size = file_signature(path)
+    metadata = {
+        "source": path.name,
+        "source_mtime_ns": mtime_ns,
+        "source_size": size,
+        "rows": len(gdf),
+        "tolerances": list(tolerances),
+    }
+    table = pa.table(columns).replace_schema_metadata({"lod": json.dumps(metadata)})
+    output_path = lod_path(path)
+    pq.write_table(table, output_path)
+    return output_path
+
+
+def _lod_metadata(sidecar: Path) -> Optional[dict]:
+    try:
+        import pyarrow.parquet as pq
+        return json.loads(pq.read_schema(sidecar).metadata[b"lod"])
+    except Exception:
+        return None
+
+
+def _precomputed(key: tuple, tolerance: float, rows: int) -> Optional[np.ndarray]:
+    """Geometries from the sidecar if it matches an unfiltered read of key's file."""
+    path, mtime_ns, size, options = key
+    if any(value is not None for _, value in options):
+        return None
+    sidecar = lod_path(Path(path))
+    if not sidecar.exists():
+        return None
+    meta = _lod_metadata(sidecar)
+    if (meta is None or meta.get("source_mtime_ns") != mtime_ns
+            or meta.get("source_size") != size or meta.get("rows") != rows
+            or tolerance not in meta.get("tolerances", [])):
+        return None
+    import pyarrow.parquet as pq
+    column = f"lod_{tolerance:g}"
+    wkb = pq.read_table(sidecar, columns=[column]).column(column).to_numpy(zero_copy_only=False)
+    return shapely.from_wkb(wkb)
+
+
+def tolerance_for_scale(
+    units_per_pixel: float,
+    crs=None,
+    tolerances: Sequence[float] = LOD_TOLERANCES
+) -> Optional[float]:
+    """
+    Coarsest LOD tolerance that is still sub-pixel at a given scale.
+
+    Parameters
+    ----------
+    units_per_pixel : float
+        Size of one output pixel in the data's CRS units
+    crs : optional
+        CRS of the data (to convert units to metres). Defaults to metres
+    tolerances : sequence of float
+        Available tolerances in metres
+
+    Returns
+    -------
+    float or None
+        Tolerance in metres, or None if full resolution is needed
+    """
+    if crs is not None:
+        crs = CRS.from_user_input(crs)
+    pixel_m = units_per_pixel * _meters_per_unit(crs)
+    usable = [t for t in tolerances if t <= pixel_m * LOD_PIXEL_FRACTION]
+    return max(usable) if usable else None
+
+
+def level_of_detail(gdf: gpd.GeoDataFrame, tolerance: Optional[float]) -> gpd.GeoDataFrame:
+    """
+    Get a GeoDataFrame with geometries at a given LOD tolerance.
+
+    Frames from src.data.loaders are served from the precomputed sidecar
+    (unmodified whole-dataset reads) or simplified once and cached per
+    frame contents and tolerance.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Layer to simplify
+    tolerance : float or None
+        Tolerance in metres (see tolerance_for_scale). None returns gdf
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Same rows and columns with simplified geometries
+    """
+    if tolerance is None or len(gdf) == 0:
+        return gdf
+
+    fingerprint = frame_fingerprint(gdf) if "cache_key" in gdf.attrs else None
+
+    def build() -> gpd.GeoDataFrame:
+        geoms = None
+        if fingerprint is not None and is_unmodified(gdf, fingerprint):
+            geoms = _precomputed(gdf.attrs["cache_key"], tolerance, len(gdf))
+        if geoms is None:
+            geoms = simplify_geometries(
+                np.asarray(gdf.geometry.values), tolerance / _meters_per_unit(gdf.crs)
+            )
+        result = gdf.copy()
+        result[gdf.geometry.name] = gpd.GeoSeries(geoms, index=gdf.index, crs=gdf.crs)
+        return result
+
+    key = derived_key(gdf, ("lod", tolerance), fingerprint)
+    if key is None:
+        return build()
+    return loader_cache.get_or_create(key, build)
@@ -0,0 +1,243 @@
+"""
+Build manifest for incremental processing of datasets.
+
+``DATA_PROCESSED/build_manifest.json`` records, per processed dataset, the
+raw input hash, the processing parameters (output CRS, clipping and the
+city-limits version they were clipped with, sidecar options) and the
+output hash::
+
+    {"parcels": {"input_hash": "...", "params": {...}, "params_hash": "...",
+                 "output": "processed/parcels_zoning.gpkg", "output_hash": "...",
+                 "features": 41210, "mode": "incremental",
+                 "added": 12, "removed": 9, "built_at": "2026-..."}}
+
+process_downloaded_data uses it to skip a dataset whose input and parameters
+are unchanged and whose output is untouched. When only the input changed,
+it compares per-feature content hashes (attributes + WKB) with the feature
+sidecar ``<output>.features.npz`` written by the previous build, and only
+processes the added features, dropping the removed ones from the previous
+output.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from .cache import file_signature
+from .transfer import file_sha256, read_sidecar
+from ..config import BUILD_MANIFEST_FILE
+
+# Bump when processing changes so that existing outputs are rebuilt
+PROCESSING_VERSION = 1
+# Above this share of added + removed features, rebuild from scratch
+MAX_INCREMENTAL_FRACTION = 0.5
+# A manifest lock file older than this is assumed left behind by a crash
+LOCK_STALE_SECONDS = 60.0
+
+
+def content_hash(path: Path) -> Optional[str]:
+    """
+    SHA-256 of a file, reusing the download sidecar when it is current.
+
+    Parameters
+    ----------
+    path : Path
+        File to hash
+
+    Returns
+    -------
+    str or None
+        Hex digest, or None if the file does not exist
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    meta = read_sidecar(path)
+    if meta is not None and meta.get("size") == path.stat().st_size:
+        sidecar = path.with_name(path.name + ".sha256")
+        if sidecar.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+            return meta["sha256"]
+    if path.is_dir():
+        digest = hashlib.sha256()
+        for child in sorted(p for p in path.rglob("*") if p.is_file()):
+            digest.update(child.name.encode())
+            digest.update(file_sha256(child).encode())
+        return digest.hexdigest()
+    return file_sha256(path)
+
+
+def params_hash(params: dict) -> str:
+    """Stable hash of processing parameters."""
+    payload = dict(params, version=PROCESSING_VERSION)
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def feature_hashes(gdf: gpd.GeoDataFrame) -> np.ndarray:
+    """
+    64-bit content hash per feature (attribute values and geometry WKB).
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Features
+
+    Returns
+    -------
+    np.ndarray
+        uint64 hash per row, independent of the index
+    """
+    geometry = gdf.geometry.name
+    wkb = np.empty(len(gdf), dtype=object)
+    wkb[:] = shapely.to_wkb(np.asarray(gdf.geometry.values))
+    frame = pd.DataFrame(gdf.drop(columns=geometry)).assign(**{f"__{geometry}__": wkb})
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def manifest_path(output_path: Path) -> Path:
+    """Manifest next to a processed dataset."""
+    return Path(output_path).parent / BUILD_MANIFEST_FILE
+
+
+def features_path(output_path: Path) -> Path:
+    """Per-feature hash sidecar of a processed dataset."""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + ".features.npz")
+
+
+def load_manifest(path: Path) -> dict:
+    path = Path(path)
+    if path.exists():
+        try:
+            return json.loads(path.read_text())
+        except ValueError:
+            print(f"Warning: ignoring unreadable build manifest {path}")
+    return {}
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock file next to path.
+
+    process_downloaded_data runs in worker processes (see
+    src/data/pipeline.py), so manifest updates must not interleave.
+    """
+    lock_path = path.with_name(path.name + ".lock")
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > LOCK_STALE_SECONDS:
+                    lock_path.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.01)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        lock_path.unlink(missing_ok=True)
+
+
+def get_entry(output_path: Path, dataset_name: str) -> dict:
+    """Manifest entry of a dataset ({} if never built)."""
+    return load_manifest(manifest_path(output_path)).get(dataset_name, {})
+
+
+def output_matches(entry: dict, output_path: Path) -> bool:
+    """
+    Whether a processed file is still the one the manifest recorded.
+
+    The recorded (mtime, size) signature avoids rehashing untouched files.
+    """
+    output_path = Path(output_path)
+    if not entry or not output_path.exists():
+        return False
+    if entry.get("output_signature") == list(file_signature(output_path)):
+        return True
+    return content_hash(output_path) == entry.get("output_hash")
+
+
+def record_build(output_path: Path, dataset_name: str, **fields) -> dict:
+    """
+    Store a dataset's manifest entry, hashing the written output.
+
+    Parameters
+    ----------
+    output_path : Path
+        Processed GeoPackage
+    dataset_name : str
+        Dataset name (key in DATASET_FILES)
+    **fields
+        input_hash, params, mode, feature counts, ...
+
+    Returns
+    -------
+    dict
+        The stored entry
+    """
+    output_path = Path(output_path)
+    path = manifest_path(output_path)
+    entry = dict(fields)
+    entry.update(
+        output=str(output_path),
+        output_hash=content_hash(output_path),
+        output_signature=list(file_signature(output_path)),
+        built_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _locked(path):
+        manifest = load_manifest(path)
+        manifest[dataset_name] = entry
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(manifest, indent=2, default=str))
+            Path(tmp_name).replace(path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+    return entry
+
+
+def save_feature_hashes(output_path: Path, input_hashes: np.ndarray, output_hashes: np.ndarray) -> Path:
+    """
+    Write the feature sidecar.
+
+    Parameters
+    ----------
+    output_path : Path
+        Processed GeoPackage
+    input_hashes : np.ndarray
+        Hashes of every raw feature read (including ones clipped away)
+    output_hashes : np.ndarray
+        Raw feature hash of each output row, in file order
+    """
+    path = features_path(output_path)
+    with open(path, "wb") as f:
+        np.savez(f, input_hashes=np.unique(input_hashes), output_hashes=output_hashes)
+    return path
+
+
+def load_feature_hashes(output_path: Path):
+    """(input_hashes, output_hashes) of the previous build, or None."""
+    path = features_path(output_path)
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        return data["input_hashes"], data["output_hashes"]
@@ -0,0 +1,518 @@
+"""
+Streaming ingestion of Overpass API responses.
+
+Overpass ``out geom`` responses for the whole county run to hundreds of MB.
+Instead of ``response.json()`` / ``json.load`` on the full payload, the body is
+streamed straight to disk and elements are parsed incrementally, built into
+geometries in fixed-size batches and appended to the processed GeoPackage.
+Peak memory is bounded by the batch size, not the bbox.
+"""
+
+import json
+from pathlib import Path
+from itertools import chain
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from ..config import LOCAL_CRS
+from .clip import staged_clip
+from .crs import reproject
+from .transfer import DEFAULT_TIMEOUT, get_session
+from .validation import repair_geometries
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+BATCH_SIZE = 50_000
+
+_decoder = json.JSONDecoder()
+
+
+def stream_overpass(
+    query: str,
+    output_path: Path,
+    url: str = OVERPASS_URL,
+    timeout=DEFAULT_TIMEOUT,
+    chunk_size: int = 1024**2
+) -> Path:
+    """
+    Run an Overpass query and write the response body straight to disk.
+
+    Parameters
+    ----------
+    query : str
+        Overpass QL query (with ``[out:json]``)
+    output_path : Path
+        Where to write the raw JSON response
+    url : str
+        Overpass interpreter endpoint
+    timeout : float or tuple
+        Requests timeout in seconds
+    chunk_size : int
+        Bytes per write
+
+    Returns
+    -------
+    Path
+        Path to the raw JSON file
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = output_path.with_name(output_path.name + ".part")
+
+    with get_session().post(url, data={"data": query}, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        with open(part_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    f.write(chunk)
+
+    part_path.replace(output_path)
+    return output_path
+
+
+def iter_overpass_elements(path: Path, buffer_size: int = 1024**2) -> Iterator[dict]:
+    """
+    Incrementally parse the ``elements`` array of an Overpass JSON file.
+
+    Only one buffer plus the element being decoded is held in memory.
+
+    Parameters
+    ----------
+    path : Path
+        Raw Overpass JSON response
+    buffer_size : int
+        Bytes to read at a time
+
+    Yields
+    ------
+    dict
+        One OSM element at a time
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, eof
+            chunk = f.read(buffer_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer += chunk
+            return True
+
+        # Seek to the opening bracket of the elements array
+        while True:
+            key = buffer.find('"elements"')
+            if key >= 0:
+                bracket = buffer.find("[", key)
+                if bracket >= 0:
+                    buffer = buffer[bracket + 1:]
+                    break
+            elif len(buffer) > 64:
+                # Keep a tail in case the key straddles two reads
+                buffer = buffer[-64:]
+            if not fill():
+                return
+
+        pos = 0
+        while True:
+            # Skip whitespace and separators between elements
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer) or not fill():
+                    break
+            if pos >= len(buffer) or buffer[pos] == "]":
+                return
+
+            try:
+                element, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                buffer = buffer[pos:]
+                pos = 0
+                if not fill():
+                    raise
+                continue
+
+            yield element
+            pos = end
+            if pos > buffer_size:
+                buffer = buffer[pos:]
+                pos = 0
+
+
+def _batched(elements: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for element in elements:
+        batch.append(element)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _is_way(element: dict) -> bool:
+    """True for ways with at least two resolved node coordinates."""
+    nodes = element.get("geometry") or []
+    return (
+        element.get("type") == "way" and len(nodes) >= 2
+        and all(node is not None for node in nodes)
+    )
+
+
+def flatten_tags(
+    tags: Sequence[dict],
+    keys: Optional[Sequence[str]] = None,
+    fill: str = ""
+) -> Dict[str, np.ndarray]:
+    """
+    Flatten per-element tag dicts into one array per tag key.
+
+    Parameters
+    ----------
+    tags : sequence of dict
+        Tag dict for each element (``{}`` for untagged elements)
+    keys : sequence of str, optional
+        Tag keys to extract. Defaults to every key seen
+    fill : str
+        Value for elements missing a key
+
+    Returns
+    -------
+    dict
+        Tag key -> object array aligned with tags
+    """
+    if keys is None:
+        keys = sorted(set().union(*tags)) if len(tags) else []
+    return {
+        key: np.array([t.get(key, fill) for t in tags], dtype=object)
+        for key in keys
+    }
+
+
+def _way_geometries(
+    ways: Sequence[dict],
+    polygon_tags: Optional[Callable[[dict], bool]] = None
+) -> np.ndarray:
+    """
+    Build geometries for many ways with one shapely call per geometry type.
+
+    Coordinates are gathered into a single (n, 2) array with per-way offsets;
+    closed ways whose tags satisfy polygon_tags become Polygons, the rest
+    LineStrings.
+    """
+    lengths = np.fromiter((len(w["geometry"]) for w in ways), dtype=np.int64, count=len(ways))
+    coords = np.fromiter(
+        chain.from_iterable(
+            (node["lon"], node["lat"]) for way in ways for node in way["geometry"]
+        ),
+        dtype=np.float64,
+        count=2 * int(lengths.sum())
+    ).reshape(-1, 2)
+
+    as_polygons = np.zeros(len(ways), dtype=bool)
+    if polygon_tags is not None and len(ways):
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+        closed = (lengths >= 4) & (coords[starts] == coords[ends - 1]).all(axis=1)
+        for i in np.flatnonzero(closed):
+            as_polygons[i] = polygon_tags(ways[i].get("tags") or {})
+
+    if not as_polygons.any():
+        return shapely.linestrings(coords, indices=np.repeat(np.arange(len(ways)), lengths))
+
+    geometries = np.empty(len(ways), dtype=object)
+    point_poly = np.repeat(as_polygons, lengths)
+    line_ids = np.flatnonzero(~as_polygons)
+    poly_ids = np.flatnonzero(as_polygons)
+    if len(line_ids):
+        geometries[line_ids] = shapely.linestrings(
+            coords[~point_poly], indices=np.repeat(np.arange(len(line_ids)), lengths[line_ids])
+        )
+    rings = shapely.linearrings(
+        coords[point_poly], indices=np.repeat(np.arange(len(poly_ids)), lengths[poly_ids])
+    )
+    geometries[poly_ids] = shapely.polygons(rings)
+    return geometries
+
+
+def elements_to_geodataframe(
+    elements: Sequence[dict],
+    tag_keys: Optional[Sequence[str]] = None,
+    polygon_tags: Optional[Callable[[dict], bool]] = None,
+    fill: str = ""
+) -> gpd.GeoDataFrame:
+    """
+    Convert Overpass ``out geom`` elements to a GeoDataFrame.
+
+    Nodes become Points and ways become LineStrings (or Polygons, see
+    polygon_tags). Geometries are built in bulk with shapely's array
+    constructors rather than one shapely object per element, and tags are
+    flattened into one column per key. Elements without coordinates
+    (relations, ways with unresolved nodes) are skipped.
+
+    Parameters
+    ----------
+    elements : sequence of dict
+        Overpass elements
+    tag_keys : sequence of str, optional
+        Tag keys to keep as columns. Defaults to every key seen
+    polygon_tags : callable, optional
+        ``polygon_tags(tags) -> bool`` deciding whether a closed way is an
+        area. Defaults to treating every way as a line.
+    fill : str
+        Value for missing tags
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Columns osm_type, osm_id, one column per tag key and geometry, in
+        input order, EPSG:4326
+    """
+    kept = []
+    nodes, node_pos = [], []
+    ways, way_pos = [], []
+    for e in elements:
+        if e.get("type") == "node" and "lat" in e:
+            nodes.append(e)
+            node_pos.append(len(kept))
+        elif _is_way(e):
+            ways.append(e)
+            way_pos.append(len(kept))
+        else:
+            continue
+        kept.append(e)
+
+    n = len(kept)
+    geometries = np.empty(n, dtype=object)
+    if nodes:
+        geometries[node_pos] = shapely.points(
+            np.fromiter((e["lon"] for e in nodes), dtype=np.float64, count=len(nodes)),
+            np.fromiter((e["lat"] for e in nodes), dtype=np.float64, count=len(nodes)),
+        )
+    if ways:
+        geometries[way_pos] = _way_geometries(ways, polygon_tags)
+
+    columns = {
+        "osm_type": np.array([e["type"] for e in kept], dtype=object),
+        "osm_id": np.fromiter((e["id"] for e in kept), dtype=np.int64, count=n),
+    }
+    columns.update(flatten_tags([e.get("tags") or {} for e in kept], tag_keys, fill))
+    return gpd.GeoDataFrame(columns, geometry=geometries, crs="EPSG:4326")
+
+
+def _is_waterbody(tags: dict) -> bool:
+    return "waterway" not in tags and tags.get("natural") == "water"
+
+
+def build_osm_batch(elements: List[dict]) -> gpd.GeoDataFrame:
+    """
+    Convert a batch of Overpass elements to roads + POIs.
+
+    Roads are ways tagged ``highway``; POIs are tagged nodes, categorized by
+    ``amenity`` falling back to ``shop``.
+
+    Parameters
+    ----------
+    elements : list of dict
+        Overpass ``out geom`` elements
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Columns geometry, feature_type ('road'/'poi'), category, name, osm_id
+        in EPSG:4326
+    """
+    gdf = elements_to_geodataframe(
+        [e for e in elements if e.get("tags")],
+        tag_keys=["highway", "amenity", "shop", "name"]
+    )
+    is_road = (gdf["osm_type"] == "way") & (gdf["highway"] != "")
+    is_poi = gdf["osm_type"] == "node"
+    gdf = gdf[is_road | is_poi]
+    is_road = is_road[gdf.index].to_numpy()
+
+    result = gpd.GeoDataFrame({
+        "feature_type": np.where(is_road, "road", "poi"),
+        "category": np.where(
+            is_road, gdf["highway"],
+            np.where(gdf["amenity"] != "", gdf["amenity"], gdf["shop"])
+        ),
+        "name": gdf["name"].to_numpy(),
+        "osm_id": gdf["osm_id"].to_numpy(),
+    }, geometry=gdf.geometry.to_numpy(), crs="EPSG:4326")
+    # Roads first, then POIs, matching the layout of earlier processed files
+    return result.iloc[np.argsort(~is_road, kind="stable")].reset_index(drop=True)
+
+
+def build_hydrology_batch(elements: List[dict]) -> gpd.GeoDataFrame:
+    """
+    Convert a batch of Overpass elements to waterways + waterbodies.
+
+    Closed ``natural=water`` ways become Polygons; everything else is a
+    LineString.
+
+    Parameters
+    ----------
+    elements : list of dict
+        Overpass ``out geom`` elements
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Columns geometry, waterway_type, name, osm_id, feature_type in EPSG:4326
+    """
+    water = [
+        e for e in elements
+        if e.get("type") == "way" and (
+            "waterway" in (e.get("tags") or {})
+            or (e.get("tags") or {}).get("natural") == "water"
+        )
+    ]
+    gdf = elements_to_geodataframe(
+        water, tag_keys=["waterway", "name"], polygon_tags=_is_waterbody
+    )
+    is_waterway = (gdf["waterway"] != "").to_numpy()
+    return gpd.GeoDataFrame({
+        "waterway_type": np.where(is_waterway, gdf["waterway"], "waterbody"),
+        "name": gdf["name"].to_numpy(),
+        "osm_id": gdf["osm_id"].to_numpy(),
+        "feature_type": np.where(is_waterway, "waterway", "waterbody"),
+    }, geometry=gdf.geometry.to_numpy(), crs="EPSG:4326")
+
+
+BUILDERS = {
+    "osm": build_osm_batch,
+    "hydrology": build_hydrology_batch,
+}
+
+
+def write_overpass_layer(
+    raw_file: Path,
+    dataset_name: str,
+    output_path: Path,
+    boundary: Optional[gpd.GeoDataFrame] = None,
+    output_crs: str = LOCAL_CRS,
+    batch_size: int = BATCH_SIZE,
+    repair: bool = False
+) -> dict:
+    """
+    Stream an Overpass JSON file into a GeoPackage.
+
+    Elements are parsed incrementally and converted ``batch_size`` at a time;
+    each batch is clipped, reprojected and appended to a temporary file that
+    is moved into place when complete, so readers never see a partial
+    dataset.
+
+    Parameters
+    ----------
+    raw_file : Path
+        Raw Overpass JSON response
+    dataset_name : str
+        'osm' (roads + POIs) or 'hydrology'
+    output_path : Path
+        GeoPackage to write
+    boundary : gpd.GeoDataFrame, optional
+        Clip boundary (city limits); None only reprojects
+    output_crs : str
+        Target CRS
+    batch_size : int
+        Elements per batch
+    repair : bool
+        Make invalid geometries valid (see repair_geometries)
+
+    Returns
+    -------
+    dict
+        'elements' read, 'batches', output 'features' and 'repaired' count
+    """
+    if dataset_name not in BUILDERS:
+        raise ValueError(f"No Overpass builder for {dataset_name}. Available: {list(BUILDERS)}")
+    build = BUILDERS[dataset_name]
+    if boundary is not None:
+        boundary = reproject(boundary, "EPSG:4326")
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.stem + ".partial" + output_path.suffix)
+    tmp_path.unlink(missing_ok=True)
+
+    stats = {"elements": 0, "batches": 0, "features": 0, "repaired": 0}
+    for batch in _batched(iter_overpass_elements(raw_file), batch_size):
+        stats["elements"] += len(batch)
+        stats["batches"] += 1
+        gdf = build(batch)
+        if boundary is not None and len(gdf):
+            gdf = staged_clip(gdf, boundary, report=False)[0]
+        if not len(gdf):
+            continue
+        gdf = reproject(gdf, output_crs)
+        if repair:
+            gdf, repaired = repair_geometries(gdf)
+            stats["repaired"] += repaired
+        # Mixed roads/POIs (lines/polygons for hydrology) share one layer
+        gdf.to_file(
+            tmp_path, driver="GPKG", layer=output_path.stem, geometry_type="Unknown",
+            mode="a" if tmp_path.exists() else "w"
+        )
+        stats["features"] += len(gdf)
+
+    if not tmp_path.exists():
+        reproject(build([]), output_crs).to_file(
+            tmp_path, driver="GPKG", layer=output_path.stem, geometry_type="Unknown"
+        )
+    tmp_path.replace(output_path)
+    return stats
+
+
+def ingest_overpass(
+    raw_file: Path,
+    dataset_name: str,
+    output_crs: Optional[str] = None,
+    clip_to_city: bool = True,
+    batch_size: int = BATCH_SIZE,
+    **kwargs
+) -> Path:
+    """
+    Stream an Overpass JSON file into a processed GeoPackage.
+
+    Shorthand for ``process_downloaded_data(dataset_name, raw_file, ...)``,
+    which writes the layer with write_overpass_layer and then, like every
+    other dataset, its GeoParquet copy, sidecars, validation report and
+    build manifest entry.
+
+    Parameters
+    ----------
+    raw_file : Path
+        Raw Overpass JSON response
+    dataset_name : str
+        'osm' (roads + POIs) or 'hydrology'
+    output_crs : str, optional
+        Target CRS. Defaults to LOCAL_CRS
+    clip_to_city : bool
+        Whether to clip to city limits
+    batch_size : int
+        Elements per batch
+    **kwargs
+        Further process_downloaded_data options (write_parquet, validate, ...)
+
+    Returns
+    -------
+    Path
+        Path to processed file
+    """
+    from .download import process_downloaded_data
+
+    return process_downloaded_data(
+        dataset_name, raw_file, output_crs=output_crs, clip_to_city=clip_to_city,
+        chunk_size=batch_size, **kwargs
+    )
+
+
+def count_elements(raw_file: Path) -> int:
+    """Count elements in an Overpass JSON file without loading it."""
+    return sum(1 for _ in iter_overpass_elements(raw_file))
@@ -0,0 +1,388 @@
+"""
+Dependency-aware pipeline for downloading and processing all datasets.
+
+Each dataset is a Task with a download stage and a processing stage.
+Downloads are network-bound and run concurrently on a thread pool; processing
+is CPU-bound and runs on a process pool as soon as a task's own download and
+the processing of its dependencies (e.g. city limits for clipping) are done.
+A cold rebuild therefore takes roughly as long as the slowest dataset.
+
+Stages are skipped when their inputs are unchanged, based on content hashes
+recorded in ``DATA_PROCESSED/.pipeline_state.json``.
+
+Usage::
+
+    python -m src.data.pipeline                 # all datasets
+    python -m src.data.pipeline census_tracts   # one dataset + its dependencies
+    python -m src.data.pipeline --force         # ignore recorded hashes
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..config import DATA_PROCESSED
+from .manifest import content_hash
+from . import download, osm
+
+PIPELINE_STATE = DATA_PROCESSED / ".pipeline_state.json"
+
+
+class Task:
+    """
+    A dataset build: one download stage followed by one processing stage.
+
+    Parameters
+    ----------
+    name : str
+        Dataset name (key in DATASET_FILES)
+    download : callable
+        Zero-argument function returning the raw file path, a tuple of
+        paths, or None when the data needs a manual download
+    process : callable, optional
+        Module-level function ``process(raw, **process_kwargs)`` returning
+        the processed file path. Runs in a worker process, so it must be
+        picklable.
+    deps : sequence of str
+        Tasks whose processing must finish before this task is processed
+    process_kwargs : dict, optional
+        Extra keyword arguments for process; part of the skip hash
+    """
+
+    def __init__(
+        self,
+        name: str,
+        download: Callable[[], object],
+        process: Optional[Callable[..., Optional[Path]]] = None,
+        deps: Sequence[str] = (),
+        process_kwargs: Optional[dict] = None
+    ):
+        self.name = name
+        self.download = download
+        self.process = process
+        self.deps = tuple(deps)
+        self.process_kwargs = process_kwargs or {}
+
+    def __repr__(self) -> str:
+        return f"Task({self.name!r}, deps={self.deps})"
+
+
+def _process_city_limits(raw: Path) -> Optional[Path]:
+    return download.process_city_limits(raw)
+
+
+def _process_census_tracts(raw: Tuple[Path, Path], **kwargs) -> Path:
+    tracts_file, acs_csv = raw
+    return download.process_census_tracts(tracts_file, acs_csv, **kwargs)
+
+
+def _process_parcels(raw: Path, **kwargs) -> Path:
+    return download.process_downloaded_data("parcels", raw, **kwargs)
+
+
+def _process_overpass_or_file(dataset_name: str, raw: Path, **kwargs) -> Path:
+    if Path(raw).suffix == ".json":
+        return osm.ingest_overpass(raw, dataset_name, **kwargs)
+    return download.process_downloaded_data(dataset_name, raw, **kwargs)
+
+
+def _process_osm(raw: Path, **kwargs) -> Path:
+    if Path(raw).suffix == ".zip":
+        kwargs.setdefault("layer", download.GEOFABRIK_ROADS_LAYER)
+    return _process_overpass_or_file("osm", raw, **kwargs)
+
+
+def _process_hydrology(raw: Path, **kwargs) -> Path:
+    return _process_overpass_or_file("hydrology", raw, **kwargs)
+
+
+def default_tasks() -> Dict[str, Task]:
+    """
+    Get the standard dataset tasks.
+
+    Returns
+    -------
+    dict
+        Task name -> Task
+    """
+    tasks = [
+        Task("city_limits", download.download_city_limits, _process_city_limits),
+        Task(
+            "census_tracts", download.download_census_tracts, _process_census_tracts,
+            deps=("city_limits",)
+        ),
+        Task(
+            "osm", download.download_osm_data, _process_osm,
+            deps=("city_limits",)
+        ),
+        Task(
+            "hydrology", download.download_hydrology, _process_hydrology,
+            deps=("city_limits",)
+        ),
+        Task(
+            "parcels", download.download_city_parcels, _process_parcels,
+            deps=("city_limits",)
+        ),
+    ]
+    return {task.name: task for task in tasks}
+
+
+def _as_paths(raw) -> List[Path]:
+    if raw is None:
+        return []
+    if isinstance(raw, (str, Path)):
+        return [Path(raw)]
+    return [Path(p) for p in raw if p is not None]
+
+
+def _raw_hash(paths: Iterable[Path]) -> Optional[str]:
+    hashes = [content_hash(p) for p in paths]
+    if not hashes or any(h is None for h in hashes):
+        return None
+    return hashlib.sha256("|".join(hashes).encode()).hexdigest()
+
+
+def _load_state(state_path: Path) -> dict:
+    if state_path.exists():
+        try:
+            return json.loads(state_path.read_text())
+        except ValueError:
+            pass
+    return {}
+
+
+def _save_state(state_path: Path, state: dict) -> None:
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(json.dumps(state, indent=2, default=str))
+
+
+def _resolve(tasks: Dict[str, Task], names: Optional[Iterable[str]]) -> List[str]:
+    """Requested task names plus their transitive dependencies."""
+    if names is None:
+        return list(tasks)
+    selected: List[str] = []
+
+    def visit(name: str) -> None:
+        if name not in tasks:
+            raise ValueError(f"Unknown task: {name}. Available: {list(tasks)}")
+        for dep in tasks[name].deps:
+            visit(dep)
+        if name not in selected:
+            selected.append(name)
+
+    for name in names:
+        visit(name)
+    return selected
+
+
+def run_pipeline(
+    names: Optional[Iterable[str]] = None,
+    tasks: Optional[Dict[str, Task]] = None,
+    force: bool = False,
+    refresh_downloads: bool = False,
+    download_workers: Optional[int] = None,
+    process_workers: Optional[int] = None,
+    state_path: Optional[Path] = None,
+    process_in_threads: bool = False
+) -> Dict[str, dict]:
+    """
+    Download and process datasets concurrently, respecting dependencies.
+
+    Parameters
+    ----------
+    names : iterable of str, optional
+        Tasks to run (dependencies are added). Defaults to all tasks
+    tasks : dict, optional
+        Task name -> Task. Defaults to default_tasks()
+    force : bool
+        Re-run every stage regardless of recorded hashes
+    refresh_downloads : bool
+        Re-run download stages even if the recorded raw files are unchanged.
+        download_file still skips unchanged files via ETag/Last-Modified.
+    download_workers : int, optional
+        Thread pool size for downloads. Defaults to the number of tasks
+    process_workers : int, optional
+        Process pool size for processing. Defaults to CPU count
+    state_path : Path, optional
+        Hash state file. Defaults to DATA_PROCESSED/.pipeline_state.json
+    process_in_threads : bool
+        Run processing on threads instead of processes (for debugging)
+
+    Returns
+    -------
+    dict
+        Task name -> {'status', 'raw', 'output', 'download_s', 'process_s'}.
+        Status is one of 'built', 'skipped', 'unavailable', 'failed' or
+        'blocked' (a dependency failed).
+    """
+    tasks = tasks if tasks is not None else default_tasks()
+    state_path = state_path or PIPELINE_STATE
+    order = _resolve(tasks, names)
+    state = _load_state(state_path)
+    results = {name: {"status": None, "raw": None, "output": None} for name in order}
+
+    download_workers = download_workers or max(len(order), 1)
+    if process_in_threads:
+        process_pool = ThreadPoolExecutor(max_workers=process_workers)
+    else:
+        process_pool = ProcessPoolExecutor(
+            max_workers=process_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    running = {}
+    downloaded = set()
+    started_process = set()
+
+    def finished(name: str) -> bool:
+        return results[name]["status"] is not None
+
+    with ThreadPoolExecutor(max_workers=download_workers) as download_pool, process_pool:
+        for name in order:
+            task = tasks[name]
+            recorded = state.get(name, {})
+            raw_paths = _as_paths(recorded.get("raw"))
+            if (not force and not refresh_downloads and raw_paths
+                    and recorded.get("raw_hash") == _raw_hash(raw_paths)):
+                results[name]["raw"] = recorded["raw"]
+                results[name]["download_s"] = 0.0
+                downloaded.add(name)
+                print(f"↷ {name}: raw data unchanged, skipping download")
+                continue
+            running[download_pool.submit(_timed, task.download)] = ("download", name)
+
+        while True:
+            # Submit processing stages whose inputs are ready
+            for name in order:
+                if name in started_process or name not in downloaded or finished(name):
+                    continue
+                task = tasks[name]
+                if not all(finished(dep) for dep in task.deps):
+                    continue
+                started_process.add(name)
+
+                if any(results[dep]["status"] in ("failed", "blocked") for dep in task.deps):
+                    results[name]["status"] = "blocked"
+                    continue
+
+                raw = results[name]["raw"]
+                raw_paths = _as_paths(raw)
+                if task.process is None or not raw_paths or not raw_paths[0].exists():
+                    results[name]["status"] = "unavailable"
+                    continue
+
+                input_key = _input_key(task, raw_paths, results, state)
+                recorded = state.get(name, {})
+                output = recorded.get("output")
+                if (not force and output and recorded.get("input_key") == input_key
+                        and content_hash(Path(output)) == recorded.get("output_hash")):
+                    results[name].update(status="skipped", output=output, process_s=0.0)
+                    print(f"↷ {name}: inputs unchanged, skipping processing")
+                    continue
+
+                results[name]["input_key"] = input_key
+                future = process_pool.submit(_timed, task.process, raw, **task.process_kwargs)
+                running[future] = ("process", name)
+
+            if not running:
+                break
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, name = running.pop(future)
+                try:
+                    value, seconds = future.result()
+                except Exception as e:
+                    print(f"⚠ {name}: {stage} failed: {e}")
+                    results[name]["status"] = "failed"
+                    results[name][f"{stage}_s"] = None
+                    downloaded.add(name)
+                    started_process.add(name)
+                    continue
+
+                results[name][f"{stage}_s"] = seconds
+                if stage == "download":
+                    results[name]["raw"] = _serialize(value)
+                    downloaded.add(name)
+                    state.setdefault(name, {}).update(
+                        raw=_serialize(value), raw_hash=_raw_hash(_as_paths(value))
+                    )
+                else:
+                    if value is None:
+                        results[name]["status"] = "unavailable"
+                        continue
+                    results[name].update(status="built", output=str(value))
+                    state.setdefault(name, {}).update(
+                        input_key=results[name].pop("input_key"),
+                        output=str(value),
+                        output_hash=content_hash(Path(value)),
+                    )
+                _save_state(state_path, state)
+
+    _save_state(state_path, state)
+    _print_summary(results)
+    return results
+
+
+def _input_key(task: Task, raw_paths: List[Path], results: dict, state: dict) -> str:
+    """Hash of everything a processing stage depends on."""
+    parts = {
+        "raw": _raw_hash(raw_paths),
+        "params": task.process_kwargs,
+        "deps": {dep: state.get(dep, {}).get("output_hash") for dep in task.deps},
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _timed(func: Callable, *args, **kwargs):
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    return value, time.perf_counter() - start
+
+
+def _serialize(raw):
+    if raw is None:
+        return None
+    if isinstance(raw, (str, Path)):
+        return str(raw)
+    return [str(p) if p is not None else None for p in raw]
+
+
+def _print_summary(results: Dict[str, dict]) -> None:
+    print("\nPipeline summary:")
+    for name, result in results.items():
+        timings = []
+        for stage in ("download", "process"):
+            seconds = result.get(f"{stage}_s")
+            if seconds:
+                timings.append(f"{stage} {seconds:.1f}s")
+        suffix = f" ({', '.join(timings)})" if timings else ""
+        print(f"  {name}: {result['status']}{suffix}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Download and process Santa Fe datasets")
+    parser.add_argument("names", nargs="*", help="Datasets to build (default: all)")
+    parser.add_argument("--force", action="store_true", help="Ignore recorded hashes")
+    parser.add_argument(
+        "--refresh-downloads", action="store_true",
+        help="Re-run downloads even if raw files are unchanged"
+    )
+    parser.add_argument("--process-workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    run_pipeline(
+        names=args.names or None,
+        force=args.force,
+        refresh_downloads=args.refresh_downloads,
+        process_workers=args.process_workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Declarative registry of the processed Santa Fe datasets.
+
+Each entry combines the file name from config DATASET_FILES with the
+metadata in DATASET_INFO and DATASET_ID_COLUMNS::
+
+    {'name': 'census_tracts', 'file': 'census_tracts_acs.gpkg',
+     'label': 'Census tracts', 'description': '...', 'source': 'Census Bureau',
+     'crs': 'EPSG:32113', 'columns': ('GEOID',),
+     'geometry_types': ('Polygon', 'MultiPolygon'), 'id_columns': ('GEOID',)}
+
+The generic loader (load in src/data/loaders.py) reads everything it needs
+from here, so a new dataset is a register_dataset call or a config entry
+rather than another load_* function.
+"""
+
+from typing import Dict, List, Sequence
+
+from ..config import DATASET_FILES, DATASET_ID_COLUMNS, DATASET_INFO, LOCAL_CRS
+
+
+def _spec(name: str, filename: str, info: dict, id_columns: Sequence[str]) -> dict:
+    return {
+        "name": name,
+        "file": filename,
+        "label": info.get("label", name),
+        "description": info.get("description", ""),
+        "source": info.get("source", "source"),
+        "crs": info.get("crs", LOCAL_CRS),
+        "columns": tuple(info.get("columns", ())),
+        "geometry_types": tuple(info.get("geometry_types", ())),
+        "id_columns": tuple(id_columns),
+    }
+
+
+REGISTRY: Dict[str, dict] = {
+    name: _spec(name, filename, DATASET_INFO.get(name, {}), DATASET_ID_COLUMNS.get(name, ()))
+    for name, filename in DATASET_FILES.items()
+}
+
+
+def dataset_names() -> List[str]:
+    """Names of the registered datasets."""
+    return list(REGISTRY)
+
+
+def dataset_spec(name: str) -> dict:
+    """
+    Registry entry of a dataset.
+
+    Parameters
+    ----------
+    name : str
+        Dataset name (e.g. 'parcels')
+
+    Returns
+    -------
+    dict
+        Spec with 'file', 'label', 'description', 'source', 'crs',
+        'columns', 'geometry_types' and 'id_columns'
+
+    Raises
+    ------
+    ValueError
+        If the dataset is not registered
+    """
+    if name not in REGISTRY:
+        raise ValueError(f"Unknown dataset: {name}. Available: {dataset_names()}")
+    return REGISTRY[name]
+
+
+def register_dataset(
+    name: str,
+    filename: str,
+    id_columns: Sequence[str] = (),
+    **info
+) -> dict:
+    """
+    Add (or replace) a processed dataset.
+
+    The file name is also added to DATASET_FILES, so get_data_path, the
+    analytics views and validation pick the dataset up as well.
+
+    Parameters
+    ----------
+    name : str
+        Dataset name
+    filename : str
+        File name in the processed data directory
+    id_columns : sequence of str
+        Columns whose values should be unique (checked by validation)
+    **info
+        label, description, source, crs, columns, geometry_types
+
+    Returns
+    -------
+    dict
+        The registered spec
+    """
+    DATASET_FILES[name] = filename
+    DATASET_INFO[name] = dict(info)
+    DATASET_ID_COLUMNS[name] = tuple(id_columns)
+    REGISTRY[name] = _spec(name, filename, info, id_columns)
+    return REGISTRY[name]
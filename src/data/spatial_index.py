@@ -0,0 +1,429 @@
+"""
+Persistent packed spatial indexes for processed datasets.
+
+Each processed file gets a ``.sidx`` sidecar holding a static R-tree over its
+feature bounding boxes::
+
+    parcels_zoning.gpkg
+    parcels_zoning.gpkg.sidx     # JSON header + float64 boxes + int64 ids
+
+The tree is packed the way flatbush does it: items are sorted by the Hilbert
+value of their bbox centres and grouped NODE_SIZE at a time, level by level,
+so it is built in one pass and stored as flat arrays. The arrays are
+memory-mapped on open, so bbox and nearest queries read only the pages of
+the tree they visit. Leaf entries are row positions in file order (what an
+unfiltered loader read returns); GeoPackage feature ids are stored alongside
+so matching rows can be read by fid without touching the rest of the layer.
+
+Indexes carry the source file's size, mtime and row count and are ignored
+once the file changes.
+"""
+
+import heapq
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from ..config import SPATIAL_INDEX_NODE_SIZE
+from .cache import file_signature
+
+MAGIC = b"SFSIDX01"
+_EMPTY_BOX = (np.inf, np.inf, -np.inf, -np.inf)
+
+
+def index_path(path: Path) -> Path:
+    """Sidecar path holding the spatial index of a dataset file."""
+    path = Path(path)
+    return path.with_name(path.name + ".sidx")
+
+
+def _hilbert(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Hilbert curve index of 16-bit grid coordinates (flatbush's bit-twiddling)."""
+    x = x.astype(np.uint64)
+    y = y.astype(np.uint64)
+    mask = np.uint64(0xFFFF)
+
+    a = x ^ y
+    b = mask ^ a
+    c = mask ^ (x | y)
+    d = x & (y ^ mask)
+    A = a | (b >> 1)
+    B = (a >> 1) ^ a
+    C = ((c >> 1) ^ (b & (d >> 1))) ^ c
+    D = ((a & (c >> 1)) ^ (d >> 1)) ^ d
+
+    for shift in (2, 4):
+        a, b, c, d = A, B, C, D
+        s = np.uint64(shift)
+        A = (a & (a >> s)) ^ (b & (b >> s))
+        B = (a & (b >> s)) ^ (b & ((a ^ b) >> s))
+        C = C ^ ((a & (c >> s)) ^ (b & (d >> s)))
+        D = D ^ ((b & (c >> s)) ^ ((a ^ b) & (d >> s)))
+
+    a, b, c, d = A, B, C, D
+    s = np.uint64(8)
+    C = C ^ ((a & (c >> s)) ^ (b & (d >> s)))
+    D = D ^ ((b & (c >> s)) ^ ((a ^ b) & (d >> s)))
+
+    a = C ^ (C >> 1)
+    b = D ^ (D >> 1)
+    i0 = x ^ y
+    i1 = b | (mask ^ (i0 | a))
+
+    def spread(v):
+        v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+        v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+        v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+        return (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+
+    return (spread(i1) << np.uint64(1)) | spread(i0)
+
+
+def pack(bounds: np.ndarray, node_size: int = SPATIAL_INDEX_NODE_SIZE):
+    """
+    Pack item bounding boxes into a Hilbert-sorted static R-tree.
+
+    Parameters
+    ----------
+    bounds : np.ndarray
+        (n, 4) item boxes (minx, miny, maxx, maxy); NaN rows never match
+    node_size : int
+        Children per node
+
+    Returns
+    -------
+    tuple
+        (boxes, indices, level_bounds). boxes is (nodes, 4); indices holds
+        the item position for leaves and the first child for inner nodes;
+        level_bounds holds the end of each level in boxes.
+    """
+    bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+    n = len(bounds)
+    missing = np.isnan(bounds).any(axis=1)
+    bounds = bounds.copy()
+    bounds[missing] = _EMPTY_BOX
+
+    level_sizes = [n]
+    while level_sizes[-1] > 1:
+        level_sizes.append(-(-level_sizes[-1] // node_size))
+    level_bounds = np.cumsum(level_sizes)
+    boxes = np.empty((int(level_bounds[-1]) if n else 0, 4))
+    indices = np.empty(len(boxes), dtype=np.int64)
+    if n == 0:
+        return boxes, indices, level_bounds[:0]
+
+    valid = bounds[~missing]
+    if len(valid):
+        minx, miny = valid[:, 0].min(), valid[:, 1].min()
+        width = max(valid[:, 2].max() - minx, 1e-12)
+        height = max(valid[:, 3].max() - miny, 1e-12)
+    else:
+        minx = miny = 0.0
+        width = height = 1.0
+    finite = np.where(missing[:, None], 0.0, bounds)
+    centers = (finite[:, :2] + finite[:, 2:]) / 2
+    hx = np.clip((centers[:, 0] - minx) / width * 0xFFFF, 0, 0xFFFF)
+    hy = np.clip((centers[:, 1] - miny) / height * 0xFFFF, 0, 0xFFFF)
+    order = np.argsort(_hilbert(hx, hy), kind="stable")
+
+    boxes[:n] = bounds[order]
+    indices[:n] = order
+    # Parents: reduce each run of node_size children
+    start = 0
+    for end, parent_end in zip(level_bounds[:-1], level_bounds[1:]):
+        end, parent_end = int(end), int(parent_end)
+        firsts = np.arange(start, end, node_size)
+        boxes[end:parent_end, 0] = np.minimum.reduceat(boxes[start:end, 0], firsts - start)
+        boxes[end:parent_end, 1] = np.minimum.reduceat(boxes[start:end, 1], firsts - start)
+        boxes[end:parent_end, 2] = np.maximum.reduceat(boxes[start:end, 2], firsts - start)
+        boxes[end:parent_end, 3] = np.maximum.reduceat(boxes[start:end, 3], firsts - start)
+        indices[end:parent_end] = firsts
+        start = end
+    return boxes, indices, level_bounds
+
+
+def _read_bounds(path: Path) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Feature bboxes in file order, plus GeoPackage fids."""
+    if path.suffix == ".parquet":
+        geoms = gpd.read_parquet(path, columns=["geometry"]).geometry.values
+        return shapely.bounds(np.asarray(geoms)), None
+    import pyogrio
+    fids, bounds = pyogrio.read_bounds(path)
+    return np.asarray(bounds, dtype=np.float64).T, np.asarray(fids, dtype=np.int64)
+
+
+def build_spatial_index(path: Path, node_size: int = SPATIAL_INDEX_NODE_SIZE) -> Path:
+    """
+    Build and persist the spatial index of a processed dataset file.
+
+    Only bounding boxes are read (from the GeoPackage geometry headers via
+    pyogrio.read_bounds, or the GeoParquet geometry column).
+
+    Parameters
+    ----------
+    path : Path
+        Processed GeoPackage or GeoParquet file
+    node_size : int
+        Children per tree node
+
+    Returns
+    -------
+    Path
+        Sidecar path
+    """
+    path = Path(path)
+    bounds, fids = _read_bounds(path)
+    boxes, indices, level_bounds = pack(bounds, node_size)
+
+    _, mtime_ns, size = file_signature(path)
+    header = {
+        "source": path.name,
+        "source_mtime_ns": mtime_ns,
+        "source_size": size,
+        "rows": len(bounds),
+        "node_size": node_size,
+        "level_bounds": [int(v) for v in level_bounds],
+        "has_fids": fids is not None,
+    }
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b" " * (-(len(MAGIC) + 8 + len(header_bytes)) % 8)
+
+    output_path = index_path(path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header_bytes)).tobytes())
+        f.write(header_bytes)
+        f.write(np.ascontiguousarray(boxes, dtype="<f8").tobytes())
+        f.write(np.ascontiguousarray(indices, dtype="<i8").tobytes())
+        if fids is not None:
+            f.write(np.ascontiguousarray(fids, dtype="<i8").tobytes())
+    tmp_path.replace(output_path)
+    return output_path
+
+
+class SpatialIndex:
+    """
+    Memory-mapped packed R-tree over a dataset's feature bounding boxes.
+
+    Use open_spatial_index() to get a (cached) instance for a dataset file.
+
+    Parameters
+    ----------
+    sidecar : Path
+        ``.sidx`` file written by build_spatial_index
+    """
+
+    def __init__(self, sidecar: Path):
+        self.path = Path(sidecar)
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a spatial index file: {self.path}")
+            header_len = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+            self.header = json.loads(f.read(header_len))
+        offset = len(MAGIC) + 8 + header_len
+
+        self.rows = self.header["rows"]
+        self.node_size = self.header["node_size"]
+        self.level_bounds = np.asarray(self.header["level_bounds"], dtype=np.int64)
+        nodes = int(self.level_bounds[-1]) if len(self.level_bounds) else 0
+        self.boxes = self._map(offset, "<f8", (nodes, 4))
+        offset += nodes * 32
+        self.indices = self._map(offset, "<i8", (nodes,))
+        offset += nodes * 8
+        self.fids = self._map(offset, "<i8", (self.rows,)) if self.header["has_fids"] else None
+
+    def _map(self, offset: int, dtype: str, shape: tuple) -> np.ndarray:
+        if not np.prod(shape):
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """Extent of all indexed features."""
+        if not len(self.boxes):
+            return (np.nan,) * 4
+        return tuple(float(v) for v in self.boxes[-1])
+
+    def query_bulk(self, query_bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Items whose bbox intersects each query box.
+
+        The tree is descended one level at a time for all queries together,
+        so each level costs a few vectorized comparisons.
+
+        Parameters
+        ----------
+        query_bounds : np.ndarray
+            (m, 4) query boxes in the dataset CRS
+
+        Returns
+        -------
+        tuple of np.ndarray
+            (query positions, item row positions), sorted by query
+        """
+        query_bounds = np.asarray(query_bounds, dtype=np.float64).reshape(-1, 4)
+        empty = np.empty(0, dtype=np.int64)
+        if not self.rows or not len(query_bounds):
+            return empty, empty
+
+        levels = len(self.level_bounds)
+        q = np.arange(len(query_bounds))
+        node = np.full(len(q), int(self.level_bounds[-1]) - 1)
+        for level in range(levels - 1, -1, -1):
+            box = self.boxes[node]
+            qb = query_bounds[q]
+            hit = ((box[:, 0] <= qb[:, 2]) & (box[:, 2] >= qb[:, 0])
+                   & (box[:, 1] <= qb[:, 3]) & (box[:, 3] >= qb[:, 1]))
+            q, node = q[hit], node[hit]
+            if level == 0:
+                break
+            starts = self.indices[node]
+            ends = np.minimum(starts + self.node_size, self.level_bounds[level - 1])
+            counts = ends - starts
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            q = np.repeat(q, counts)
+            node = np.repeat(starts, counts) + offsets
+
+        items = np.asarray(self.indices[node])
+        order = np.lexsort((items, q))
+        return q[order], items[order]
+
+    def query(self, bbox) -> np.ndarray:
+        """
+        Row positions of features whose bbox intersects bbox.
+
+        Parameters
+        ----------
+        bbox : tuple
+            (minx, miny, maxx, maxy) in the dataset CRS
+
+        Returns
+        -------
+        np.ndarray
+            Sorted row positions
+        """
+        return self.query_bulk(np.asarray([bbox], dtype=np.float64))[1]
+
+    def iter_nearest(self, x: float, y: float,
+                     max_distance: Optional[float] = None) -> Iterator[Tuple[int, float]]:
+        """
+        Yield (row position, bbox distance) in increasing bbox distance.
+
+        Parameters
+        ----------
+        x, y : float
+            Query point in the dataset CRS
+        max_distance : float, optional
+            Stop once bbox distances exceed this
+        """
+        if not self.rows:
+            return
+        limit = np.inf if max_distance is None else max_distance
+        n = self.rows
+        heap = [(0.0, int(self.level_bounds[-1]) - 1)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > limit:
+                return
+            if node < n:
+                yield int(self.indices[node]), distance
+                continue
+            level = int(np.searchsorted(self.level_bounds, node, side="right"))
+            start = int(self.indices[node])
+            end = min(start + self.node_size, int(self.level_bounds[level - 1]))
+            box = self.boxes[start:end]
+            dx = np.maximum(np.maximum(box[:, 0] - x, x - box[:, 2]), 0)
+            dy = np.maximum(np.maximum(box[:, 1] - y, y - box[:, 3]), 0)
+            for child, d in zip(range(start, end), np.hypot(dx, dy)):
+                if np.isfinite(d):
+                    heapq.heappush(heap, (float(d), child))
+
+    def nearest(self, x: float, y: float, k: int = 1,
+                max_distance: Optional[float] = None) -> np.ndarray:
+        """Row positions of the k features with the nearest bboxes."""
+        result = []
+        for position, _ in self.iter_nearest(x, y, max_distance):
+            result.append(position)
+            if len(result) == k:
+                break
+        return np.asarray(result, dtype=np.int64)
+
+
+@lru_cache(maxsize=32)
+def _open(sidecar: str, mtime_ns: int) -> SpatialIndex:
+    return SpatialIndex(Path(sidecar))
+
+
+def open_spatial_index(path: Path, rows: Optional[int] = None) -> Optional[SpatialIndex]:
+    """
+    Open the spatial index of a dataset file if it is present and current.
+
+    Parameters
+    ----------
+    path : Path
+        Processed GeoPackage or GeoParquet file
+    rows : int, optional
+        Expected feature count (e.g. of an unfiltered loaded frame)
+
+    Returns
+    -------
+    SpatialIndex or None
+        None if there is no sidecar or it was built from another version
+    """
+    path = Path(path)
+    sidecar = index_path(path)
+    if not sidecar.exists() or not path.exists():
+        return None
+    try:
+        index = _open(str(sidecar), sidecar.stat().st_mtime_ns)
+    except (OSError, ValueError):
+        return None
+    _, mtime_ns, size = file_signature(path)
+    header = index.header
+    if header["source_mtime_ns"] != mtime_ns or header["source_size"] != size:
+        return None
+    if rows is not None and header["rows"] != rows:
+        return None
+    return index
+
+
+def index_for_frame(gdf: gpd.GeoDataFrame) -> Optional[SpatialIndex]:
+    """
+    Spatial index matching a frame from src.data.loaders, if available.
+
+    Only unfiltered reads qualify: their row positions are the file's. The
+    index is handed out only after checking every row's bbox against the
+    stored leaf boxes, so reprojected, filtered, reordered or otherwise
+    modified frames return None.
+    """
+    key = gdf.attrs.get("cache_key")
+    if key is None:
+        return None
+    path, mtime_ns, size, options = key
+    if any(value is not None for _, value in options):
+        return None
+    if not gdf.index.equals(pd.RangeIndex(len(gdf))):
+        return None
+    index = open_spatial_index(Path(path), rows=len(gdf))
+    if index is None or index.header["source_mtime_ns"] != mtime_ns:
+        return None
+    if not _matches_boxes(index, gdf):
+        return None
+    return index
+
+
+def _matches_boxes(index: SpatialIndex, gdf: gpd.GeoDataFrame) -> bool:
+    """True if each row of gdf has the bbox the index stores for its position."""
+    n = index.rows
+    if not n:
+        return True
+    bounds = shapely.bounds(np.asarray(gdf.geometry.values))
+    bounds[np.isnan(bounds).any(axis=1)] = _EMPTY_BOX
+    return bool(np.allclose(bounds[index.indices[:n]], index.boxes[:n], rtol=1e-12, atol=0.0))
@@ -0,0 +1,394 @@
+"""
+Multi-year ACS tract time series.
+
+All vintages live in one long Parquet table (processed/ACS_TIMESERIES_FILE),
+one row per (GEOID, year), so loading a decade of ACS is a single columnar
+read filtered by year/GEOID rather than one shapefile join per year.
+
+Tract boundaries change between decennial vintages: ACS releases up to 2019
+are tabulated on 2010 tracts, later ones on 2020 tracts. Before storing,
+every year is harmonized to one target vintage through a crosswalk table
+(source_geoid, target_geoid, weight), where weight is the share of the
+source tract allocated to the target tract:
+
+- counts (extensive variables) are split by weight and summed per target
+- medians and rates (intensive variables) are averaged with weight x
+  occupied units
+
+Crosswalks come from the Census tract relationship files
+(load_tract_crosswalk) or from two boundary layers (crosswalk_from_geometries).
+compute_changes then derives per-tract change and annualized rates with
+vectorized pivots.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from .acs import ACSClient, tract_geography
+from .download import TRACT_ACS_VARIABLES, download_file
+from ..config import ACS_TIMESERIES_FILE, DATA_PROCESSED, DATA_RAW
+
+# Variables averaged rather than summed when harmonizing tracts
+INTENSIVE_VARIABLES = ("median_income",)
+# Size variable weighting intensive averages
+SIZE_VARIABLE = "total_occupied_units"
+# First ACS year tabulated on 2020 tract boundaries
+VINTAGE_2020_FIRST_YEAR = 2020
+
+RELATIONSHIP_URL = (
+    "https://www2.census.gov/geo/docs/maps-data/data/rel2020/tract/"
+    "tab20_tract20_tract10_st{state_fips}.txt"
+)
+
+
+def tract_vintage(year: int) -> int:
+    """Decennial tract boundaries an ACS release is tabulated on."""
+    return 2020 if year >= VINTAGE_2020_FIRST_YEAR else 2010
+
+
+def timeseries_path(data_dir: Optional[Path] = None) -> Path:
+    """Location of the tract-by-year store."""
+    return (Path(data_dir) if data_dir is not None else DATA_PROCESSED) / ACS_TIMESERIES_FILE
+
+
+def load_tract_crosswalk(path: Path, target_vintage: int = 2020) -> pd.DataFrame:
+    """
+    Read a Census 2020-to-2010 tract relationship file as a crosswalk.
+
+    Weights are the share of each source tract's land area falling in each
+    target tract (total area for all-water tracts). The file relates both
+    vintages, so it serves either direction.
+
+    Parameters
+    ----------
+    path : Path
+        Pipe-delimited ``tab20_tract20_tract10`` file
+    target_vintage : {2010, 2020}
+        Vintage to harmonize to: 2020 maps 2010 tracts onto 2020 tracts,
+        2010 maps 2020 tracts onto 2010 tracts
+
+    Returns
+    -------
+    pd.DataFrame
+        source_geoid, target_geoid, weight
+
+    Raises
+    ------
+    ValueError
+        If target_vintage is not 2010 or 2020
+    """
+    if target_vintage not in (2010, 2020):
+        raise ValueError(f"target_vintage must be 2010 or 2020, got {target_vintage}")
+    source, target = (
+        ("GEOID_TRACT_10", "GEOID_TRACT_20") if target_vintage == 2020
+        else ("GEOID_TRACT_20", "GEOID_TRACT_10")
+    )
+    rel = pd.read_csv(path, sep="|", dtype={"GEOID_TRACT_10": str, "GEOID_TRACT_20": str})
+    land = rel["AREALAND_PART"].astype(float)
+    area = land + rel["AREAWATER_PART"].astype(float)
+    land_total = land.groupby(rel[source]).transform("sum")
+    area_total = area.groupby(rel[source]).transform("sum")
+    weight = np.where(land_total > 0, land / land_total.where(land_total > 0),
+                      area / area_total.where(area_total > 0))
+    return pd.DataFrame({
+        "source_geoid": rel[source],
+        "target_geoid": rel[target],
+        "weight": weight,
+    })
+
+
+def download_tract_crosswalk(
+    state_fips: str = "35",
+    output_dir: Optional[Path] = None,
+    target_vintage: int = 2020
+) -> pd.DataFrame:
+    """Download (once) and read the state's 2020-to-2010 tract relationship file."""
+    output_dir = Path(output_dir) if output_dir is not None else DATA_RAW
+    url = RELATIONSHIP_URL.format(state_fips=state_fips)
+    path = download_file(url, output_dir / url.rsplit("/", 1)[1])
+    return load_tract_crosswalk(path, target_vintage=target_vintage)
+
+
+def crosswalk_from_geometries(
+    source: gpd.GeoDataFrame,
+    target: gpd.GeoDataFrame,
+    geoid_column: str = "GEOID"
+) -> pd.DataFrame:
+    """
+    Area-weighted crosswalk between two tract boundary layers.
+
+    Parameters
+    ----------
+    source, target : gpd.GeoDataFrame
+        Old and new tract boundaries with a GEOID column
+
+    Returns
+    -------
+    pd.DataFrame
+        source_geoid, target_geoid, weight (share of source area)
+    """
+    from ..analysis.interpolation import _align, intersection_pairs
+
+    source, target = _align([source, target])
+    si, ti, area = intersection_pairs(source, target)
+    return pd.DataFrame({
+        "source_geoid": source[geoid_column].to_numpy()[si],
+        "target_geoid": target[geoid_column].to_numpy()[ti],
+        "weight": area / source.geometry.area.to_numpy()[si],
+    })
+
+
+def harmonize(
+    df: pd.DataFrame,
+    crosswalk: pd.DataFrame,
+    intensive: Sequence[str] = INTENSIVE_VARIABLES,
+    size_column: str = SIZE_VARIABLE
+) -> pd.DataFrame:
+    """
+    Re-tabulate one year of tract data onto crosswalk target tracts.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        GEOID plus numeric variables (source vintage)
+    crosswalk : pd.DataFrame
+        source_geoid, target_geoid, weight
+    intensive : sequence of str
+        Columns averaged instead of summed
+    size_column : str
+        Column weighting intensive averages (crosswalk weight only if missing)
+
+    Returns
+    -------
+    pd.DataFrame
+        GEOID (target vintage) plus the same variables. Source tracts
+        missing from the crosswalk are dropped.
+    """
+    values = [c for c in df.columns if c != "GEOID" and pd.api.types.is_numeric_dtype(df[c])]
+    merged = crosswalk.merge(df[["GEOID"] + values], left_on="source_geoid", right_on="GEOID")
+    groups = merged["target_geoid"]
+    weight = merged["weight"]
+
+    extensive = [c for c in values if c not in intensive]
+    result = merged[extensive].mul(weight, axis=0).groupby(groups).sum(min_count=1)
+
+    averaged = [c for c in values if c in intensive]
+    if averaged:
+        size = weight * merged[size_column] if size_column in merged.columns else weight
+        data = merged[averaged]
+        w = data.notna().mul(size, axis=0)
+        totals = w.groupby(groups).sum()
+        means = data.mul(size, axis=0).groupby(groups).sum() / totals.where(totals > 0)
+        result = result.join(means)
+    return result[values].reset_index().rename(columns={"target_geoid": "GEOID"})
+
+
+def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Add share columns used in displacement analysis (percent, 0-100)."""
+    def share(numerator, denominator):
+        if numerator in df.columns and denominator in df.columns:
+            d = df[denominator].where(df[denominator] > 0)
+            return (df[numerator] / d * 100).round(2)
+        return None
+
+    for column, (numerator, denominator) in {
+        "pct_renters": ("renter_occupied", "total_occupied_units"),
+        "pct_hispanic": ("hispanic_latino", "total_population"),
+        "pct_white": ("white_alone", "total_population"),
+    }.items():
+        values = share(numerator, denominator)
+        if values is not None:
+            df[column] = values
+    return df
+
+
+def build_acs_timeseries(
+    years: Sequence[int],
+    variables: Optional[Dict[str, str]] = None,
+    state_fips: str = "35",
+    county_fips: str = "049",
+    crosswalk: Optional[pd.DataFrame] = None,
+    target_vintage: int = 2020,
+    client: Optional[ACSClient] = None,
+    data_dir: Optional[Path] = None
+) -> Path:
+    """
+    Fetch ACS 5-year tract data for many years into one harmonized store.
+
+    Parameters
+    ----------
+    years : sequence of int
+        ACS release years (e.g. range(2012, 2023))
+    variables : dict, optional
+        ACS variable -> column name. Defaults to TRACT_ACS_VARIABLES
+    state_fips, county_fips : str
+        County to fetch
+    crosswalk : pd.DataFrame, optional
+        Crosswalk from the other vintage to target_vintage. Defaults to the
+        Census 2020/2010 tract relationship file, downloaded when needed and
+        read in the target_vintage direction (see load_tract_crosswalk)
+    target_vintage : {2010, 2020}
+        Tract boundaries to store every year on
+    client : ACSClient, optional
+        Defaults to a new ACSClient (cached responses)
+    data_dir : Path, optional
+        Output directory. Defaults to DATA_PROCESSED
+
+    Returns
+    -------
+    Path
+        Parquet store, sorted by (year, GEOID)
+
+    Raises
+    ------
+    ValueError
+        If target_vintage is not 2010 or 2020
+    """
+    if target_vintage not in (2010, 2020):
+        raise ValueError(f"target_vintage must be 2010 or 2020, got {target_vintage}")
+    variables = variables or TRACT_ACS_VARIABLES
+    client = client or ACSClient()
+
+    frames = []
+    for year in sorted(set(years)):
+        df = client.get(list(variables), year=int(year), geography=tract_geography(state_fips, county_fips))
+        df = df[["GEOID"] + list(variables)].rename(columns=variables)
+        vintage = tract_vintage(year)
+        if vintage != target_vintage:
+            if crosswalk is None:
+                crosswalk = download_tract_crosswalk(state_fips, target_vintage=target_vintage)
+            df = harmonize(df, crosswalk)
+        df.insert(1, "year", int(year))
+        df["source_vintage"] = vintage
+        frames.append(df)
+
+    table = add_indicators(pd.concat(frames, ignore_index=True))
+    table = table.sort_values(["year", "GEOID"], ignore_index=True)
+    path = timeseries_path(data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    table.to_parquet(tmp_path, index=False, row_group_size=max(1, table["GEOID"].nunique()))
+    tmp_path.replace(path)
+    print(f"✓ ACS time series ({len(frames)} years, {table['GEOID'].nunique()} tracts) saved to: {path}")
+    return path
+
+
+def load_acs_timeseries(
+    years: Optional[Sequence[int]] = None,
+    geoids: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+    data_dir: Optional[Path] = None
+) -> pd.DataFrame:
+    """
+    Read the tract-by-year store in one pass.
+
+    Parameters
+    ----------
+    years : sequence of int, optional
+        Only these years (pushed down to the Parquet reader)
+    geoids : sequence of str, optional
+        Only these tracts
+    columns : sequence of str, optional
+        Variables to read (GEOID and year are always included)
+    data_dir : Path, optional
+        Defaults to DATA_PROCESSED
+
+    Returns
+    -------
+    pd.DataFrame
+        Long table, one row per (GEOID, year)
+
+    Raises
+    ------
+    FileNotFoundError
+        If the store hasn't been built
+    """
+    path = timeseries_path(data_dir)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"ACS time series not found at {path}. Build it first with build_acs_timeseries()."
+        )
+    filters = []
+    if years is not None:
+        filters.append(("year", "in", [int(y) for y in years]))
+    if geoids is not None:
+        filters.append(("GEOID", "in", list(geoids)))
+    if columns is not None:
+        columns = ["GEOID", "year"] + [c for c in columns if c not in ("GEOID", "year")]
+    return pd.read_parquet(path, columns=columns, filters=filters or None)
+
+
+def compute_changes(
+    df: pd.DataFrame,
+    columns: Sequence[str],
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Per-tract change between two years.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long table from load_acs_timeseries
+    columns : sequence of str
+        Variables to compare
+    start_year, end_year : int, optional
+        Defaults to the first and last year in df
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by GEOID with, per variable, ``<col>_<start>``,
+        ``<col>_<end>``, ``<col>_change`` (absolute), ``<col>_pct_change``
+        and ``<col>_annual_rate`` (compound annual growth, percent).
+        Percent-point variables (``pct_*``) get the absolute change only.
+
+    Raises
+    ------
+    ValueError
+        If a year is not in df
+    """
+    years = sorted(df["year"].unique())
+    start_year = years[0] if start_year is None else start_year
+    end_year = years[-1] if end_year is None else end_year
+    for year in (start_year, end_year):
+        if year not in years:
+            raise ValueError(f"Year {year} not in time series. Available: {years}")
+
+    wide = df[df["year"].isin([start_year, end_year])].pivot(index="GEOID", columns="year", values=list(columns))
+    span = end_year - start_year
+    result = {}
+    for column in columns:
+        start, end = wide[(column, start_year)], wide[(column, end_year)]
+        result[f"{column}_{start_year}"] = start
+        result[f"{column}_{end_year}"] = end
+        result[f"{column}_change"] = end - start
+        if column.startswith("pct_"):
+            continue
+        base = start.where(start > 0)
+        result[f"{column}_pct_change"] = (end - start) / base * 100
+        if span > 0:
+            result[f"{column}_annual_rate"] = ((end.where(end > 0) / base) ** (1 / span) - 1) * 100
+    return pd.DataFrame(result)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the multi-year ACS tract time series")
+    parser.add_argument("--years", type=int, nargs="+", default=list(range(2013, 2023)))
+    parser.add_argument("--target-vintage", type=int, default=2020, choices=[2010, 2020])
+    parser.add_argument("--crosswalk", type=Path, default=None,
+                        help="Census tab20_tract20_tract10 relationship file")
+    args = parser.parse_args(argv)
+    crosswalk = (load_tract_crosswalk(args.crosswalk, target_vintage=args.target_vintage)
+                 if args.crosswalk else None)
+    build_acs_timeseries(args.years, crosswalk=crosswalk, target_vintage=args.target_vintage)
+
+
+if __name__ == "__main__":
+    main()
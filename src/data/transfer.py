@@ -0,0 +1,404 @@
+"""
+Robust HTTP transfers for raw data downloads.
+
+Downloads stream into a ``.part`` file next to the target and are resumed with
+HTTP Range requests after a dropped connection. Large files on servers that
+accept ranges are fetched as parallel byte-range chunks. Every completed file
+gets a ``.sha256`` sidecar recording its checksum and the server's ETag /
+Last-Modified, so re-runs skip files that have not changed upstream.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = (10, 60)
+DEFAULT_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+# Files at least this large are fetched as parallel byte ranges
+PARALLEL_THRESHOLD = 64 * 1024**2
+RANGE_CHUNK_SIZE = 16 * 1024**2
+MAX_WORKERS = 4
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the shared requests session.
+
+    The session keeps a connection pool sized for parallel range downloads
+    and retries connection errors and 429/5xx responses with backoff.
+
+    Returns
+    -------
+    requests.Session
+        Process-wide session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=DEFAULT_RETRIES,
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "HEAD", "POST"]),
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=MAX_WORKERS,
+                pool_maxsize=MAX_WORKERS * 2,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def file_sha256(path: Path, block_size: int = 1024**2) -> str:
+    """
+    Compute the SHA-256 hex digest of a file.
+
+    Parameters
+    ----------
+    path : Path
+        File to hash
+    block_size : int
+        Read block size in bytes
+
+    Returns
+    -------
+    str
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sidecar_path(path: Path) -> Path:
+    """Path of the checksum sidecar for a downloaded file."""
+    return path.with_name(path.name + ".sha256")
+
+
+def read_sidecar(path: Path) -> Optional[dict]:
+    """
+    Read the checksum sidecar for a downloaded file.
+
+    Returns
+    -------
+    dict or None
+        Sidecar contents (sha256, size, url, etag, last_modified), or None
+    """
+    sidecar = sidecar_path(path)
+    if not sidecar.exists():
+        return None
+    try:
+        return json.loads(sidecar.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _validators(headers) -> dict:
+    return {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+    }
+
+
+def _validators_match(old: dict, new: dict) -> bool:
+    """True if the server validators identify the same file version."""
+    if new.get("etag") or old.get("etag"):
+        return bool(new.get("etag")) and new.get("etag") == old.get("etag")
+    if new.get("last_modified") or old.get("last_modified"):
+        return new.get("last_modified") == old.get("last_modified")
+    return False
+
+
+def _probe(session: requests.Session, url: str, timeout) -> Tuple[Optional[int], bool, dict]:
+    """HEAD the URL: (content length, accepts ranges, validators)."""
+    try:
+        response = session.head(url, allow_redirects=True, timeout=timeout)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        return None, False, {}
+    length = response.headers.get("Content-Length")
+    accepts_ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    return (int(length) if length else None), accepts_ranges, _validators(response.headers)
+
+
+def _is_current(output_path: Path, validators: dict) -> bool:
+    """True if output_path is intact and matches the server's validators."""
+    meta = read_sidecar(output_path)
+    if meta is None or not output_path.exists():
+        return False
+    if output_path.stat().st_size != meta.get("size"):
+        return False
+    if not validators or not _validators_match(meta, validators):
+        return False
+    return file_sha256(output_path) == meta.get("sha256")
+
+
+class _RangesIgnored(requests.exceptions.HTTPError):
+    """Server advertised byte ranges but answered a range request in full."""
+
+
+def _with_retries(func, max_retries: int):
+    """Call func, retrying mid-stream network errors with exponential backoff."""
+    for attempt in range(max_retries + 1):
+        try:
+            return func()
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout):
+            if attempt == max_retries:
+                raise
+            time.sleep(BACKOFF_FACTOR * (2 ** attempt))
+
+
+def _load_part_state(state_path: Path) -> dict:
+    if state_path.exists():
+        try:
+            return json.loads(state_path.read_text())
+        except ValueError:
+            pass
+    return {}
+
+
+def _stream_download(
+    session: requests.Session,
+    url: str,
+    part_path: Path,
+    state_path: Path,
+    validators: dict,
+    total_size: Optional[int],
+    chunk_size: int,
+    timeout,
+    max_retries: int,
+    desc: str
+) -> None:
+    """Single-connection download into part_path, resuming with Range."""
+    state = _load_part_state(state_path)
+    # Only a stream-mode part is a contiguous prefix; a ranges-mode part is
+    # preallocated to full size and may be mostly zeros
+    if part_path.exists() and (state.get("mode") != "stream"
+                               or not _validators_match(state, validators)):
+        part_path.unlink()
+    state_path.write_text(json.dumps({**validators, "mode": "stream"}))
+
+    with tqdm(total=total_size, unit='B', unit_scale=True, desc=desc) as pbar:
+        def attempt():
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            if total_size is not None and offset >= total_size:
+                return
+            headers = {}
+            if offset:
+                headers["Range"] = f"bytes={offset}-"
+                if validators.get("etag") or validators.get("last_modified"):
+                    headers["If-Range"] = validators.get("etag") or validators["last_modified"]
+            with session.get(url, stream=True, headers=headers, timeout=timeout) as response:
+                response.raise_for_status()
+                mode = "ab"
+                if offset and response.status_code != 206:
+                    # Server ignored the range (or file changed): start over
+                    mode = "wb"
+                    offset = 0
+                pbar.reset(total=total_size)
+                pbar.update(offset)
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if chunk:
+                            f.write(chunk)
+                            pbar.update(len(chunk))
+
+        _with_retries(attempt, max_retries)
+
+
+def _parallel_download(
+    session: requests.Session,
+    url: str,
+    part_path: Path,
+    state_path: Path,
+    validators: dict,
+    total_size: int,
+    chunk_size: int,
+    timeout,
+    max_retries: int,
+    max_workers: int,
+    desc: str
+) -> None:
+    """Download fixed byte ranges concurrently into a preallocated part file."""
+    ranges = [
+        (start, min(start + RANGE_CHUNK_SIZE, total_size) - 1)
+        for start in range(0, total_size, RANGE_CHUNK_SIZE)
+    ]
+
+    state = _load_part_state(state_path)
+    if (not part_path.exists() or state.get("mode") != "ranges"
+            or state.get("size") != total_size
+            or not _validators_match(state, validators)):
+        state = {**validators, "mode": "ranges", "size": total_size, "done": []}
+        with open(part_path, "wb") as f:
+            f.truncate(total_size)
+    done = set(state["done"])
+    state_lock = threading.Lock()
+
+    with tqdm(total=total_size, unit='B', unit_scale=True, desc=desc) as pbar:
+        pbar.update(sum(ranges[i][1] - ranges[i][0] + 1 for i in done))
+
+        def fetch(index: int) -> None:
+            start, end = ranges[index]
+
+            def attempt():
+                written = 0
+                headers = {"Range": f"bytes={start}-{end}"}
+                with session.get(url, stream=True, headers=headers, timeout=timeout) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise _RangesIgnored(f"Server ignored Range request for {url}")
+                    with open(part_path, "r+b") as f:
+                        f.seek(start)
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            if chunk:
+                                f.write(chunk)
+                                written += len(chunk)
+                                pbar.update(len(chunk))
+                if written != end - start + 1:
+                    pbar.update(-written)
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"Short read for bytes {start}-{end} of {url}"
+                    )
+
+            _with_retries(attempt, max_retries)
+            with state_lock:
+                done.add(index)
+                state["done"] = sorted(done)
+                state_path.write_text(json.dumps(state))
+
+        pending = [i for i in range(len(ranges)) if i not in done]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(fetch, i) for i in pending]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                pool.shutdown(cancel_futures=True)
+                raise
+
+
+def fetch(
+    url: str,
+    output_path: Path,
+    chunk_size: int = 8192,
+    timeout=DEFAULT_TIMEOUT,
+    max_retries: int = DEFAULT_RETRIES,
+    parallel: bool = True,
+    max_workers: int = MAX_WORKERS,
+    force: bool = False,
+    expected_sha256: Optional[str] = None,
+    session: Optional[requests.Session] = None
+) -> Path:
+    """
+    Download a URL to a file with resume, parallel ranges and checksums.
+
+    Parameters
+    ----------
+    url : str
+        URL to download from
+    output_path : Path
+        Output file path
+    chunk_size : int
+        Streaming chunk size in bytes
+    timeout : float or tuple
+        Requests (connect, read) timeout in seconds
+    max_retries : int
+        Retries for dropped connections during a transfer
+    parallel : bool
+        Fetch large files as concurrent byte ranges when the server allows it
+    max_workers : int
+        Concurrent connections for parallel range downloads
+    force : bool
+        Download even if the existing file matches the server's validators
+    expected_sha256 : str, optional
+        Known checksum; the download fails if the result does not match
+    session : requests.Session, optional
+        Session to use. Defaults to the shared pooled session
+
+    Returns
+    -------
+    Path
+        Path to downloaded file
+
+    Raises
+    ------
+    ValueError
+        If the downloaded file does not match expected_sha256
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    session = session or get_session()
+
+    total_size, accepts_ranges, validators = _probe(session, url, timeout)
+
+    if not force and _is_current(output_path, validators):
+        if expected_sha256 is None or read_sidecar(output_path)["sha256"] == expected_sha256:
+            print(f"✓ {output_path.name} is up to date (checksum and server validators match)")
+            return output_path
+
+    part_path = output_path.with_name(output_path.name + ".part")
+    state_path = output_path.with_name(output_path.name + ".part.json")
+    desc = f"Downloading {output_path.name}"
+
+    ranged = bool(parallel and accepts_ranges and total_size and total_size >= PARALLEL_THRESHOLD)
+    if ranged:
+        try:
+            _parallel_download(
+                session, url, part_path, state_path, validators, total_size,
+                chunk_size, timeout, max_retries, max_workers, desc
+            )
+        except _RangesIgnored:
+            # Accept-Ranges was advertised but not honoured: the preallocated
+            # part file holds no usable prefix, so stream from scratch
+            print(f"Warning: {url} ignored byte-range requests; downloading over one connection")
+            part_path.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            ranged = False
+    if not ranged:
+        _stream_download(
+            session, url, part_path, state_path, validators, total_size,
+            chunk_size, timeout, max_retries, desc
+        )
+
+    checksum = file_sha256(part_path)
+    if expected_sha256 is not None and checksum != expected_sha256:
+        part_path.unlink()
+        state_path.unlink(missing_ok=True)
+        raise ValueError(
+            f"Checksum mismatch for {url}: got {checksum}, expected {expected_sha256}"
+        )
+
+    part_path.replace(output_path)
+    state_path.unlink(missing_ok=True)
+    sidecar_path(output_path).write_text(json.dumps({
+        "sha256": checksum,
+        "size": output_path.stat().st_size,
+        "url": url,
+        **validators,
+    }, indent=2))
+
+    return output_path
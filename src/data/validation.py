@@ -0,0 +1,319 @@
+"""
+Data-quality validation of processed datasets.
+
+Checks run vectorized over whole columns (or batch by batch for files):
+
+- null and empty geometries
+- invalid geometries (``shapely.is_valid``), with GEOS reasons tallied
+- features whose bbox lies outside the Santa Fe bounds, padded by
+  VALIDATION_BOUNDS_PAD times their size (catches a wrong CRS or
+  swapped axes without flagging county-wide tracts)
+- duplicate IDs (DATASET_ID_COLUMNS, e.g. GEOID) and duplicate geometries
+- null attribute values, e.g. suppressed ACS estimates
+
+process_downloaded_data repairs invalid geometries with ``make_valid``
+before writing, and stores the report of the written file in a sidecar::
+
+    census_tracts_acs.gpkg
+    census_tracts_acs.gpkg.validation.json
+
+The report carries the file's SHA-256 and (mtime, size) signature, so
+loaders asking for validation reuse it instead of re-running the checks
+until the file changes.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from .cache import file_signature
+from .manifest import content_hash
+from ..config import DATASET_FILES, DATASET_ID_COLUMNS, VALIDATION_BOUNDS_PAD
+
+# Bump when checks change so that cached reports are recomputed
+VALIDATION_VERSION = 1
+# Features per batch when validating a file
+VALIDATION_CHUNK_SIZE = 50_000
+
+Bounds = Union[Tuple[float, float, float, float], dict]
+
+
+def report_path(path: Path) -> Path:
+    """Sidecar holding the validation report of a dataset file."""
+    path = Path(path)
+    return path.with_name(path.name + ".validation.json")
+
+
+def dataset_id_columns(path: Path, columns: Sequence[str]) -> List[str]:
+    """ID columns to check for duplicates in a processed dataset file."""
+    names = [name for name, filename in DATASET_FILES.items() if filename == Path(path).name]
+    candidates = DATASET_ID_COLUMNS.get(names[0], ()) if names else ()
+    return [c for c in candidates if c in columns]
+
+
+def repair_geometries(gdf: gpd.GeoDataFrame) -> Tuple[gpd.GeoDataFrame, int]:
+    """
+    Make invalid geometries valid, leaving valid ones untouched.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Features
+
+    Returns
+    -------
+    tuple
+        (GeoDataFrame, number of geometries repaired). Repaired polygons
+        stay polygonal: parts collapsed to lines or points are dropped.
+    """
+    geoms = np.asarray(gdf.geometry.values)
+    invalid = ~shapely.is_valid(geoms) & ~shapely.is_missing(geoms)
+    n_invalid = int(invalid.sum())
+    if not n_invalid:
+        return gdf, 0
+    repaired = geoms.copy()
+    repaired[invalid] = shapely.make_valid(geoms[invalid], method="structure", keep_collapsed=False)
+    gdf = gdf.copy()
+    gdf[gdf.geometry.name] = gpd.GeoSeries(repaired, index=gdf.index, crs=gdf.crs)
+    return gdf, n_invalid
+
+
+class _Checks:
+    """Validation counters accumulated over one frame or a stream of batches."""
+
+    def __init__(self, bounds: Optional[Bounds], id_columns: Sequence[str]):
+        if isinstance(bounds, dict):
+            bounds = (bounds["minx"], bounds["miny"], bounds["maxx"], bounds["maxy"])
+        if bounds is not None:
+            minx, miny, maxx, maxy = bounds
+            pad_x = (maxx - minx) * VALIDATION_BOUNDS_PAD
+            pad_y = (maxy - miny) * VALIDATION_BOUNDS_PAD
+            bounds = (minx - pad_x, miny - pad_y, maxx + pad_x, maxy + pad_y)
+        self.bounds = bounds
+        self.id_columns = list(id_columns)
+        self.counts = {"features": 0, "null_geometry": 0, "empty_geometry": 0,
+                       "invalid_geometry": 0, "out_of_bounds": 0}
+        self.reasons = {}
+        self.nulls = {}
+        self.id_hashes = {c: [] for c in self.id_columns}
+        self.geometry_hashes = []
+
+    def add(self, gdf: gpd.GeoDataFrame) -> "_Checks":
+        geoms = np.asarray(gdf.geometry.values)
+        missing = shapely.is_missing(geoms)
+        empty = shapely.is_empty(geoms)
+        present = ~missing & ~empty
+        valid = shapely.is_valid(geoms)
+        invalid = present & ~valid
+
+        self.counts["features"] += len(gdf)
+        self.counts["null_geometry"] += int(missing.sum())
+        self.counts["empty_geometry"] += int(empty.sum())
+        self.counts["invalid_geometry"] += int(invalid.sum())
+        if invalid.any():
+            # "Self-intersection[-105.9 35.6]" -> "Self-intersection"
+            for reason in shapely.is_valid_reason(geoms[invalid]):
+                reason = re.sub(r"\s*\[.*\]$", "", reason)
+                self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+        if self.bounds is not None and present.any():
+            b = shapely.bounds(geoms[present])
+            minx, miny, maxx, maxy = self.bounds
+            outside = (b[:, 2] < minx) | (b[:, 0] > maxx) | (b[:, 3] < miny) | (b[:, 1] > maxy)
+            self.counts["out_of_bounds"] += int(outside.sum())
+
+        attributes = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+        for column, count in attributes.isna().sum().items():
+            if count:
+                self.nulls[column] = self.nulls.get(column, 0) + int(count)
+        for column in self.id_columns:
+            ids = attributes[column].dropna()
+            self.id_hashes[column].append(pd.util.hash_pandas_object(ids, index=False).to_numpy())
+        wkb = pd.Series(shapely.to_wkb(geoms[present]), dtype=object)
+        self.geometry_hashes.append(pd.util.hash_pandas_object(wkb, index=False).to_numpy())
+        return self
+
+    def report(self) -> dict:
+        def duplicates(hashes):
+            hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+            return int(len(hashes) - len(np.unique(hashes)))
+
+        return dict(
+            self.counts,
+            invalid_reasons=self.reasons,
+            duplicate_ids={c: duplicates(h) for c, h in self.id_hashes.items()},
+            duplicate_geometry=duplicates(self.geometry_hashes),
+            null_values=self.nulls,
+            bounds=list(self.bounds) if self.bounds is not None else None,
+            version=VALIDATION_VERSION,
+        )
+
+
+def _default_bounds(crs) -> Optional[dict]:
+    if crs is None:
+        return None
+    from .loaders import get_santa_fe_bounds
+    return get_santa_fe_bounds(crs=crs)
+
+
+def validate_frame(
+    gdf: gpd.GeoDataFrame,
+    bounds: Optional[Bounds] = None,
+    id_columns: Sequence[str] = ()
+) -> dict:
+    """
+    Run the data-quality checks on a GeoDataFrame.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Features to check
+    bounds : tuple or dict, optional
+        Expected extent in the data's CRS (before padding). Defaults to
+        get_santa_fe_bounds() in the data's CRS
+    id_columns : sequence of str
+        Columns whose non-null values should be unique
+
+    Returns
+    -------
+    dict
+        Counts per check ('features', 'null_geometry', 'empty_geometry',
+        'invalid_geometry', 'out_of_bounds', 'duplicate_geometry'), plus
+        'invalid_reasons', 'duplicate_ids' and 'null_values' by column
+    """
+    if bounds is None:
+        bounds = _default_bounds(gdf.crs)
+    return _Checks(bounds, id_columns).add(gdf).report()
+
+
+def validate_file(
+    path: Path,
+    bounds: Optional[Bounds] = None,
+    id_columns: Optional[Sequence[str]] = None
+) -> dict:
+    """
+    Run the data-quality checks on a dataset file, batch by batch.
+
+    Parameters
+    ----------
+    path : Path
+        Vector file
+    bounds : tuple or dict, optional
+        Expected extent in the file's CRS. Defaults to get_santa_fe_bounds()
+    id_columns : sequence of str, optional
+        Columns whose values should be unique. Defaults to the dataset's
+        DATASET_ID_COLUMNS
+
+    Returns
+    -------
+    dict
+        Report as from validate_frame
+    """
+    import pyogrio
+    from .chunked import iter_batches
+
+    info = pyogrio.read_info(path)
+    if id_columns is None:
+        id_columns = dataset_id_columns(path, list(info["fields"]))
+    if bounds is None:
+        bounds = _default_bounds(info.get("crs"))
+    checks = _Checks(bounds, id_columns)
+    for batch in iter_batches(path, VALIDATION_CHUNK_SIZE, crs=info.get("crs")):
+        checks.add(batch)
+    return checks.report()
+
+
+def save_report(path: Path, report: dict, sha256: Optional[str] = None) -> dict:
+    """
+    Store the validation report of a dataset file in its sidecar.
+
+    Parameters
+    ----------
+    path : Path
+        Validated file
+    report : dict
+        Report from validate_frame or validate_file
+    sha256 : str, optional
+        File hash if already known (e.g. from the build manifest)
+
+    Returns
+    -------
+    dict
+        The stored report, with the file's 'sha256' and 'signature'
+    """
+    report = dict(report, sha256=sha256 or content_hash(path), signature=list(file_signature(path)))
+    sidecar = report_path(path)
+    tmp_path = sidecar.with_name(sidecar.name + ".tmp")
+    tmp_path.write_text(json.dumps(report, indent=2, default=str))
+    tmp_path.replace(sidecar)
+    return report
+
+
+def load_report(path: Path) -> Optional[dict]:
+    """
+    Cached validation report of a file, or None if missing or stale.
+
+    A report is current when the file still has the recorded (mtime, size)
+    signature or, failing that, the recorded SHA-256.
+    """
+    sidecar = report_path(path)
+    if not sidecar.exists():
+        return None
+    try:
+        report = json.loads(sidecar.read_text())
+    except ValueError:
+        return None
+    if report.get("version") != VALIDATION_VERSION:
+        return None
+    if report.get("signature") == list(file_signature(path)):
+        return report
+    if report.get("sha256") == content_hash(path):
+        save_report(path, report, sha256=report["sha256"])
+        return report
+    return None
+
+
+def validation_report(path: Path, refresh: bool = False) -> dict:
+    """
+    Validation report of a dataset file, computed at most once per version.
+
+    Parameters
+    ----------
+    path : Path
+        Processed dataset file
+    refresh : bool
+        Ignore a cached report
+
+    Returns
+    -------
+    dict
+        Report as from validate_file
+    """
+    report = None if refresh else load_report(path)
+    if report is None:
+        report = save_report(path, validate_file(path))
+    return report
+
+
+def report_issues(report: dict) -> List[str]:
+    """Human-readable list of the problems in a report (empty if clean)."""
+    issues = []
+    for key, label in (("null_geometry", "null geometries"), ("empty_geometry", "empty geometries"),
+                       ("invalid_geometry", "invalid geometries"),
+                       ("out_of_bounds", "features outside the Santa Fe area"),
+                       ("duplicate_geometry", "duplicate geometries")):
+        if report.get(key):
+            issues.append(f"{report[key]} {label}")
+    for column, count in report.get("duplicate_ids", {}).items():
+        if count:
+            issues.append(f"{count} duplicate {column} values")
+    if report.get("null_values"):
+        columns = ", ".join(f"{c} ({n})" for c, n in sorted(report["null_values"].items()))
+        issues.append(f"null values in {columns}")
+    return issues
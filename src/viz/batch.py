@@ -0,0 +1,437 @@
+"""
+Parallel batch rendering of map catalogs.
+
+A manifest lists map specs; each spec is rendered with setup_basemap and
+save_map on a pool of worker processes using the Agg backend. Workers load
+the shared layers once at start-up through the loader cache (which reads the
+Arrow-backed GeoParquet copies when present), so each spec only pays for
+plotting. Specs whose style and input files are unchanged since the last run
+are skipped, based on hashes recorded in ``<output_dir>/.render_state.json``.
+
+Manifest format (JSON)::
+
+    {
+      "maps": [
+        {
+          "name": "acs_{variable}_{dpi}dpi",
+          "vary": {"variable": ["median_income", "pct_renters"], "dpi": [150, 300]},
+          "crs": "EPSG:3857",
+          "dpi": "{dpi}",
+          "title": "Santa Fe: {variable}",
+          "layers": [
+            {"dataset": "city_limits", "color": "none", "edgecolor": "#2C3E50"},
+            {"dataset": "census_tracts", "column": "{variable}", "cmap": "viridis",
+             "legend": true}
+          ]
+        }
+      ]
+    }
+
+``vary`` expands one entry into the cartesian product of its values,
+substituting ``{key}`` placeholders anywhere in the spec. The first layer
+sets the map extent. ``render`` ("auto", "vector" or "raster") picks how a
+layer is drawn (see plot_layer); other layer keys besides ``dataset``,
+``where`` and ``columns`` are style arguments for ``GeoDataFrame.plot``.
+
+Usage::
+
+    python -m src.viz.batch maps/manifests/catalog.json --workers 8
+"""
+
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from ..config import DATASET_FILES, DEFAULT_CRS, MAP_DPI, MAPS_DIR, get_data_path
+
+# Bump when rendering code changes in a way that should invalidate outputs
+RENDERER_VERSION = 3
+LAYER_KEYS = ("dataset", "where", "columns", "render")
+
+
+def _substitute(value, params: dict):
+    """Replace {key} placeholders in every string of a spec."""
+    if isinstance(value, str):
+        for key, param in params.items():
+            if value == f"{{{key}}}":
+                return param
+            value = value.replace(f"{{{key}}}", str(param))
+        return value
+    if isinstance(value, list):
+        return [_substitute(v, params) for v in value]
+    if isinstance(value, dict):
+        return {k: _substitute(v, params) for k, v in value.items()}
+    return value
+
+
+def expand_specs(specs: Sequence[dict]) -> List[dict]:
+    """
+    Expand ``vary`` entries into one spec per combination of values.
+
+    Parameters
+    ----------
+    specs : sequence of dict
+        Map specs, possibly with a ``vary`` mapping of key -> list of values
+
+    Returns
+    -------
+    list of dict
+        Concrete map specs
+
+    Raises
+    ------
+    ValueError
+        If a spec has no name or no layers, or two specs share a name
+    """
+    expanded = []
+    for spec in specs:
+        spec = copy.deepcopy(spec)
+        vary = spec.pop("vary", None) or {}
+        keys = list(vary)
+        for values in itertools.product(*(vary[k] for k in keys)):
+            expanded.append(_substitute(spec, dict(zip(keys, values))))
+
+    names = set()
+    for spec in expanded:
+        if not spec.get("name") or not spec.get("layers"):
+            raise ValueError(f"Map spec needs a 'name' and 'layers': {spec}")
+        if spec["name"] in names:
+            raise ValueError(f"Duplicate map name in manifest: {spec['name']}")
+        names.add(spec["name"])
+    return expanded
+
+
+def load_manifest(path: Union[str, Path]) -> List[dict]:
+    """
+    Read a JSON manifest and expand it into concrete map specs.
+
+    Parameters
+    ----------
+    path : str or Path
+        Manifest file: {"maps": [...]} or a bare list of specs
+
+    Returns
+    -------
+    list of dict
+    """
+    manifest = json.loads(Path(path).read_text())
+    specs = manifest["maps"] if isinstance(manifest, dict) else manifest
+    return expand_specs(specs)
+
+
+def _datasets(specs: Sequence[dict]) -> List[str]:
+    names = []
+    for spec in specs:
+        for layer in spec["layers"]:
+            if layer["dataset"] not in names:
+                names.append(layer["dataset"])
+    return names
+
+
+def _layer_loads(specs: Sequence[dict]) -> List[dict]:
+    """Distinct dataset/where/columns loads, as render_spec will request them."""
+    loads = []
+    for spec in specs:
+        for layer in spec["layers"]:
+            load = {key: layer[key] for key in ("dataset", "where", "columns") if key in layer}
+            if load not in loads:
+                loads.append(load)
+    return loads
+
+
+def _dataset_path(name: str, data_dir: Optional[Path]) -> Path:
+    if data_dir is None:
+        return get_data_path(name, processed=True)
+    return Path(data_dir) / DATASET_FILES[name]
+
+
+def _input_signature(name: str, data_dir: Optional[Path]) -> Optional[list]:
+    """Size and mtime of a dataset's processed files (GeoPackage + GeoParquet)."""
+    path = _dataset_path(name, data_dir)
+    signature = []
+    for candidate in (path, path.with_suffix(".parquet")):
+        if candidate.exists():
+            stat = candidate.stat()
+            signature.append([candidate.name, stat.st_size, stat.st_mtime_ns])
+    return signature or None
+
+
+def spec_hash(spec: dict, data_dir: Optional[Path] = None) -> str:
+    """
+    Hash of a spec's style and the input files it reads.
+
+    Parameters
+    ----------
+    spec : dict
+        Concrete map spec
+    data_dir : Path, optional
+        Processed data directory. Defaults to config DATA_PROCESSED
+
+    Returns
+    -------
+    str
+        Hex digest; unchanged specs with unchanged inputs hash the same
+    """
+    parts = {
+        "version": RENDERER_VERSION,
+        "spec": spec,
+        "inputs": {
+            name: _input_signature(name, data_dir)
+            for name in _datasets([spec])
+        },
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _loaders() -> dict:
+    from ..data import loaders
+    return {
+        "parcels": loaders.load_parcels,
+        "census_tracts": loaders.load_census_tracts,
+        "hydrology": loaders.load_hydrology,
+        "osm": loaders.load_osm_infrastructure,
+        "city_limits": loaders.load_city_limits,
+    }
+
+
+def load_layer(layer: dict, data_dir: Optional[Path] = None):
+    """
+    Load the data for one manifest layer through the shared loader cache.
+
+    Parameters
+    ----------
+    layer : dict
+        Layer spec with 'dataset' and optional 'where' / 'columns'
+    data_dir : Path, optional
+        Processed data directory
+
+    Returns
+    -------
+    gpd.GeoDataFrame
+
+    Raises
+    ------
+    ValueError
+        If the dataset is unknown
+    FileNotFoundError
+        If the dataset has not been processed
+    """
+    loaders = _loaders()
+    name = layer["dataset"]
+    if name not in loaders:
+        raise ValueError(f"Unknown dataset: {name}. Available: {list(loaders)}")
+    gdf = loaders[name](data_dir=data_dir, where=layer.get("where"), columns=layer.get("columns"))
+    if gdf is None:
+        raise FileNotFoundError(f"Dataset {name} not found. Run python -m src.data.pipeline first.")
+    return gdf
+
+
+def render_spec(
+    spec: dict,
+    output_dir: Optional[Path] = None,
+    data_dir: Optional[Path] = None
+) -> Path:
+    """
+    Render one map spec to a file.
+
+    Parameters
+    ----------
+    spec : dict
+        Concrete map spec (see module docstring)
+    output_dir : Path, optional
+        Output directory. Defaults to config MAPS_DIR
+    data_dir : Path, optional
+        Processed data directory
+
+    Returns
+    -------
+    Path
+        Path to the saved map
+    """
+    import matplotlib.pyplot as plt
+    from .maps import plot_layer, save_map, setup_basemap
+
+    crs = spec.get("crs", DEFAULT_CRS)
+    dpi = spec.get("dpi", MAP_DPI)
+    layers = [
+        (
+            load_layer(layer, data_dir),
+            layer.get("render", "auto"),
+            {k: v for k, v in layer.items() if k not in LAYER_KEYS},
+        )
+        for layer in spec["layers"]
+    ]
+
+    (first, first_render, first_style), rest = layers[0], layers[1:]
+    fig, ax = setup_basemap(
+        first,
+        crs=crs,
+        figsize=tuple(spec.get("figsize", (12, 12))),
+        add_basemap=spec.get("basemap", True),
+        offline=spec.get("offline"),
+        plot_kwargs=first_style,
+        render=first_render,
+        output_dpi=dpi
+    )
+    try:
+        for gdf, render, style in rest:
+            plot_layer(ax, gdf, render=render, dpi=dpi, crs=crs, **style)
+        if spec.get("title"):
+            ax.set_title(spec["title"], fontsize=16, fontweight="bold", pad=20)
+        if spec.get("note"):
+            ax.text(
+                0.02, 0.02, spec["note"],
+                transform=ax.transAxes,
+                fontsize=8,
+                bbox=dict(boxstyle="round", facecolor="white", alpha=0.8)
+            )
+        return save_map(fig, spec["name"], output_dir=output_dir, dpi=dpi)
+    finally:
+        plt.close(fig)
+
+
+def _init_worker(data_dir: Optional[Path], layers: Sequence[dict]) -> None:
+    """Select the Agg backend and load shared layers once per worker."""
+    import matplotlib
+    matplotlib.use("Agg")
+    for layer in layers:
+        try:
+            load_layer(layer, data_dir)
+        except (FileNotFoundError, ValueError):
+            pass
+
+
+def _render_timed(spec: dict, output_dir: Optional[Path], data_dir: Optional[Path]):
+    start = time.perf_counter()
+    path = render_spec(spec, output_dir, data_dir)
+    return str(path), time.perf_counter() - start
+
+
+def _load_state(state_path: Path) -> dict:
+    if state_path.exists():
+        try:
+            return json.loads(state_path.read_text())
+        except ValueError:
+            pass
+    return {}
+
+
+def render_batch(
+    specs: Sequence[dict],
+    output_dir: Optional[Path] = None,
+    data_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+    state_path: Optional[Path] = None,
+    in_process: bool = False
+) -> Dict[str, dict]:
+    """
+    Render many map specs in parallel, skipping unchanged ones.
+
+    Parameters
+    ----------
+    specs : sequence of dict
+        Concrete map specs (see load_manifest / expand_specs)
+    output_dir : Path, optional
+        Output directory. Defaults to config MAPS_DIR
+    data_dir : Path, optional
+        Processed data directory. Defaults to config DATA_PROCESSED
+    workers : int, optional
+        Worker processes. Defaults to CPU count
+    force : bool
+        Re-render every spec regardless of recorded hashes
+    state_path : Path, optional
+        Hash state file. Defaults to <output_dir>/.render_state.json
+    in_process : bool
+        Render sequentially in this process (for debugging)
+
+    Returns
+    -------
+    dict
+        Map name -> {'status', 'output', 'seconds'}. Status is one of
+        'rendered', 'skipped' or 'failed'.
+    """
+    output_dir = Path(output_dir) if output_dir is not None else MAPS_DIR
+    state_path = state_path or output_dir / ".render_state.json"
+    state = _load_state(state_path)
+    results: Dict[str, dict] = {}
+
+    pending = []
+    for spec in specs:
+        digest = spec_hash(spec, data_dir)
+        recorded = state.get(spec["name"], {})
+        output = recorded.get("output")
+        if not force and recorded.get("hash") == digest and output and Path(output).exists():
+            results[spec["name"]] = {"status": "skipped", "output": output, "seconds": 0.0}
+            continue
+        pending.append((spec, digest))
+
+    def record(spec: dict, digest: str, future_or_value) -> None:
+        try:
+            output, seconds = future_or_value()
+        except Exception as e:
+            print(f"⚠ {spec['name']}: render failed: {e}")
+            results[spec["name"]] = {"status": "failed", "output": None, "seconds": None}
+            return
+        results[spec["name"]] = {"status": "rendered", "output": output, "seconds": seconds}
+        state[spec["name"]] = {"hash": digest, "output": output}
+
+    if in_process:
+        for spec, digest in pending:
+            record(spec, digest, lambda: _render_timed(spec, output_dir, data_dir))
+    elif pending:
+        workers = min(workers or os.cpu_count() or 1, len(pending))
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(data_dir, _layer_loads([spec for spec, _ in pending])),
+        )
+        with pool:
+            futures = {
+                pool.submit(_render_timed, spec, output_dir, data_dir): (spec, digest)
+                for spec, digest in pending
+            }
+            for future in as_completed(futures):
+                spec, digest = futures[future]
+                record(spec, digest, future.result)
+
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(json.dumps(state, indent=2))
+    _print_summary(results)
+    return results
+
+
+def _print_summary(results: Dict[str, dict]) -> None:
+    counts = {}
+    for result in results.values():
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"\nRendered catalog: {summary or 'nothing to do'}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Render a catalog of Santa Fe maps")
+    parser.add_argument("manifest", type=Path, help="JSON manifest of map specs")
+    parser.add_argument("--output-dir", type=Path, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="Ignore recorded hashes")
+    parser.add_argument("--only", nargs="+", default=None, help="Render only these map names")
+    args = parser.parse_args(argv)
+
+    specs = load_manifest(args.manifest)
+    if args.only:
+        specs = [spec for spec in specs if spec["name"] in args.only]
+    render_batch(specs, output_dir=args.output_dir, workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
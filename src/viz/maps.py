@@ -7,7 +7,77 @@ import geopandas as gpd
 import contextily as ctx
 from typing import Optional, Tuple
 
-from ..config import DEFAULT_CRS
+from ..config import DEFAULT_CRS, MAP_DPI
+from ..data.crs import reproject, transform_bounds
+from ..data.lod import level_of_detail, tolerance_for_scale
+from .raster import rasterize_layer, should_rasterize, units_per_pixel
+from .tiles import add_cached_basemap
+
+RENDER_MODES = ("auto", "vector", "raster")
+
+
+def _display_lod(ax: plt.Axes, gdf: gpd.GeoDataFrame, crs, dpi: int) -> gpd.GeoDataFrame:
+    """Coarsest LOD of gdf that stays sub-pixel for the axes' current extent."""
+    if ax.get_autoscalex_on() or ax.get_autoscaley_on() or gdf.crs is None:
+        return gdf  # extent not fixed yet, so the output scale is unknown
+    (xmin, xmax), (ymin, ymax) = ax.get_xlim(), ax.get_ylim()
+    extent = (xmin, ymin, xmax, ymax)
+    if crs is not None and gdf.crs != crs:
+        extent = transform_bounds(extent, crs, gdf.crs)
+    scale = units_per_pixel(ax, dpi, extent)
+    return level_of_detail(gdf, tolerance_for_scale(scale, gdf.crs))
+
+
+def plot_layer(
+    ax: plt.Axes,
+    gdf: gpd.GeoDataFrame,
+    render: str = "auto",
+    dpi: int = MAP_DPI,
+    lod: bool = True,
+    crs: Optional[str] = None,
+    **style
+):
+    """
+    Plot a layer as vector patches or as a single rasterized image.
+    
+    Parameters
+    ----------
+    ax : plt.Axes
+        Target axes. For raster rendering and LOD selection, limits should
+        already be set
+    gdf : gpd.GeoDataFrame
+        Layer to plot
+    render : str
+        "vector" (GeoDataFrame.plot), "raster" (rasterize_layer) or "auto":
+        raster for polygon/line layers with at least RASTER_MIN_FEATURES
+        features, vector otherwise
+    dpi : int
+        Output resolution (default: MAP_DPI)
+    lod : bool
+        Draw the coarsest level of detail that is still sub-pixel at dpi
+        (see src/data/lod.py)
+    crs : str, optional
+        CRS of the axes. gdf is simplified in its own CRS, then reprojected.
+        Defaults to gdf's CRS
+    **style
+        GeoDataFrame.plot style arguments (column, cmap, color, edgecolor, ...)
+    
+    Raises
+    ------
+    ValueError
+        If render is not one of RENDER_MODES
+    """
+    if render not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode: {render}. Available: {list(RENDER_MODES)}")
+    if lod:
+        gdf = _display_lod(ax, gdf, crs, dpi)
+    if crs is not None:
+        gdf = reproject(gdf, crs)
+    if render == "auto":
+        render = "raster" if should_rasterize(gdf) else "vector"
+    if render == "raster":
+        return rasterize_layer(ax, gdf, dpi=dpi, **style)
+    return gdf.plot(ax=ax, **style)
 
 
 def setup_basemap(
@@ -16,7 +86,13 @@ def setup_basemap(
     figsize: Tuple[int, int] = (12, 12),
     alpha: float = 0.7,
     add_basemap: bool = True,
-    basemap_source = None
+    basemap_source = None,
+    offline: Optional[bool] = None,
+    tile_cache: bool = True,
+    plot_kwargs: Optional[dict] = None,
+    render: str = "auto",
+    output_dpi: int = MAP_DPI,
+    lod: bool = True
 ) -> Tuple[plt.Figure, plt.Axes]:
     """
     Set up a basemap with contextily tiles.
@@ -36,6 +112,23 @@ def setup_basemap(
         Whether to add contextily basemap tiles (requires internet)
     basemap_source
         Contextily tile source (default: CartoDB Positron)
+    offline : bool, optional
+        Render tiles from the on-disk tile cache only, never the network.
+        Defaults to config TILES_OFFLINE (see src/viz/tiles.py)
+    tile_cache : bool
+        Read tiles through the persistent tile cache. If False, tiles are
+        fetched by contextily directly
+    plot_kwargs : dict, optional
+        Extra style arguments for plotting gdf (color, edgecolor, column, ...)
+    render : str
+        "vector", "raster" or "auto" (see plot_layer). Dense layers such as
+        county-wide parcels render much faster as a raster
+    output_dpi : int
+        DPI the map will be saved at (pass the same value to save_map). Sets
+        the raster resolution and the level of detail
+    lod : bool
+        Plot simplified geometry that is still sub-pixel accurate at
+        output_dpi (see src/data/lod.py)
     
     Returns
     -------
@@ -59,16 +152,26 @@ def setup_basemap(
         # Set CRS assuming it's in the provided CRS
         gdf = gdf.set_crs(crs, allow_override=True)
     
-    # Reproject if needed
-    if str(gdf.crs) != crs:
-        gdf_plot = gdf.to_crs(crs)
-    else:
-        gdf_plot = gdf.copy()
+    # Reproject if needed (memoized for loaded datasets, so overlays that
+    # reproject the same layer again get the cached copy)
+    gdf_plot = reproject(gdf, crs)
     
     fig, ax = plt.subplots(figsize=figsize)
+    ax.set_aspect('equal')
+    bounds = gdf_plot.total_bounds
+    if bounds[2] > bounds[0] and bounds[3] > bounds[1]:
+        # Raster rendering and LOD selection depend on the extent, so fix it
+        # before plotting
+        ax.set_xlim(bounds[0], bounds[2])
+        ax.set_ylim(bounds[1], bounds[3])
+    else:
+        render = "vector"
     
-    # Plot data
-    gdf_plot.plot(ax=ax, alpha=alpha)
+    # Plot data (simplified in its own CRS, then reprojected)
+    plot_layer(
+        ax, gdf, render=render, dpi=output_dpi, lod=lod, crs=crs,
+        **{"alpha": alpha, **(plot_kwargs or {})}
+    )
     
     # Add basemap if requested
     if add_basemap:
@@ -76,12 +179,21 @@ def setup_basemap(
             if basemap_source is None:
                 basemap_source = ctx.providers.CartoDB.Positron
             
-            ctx.add_basemap(
-                ax,
-                crs=gdf_plot.crs,
-                source=basemap_source,
-                attribution_size=6
-            )
+            if tile_cache:
+                add_cached_basemap(
+                    ax,
+                    crs=gdf_plot.crs,
+                    source=basemap_source,
+                    offline=offline,
+                    attribution_size=6
+                )
+            else:
+                ctx.add_basemap(
+                    ax,
+                    crs=gdf_plot.crs,
+                    source=basemap_source,
+                    attribution_size=6
+                )
         except Exception as e:
             print(f"Warning: Could not add basemap: {e}")
             print("Continuing without basemap (offline mode or network issue)")
@@ -90,7 +202,6 @@ def setup_basemap(
     ax.set_aspect('equal')
     
     # Set tight limits based on data bounds
-    bounds = gdf_plot.total_bounds
     ax.set_xlim(bounds[0], bounds[2])
     ax.set_ylim(bounds[1], bounds[3])
     
@@ -116,6 +227,11 @@ def save_map(
         Output directory. Defaults to MAPS_DIR from config
     dpi : int
         Resolution for saved figure (default: 300)
+    
+    Returns
+    -------
+    Path
+        Path to the saved file
     """
     from pathlib import Path
     from ..config import MAPS_DIR
@@ -133,4 +249,5 @@ def save_map(
     output_path = output_dir / filename
     fig.savefig(output_path, dpi=dpi, bbox_inches='tight', facecolor='white')
     print(f"Map saved to {output_path}")
+    return output_path
 
@@ -0,0 +1,362 @@
+"""
+Rasterized rendering of dense layers.
+
+``GeoDataFrame.plot`` builds one matplotlib patch per geometry, which is slow
+for tens of thousands of parcels and makes PDFs/SVGs huge. For dense polygon
+and line layers the features are instead burned into a feature-index raster
+at the output resolution by a vectorized numpy scanline rasterizer, colored
+through a per-feature lookup table, and composited onto the axes as a single
+image. Sparse overlays such as city limits should stay vector.
+
+Fills follow the even-odd rule at pixel centers (holes and multipolygons work
+unchanged); lines are sampled at sub-pixel steps so every pixel they cross
+is drawn, then widened to the requested line width.
+"""
+
+from typing import Optional, Tuple
+
+import geopandas as gpd
+import matplotlib
+import numpy as np
+import pandas as pd
+import shapely
+from matplotlib.colors import Normalize, to_rgba
+
+from ..config import MAP_DPI, RASTER_MIN_FEATURES
+
+# Style keys understood by rasterize_layer (others are ignored with a warning)
+RASTER_STYLE_KEYS = {
+    "column", "cmap", "color", "facecolor", "edgecolor", "linewidth",
+    "alpha", "vmin", "vmax", "legend", "zorder",
+}
+_DENSE_TYPES = {"Polygon", "MultiPolygon", "LineString", "MultiLineString", "LinearRing"}
+
+
+def should_rasterize(gdf: gpd.GeoDataFrame, min_features: int = RASTER_MIN_FEATURES) -> bool:
+    """
+    True if a layer is dense enough to draw as a raster.
+
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        Layer to draw
+    min_features : int
+        Feature count from which polygon/line layers are rasterized
+
+    Returns
+    -------
+    bool
+    """
+    if len(gdf) < min_features:
+        return False
+    types = set(gdf.geometry.geom_type.dropna().unique())
+    return bool(types) and types <= _DENSE_TYPES
+
+
+def units_per_pixel(ax, dpi: int, extent: Optional[Tuple[float, float, float, float]] = None) -> float:
+    """
+    Data units per output pixel for an equal-aspect axes.
+
+    Parameters
+    ----------
+    ax : matplotlib Axes
+        Target axes
+    dpi : int
+        Output resolution
+    extent : tuple, optional
+        (minx, miny, maxx, maxy) in data units. Defaults to the axes limits
+
+    Returns
+    -------
+    float
+    """
+    if extent is None:
+        (xmin, xmax), (ymin, ymax) = ax.get_xlim(), ax.get_ylim()
+        extent = (xmin, ymin, xmax, ymax)
+    fig = ax.figure
+    position = ax.get_position()
+    avail_w = position.width * fig.get_figwidth() * dpi
+    avail_h = position.height * fig.get_figheight() * dpi
+    return max((extent[2] - extent[0]) / avail_w, (extent[3] - extent[1]) / avail_h)
+
+
+def raster_shape(ax, extent: Tuple[float, float, float, float], dpi: int) -> Tuple[int, int]:
+    """
+    Pixel size of an extent drawn in an equal-aspect axes at a given DPI.
+
+    Parameters
+    ----------
+    ax : matplotlib Axes
+        Target axes
+    extent : tuple
+        (minx, miny, maxx, maxy) in data units
+    dpi : int
+        Output resolution
+
+    Returns
+    -------
+    tuple
+        (height, width) in pixels
+    """
+    scale = units_per_pixel(ax, dpi, extent)
+    height = int(np.ceil((extent[3] - extent[1]) / scale))
+    width = int(np.ceil((extent[2] - extent[0]) / scale))
+    return max(height, 1), max(width, 1)
+
+
+def _feature_colors(
+    gdf: gpd.GeoDataFrame,
+    column: Optional[str],
+    cmap,
+    color,
+    vmin,
+    vmax
+):
+    """Per-feature RGBA colors, plus (mappable, categories) for legends."""
+    n = len(gdf)
+    if column is None:
+        rgba = np.tile(to_rgba(color if color is not None else "C0"), (n, 1))
+        return rgba, None, None
+
+    values = gdf[column]
+    if pd.api.types.is_numeric_dtype(values):
+        data = values.to_numpy(dtype=float)
+        norm = Normalize(
+            vmin=np.nanmin(data) if vmin is None else vmin,
+            vmax=np.nanmax(data) if vmax is None else vmax
+        )
+        colormap = matplotlib.colormaps[cmap or "viridis"]
+        rgba = colormap(norm(data))
+        rgba[np.isnan(data)] = 0.0
+        mappable = matplotlib.cm.ScalarMappable(norm=norm, cmap=colormap)
+        return rgba, mappable, None
+
+    categories = pd.Categorical(values)
+    colormap = matplotlib.colormaps[cmap or "tab10"]
+    palette = colormap(np.linspace(0, 1, max(len(categories.categories), 1)))
+    rgba = palette[np.clip(categories.codes, 0, None)]
+    rgba[categories.codes < 0] = 0.0
+    return rgba, None, dict(zip(categories.categories, palette))
+
+
+# Cap on pixels expanded per step, to bound temporary memory on huge rasters
+_CHUNK_PIXELS = 4_000_000
+
+
+def _to_pixels(coords: np.ndarray, extent, shape) -> Tuple[np.ndarray, np.ndarray]:
+    """Map coordinates to fractional (column, row) pixel positions."""
+    minx, miny, maxx, maxy = extent
+    h, w = shape
+    px = (coords[:, 0] - minx) * (w / (maxx - minx))
+    py = (maxy - coords[:, 1]) * (h / (maxy - miny))
+    return px, py
+
+
+def _paint(index: np.ndarray, pixels: np.ndarray, values: np.ndarray) -> None:
+    """Write values at flat pixel positions; later entries win."""
+    flat = index.reshape(-1)
+    for start in range(0, len(pixels), _CHUNK_PIXELS):
+        flat[pixels[start:start + _CHUNK_PIXELS]] = values[start:start + _CHUNK_PIXELS]
+
+
+def _expand_ranges(starts: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """For ranges [start, start + count), return (range number, value) per element."""
+    owner = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.cumsum(counts) - counts
+    return owner, starts[owner] + (np.arange(len(owner)) - offsets[owner])
+
+
+def _fill_polygons(index: np.ndarray, geoms: np.ndarray, ids: np.ndarray, extent) -> None:
+    """Scanline-fill (Multi)Polygons into the index raster (even-odd rule)."""
+    h, w = index.shape
+    parts, part_owner = shapely.get_parts(geoms, return_index=True)
+    rings, ring_part = shapely.get_rings(parts, return_index=True)
+    coords, coord_ring = shapely.get_coordinates(rings, return_index=True)
+    if not len(coords):
+        return
+    px, py = _to_pixels(coords, extent, (h, w))
+
+    # Ring edges (rings are closed, so consecutive vertices of one ring)
+    same = coord_ring[:-1] == coord_ring[1:]
+    x0, y0, x1, y1 = px[:-1][same], py[:-1][same], px[1:][same], py[1:][same]
+    edge_id = ids[part_owner[ring_part[coord_ring[:-1][same]]]]
+    sloped = y0 != y1
+    x0, y0, x1, y1, edge_id = x0[sloped], y0[sloped], x1[sloped], y1[sloped], edge_id[sloped]
+
+    # Rows whose pixel centers lie in [min(y), max(y)) of each edge
+    r0 = np.clip(np.ceil(np.minimum(y0, y1) - 0.5), 0, h).astype(np.int64)
+    r1 = np.clip(np.ceil(np.maximum(y0, y1) - 0.5), 0, h).astype(np.int64)
+    edge, rows = _expand_ranges(r0, np.maximum(r1 - r0, 0))
+    if not len(rows):
+        return
+    x = x0[edge] + (rows + 0.5 - y0[edge]) * (x1[edge] - x0[edge]) / (y1[edge] - y0[edge])
+
+    # Crossings come in pairs per (feature, row); sorted by feature first so
+    # later features are painted over earlier ones
+    feature = edge_id[edge]
+    order = np.lexsort((x, rows, feature))
+    x, rows, feature = x[order], rows[order], feature[order]
+    c0 = np.clip(np.ceil(x[0::2] - 0.5), 0, w).astype(np.int64)
+    c1 = np.clip(np.ceil(x[1::2] - 0.5), 0, w).astype(np.int64)
+    span, cols = _expand_ranges(c0, np.maximum(c1 - c0, 0))
+    _paint(index, rows[0::2][span] * w + cols, feature[0::2][span])
+
+
+def _burn_strokes(index: np.ndarray, geoms: np.ndarray, ids: np.ndarray, extent) -> None:
+    """Draw lines and points into the index raster, touching every crossed pixel."""
+    h, w = index.shape
+    parts, part_owner = shapely.get_parts(geoms, return_index=True)
+    coords, coord_part = shapely.get_coordinates(parts, return_index=True)
+    if not len(coords):
+        return
+    px, py = _to_pixels(coords, extent, (h, w))
+
+    # Vertices themselves (covers points), then samples along each segment
+    xs, ys, owner = [px], [py], [coord_part]
+    same = coord_part[:-1] == coord_part[1:]
+    x0, y0, x1, y1 = px[:-1][same], py[:-1][same], px[1:][same], py[1:][same]
+    steps = np.ceil(np.maximum(np.abs(x1 - x0), np.abs(y1 - y0)) * 2).astype(np.int64)
+    segment, k = _expand_ranges(np.zeros(len(steps), dtype=np.int64), steps)
+    t = (k + 0.5) / steps[segment]
+    xs.append(x0[segment] + t * (x1[segment] - x0[segment]))
+    ys.append(y0[segment] + t * (y1[segment] - y0[segment]))
+    owner.append(coord_part[:-1][same][segment])
+
+    cols = np.floor(np.concatenate(xs)).astype(np.int64)
+    rows = np.floor(np.concatenate(ys)).astype(np.int64)
+    feature = ids[part_owner[np.concatenate(owner)]]
+    inside = (cols >= 0) & (cols < w) & (rows >= 0) & (rows < h)
+    order = np.argsort(feature[inside], kind="stable")
+    _paint(index, (rows[inside] * w + cols[inside])[order], feature[inside][order])
+
+
+def _burn(geoms: np.ndarray, shape, extent, fill: bool) -> np.ndarray:
+    """Rasterize geometries to an index raster (feature position + 1, 0 = empty)."""
+    index = np.zeros(shape, dtype=np.int32)
+    keep = ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
+    ids = (np.flatnonzero(keep) + 1).astype(np.int32)
+    if not len(ids):
+        return index
+    if fill:
+        _fill_polygons(index, geoms[keep], ids, extent)
+    else:
+        _burn_strokes(index, geoms[keep], ids, extent)
+    return index
+
+
+def _dilate(index: np.ndarray, radius: int) -> np.ndarray:
+    """Grow non-empty pixels by radius (square structuring element)."""
+    for _ in range(radius):
+        grown = index.copy()
+        for shifted, target in (
+            (index[1:, :], grown[:-1, :]), (index[:-1, :], grown[1:, :]),
+            (index[:, 1:], grown[:, :-1]), (index[:, :-1], grown[:, 1:]),
+        ):
+            fill = (target == 0) & (shifted != 0)
+            target[fill] = shifted[fill]
+        index = grown
+    return index
+
+
+def rasterize_layer(
+    ax,
+    gdf: gpd.GeoDataFrame,
+    column: Optional[str] = None,
+    cmap=None,
+    color=None,
+    facecolor=None,
+    edgecolor=None,
+    linewidth: Optional[float] = None,
+    alpha: Optional[float] = None,
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None,
+    legend: bool = False,
+    zorder: Optional[float] = None,
+    dpi: int = MAP_DPI,
+    extent: Optional[Tuple[float, float, float, float]] = None,
+    **ignored
+):
+    """
+    Draw a layer onto the axes as a single image.
+
+    Takes the GeoDataFrame.plot style arguments listed in RASTER_STYLE_KEYS.
+
+    Parameters
+    ----------
+    ax : matplotlib Axes
+        Target axes (limits should already be set, unless extent is given)
+    gdf : gpd.GeoDataFrame
+        Layer in the axes' CRS
+    column, cmap, color, facecolor, edgecolor, linewidth, alpha, vmin, vmax, legend, zorder
+        As for GeoDataFrame.plot. Polygon faces use column/cmap or
+        facecolor/color; outlines use edgecolor at linewidth points
+    dpi : int
+        Output resolution the raster is built for (default: MAP_DPI)
+    extent : tuple, optional
+        (minx, miny, maxx, maxy) to rasterize. Defaults to the axes limits
+
+    Returns
+    -------
+    matplotlib.image.AxesImage
+        The composited image
+    """
+    if ignored:
+        print(f"Warning: rasterized rendering ignores style options {sorted(ignored)}")
+
+    if extent is None:
+        (xmin, xmax), (ymin, ymax) = ax.get_xlim(), ax.get_ylim()
+        extent = (xmin, ymin, xmax, ymax)
+    shape = raster_shape(ax, extent, dpi)
+
+    geoms = np.asarray(gdf.geometry.values)
+    types = shapely.get_type_id(geoms)
+    is_polygon = np.isin(types, (3, 6))  # Polygon, MultiPolygon
+
+    fill = facecolor if facecolor is not None else color
+    rgba, mappable, categories = _feature_colors(gdf, column, cmap, fill, vmin, vmax)
+    if alpha is not None:
+        rgba[:, 3] *= alpha
+
+    def lut(colors: np.ndarray) -> np.ndarray:
+        # Row 0 is the empty (transparent) pixel
+        return (np.vstack([np.zeros((1, 4)), colors]) * 255).round().astype(np.uint8)
+
+    image = np.zeros(shape + (4,), dtype=np.uint8)
+
+    # Polygon faces
+    if is_polygon.any() and rgba[is_polygon, 3].any():
+        faces = np.where(is_polygon, geoms, None)
+        image = lut(rgba)[_burn(faces, shape, extent, fill=True)]
+
+    # Lines, points and polygon outlines
+    outline_color = None
+    if edgecolor is not None and not (isinstance(edgecolor, str) and edgecolor.lower() == "none"):
+        outline_color = to_rgba(edgecolor, alpha=alpha)
+    if (~is_polygon).any() or outline_color is not None:
+        strokes = geoms.copy()
+        strokes[is_polygon] = shapely.boundary(geoms[is_polygon]) if outline_color is not None else None
+        index = _burn(strokes, shape, extent, fill=False)
+        width_px = (linewidth if linewidth is not None else 1.0) * dpi / 72.0
+        index = _dilate(index, int(round((width_px - 1) / 2)))
+        stroke_rgba = rgba.copy()
+        if outline_color is not None:
+            stroke_rgba[is_polygon] = outline_color
+        drawn = index > 0
+        image[drawn] = lut(stroke_rgba)[index[drawn]]
+
+    artist = ax.imshow(
+        image,
+        extent=(extent[0], extent[2], extent[1], extent[3]),
+        origin="upper",
+        interpolation="nearest",
+        zorder=1 if zorder is None else zorder
+    )
+    ax.set_xlim(extent[0], extent[2])
+    ax.set_ylim(extent[1], extent[3])
+
+    if legend and mappable is not None:
+        ax.figure.colorbar(mappable, ax=ax, shrink=0.5)
+    elif legend and categories:
+        from matplotlib.patches import Patch
+        ax.legend(handles=[Patch(color=c, label=str(k)) for k, c in categories.items()])
+    return artist
@@ -0,0 +1,512 @@
+"""
+Persistent basemap tile cache for Santa Fe maps.
+
+contextily fetches every tile from the provider on each render (its own cache
+is a per-process temp directory). Batch map jobs render the same Santa Fe
+extent dozens of times, so tiles are kept in an XYZ directory tree under the
+data root instead::
+
+    <TILE_CACHE_DIR>/<provider>/<z>/<x>/<y>.png
+
+The cache is capped in size; reading a tile refreshes its mtime and the
+least recently used tiles are evicted first. Seed it once with
+
+    python -m src.viz.tiles seed --zoom 11 12 13 14
+
+after which ``setup_basemap(..., offline=True)`` renders from disk only, with
+no network time and identical output on every run.
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+import contextily as ctx
+import mercantile
+import numpy as np
+
+from ..config import TILE_CACHE_DIR, TILE_CACHE_MAX_BYTES, TILES_OFFLINE
+
+TILE_SIZE = 256
+DEFAULT_ZOOMS = (11, 12, 13, 14)
+MAX_WORKERS = 8
+# After exceeding the cap, evict down to this fraction of it so that every
+# new tile does not trigger a full directory scan
+EVICT_TO = 0.9
+
+
+def default_source():
+    """Default basemap provider (CartoDB Positron, as in setup_basemap)."""
+    return ctx.providers.CartoDB.Positron
+
+
+def resolve_source(source=None):
+    """
+    Resolve a tile source given as a provider, provider name or URL template.
+
+    Parameters
+    ----------
+    source : xyzservices.TileProvider, str, optional
+        Provider object, name such as "CartoDB.Positron", or an XYZ URL
+        template with {x}, {y}, {z} placeholders. Defaults to CartoDB Positron
+
+    Returns
+    -------
+    xyzservices.TileProvider or str
+    """
+    if source is None:
+        return default_source()
+    if isinstance(source, str) and "{" not in source:
+        return ctx.providers.query_name(source)
+    return source
+
+
+def source_name(source) -> str:
+    """Directory name for a tile source."""
+    name = getattr(source, "name", None)
+    if name:
+        return name.replace("/", "_")
+    return "url-" + hashlib.sha1(str(source).encode()).hexdigest()[:12]
+
+
+def tile_url(source, z: int, x: int, y: int) -> str:
+    """URL of one tile from a provider or URL template."""
+    if hasattr(source, "build_url"):
+        return source.build_url(x=x, y=y, z=z)
+    return source.format(x=x, y=y, z=z)
+
+
+def _max_zoom(source) -> int:
+    return int(source.get("max_zoom", 19)) if hasattr(source, "get") else 19
+
+
+class TileCache:
+    """
+    Size-capped XYZ tile directory with least-recently-used eviction.
+
+    Parameters
+    ----------
+    root : Path, optional
+        Cache directory. Defaults to config TILE_CACHE_DIR
+    max_bytes : int
+        Size cap across all providers
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = TILE_CACHE_MAX_BYTES):
+        self.root = Path(root if root is not None else TILE_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._nbytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def path(self, source, z: int, x: int, y: int) -> Path:
+        """Path of a tile in the cache."""
+        return self.root / source_name(source) / str(z) / str(x) / f"{y}.png"
+
+    def get(self, source, z: int, x: int, y: int) -> Optional[bytes]:
+        """Read a cached tile (marking it recently used), or None if absent."""
+        path = self.path(source, z, x, y)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, source, z: int, x: int, y: int, data: bytes) -> None:
+        """Store a tile, evicting old tiles if the cache is over its cap."""
+        path = self.path(source, z, x, y)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        with self._lock:
+            # An overwritten tile's bytes are no longer in the cache
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)
+            if self._nbytes is None:
+                self._nbytes = self.size()
+            else:
+                self._nbytes += len(data) - replaced
+            over = self._nbytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def size(self) -> int:
+        """Total bytes of cached tiles."""
+        return sum(p.stat().st_size for p in self.root.rglob("*.png"))
+
+    def zooms(self, source) -> List[int]:
+        """Zoom levels with at least one cached tile for a source."""
+        base = self.root / source_name(source)
+        if not base.exists():
+            return []
+        return sorted(int(p.name) for p in base.iterdir() if p.name.isdigit())
+
+    def evict(self, target_bytes: Optional[int] = None) -> int:
+        """
+        Delete least recently used tiles until the cache fits.
+
+        Parameters
+        ----------
+        target_bytes : int, optional
+            Size to shrink to. Defaults to EVICT_TO of max_bytes
+
+        Returns
+        -------
+        int
+            Number of tiles deleted
+        """
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * EVICT_TO)
+        with self._lock:
+            tiles = []
+            for path in self.root.rglob("*.png"):
+                stat = path.stat()
+                tiles.append((stat.st_mtime_ns, stat.st_size, path))
+            total = sum(size for _, size, _ in tiles)
+            removed = 0
+            for _, size, path in sorted(tiles, key=lambda t: t[0]):
+                if total <= target_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            self._nbytes = total
+        return removed
+
+
+def fetch_tile(
+    source,
+    z: int,
+    x: int,
+    y: int,
+    cache: Optional[TileCache] = None,
+    offline: bool = False
+) -> Optional[bytes]:
+    """
+    Get one tile, from the cache if present, otherwise from the provider.
+
+    Parameters
+    ----------
+    source : xyzservices.TileProvider or str
+        Tile source (see resolve_source)
+    z, x, y : int
+        Tile address
+    cache : TileCache, optional
+        Defaults to the cache under TILE_CACHE_DIR
+    offline : bool
+        Never touch the network; return None for uncached tiles
+
+    Returns
+    -------
+    bytes or None
+        Encoded tile image
+    """
+    from ..data.transfer import DEFAULT_TIMEOUT, get_session
+
+    cache = cache or TileCache()
+    data = cache.get(source, z, x, y)
+    if data is not None or offline:
+        return data
+    response = get_session().get(
+        tile_url(source, z, x, y),
+        timeout=DEFAULT_TIMEOUT,
+        headers={"User-Agent": "santa-fe-field-notes"}
+    )
+    response.raise_for_status()
+    cache.put(source, z, x, y, response.content)
+    return response.content
+
+
+def _lonlat_bounds(bounds) -> Tuple[float, float, float, float]:
+    if isinstance(bounds, dict):
+        return bounds["minx"], bounds["miny"], bounds["maxx"], bounds["maxy"]
+    return tuple(bounds)
+
+
+def auto_zoom(bounds, max_zoom: int = 19) -> int:
+    """
+    Zoom level that resolves a lon/lat extent well (same rule as contextily).
+
+    Parameters
+    ----------
+    bounds : tuple or dict
+        (west, south, east, north) in EPSG:4326
+    max_zoom : int
+        Provider's maximum zoom
+
+    Returns
+    -------
+    int
+    """
+    w, s, e, n = _lonlat_bounds(bounds)
+    zoom_lon = np.ceil(np.log2(360 * 2.0 / max(e - w, 1e-9)))
+    zoom_lat = np.ceil(np.log2(360 * 2.0 / max(n - s, 1e-9)))
+    return int(min(max(zoom_lon, zoom_lat, 0), max_zoom))
+
+
+def seed_tiles(
+    bounds=None,
+    zooms: Iterable[int] = DEFAULT_ZOOMS,
+    source=None,
+    cache: Optional[TileCache] = None,
+    max_workers: int = MAX_WORKERS
+) -> dict:
+    """
+    Download every tile covering an extent into the cache.
+
+    Parameters
+    ----------
+    bounds : tuple or dict, optional
+        (west, south, east, north) in EPSG:4326. Defaults to
+        get_santa_fe_bounds()
+    zooms : iterable of int
+        Zoom levels to seed
+    source : optional
+        Tile source (see resolve_source)
+    cache : TileCache, optional
+        Defaults to the cache under TILE_CACHE_DIR
+    max_workers : int
+        Parallel tile requests
+
+    Returns
+    -------
+    dict
+        Tile counts: 'tiles', 'cached' (already present), 'downloaded', 'failed'
+    """
+    if bounds is None:
+        from ..data.loaders import get_santa_fe_bounds
+        bounds = get_santa_fe_bounds(crs="EPSG:4326")
+    source = resolve_source(source)
+    cache = cache or TileCache()
+    w, s, e, n = _lonlat_bounds(bounds)
+    tiles = [t for z in zooms for t in mercantile.tiles(w, s, e, n, int(z))]
+
+    counts = {"tiles": len(tiles), "cached": 0, "downloaded": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def seed(tile) -> None:
+        if cache.path(source, tile.z, tile.x, tile.y).exists():
+            key = "cached"
+        else:
+            try:
+                fetch_tile(source, tile.z, tile.x, tile.y, cache=cache)
+                key = "downloaded"
+            except Exception as e:
+                print(f"Warning: Could not fetch tile {tile.z}/{tile.x}/{tile.y}: {e}")
+                key = "failed"
+        with lock:
+            counts[key] += 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(seed, tiles))
+    return counts
+
+
+def _decode(data: bytes) -> np.ndarray:
+    from PIL import Image
+    with Image.open(io.BytesIO(data)) as img:
+        return np.asarray(img.convert("RGBA"))
+
+
+def tile_mosaic(
+    bounds,
+    zoom: int,
+    source=None,
+    cache: Optional[TileCache] = None,
+    offline: bool = False,
+    max_workers: int = MAX_WORKERS
+) -> Tuple[np.ndarray, Tuple[float, float, float, float], int]:
+    """
+    Stitch the tiles covering an extent into one Web Mercator image.
+
+    Parameters
+    ----------
+    bounds : tuple or dict
+        (west, south, east, north) in EPSG:4326
+    zoom : int
+        Tile zoom level
+    source : optional
+        Tile source (see resolve_source)
+    cache : TileCache, optional
+        Defaults to the cache under TILE_CACHE_DIR
+    offline : bool
+        Read only from the cache; uncached tiles are left transparent
+    max_workers : int
+        Parallel tile requests when online
+
+    Returns
+    -------
+    tuple
+        (RGBA image, extent as (minx, maxx, miny, maxy) in EPSG:3857,
+        number of missing tiles)
+    """
+    source = resolve_source(source)
+    cache = cache or TileCache()
+    w, s, e, n = _lonlat_bounds(bounds)
+    tiles = list(mercantile.tiles(w, s, e, n, zoom))
+    xs = [t.x for t in tiles]
+    ys = [t.y for t in tiles]
+    x0, y0 = min(xs), min(ys)
+    image = np.zeros(
+        ((max(ys) - y0 + 1) * TILE_SIZE, (max(xs) - x0 + 1) * TILE_SIZE, 4), dtype=np.uint8
+    )
+
+    def load(tile):
+        try:
+            return tile, fetch_tile(source, tile.z, tile.x, tile.y, cache=cache, offline=offline)
+        except Exception as e:
+            print(f"Warning: Could not fetch tile {tile.z}/{tile.x}/{tile.y}: {e}")
+            return tile, None
+
+    missing = 0
+    with ThreadPoolExecutor(max_workers=1 if offline else max_workers) as executor:
+        for tile, data in executor.map(load, tiles):
+            if data is None:
+                missing += 1
+                continue
+            tile_img = _decode(data)
+            row = (tile.y - y0) * TILE_SIZE
+            col = (tile.x - x0) * TILE_SIZE
+            image[row:row + tile_img.shape[0], col:col + tile_img.shape[1]] = tile_img
+
+    upper_left = mercantile.xy_bounds(x0, y0, zoom)
+    lower_right = mercantile.xy_bounds(max(xs), max(ys), zoom)
+    extent = (upper_left.left, lower_right.right, lower_right.bottom, upper_left.top)
+    return image, extent, missing
+
+
+def add_cached_basemap(
+    ax,
+    crs,
+    source=None,
+    zoom: Union[int, str] = "auto",
+    offline: Optional[bool] = None,
+    cache: Optional[TileCache] = None,
+    attribution_size: int = 6
+) -> dict:
+    """
+    Drop-in replacement for ctx.add_basemap that reads through the tile cache.
+
+    Parameters
+    ----------
+    ax : matplotlib Axes
+        Axes whose current limits define the extent
+    crs : str or pyproj.CRS
+        CRS of the axes
+    source : optional
+        Tile source (see resolve_source)
+    zoom : int or "auto"
+        Tile zoom level. In offline mode, "auto" falls back to the closest
+        cached zoom
+    offline : bool, optional
+        Read only from the cache. Defaults to config TILES_OFFLINE
+    cache : TileCache, optional
+        Defaults to the cache under TILE_CACHE_DIR
+    attribution_size : int
+        Font size of the provider attribution
+
+    Returns
+    -------
+    dict
+        {'zoom': zoom level used, 'missing': number of unavailable tiles}
+
+    Raises
+    ------
+    FileNotFoundError
+        If offline and nothing is cached for the source
+    """
+    from ..data.crs import transform_bounds
+
+    if offline is None:
+        offline = TILES_OFFLINE
+    source = resolve_source(source)
+    cache = cache or TileCache()
+
+    xmin, xmax = ax.get_xlim()
+    ymin, ymax = ax.get_ylim()
+    lonlat = transform_bounds((xmin, ymin, xmax, ymax), crs, "EPSG:4326")
+
+    if zoom == "auto":
+        zoom = auto_zoom(lonlat, _max_zoom(source))
+        if offline:
+            cached = cache.zooms(source)
+            if not cached:
+                raise FileNotFoundError(
+                    f"No cached tiles for {source_name(source)} in {cache.root}. "
+                    "Seed them with: python -m src.viz.tiles seed"
+                )
+            zoom = min(cached, key=lambda z: (abs(z - zoom), -z))
+
+    image, extent, missing = tile_mosaic(lonlat, zoom, source, cache=cache, offline=offline)
+    if missing:
+        print(f"Warning: {missing} basemap tile(s) unavailable at zoom {zoom}")
+
+    if not _is_web_mercator(crs):
+        image, extent = ctx.warp_tiles(image, extent, t_crs=crs)
+
+    ax.imshow(image, extent=extent, interpolation="bilinear")
+    ax.axis((xmin, xmax, ymin, ymax))
+
+    attribution = source.get("attribution") if hasattr(source, "get") else None
+    if attribution:
+        ctx.add_attribution(ax, attribution, font_size=attribution_size)
+    return {"zoom": zoom, "missing": missing}
+
+
+def _is_web_mercator(crs) -> bool:
+    from pyproj import CRS
+    return CRS.from_user_input(crs) == CRS.from_epsg(3857)
+
+
+def main(argv=None) -> int:
+    """Command-line entry point: ``python -m src.viz.tiles``."""
+    parser = argparse.ArgumentParser(description="Manage the basemap tile cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed = sub.add_parser("seed", help="Download tiles for the Santa Fe extent")
+    seed.add_argument("--zoom", type=int, nargs="+", default=list(DEFAULT_ZOOMS))
+    seed.add_argument("--source", default=None, help="Provider name, e.g. CartoDB.Positron")
+    seed.add_argument("--workers", type=int, default=MAX_WORKERS)
+
+    info = sub.add_parser("info", help="Show cached zoom levels and size")
+    info.add_argument("--source", default=None)
+
+    sub.add_parser("evict", help="Shrink the cache to its size cap")
+
+    args = parser.parse_args(argv)
+    cache = TileCache()
+
+    if args.command == "seed":
+        counts = seed_tiles(zooms=args.zoom, source=args.source, cache=cache,
+                            max_workers=args.workers)
+        print(
+            f"{counts['tiles']} tiles: {counts['downloaded']} downloaded, "
+            f"{counts['cached']} already cached, {counts['failed']} failed"
+        )
+        return 1 if counts["failed"] else 0
+
+    if args.command == "info":
+        source = resolve_source(args.source)
+        print(f"Tile cache: {cache.root}")
+        print(f"  {source_name(source)} zooms: {cache.zooms(source) or 'none'}")
+        print(f"  size: {cache.size() / 1024**2:.1f} MB of {cache.max_bytes / 1024**2:.0f} MB")
+        return 0
+
+    removed = cache.evict(target_bytes=cache.max_bytes)
+    print(f"Evicted {removed} tiles")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
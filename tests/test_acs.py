@@ -0,0 +1,158 @@
+"""
+Tests for the batched, cached ACS client against a local stub Census API.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import numpy as np
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data.acs import MAX_VARIABLES_PER_REQUEST, ACSClient, tract_geography
+
+TRACTS = ["000100", "000200", "000300"]
+TABLE = {
+    "variables": {
+        "B25003_001E": {"label": "Estimate!!Total:"},
+        "B25003_002E": {"label": "Estimate!!Total:!!Owner occupied"},
+        "B25003_003E": {"label": "Estimate!!Total:!!Renter occupied"},
+        "B25003_001EA": {"label": "Annotation of Estimate!!Total:"},
+        "B25003_001M": {"label": "Margin of Error!!Total:"},
+    }
+}
+
+
+def _value(variable, tract):
+    """Deterministic fake estimate; the first tract has no median income."""
+    if variable == "B19013_001E" and tract == TRACTS[0]:
+        return "-666666666"
+    return str(int(variable[1:6]) % 1000 + int(variable[7:10]) + int(tract))
+
+
+class _CensusHandler(BaseHTTPRequestHandler):
+    """Minimal Census Data API: data queries and group metadata."""
+
+    requests_seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode() if not isinstance(body, bytes) else body
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        type(self).requests_seen.append((url.path, query))
+        if url.path == "/2022/acs/acs5/groups/B25003.json":
+            return self._send(200, TABLE)
+        if url.path != "/2022/acs/acs5":
+            return self._send(404, b"unknown dataset")
+        variables = query["get"][0].split(",")
+        if len(variables) > MAX_VARIABLES_PER_REQUEST:
+            return self._send(400, b"error: more than 50 variables")
+        if "B88888_001E" in variables:
+            return self._send(204, b"")
+        if "B99999_001E" in variables:
+            return self._send(400, b"error: unknown variable 'B99999_001E'")
+        assert query["for"] == ["tract:*"] and query["in"] == ["state:35 county:049"]
+        rows = [variables + ["state", "county", "tract"]]
+        rows += [[_value(v, t) for v in variables] + ["35", "049", t] for t in reversed(TRACTS)]
+        self._send(200, rows)
+
+
+@pytest.fixture
+def api():
+    _CensusHandler.requests_seen = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _CensusHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache_dir():
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def _data_requests():
+    return [q for path, q in _CensusHandler.requests_seen if path == "/2022/acs/acs5"]
+
+
+def test_batches_and_caches_variables(api, cache_dir):
+    client = ACSClient(api_key="secret", base_url=api, cache_dir=cache_dir)
+    variables = [f"B01001_{i:03d}E" for i in range(1, 121)]
+    df = client.get(variables, year=2022)
+
+    sizes = sorted(len(q["get"][0].split(",")) for q in _data_requests())
+    assert sizes == [20, 50, 50]
+    assert all(q["key"] == ["secret"] for q in _data_requests())
+    assert list(df["GEOID"]) == ["35049" + t for t in TRACTS]
+    assert df["B01001_120E"].iloc[1] == 1 + 120 + 200
+
+    # Re-runs and subsets are served from the cache; only new variables are fetched
+    _CensusHandler.requests_seen = []
+    again = client.get(variables[:5], year=2022)
+    assert _data_requests() == []
+    np.testing.assert_array_equal(again["B01001_003E"], df["B01001_003E"])
+
+    fresh = ACSClient(base_url=api, cache_dir=cache_dir)
+    income = fresh.get(["B01001_001E", "B19013_001E"], year=2022)
+    assert [q["get"] for q in _data_requests()] == [["B19013_001E"]]
+    assert np.isnan(income["B19013_001E"].iloc[0])
+    assert income["B19013_001E"].iloc[1] == 13 + 1 + 200
+
+    fresh.get(["B01001_001E"], year=2022, refresh=True)
+    assert [q["get"] for q in _data_requests()][-1] == ["B01001_001E"]
+
+
+def test_table_expansion_uses_cached_metadata(api, cache_dir):
+    client = ACSClient(base_url=api, cache_dir=cache_dir)
+    assert client.table_variables("B25003", 2022) == {
+        "B25003_001E": "Estimate!!Total:",
+        "B25003_002E": "Estimate!!Total:!!Owner occupied",
+        "B25003_003E": "Estimate!!Total:!!Renter occupied",
+    }
+    df = client.get(["B25003", "B25003_003E"], year=2022, geography=tract_geography("35", "049"))
+    assert [c for c in df.columns if c.startswith("B")] == ["B25003_001E", "B25003_002E", "B25003_003E"]
+    groups = [p for p, _ in _CensusHandler.requests_seen if "groups" in p]
+    assert len(groups) == 1
+
+
+def test_api_errors_raise(api, cache_dir):
+    client = ACSClient(base_url=api, cache_dir=cache_dir)
+    with pytest.raises(ValueError, match="unknown variable"):
+        client.get(["B01001_001E", "B99999_001E"], year=2022)
+    assert not list(cache_dir.glob("*.parquet"))
+
+
+def test_no_content_batches_are_not_cached(api, cache_dir):
+    client = ACSClient(base_url=api, cache_dir=cache_dir)
+    variables = [f"B01001_{i:03d}E" for i in range(1, 60)] + ["B88888_001E"]
+    df = client.get(variables, year=2022)
+    assert list(df["GEOID"]) == ["35049" + t for t in TRACTS]
+    assert df["B88888_001E"].isna().all()
+    assert df["B01001_050E"].iloc[0] == 1 + 50 + 100
+
+    # The empty batch is asked for again; nothing empty was cached
+    _CensusHandler.requests_seen = []
+    client.get(["B01001_001E", "B88888_001E"], year=2022)
+    assert [q["get"] for q in _data_requests()] == [["B88888_001E"]]
+    assert client.get(["B01001_055E"], year=2022)["B01001_055E"].iloc[0] == 1 + 55 + 100
+
+    other = ACSClient(base_url=api, cache_dir=cache_dir / "other")
+    assert len(other.get(["B88888_001E"], year=2022)) == 0
+    assert not list((cache_dir / "other").glob("*.parquet"))
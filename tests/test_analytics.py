@@ -0,0 +1,81 @@
+"""
+Tests for the DuckDB analytics backend.
+"""
+
+import os
+
+import pytest
+import geopandas as gpd
+import pandas as pd
+from shapely.geometry import box
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data.analytics import connect, get_db, parcel_counts_by_zoning, renter_share_by_tract
+from src.data.loaders import load_query
+
+
+@pytest.fixture
+def temp_data_dir():
+    """Processed dir with GeoPackages and GeoParquet copies of parcels and tracts."""
+    temp_dir = Path(tempfile.mkdtemp())
+    parcels = gpd.GeoDataFrame(
+        {"parcel_id": [1, 2, 3, 4], "zoning": ["R-1", "R-1", "C-2", "R-5"]},
+        geometry=[box(i * 100, 0, i * 100 + 90, 90) for i in range(4)],
+        crs="EPSG:32113"
+    )
+    tracts = gpd.GeoDataFrame(
+        {"GEOID": ["35049000200", "35049000100"], "renter_occupied": [30, 10],
+         "total_occupied_units": [0, 40]},
+        geometry=[box(200, 0, 400, 100), box(0, 0, 200, 100)],
+        crs="EPSG:32113"
+    )
+    for gdf, stem in ((parcels, "parcels_zoning"), (tracts, "census_tracts_acs")):
+        gdf.to_file(temp_dir / f"{stem}.gpkg", driver="GPKG")
+        gdf.to_parquet(temp_dir / f"{stem}.parquet")
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def test_views_and_geodataframe_results(temp_data_dir):
+    with connect(temp_data_dir, threads=2) as db:
+        assert set(db.datasets) == {"parcels", "census_tracts"}
+
+        result = db.query("SELECT parcel_id, geometry FROM parcels WHERE zoning = $z", {"z": "R-1"})
+        assert isinstance(result, gpd.GeoDataFrame)
+        assert result.crs.to_epsg() == 32113
+        assert list(result["parcel_id"]) == [1, 2]
+        assert result.geometry.iloc[1].equals(box(100, 0, 190, 90))
+
+        counts = db.query("SELECT zoning, count(*) AS n FROM parcels GROUP BY zoning ORDER BY zoning")
+        assert isinstance(counts, pd.DataFrame) and not isinstance(counts, gpd.GeoDataFrame)
+        assert dict(zip(counts["zoning"], counts["n"])) == {"C-2": 1, "R-1": 2, "R-5": 1}
+
+
+def test_aggregations(temp_data_dir):
+    with connect(temp_data_dir) as db:
+        shares = renter_share_by_tract(db)
+        assert list(shares["GEOID"]) == ["35049000100", "35049000200"]
+        assert shares["renter_share"].iloc[0] == pytest.approx(0.25)
+        assert pd.isna(shares["renter_share"].iloc[1])
+
+        corridor = gpd.GeoSeries([box(50, 10, 250, 20)], crs="EPSG:32113").to_crs("EPSG:4326")
+        counts = parcel_counts_by_zoning(db, corridor)
+        assert counts.to_dict("list") == {"zoning": ["R-1", "C-2"], "parcels": [2, 1]}
+
+
+def test_load_query_tracks_file_changes(temp_data_dir):
+    result = load_query("SELECT count(*) AS n FROM parcels", data_dir=temp_data_dir)
+    assert result["n"].iloc[0] == 4
+    db = get_db(temp_data_dir)
+
+    parcels = gpd.read_parquet(temp_data_dir / "parcels_zoning.parquet").iloc[:2]
+    parcels.to_parquet(temp_data_dir / "parcels_zoning.parquet")
+    stat = (temp_data_dir / "parcels_zoning.parquet").stat()
+    os.utime(temp_data_dir / "parcels_zoning.parquet",
+             ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    result = load_query("SELECT count(*) AS n FROM parcels", data_dir=temp_data_dir)
+    assert result["n"].iloc[0] == 2
+    assert get_db(temp_data_dir) is db
@@ -0,0 +1,85 @@
+"""
+Tests for reading vector layers from zip archives without extraction.
+"""
+
+import zipfile
+
+import pytest
+import geopandas as gpd
+from shapely.geometry import LineString, Point, box
+from pathlib import Path
+import tempfile
+import shutil
+
+from src import config
+from src.data.archive import list_layers, read_vector, vsizip_path
+from src.data.clip import read_prefiltered
+from src.data.download import process_downloaded_data
+
+
+@pytest.fixture
+def temp_dir():
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def extract(temp_dir):
+    """A GeoFabrik-style zip with several shapefile layers."""
+    layers = {
+        "gis_osm_roads_free_1": gpd.GeoDataFrame(
+            {"fclass": ["primary", "residential"]},
+            geometry=[LineString([(-105.95, 35.68), (-105.93, 35.69)]),
+                      LineString([(-104.0, 33.0), (-104.1, 33.1)])], crs="EPSG:4326"),
+        "gis_osm_pois_free_1": gpd.GeoDataFrame(
+            {"fclass": ["library"]}, geometry=[Point(-105.94, 35.687)], crs="EPSG:4326"),
+    }
+    source = temp_dir / "layers"
+    source.mkdir()
+    zip_path = temp_dir / "new-mexico-latest-free.shp.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, gdf in layers.items():
+            gdf.to_file(source / f"{name}.shp")
+            for part in source.glob(f"{name}.*"):
+                archive.write(part, part.name)
+        archive.writestr("README", "not a layer")
+    shutil.rmtree(source)
+    return zip_path
+
+
+@pytest.fixture
+def no_extraction(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("archive was extracted")
+    monkeypatch.setattr(zipfile.ZipFile, "extractall", fail)
+    monkeypatch.setattr(zipfile.ZipFile, "extract", fail)
+
+
+def test_member_selection(extract, no_extraction):
+    assert list_layers(extract) == ["gis_osm_pois_free_1.shp", "gis_osm_roads_free_1.shp"]
+    assert vsizip_path(extract, "gis_osm_roads_free_1").startswith("/vsizip/")
+    assert vsizip_path(extract, "ROADS").endswith("/gis_osm_roads_free_1.shp")
+
+    roads = read_vector(extract, layer="roads")
+    assert list(roads["fclass"]) == ["primary", "residential"]
+    assert list(read_vector(extract)["fclass"]) == ["library"]
+
+    with pytest.raises(ValueError, match="not found"):
+        vsizip_path(extract, "buildings")
+    with pytest.raises(ValueError, match="ambiguous"):
+        vsizip_path(extract, "free")
+
+    # bbox prefilter is pushed down to the zipped shapefile
+    city = gpd.GeoDataFrame(geometry=[box(-106.0, 35.6, -105.8, 35.8)], crs="EPSG:4326")
+    prefiltered, stats = read_prefiltered(vsizip_path(extract, "roads"), city)
+    assert list(prefiltered["fclass"]) == ["primary"] and stats["input"] == 2
+
+
+def test_process_reads_zip_member_in_place(extract, temp_dir, monkeypatch, no_extraction):
+    monkeypatch.setattr(config, "DATA_PROCESSED", temp_dir / "processed")
+    output = process_downloaded_data("osm", extract, layer="gis_osm_roads_free_1",
+                                     clip_to_city=False, write_lod=False, write_index=False)
+    processed = gpd.read_file(output)
+    assert len(processed) == 2 and "fclass" in processed.columns
+    assert processed.crs.to_epsg() == 32113
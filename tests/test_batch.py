@@ -0,0 +1,116 @@
+"""
+Tests for parallel batch map rendering.
+"""
+
+import json
+import os
+
+import pytest
+import geopandas as gpd
+from shapely.geometry import box
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data.cache import clear_cache, loader_cache
+from src.viz.batch import (
+    _init_worker, _layer_loads, expand_specs, load_layer, load_manifest, render_batch,
+    spec_hash,
+)
+
+
+@pytest.fixture
+def temp_dirs():
+    """Processed data dir with tracts and city limits, plus an output dir."""
+    temp_dir = Path(tempfile.mkdtemp())
+    data_dir = temp_dir / "processed"
+    data_dir.mkdir()
+    tracts = gpd.GeoDataFrame(
+        {"GEOID": ["35049000100", "35049000200"], "median_income": [52000, 71000],
+         "pct_renters": [48.0, 22.5]},
+        geometry=[box(-106.0, 35.6, -105.95, 35.65), box(-105.95, 35.6, -105.9, 35.65)],
+        crs="EPSG:4326"
+    )
+    tracts.to_file(data_dir / "census_tracts_acs.gpkg", driver="GPKG")
+    yield data_dir, temp_dir / "maps"
+    shutil.rmtree(temp_dir)
+
+
+def _manifest():
+    return [{
+        "name": "acs_{variable}_{dpi}",
+        "vary": {"variable": ["median_income", "pct_renters"], "dpi": [50, 60]},
+        "dpi": "{dpi}",
+        "figsize": [3, 3],
+        "basemap": False,
+        "title": "{variable}",
+        "layers": [{"dataset": "census_tracts", "column": "{variable}", "cmap": "viridis"}],
+    }]
+
+
+def test_expand_specs():
+    """vary expands to the cartesian product and keeps value types."""
+    specs = expand_specs(_manifest())
+    assert [s["name"] for s in specs] == [
+        "acs_median_income_50", "acs_median_income_60",
+        "acs_pct_renters_50", "acs_pct_renters_60",
+    ]
+    assert specs[1]["dpi"] == 60
+    assert specs[2]["layers"][0]["column"] == "pct_renters"
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        expand_specs([{"name": "a", "layers": [{}]}, {"name": "a", "layers": [{}]}])
+
+
+def test_render_batch_parallel_and_skips_unchanged(temp_dirs):
+    """Renders on worker processes; unchanged specs are skipped next time."""
+    data_dir, output_dir = temp_dirs
+    specs = expand_specs(_manifest())
+
+    results = render_batch(specs, output_dir=output_dir, data_dir=data_dir, workers=2)
+    assert {r["status"] for r in results.values()} == {"rendered"}
+    assert all(Path(r["output"]).exists() for r in results.values())
+
+    again = render_batch(specs, output_dir=output_dir, data_dir=data_dir, in_process=True)
+    assert {r["status"] for r in again.values()} == {"skipped"}
+
+    # Touching an input invalidates only the specs that read it
+    tracts = data_dir / "census_tracts_acs.gpkg"
+    stat = tracts.stat()
+    before = spec_hash(specs[0], data_dir)
+    os.utime(tracts, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert spec_hash(specs[0], data_dir) != before
+    changed = render_batch(specs[:1], output_dir=output_dir, data_dir=data_dir, in_process=True)
+    assert changed[specs[0]["name"]]["status"] == "rendered"
+
+
+def test_render_batch_reports_failures(temp_dirs):
+    data_dir, output_dir = temp_dirs
+    specs = [{"name": "missing", "basemap": False, "layers": [{"dataset": "parcels"}]}]
+    results = render_batch(specs, output_dir=output_dir, data_dir=data_dir, in_process=True)
+    assert results["missing"]["status"] == "failed"
+
+
+def test_worker_preloads_filtered_layers(temp_dirs):
+    """Preloading uses each layer's where/columns, so renders hit the cache."""
+    data_dir, _ = temp_dirs
+    layer = {"dataset": "census_tracts", "where": "median_income > 60000",
+             "columns": ["GEOID"], "cmap": "viridis"}
+    specs = [{"name": "rich", "layers": [layer]}, {"name": "again", "layers": [dict(layer)]}]
+    loads = _layer_loads(specs)
+    assert loads == [{"dataset": "census_tracts", "where": "median_income > 60000",
+                      "columns": ["GEOID"]}]
+
+    clear_cache()
+    _init_worker(data_dir, loads)
+    misses = loader_cache.stats()["misses"]
+    gdf = load_layer(layer, data_dir)
+    assert loader_cache.stats()["misses"] == misses
+    assert list(gdf["GEOID"]) == ["35049000200"]
+
+
+def test_example_manifest_is_valid():
+    manifest = Path(__file__).parent.parent / "maps" / "manifests" / "catalog.json"
+    specs = load_manifest(manifest)
+    assert len(specs) == 7
+    assert json.dumps(specs)
@@ -0,0 +1,82 @@
+"""
+Tests for the in-process loader cache.
+"""
+
+import os
+import pytest
+import geopandas as gpd
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data.cache import LoaderCache, loader_cache
+from src.data.loaders import load_parcels
+
+
+@pytest.fixture
+def parcels_dir():
+    """Create a temporary processed directory with the parcel fixture."""
+    temp_dir = Path(tempfile.mkdtemp())
+    fixture_path = Path(__file__).parent / "fixtures" / "sample_parcel.geojson"
+    gdf = gpd.read_file(fixture_path).set_crs("EPSG:4326", allow_override=True)
+    gdf.to_file(temp_dir / "parcels_zoning.gpkg", driver="GPKG")
+    loader_cache.clear()
+    yield temp_dir
+    loader_cache.clear()
+    shutil.rmtree(temp_dir)
+
+
+def test_repeated_load_hits_cache(parcels_dir):
+    """Second load of an unchanged file is served from the cache."""
+    load_parcels(data_dir=parcels_dir)
+    load_parcels(data_dir=parcels_dir)
+    stats = loader_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_cached_frame_is_not_corrupted(parcels_dir):
+    """Mutating a returned frame does not leak into later loads."""
+    first = load_parcels(data_dir=parcels_dir)
+    first["zoning"] = "CHANGED"
+    first.loc[first.index[0], "parcel_id"] = "X"
+
+    second = load_parcels(data_dir=parcels_dir)
+    assert (second["zoning"] != "CHANGED").all()
+    assert second["parcel_id"].iloc[0] == "SF-001"
+
+
+def test_file_change_invalidates_cache(parcels_dir):
+    """Rewriting the file (new mtime/size) forces a fresh read."""
+    load_parcels(data_dir=parcels_dir)
+
+    path = parcels_dir / "parcels_zoning.gpkg"
+    gdf = gpd.read_file(path)
+    gdf = gdf.assign(zoning="C-2")
+    gdf.to_file(path, driver="GPKG")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    result = load_parcels(data_dir=parcels_dir)
+    assert (result["zoning"] == "C-2").all()
+    assert loader_cache.stats()["misses"] == 2
+    assert len(loader_cache) == 1
+
+
+def test_use_cache_false_bypasses_cache(parcels_dir):
+    """use_cache=False always reads from disk."""
+    load_parcels(data_dir=parcels_dir, use_cache=False)
+    assert loader_cache.stats()["misses"] == 0
+    assert len(loader_cache) == 0
+
+
+def test_lru_eviction(parcels_dir):
+    """Oldest entry is evicted once max_entries is exceeded."""
+    cache = LoaderCache(max_entries=2)
+    path = parcels_dir / "parcels_zoning.gpkg"
+    for columns in (("a",), ("b",), ("c",)):
+        cache.get_or_load(path, lambda: gpd.read_file(path), {"columns": columns})
+    assert len(cache) == 2
+
+    cache.get_or_load(path, lambda: gpd.read_file(path), {"columns": ("a",)})
+    assert cache.stats()["misses"] == 4
@@ -0,0 +1,105 @@
+"""
+Tests for chunked, bounded-memory processing of large raw layers.
+"""
+
+import zipfile
+
+import pytest
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely.geometry import box
+from pathlib import Path
+import tempfile
+import shutil
+
+from src import config
+from src.data.chunked import iter_batches, process_in_chunks
+from src.data.download import process_downloaded_data
+from src.data.manifest import get_entry
+
+
+def _raw_roads(n=500):
+    """Road segments in lon/lat; some cross the city box edge, some lie far outside it."""
+    rng = np.random.default_rng(1)
+    x = -106.05 + rng.uniform(0, 0.25, n)
+    y = 35.60 + rng.uniform(0, 0.25, n)
+    lines = shapely.linestrings(np.stack([np.c_[x, y], np.c_[x + 0.01, y + 0.005]], axis=1))
+    return gpd.GeoDataFrame(
+        {"osm_id": np.arange(n), "fclass": rng.choice(["primary", "residential", "track"], n)},
+        geometry=lines, crs="EPSG:4326"
+    )
+
+
+def _rows(gdf):
+    geoms = shapely.normalize(np.asarray(gdf.geometry.values))
+    return sorted(zip(gdf["osm_id"], gdf["fclass"], shapely.to_wkb(shapely.set_precision(geoms, 1e-6), hex=True)))
+
+
+@pytest.fixture
+def processed_dir(monkeypatch):
+    temp_dir = Path(tempfile.mkdtemp())
+    (temp_dir / "processed").mkdir()
+    monkeypatch.setattr(config, "DATA_PROCESSED", temp_dir / "processed")
+    city = gpd.GeoDataFrame(geometry=[box(-106.0, 35.65, -105.9, 35.75)], crs="EPSG:4326")
+    city.to_file(config.get_data_path("city_limits"), driver="GPKG")
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def test_chunked_output_matches_full_read(processed_dir, capsys):
+    raw = processed_dir / "roads_raw.gpkg"
+    _raw_roads().to_file(raw, driver="GPKG")
+
+    batches = list(iter_batches(raw, chunk_size=120))
+    assert [len(b) for b in batches] == [120, 120, 120, 120, 20]
+    assert batches[0].crs.to_epsg() == 4326
+
+    full = gpd.read_file(process_downloaded_data("osm", raw, write_lod=False, incremental=False))
+    output = process_downloaded_data("osm", raw, write_lod=False, write_parquet=True, chunk_size=37)
+    entry = get_entry(output, "osm")
+    assert entry["mode"] == "chunked" and entry["features"] == len(full)
+    assert entry["params"]["write_lod"] is False
+
+    chunked = gpd.read_file(output)
+    assert chunked.crs.to_epsg() == 32113
+    assert 0 < len(chunked) < 500
+    assert _rows(chunked) == _rows(full)
+
+    # Streamed GeoParquet copy: same rows, bbox covering column used by bbox reads
+    parquet = gpd.read_parquet(output.with_suffix(".parquet"))
+    assert _rows(parquet) == _rows(full)
+    window = tuple(chunked.total_bounds[:2]) + tuple(chunked.total_bounds[:2] + 2000)
+    expected = chunked[chunked.intersects(box(*window))]
+    subset = gpd.read_parquet(output.with_suffix(".parquet"), bbox=window)
+    assert set(subset["osm_id"]) >= set(expected["osm_id"])
+
+    capsys.readouterr()
+    process_downloaded_data("osm", raw, write_lod=False, write_parquet=True, chunk_size=37)
+    assert "skipping" in capsys.readouterr().out
+
+
+def test_parallel_batches_from_zip_member(processed_dir):
+    source = processed_dir / "layers"
+    source.mkdir()
+    _raw_roads().to_file(source / "gis_osm_roads_free_1.shp")
+    zip_path = processed_dir / "new-mexico-latest-free.shp.zip"
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        for part in source.iterdir():
+            archive.write(part, part.name)
+
+    city = gpd.read_file(config.get_data_path("city_limits"))
+    member = f"/vsizip/{zip_path.as_posix()}/gis_osm_roads_free_1.shp"
+    serial_path, parallel_path = processed_dir / "serial.gpkg", processed_dir / "parallel.gpkg"
+    serial = process_in_chunks(member, serial_path, city, chunk_size=50)
+    parallel = process_in_chunks(member, parallel_path, city, chunk_size=50, workers=2)
+    assert parallel["output"] == serial["output"] == len(gpd.read_file(parallel_path))
+    assert parallel["input"] == 500 and parallel["read_candidates"] < 500
+    # Batches are appended in input order whichever worker finishes first
+    assert gpd.read_file(parallel_path)["osm_id"].tolist() == gpd.read_file(serial_path)["osm_id"].tolist()
+
+    # Nothing inside the boundary still yields a (empty) layer with the raw fields
+    far = gpd.GeoDataFrame(geometry=[box(-104.0, 33.0, -103.9, 33.1)], crs="EPSG:4326")
+    stats = process_in_chunks(member, processed_dir / "empty.gpkg", far, chunk_size=50)
+    empty = gpd.read_file(processed_dir / "empty.gpkg")
+    assert stats["output"] == 0 and len(empty) == 0 and "fclass" in empty.columns
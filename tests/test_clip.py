@@ -0,0 +1,70 @@
+"""
+Tests for staged clipping.
+"""
+
+import pytest
+import numpy as np
+import geopandas as gpd
+from shapely.geometry import LineString, Point, box
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data.clip import read_clipped, staged_clip
+
+
+@pytest.fixture
+def boundary():
+    """Square 'city limits' in EPSG:4326."""
+    return gpd.GeoDataFrame(
+        {"NAME": ["Santa Fe"]}, geometry=[box(-106.0, 35.6, -105.9, 35.7)], crs="EPSG:4326"
+    )
+
+
+@pytest.fixture
+def features():
+    """Features inside, crossing and outside the boundary."""
+    return gpd.GeoDataFrame(
+        {"kind": ["inside", "crossing", "outside", "inside_point"]},
+        geometry=[
+            box(-105.99, 35.61, -105.98, 35.62),
+            LineString([(-105.95, 35.65), (-105.85, 35.65)]),
+            box(-104.0, 34.0, -103.9, 34.1),
+            Point(-105.95, 35.65),
+        ],
+        crs="EPSG:4326"
+    )
+
+
+def test_staged_clip_matches_gpd_clip(features, boundary):
+    """Staged clip produces the same features and geometries as gpd.clip."""
+    result, stats = staged_clip(features, boundary, report=False)
+    expected = gpd.clip(features, boundary)
+
+    assert sorted(result["kind"]) == sorted(expected["kind"])
+    merged = result.join(expected.geometry.rename("expected"))
+    assert merged.geometry.geom_equals(merged["expected"]).all()
+    assert stats == {**stats, "input": 4, "intersecting": 3, "inside": 2, "cut": 1, "output": 3}
+
+
+def test_staged_clip_reprojects_boundary(features, boundary):
+    """Boundary is transformed to the features' CRS."""
+    projected = features.to_crs("EPSG:32113")
+    result, _ = staged_clip(projected, boundary, report=False)
+    assert result.crs == projected.crs
+    assert sorted(result["kind"]) == ["crossing", "inside", "inside_point"]
+
+
+def test_read_clipped_prefilters_by_bbox(features, boundary):
+    """Features outside the boundary bbox are not read at all."""
+    temp_dir = Path(tempfile.mkdtemp())
+    try:
+        path = temp_dir / "raw.gpkg"
+        features.to_file(path, driver="GPKG")
+        result, stats = read_clipped(path, boundary.to_crs("EPSG:3857"), report=False)
+        assert stats["input"] == 4
+        assert stats["read_candidates"] == 3
+        assert stats["output"] == 3
+        assert np.isclose(result.total_bounds[2], -105.9)
+    finally:
+        shutil.rmtree(temp_dir)
@@ -0,0 +1,106 @@
+"""
+Tests for the CRS service (cached transformers and memoized reprojection).
+"""
+
+import pytest
+import geopandas as gpd
+from shapely.geometry import Point, box
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data.cache import clear_cache, loader_cache
+from src.data.crs import choose_clip_order, get_transformer, reproject
+from src.data.loaders import load_city_limits
+
+
+@pytest.fixture
+def temp_data_dir():
+    """Create temporary data directory for tests."""
+    temp_dir = Path(tempfile.mkdtemp())
+    clear_cache()
+    yield temp_dir
+    clear_cache()
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def boundary():
+    return gpd.GeoDataFrame(
+        {"NAME": ["Santa Fe"]}, geometry=[box(-106.0, 35.6, -105.9, 35.7)], crs="EPSG:4326"
+    )
+
+
+def test_get_transformer_is_cached():
+    """The same CRS pair, however spelled, reuses one transformer."""
+    a = get_transformer("EPSG:4326", "EPSG:3857")
+    b = get_transformer("epsg:4326", "EPSG:3857")
+    assert a is b
+    x, _ = a.transform(-106.0, 35.7)
+    assert x == pytest.approx(-106.0 * 111319.4908, abs=1.0)
+
+
+def test_reproject_matches_to_crs(boundary):
+    """Reprojection with the cached transformer matches GeoDataFrame.to_crs."""
+    result = reproject(boundary, "EPSG:32113")
+    expected = boundary.to_crs("EPSG:32113")
+    assert result.crs == expected.crs
+    assert result.geometry.geom_equals_exact(expected.geometry, tolerance=1e-6).all()
+    assert boundary.crs == "EPSG:4326"
+    assert reproject(boundary, "EPSG:4326") is boundary
+
+
+def test_reproject_memoizes_loaded_dataset(temp_data_dir, boundary):
+    """A loaded layer is reprojected once per target CRS."""
+    boundary.to_file(temp_data_dir / "city_limits.gpkg", driver="GPKG")
+    city = load_city_limits(data_dir=temp_data_dir)
+
+    first = reproject(city, "EPSG:3857")
+    misses = loader_cache.stats()["misses"]
+    second = reproject(load_city_limits(data_dir=temp_data_dir), "EPSG:3857")
+
+    assert loader_cache.stats()["misses"] == misses
+    assert second.geometry.geom_equals(first.geometry).all()
+
+
+def test_reproject_subset_of_loaded_dataset(temp_data_dir):
+    """Subsets and modified copies of a loaded layer are not served the whole cached layer."""
+    zones = gpd.GeoDataFrame(
+        {"zoning": ["R-1", "C-2", "R-1"]},
+        geometry=[box(-105.99 + i / 100, 35.61, -105.985 + i / 100, 35.615) for i in range(3)],
+        crs="EPSG:4326",
+    )
+    zones.to_file(temp_data_dir / "city_limits.gpkg", driver="GPKG")
+    city = load_city_limits(data_dir=temp_data_dir)
+    reproject(city, "EPSG:3857")
+
+    subset = reproject(city[city.zoning == "C-2"], "EPSG:3857")
+    assert list(subset.zoning) == ["C-2"]
+
+    city["area_rank"] = [3, 1, 2]
+    assert list(reproject(city, "EPSG:3857").area_rank) == [3, 1, 2]
+    assert len(reproject(load_city_limits(data_dir=temp_data_dir), "EPSG:3857")) == 3
+
+
+def test_reproject_keeps_z():
+    """3D coordinates keep their Z values, as with GeoDataFrame.to_crs."""
+    points = gpd.GeoDataFrame(
+        geometry=[Point(-105.95, 35.65, 2100.0), Point(-105.9, 35.7)], crs="EPSG:4326"
+    )
+    result = reproject(points, "EPSG:32113")
+    expected = points.to_crs("EPSG:32113")
+    assert list(result.has_z) == [True, False]
+    assert result.geometry.iloc[0].z == pytest.approx(2100.0)
+    assert result.geometry.geom_equals_exact(expected.geometry, tolerance=1e-6).all()
+
+
+def test_choose_clip_order(boundary):
+    """Clip first when most features fall outside the boundary bbox."""
+    near = box(-105.99, 35.61, -105.98, 35.62)
+    far = box(-104.0, 34.0, -103.9, 34.1)
+    mostly_far = gpd.GeoDataFrame(geometry=[near, far, far], crs="EPSG:4326")
+    mostly_near = gpd.GeoDataFrame(geometry=[near, near, far], crs="EPSG:4326")
+
+    plan = choose_clip_order(mostly_far, boundary)
+    assert plan == {"order": "clip_first", "features": 3, "in_bbox": 1}
+    assert choose_clip_order(mostly_near.to_crs("EPSG:32113"), boundary)["order"] == "reproject_first"
@@ -0,0 +1,96 @@
+"""
+Tests for parcel-to-tract joins and areal interpolation.
+"""
+
+import pytest
+import numpy as np
+import geopandas as gpd
+from shapely.geometry import box
+
+from src.analysis.interpolation import areal_interpolate, join_parcels_to_tracts
+
+
+@pytest.fixture
+def tracts():
+    """Two 100 x 100 m tracts side by side (NM State Plane)."""
+    return gpd.GeoDataFrame(
+        {"GEOID": ["35049000100", "35049000200"], "renter_occupied": [100.0, 40.0],
+         "median_income": [50000.0, 80000.0]},
+        geometry=[box(0, 0, 100, 100), box(100, 0, 200, 100)],
+        crs="EPSG:32113"
+    )
+
+
+def test_join_parcels_to_tracts_largest_overlap(tracts):
+    parcels = gpd.GeoDataFrame(
+        {"parcel_id": [1, 2, 3, 4]},
+        geometry=[box(10, 10, 20, 20), box(90, 10, 130, 20), box(95, 50, 105, 60),
+                  box(500, 500, 510, 510)],
+        crs="EPSG:32113", index=[10, 11, 12, 13]
+    )
+    joined = join_parcels_to_tracts(parcels, tracts.to_crs("EPSG:4326"), columns=["GEOID"],
+                                    chunk_size=2)
+    assert list(joined.index) == [10, 11, 12, 13]
+    assert joined.crs == parcels.crs
+    assert list(joined["GEOID"].iloc[:2]) == ["35049000100", "35049000200"]
+    assert joined["GEOID"].iloc[2] in ("35049000100", "35049000200")
+    assert joined["GEOID"].isna().iloc[3]
+
+    with pytest.raises(ValueError, match="missing columns"):
+        join_parcels_to_tracts(parcels, tracts, columns=["nope"])
+
+
+def test_area_weighted_matches_overlay(tracts):
+    target = gpd.GeoDataFrame(
+        {"name": ["west", "middle", "outside"]},
+        geometry=[box(0, 0, 50, 100), box(50, 0, 150, 50), box(300, 0, 400, 100)],
+        crs="EPSG:32113"
+    )
+    result = areal_interpolate(tracts, target, extensive=["renter_occupied"],
+                               intensive=["median_income"], chunk_size=1)
+    assert list(result["name"]) == ["west", "middle", "outside"]
+    # west: half of tract 1; middle: quarter of each tract
+    np.testing.assert_allclose(result["renter_occupied"], [50.0, 25.0 + 10.0, 0.0])
+    assert result["median_income"].iloc[1] == pytest.approx(65000.0)
+    assert np.isnan(result["median_income"].iloc[2])
+
+    pieces = gpd.overlay(target, tracts.assign(tract_area=tracts.area), how="intersection")
+    expected = (pieces["renter_occupied"] * pieces.area / pieces["tract_area"]).groupby(pieces["name"]).sum()
+    assert result.set_index("name")["renter_occupied"].loc[expected.index].tolist() == pytest.approx(expected.tolist())
+
+
+def test_parcel_weighted(tracts):
+    """Counts follow parcels, not area; tracts without parcels use area."""
+    parcels = gpd.GeoDataFrame(
+        {"units": [1, 1, 1, 5]},
+        geometry=[box(5, 5, 10, 10), box(20, 5, 25, 10), box(30, 5, 35, 10), box(80, 80, 90, 90)],
+        crs="EPSG:32113"
+    )
+    target = gpd.GeoDataFrame(
+        {"name": ["southwest", "rest"]},
+        geometry=[box(0, 0, 50, 50), box(0, 50, 200, 100).union(box(50, 0, 200, 50))],
+        crs="EPSG:32113"
+    )
+    by_count = areal_interpolate(tracts, target, extensive=["renter_occupied"],
+                                 weights="parcels", parcels=parcels)
+    np.testing.assert_allclose(by_count["renter_occupied"], [75.0, 25.0 + 40.0])
+
+    by_units = areal_interpolate(tracts, target, extensive=["renter_occupied"],
+                                 intensive=["median_income"], weights="parcels",
+                                 parcels=parcels, parcel_weight="units")
+    np.testing.assert_allclose(by_units["renter_occupied"], [37.5, 62.5 + 40.0])
+    assert by_units["median_income"].iloc[1] == pytest.approx(50000.0)
+
+    # A tract whose parcels all have zero (or missing) weight falls back to area
+    whole = gpd.GeoDataFrame({"name": ["all"]}, geometry=[box(0, 0, 200, 100)], crs="EPSG:32113")
+    zero_units = gpd.GeoDataFrame(
+        {"units": [5.0, None]}, geometry=[box(5, 5, 10, 10), box(150, 5, 155, 10)], crs="EPSG:32113"
+    )
+    combined = areal_interpolate(tracts, whole, extensive=["renter_occupied"],
+                                 intensive=["median_income"], weights="parcels",
+                                 parcels=zero_units, parcel_weight="units")
+    assert combined["renter_occupied"].iloc[0] == pytest.approx(140.0)
+    assert combined["median_income"].iloc[0] == pytest.approx(50000.0)
+
+    with pytest.raises(ValueError, match="requires a parcels layer"):
+        areal_interpolate(tracts, target, extensive=["renter_occupied"], weights="parcels")
@@ -6,6 +6,7 @@ Tests basic functionality with small fixture data.
 
 import pytest
 import geopandas as gpd
+import pandas as pd
 from pathlib import Path
 import tempfile
 import shutil
@@ -120,3 +121,141 @@ def test_get_santa_fe_bounds():
     assert bounds["minx"] < bounds["maxx"]
     assert bounds["miny"] < bounds["maxy"]
 
+
+
+def _write_two_parcels(temp_data_dir):
+    """Write the parcel fixture plus a second parcel far to the east."""
+    from shapely.geometry import box
+    fixture_path = Path(__file__).parent / "fixtures" / "sample_parcel.geojson"
+    gdf = gpd.read_file(fixture_path).set_crs("EPSG:4326", allow_override=True)
+    far = gpd.GeoDataFrame(
+        {"parcel_id": ["SF-002"], "zoning": ["C-2"], "area_sqft": [9000]},
+        geometry=[box(-105.90, 35.70, -105.89, 35.71)],
+        crs="EPSG:4326"
+    )
+    gdf = gpd.GeoDataFrame(pd.concat([gdf, far], ignore_index=True), crs="EPSG:4326")
+    gdf.to_file(temp_data_dir / "parcels_zoning.gpkg", driver="GPKG")
+
+
+def test_load_parcels_bbox_and_mask(temp_data_dir):
+    """bbox and mask only return intersecting parcels."""
+    from shapely.geometry import box
+    _write_two_parcels(temp_data_dir)
+
+    result = load_parcels(data_dir=temp_data_dir, bbox=(-105.95, 35.65, -105.94, 35.66))
+    assert list(result["parcel_id"]) == ["SF-001"]
+
+    result = load_parcels(
+        data_dir=temp_data_dir,
+        bbox={"minx": -105.91, "miny": 35.69, "maxx": -105.88, "maxy": 35.72}
+    )
+    assert list(result["parcel_id"]) == ["SF-002"]
+
+    result = load_parcels(data_dir=temp_data_dir, mask=box(-105.905, 35.695, -105.885, 35.715))
+    assert list(result["parcel_id"]) == ["SF-002"]
+
+    with pytest.raises(ValueError, match="either bbox or mask"):
+        load_parcels(data_dir=temp_data_dir, bbox=(0, 0, 1, 1), mask=box(0, 0, 1, 1))
+
+
+def test_load_parcels_columns_and_where(temp_data_dir):
+    """columns projects attributes and where filters rows."""
+    _write_two_parcels(temp_data_dir)
+
+    result = load_parcels(data_dir=temp_data_dir, columns=["zoning"])
+    assert set(result.columns) == {"zoning", "geometry"}
+
+    result = load_parcels(data_dir=temp_data_dir, where="zoning = 'C-2'")
+    assert list(result["parcel_id"]) == ["SF-002"]
+
+
+def test_loaders_prefer_fresh_parquet(temp_data_dir):
+    """A GeoParquet copy newer than the GeoPackage is read instead."""
+    import os
+    from shapely.geometry import box
+    from src.data.download import write_geoparquet
+    _write_two_parcels(temp_data_dir)
+
+    gpkg_path = temp_data_dir / "parcels_zoning.gpkg"
+    parquet_path = temp_data_dir / "parcels_zoning.parquet"
+    gdf = gpd.read_file(gpkg_path).assign(source="parquet")
+    write_geoparquet(gdf, parquet_path, row_group_size=1)
+
+    result = load_parcels(data_dir=temp_data_dir, use_cache=False)
+    assert (result["source"] == "parquet").all()
+
+    result = load_parcels(
+        data_dir=temp_data_dir, use_cache=False,
+        bbox=(-105.91, 35.69, -105.88, 35.72), columns=["zoning"]
+    )
+    assert list(result["zoning"]) == ["C-2"]
+    assert set(result.columns) == {"zoning", "geometry"}
+
+    mask = gpd.GeoSeries([box(-105.945, 35.655, -105.944, 35.656)], crs="EPSG:4326").to_crs("EPSG:3857")
+    result = load_parcels(data_dir=temp_data_dir, use_cache=False, mask=mask)
+    assert list(result["parcel_id"]) == ["SF-001"]
+
+    # where clauses always go to the GeoPackage
+    result = load_parcels(data_dir=temp_data_dir, use_cache=False, where="zoning = 'C-2'")
+    assert "source" not in result.columns
+
+    # A stale Parquet copy is ignored
+    stat = parquet_path.stat()
+    os.utime(parquet_path, ns=(stat.st_atime_ns, gpkg_path.stat().st_mtime_ns - 10**9))
+    result = load_parcels(data_dir=temp_data_dir, use_cache=False)
+    assert "source" not in result.columns
+
+
+def test_lazy_dataset_handle(temp_data_dir, monkeypatch):
+    """Metadata and status come from the file header; features only on read()."""
+    from src.data.loaders import dataset_status, load
+    _write_two_parcels(temp_data_dir)
+
+    parcels = load("parcels", data_dir=temp_data_dir)
+    tracts = load("census_tracts", data_dir=temp_data_dir)
+
+    def no_reads(*args, **kwargs):
+        raise AssertionError("features were read")
+    with monkeypatch.context() as m:
+        m.setattr(gpd, "read_file", no_reads)
+        assert len(parcels) == 2
+        assert parcels.crs.to_epsg() == 4326
+        assert parcels.bounds[2] == pytest.approx(-105.89)
+        assert {"parcel_id", "zoning"} <= set(parcels.columns)
+        assert "2 features" in repr(parcels)
+        status = dataset_status(data_dir=temp_data_dir)
+    assert status.loc["parcels", "features"] == 2
+    assert not status.loc["census_tracts", "exists"]
+    assert pd.isna(status.loc["parcels", "issues"]) and not status.loc["parcels", "lod"]
+    assert not tracts.exists and "missing" in repr(tracts)
+
+    gdf = parcels.read(columns=["zoning"], where="zoning = 'C-2'")
+    assert list(gdf["zoning"]) == ["C-2"]
+    assert len(parcels.head(1)) == 1
+    with pytest.raises(FileNotFoundError, match="Census tracts data not found"):
+        tracts.read()
+    with pytest.raises(ValueError, match="Unknown dataset"):
+        load("zoning_overlays")
+
+
+def test_registered_dataset_gets_generic_loader(temp_data_dir):
+    """A new dataset is a registry entry, not another load_* function."""
+    from shapely.geometry import Point
+    from src import config
+    from src.data import registry
+    from src.data.loaders import load
+
+    spec = registry.register_dataset("bus_stops", "bus_stops.gpkg", id_columns=["stop_id"],
+                                     label="Bus stops", source="Santa Fe Trails GTFS",
+                                     columns=["stop_id", "route"])
+    try:
+        assert spec["crs"] == config.LOCAL_CRS and config.get_data_path("bus_stops").name == "bus_stops.gpkg"
+        gpd.GeoDataFrame({"stop_id": [1, 2]}, geometry=[Point(0, 0), Point(1, 1)],
+                         crs=config.LOCAL_CRS).to_file(temp_data_dir / "bus_stops.gpkg")
+        stops = load("bus_stops", data_dir=temp_data_dir)
+        assert len(stops) == 2 and stops.missing_columns == ["route"]
+        with pytest.raises(ValueError, match="Bus stops data missing required columns"):
+            stops.read(required_columns=["route"])
+    finally:
+        for mapping in (config.DATASET_FILES, config.DATASET_INFO, config.DATASET_ID_COLUMNS, registry.REGISTRY):
+            mapping.pop("bus_stops", None)
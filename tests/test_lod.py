@@ -0,0 +1,127 @@
+"""
+Tests for the level-of-detail geometry store.
+"""
+
+import pytest
+import numpy as np
+import geopandas as gpd
+import shapely
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from shapely.geometry import Polygon
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data.cache import clear_cache, loader_cache
+from src.data.lod import (
+    build_lod, level_of_detail, lod_path, simplify_geometries, tolerance_for_scale
+)
+from src.data.loaders import load_census_tracts
+from src.viz.maps import setup_basemap
+
+
+def _wiggly_tracts():
+    """Two tracts (metres) sharing a finely digitised, wiggly edge."""
+    ys = np.linspace(0, 1000, 401)
+    edge = [(500 + np.sin(y / 2), y) for y in ys]
+    west = Polygon([(0, 0)] + edge + [(0, 1000)])
+    east = Polygon([edge[0], (1000, 0), (1000, 1000)] + edge[::-1][:-1])
+    return gpd.GeoDataFrame(
+        {"GEOID": ["35049000100", "35049000200"]}, geometry=[west, east], crs="EPSG:32113"
+    )
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = Path(tempfile.mkdtemp())
+    clear_cache()
+    yield temp_dir
+    clear_cache()
+    shutil.rmtree(temp_dir)
+
+
+def test_simplify_keeps_shared_edges():
+    """Coverage simplification drops vertices without opening gaps."""
+    tracts = _wiggly_tracts()
+    geoms = np.asarray(tracts.geometry.values)
+    simplified = simplify_geometries(geoms, 8.0)
+
+    assert shapely.get_num_coordinates(simplified).sum() < shapely.get_num_coordinates(geoms).sum() / 4
+    assert shapely.coverage_is_valid(simplified)
+    assert shapely.union_all(simplified).area == pytest.approx(1000 * 1000, rel=1e-3)
+
+
+def test_tolerance_for_scale():
+    assert tolerance_for_scale(10.0) == 4.0
+    assert tolerance_for_scale(1.0) is None
+    assert tolerance_for_scale(1000.0) == 32.0
+    # ~10 m pixels expressed in degrees
+    assert tolerance_for_scale(10 / 111_320, crs="EPSG:4326") == 4.0
+
+
+def test_level_of_detail_uses_sidecar_and_cache(temp_data_dir):
+    tracts = _wiggly_tracts()
+    path = temp_data_dir / "census_tracts_acs.gpkg"
+    tracts.to_file(path, driver="GPKG")
+    sidecar = build_lod(path)
+    assert sidecar == lod_path(path) and sidecar.exists()
+
+    loaded = load_census_tracts(data_dir=temp_data_dir)
+    first = level_of_detail(loaded, 8.0)
+    misses = loader_cache.stats()["misses"]
+    second = level_of_detail(load_census_tracts(data_dir=temp_data_dir), 8.0)
+
+    assert loader_cache.stats()["misses"] == misses
+    assert list(first["GEOID"]) == list(tracts["GEOID"])
+    assert shapely.get_num_coordinates(first.geometry.values).sum() < 100
+    assert second.geometry.geom_equals_exact(first.geometry, tolerance=0).all()
+    assert level_of_detail(loaded, None) is loaded
+
+
+def test_stale_sidecar_is_ignored(temp_data_dir):
+    """After the dataset changes, levels are recomputed rather than misaligned."""
+    tracts = _wiggly_tracts()
+    path = temp_data_dir / "census_tracts_acs.gpkg"
+    tracts.to_file(path, driver="GPKG")
+    build_lod(path)
+    tracts.iloc[:1].to_file(path, driver="GPKG")
+
+    result = level_of_detail(load_census_tracts(data_dir=temp_data_dir), 8.0)
+    assert len(result) == 1
+
+
+def test_subsets_and_reordered_frames_get_their_own_levels(temp_data_dir):
+    """Subsets and reordered copies of a loaded layer keep their own rows and geometries."""
+    tracts = _wiggly_tracts()
+    path = temp_data_dir / "census_tracts_acs.gpkg"
+    tracts.to_file(path, driver="GPKG")
+    build_lod(path)
+    loaded = load_census_tracts(data_dir=temp_data_dir)
+
+    west = level_of_detail(loaded[loaded.GEOID == "35049000100"], 8.0)
+    east = level_of_detail(loaded[loaded.GEOID == "35049000200"], 8.0)
+    assert list(west["GEOID"]) == ["35049000100"]
+    assert list(east["GEOID"]) == ["35049000200"]
+
+    reordered = loaded.iloc[::-1].reset_index(drop=True)
+    result = level_of_detail(reordered, 8.0)
+    assert list(result["GEOID"]) == ["35049000200", "35049000100"]
+    assert (result.geometry.centroid.x > 500).tolist() == [True, False]
+
+
+def test_setup_basemap_plots_scale_appropriate_level():
+    """A small figure of a large extent draws far fewer vertices."""
+    tracts = _wiggly_tracts()
+    full = sum(len(p.vertices) for p in _plotted_paths(tracts, lod=False))
+    coarse = sum(len(p.vertices) for p in _plotted_paths(tracts, lod=True))
+    assert coarse < full / 4
+
+
+def _plotted_paths(gdf, lod):
+    fig, ax = setup_basemap(gdf, crs="EPSG:32113", add_basemap=False, render="vector",
+                            figsize=(1, 1), output_dpi=100, lod=lod)
+    paths = [path for collection in ax.collections for path in collection.get_paths()]
+    plt.close(fig)
+    return paths
@@ -0,0 +1,155 @@
+"""
+Tests for manifest-driven incremental processing.
+"""
+
+import pytest
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+import shapely
+from shapely.geometry import box
+from pathlib import Path
+import tempfile
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from src import config
+from src.data.download import process_downloaded_data, update_processed
+from src.data.manifest import feature_hashes, get_entry, load_manifest, manifest_path, record_build
+from src.data.validation import load_report
+
+
+def _raw_parcels(n=200):
+    """Parcels in lon/lat around Santa Fe; every 10th lies outside the city box."""
+    rng = np.random.default_rng(0)
+    x = -105.99 + rng.uniform(0, 0.1, n)
+    y = 35.64 + rng.uniform(0, 0.1, n)
+    x[::10] += 1.0
+    return gpd.GeoDataFrame(
+        {"parcel_id": np.arange(n), "zoning": rng.choice(["R-1", "C-2", "MU"], n)},
+        geometry=shapely.box(x, y, x + 0.0005, y + 0.0005), crs="EPSG:4326"
+    )
+
+
+def _rows(gdf):
+    return sorted(zip(gdf["parcel_id"], gdf["zoning"], shapely.to_wkb(gdf.geometry.values, hex=True)))
+
+
+@pytest.fixture
+def processed_dir(monkeypatch):
+    temp_dir = Path(tempfile.mkdtemp())
+    (temp_dir / "processed").mkdir()
+    monkeypatch.setattr(config, "DATA_PROCESSED", temp_dir / "processed")
+    city = gpd.GeoDataFrame(geometry=[box(-106.0, 35.6, -105.85, 35.8)], crs="EPSG:4326")
+    city.to_file(config.get_data_path("city_limits"), driver="GPKG")
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def test_unchanged_input_is_skipped(processed_dir, capsys):
+    raw = processed_dir / "parcels_raw.gpkg"
+    _raw_parcels().to_file(raw, driver="GPKG")
+
+    output = process_downloaded_data("parcels", raw, write_lod=False)
+    entry = get_entry(output, "parcels")
+    assert entry["mode"] == "full" and entry["features"] == 180
+    assert entry["params"]["city_limits"] is not None
+    mtime = output.stat().st_mtime_ns
+
+    capsys.readouterr()
+    assert process_downloaded_data("parcels", raw, write_lod=False) == output
+    assert "skipping" in capsys.readouterr().out
+    assert output.stat().st_mtime_ns == mtime
+
+    # Changed parameters rebuild in full
+    process_downloaded_data("parcels", raw, write_lod=False, clip_to_city=False)
+    entry = get_entry(output, "parcels")
+    assert entry["mode"] == "full" and entry["features"] == 200
+
+
+def test_changed_features_are_upserted(processed_dir):
+    raw = processed_dir / "parcels_raw.gpkg"
+    parcels = _raw_parcels()
+    parcels.to_file(raw, driver="GPKG")
+    output = process_downloaded_data("parcels", raw, write_lod=False)
+
+    # Rezone two parcels, drop one, add one (partly outside the city)
+    parcels.loc[[1, 2], "zoning"] = "R-21"
+    parcels = parcels.drop(index=3)
+    new = gpd.GeoDataFrame({"parcel_id": [999], "zoning": ["C-1"]},
+                           geometry=[box(-105.8505, 35.70, -105.8495, 35.701)], crs="EPSG:4326")
+    parcels = pd.concat([parcels, new], ignore_index=True)
+    parcels.to_file(raw, driver="GPKG")
+
+    process_downloaded_data("parcels", raw, write_lod=False)
+    entry = get_entry(output, "parcels")
+    assert entry["mode"] == "incremental"
+    assert (entry["added"], entry["removed"]) == (3, 3)
+    updated = gpd.read_file(output)
+    assert updated.loc[updated["parcel_id"] == 1, "zoning"].item() == "R-21"
+    assert 3 not in set(updated["parcel_id"])
+    assert updated.loc[updated["parcel_id"] == 999].geometry.bounds["maxx"].item() < new.to_crs(updated.crs).total_bounds[2]
+
+    process_downloaded_data("parcels", raw, write_lod=False, incremental=False)
+    rebuilt = gpd.read_file(output)
+    assert get_entry(output, "parcels")["mode"] == "full"
+    assert _rows(updated) == _rows(rebuilt)
+
+
+def test_derived_columns_survive_rebuilds(processed_dir, capsys):
+    """Columns added with update_processed are kept by skipped and incremental builds."""
+    raw = processed_dir / "parcels_raw.gpkg"
+    parcels = _raw_parcels()
+    parcels.to_file(raw, driver="GPKG")
+    output = process_downloaded_data("parcels", raw, write_lod=False, validate=True)
+
+    processed = gpd.read_file(output)
+    processed["score"] = processed["parcel_id"] * 2.0
+    update_processed("parcels", processed, output, ["score"])
+    assert get_entry(output, "parcels")["derived_columns"] == ["score"]
+    assert load_report(output)["features"] == len(processed)
+
+    capsys.readouterr()
+    process_downloaded_data("parcels", raw, write_lod=False, validate=True)
+    assert "skipping" in capsys.readouterr().out
+
+    parcels.loc[[1, 2], "zoning"] = "R-21"
+    parcels.to_file(raw, driver="GPKG")
+    process_downloaded_data("parcels", raw, write_lod=False, validate=True)
+    updated = gpd.read_file(output)
+    assert get_entry(output, "parcels")["mode"] == "incremental"
+    kept = updated[~updated["parcel_id"].isin([1, 2])]
+    assert (kept["score"] == kept["parcel_id"] * 2.0).all()
+    assert updated.loc[updated["parcel_id"] == 1, "score"].isna().all()
+    assert get_entry(output, "parcels")["derived_columns"] == ["score"]
+
+
+def test_feature_hashes_ignore_index():
+    parcels = _raw_parcels(10)
+    hashes = feature_hashes(parcels)
+    assert len(set(hashes)) == 10
+    np.testing.assert_array_equal(feature_hashes(parcels.set_index(parcels.index + 5)), hashes)
+    parcels.loc[0, "zoning"] = "X"
+    assert (feature_hashes(parcels) != hashes).sum() == 1
+
+
+def _record(output_path, name):
+    record_build(output_path, name, mode="full")
+    return name
+
+
+def test_concurrent_record_build_keeps_every_entry(tmp_path):
+    """Worker processes recording builds at once neither lose entries nor fail."""
+    outputs = []
+    for i in range(12):
+        output_path = tmp_path / f"dataset_{i}.gpkg"
+        output_path.write_bytes(b"x" * i)
+        outputs.append(output_path)
+
+    with ProcessPoolExecutor(max_workers=6, mp_context=multiprocessing.get_context("spawn")) as pool:
+        done = list(pool.map(_record, outputs, [p.stem for p in outputs]))
+
+    manifest = load_manifest(manifest_path(outputs[0]))
+    assert sorted(manifest) == sorted(done)
+    assert not list(tmp_path.glob("*.tmp")) and not list(tmp_path.glob("*.lock"))
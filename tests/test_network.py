@@ -0,0 +1,117 @@
+"""
+Tests for road-network routing and parcel access.
+"""
+
+import pytest
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+import shapely
+from shapely.geometry import LineString, Point, box
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.analysis.network import (
+    access_for_parcels, build_graph, isochrones, load_graph, multi_source_dijkstra,
+    parcel_access
+)
+from src.config import WALK_SPEED_MPS
+from src.data.cache import clear_cache
+
+
+def _grid_roads(n=5, spacing=100.0):
+    """n x n street grid; streets share a vertex at every crossing, like OSM ways."""
+    end = (n - 1) * spacing
+    lines = [LineString([(0, i * spacing), (end, i * spacing)]) for i in range(n)]
+    lines += [LineString([(i * spacing, 0), (i * spacing, end)]) for i in range(n)]
+    lines = shapely.segmentize(lines, spacing)
+    return gpd.GeoDataFrame(
+        {"feature_type": ["road"] * len(lines), "category": ["residential"] * len(lines)},
+        geometry=lines, crs="EPSG:32113"
+    )
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = Path(tempfile.mkdtemp())
+    clear_cache()
+    yield temp_dir
+    clear_cache()
+    shutil.rmtree(temp_dir)
+
+
+def test_build_graph_splits_at_shared_vertices():
+    roads = _grid_roads(3)
+    # A way ending 0.2 m short of a node snaps onto it; a motorway is not walkable
+    extra = gpd.GeoDataFrame(
+        {"feature_type": ["road", "road"], "category": ["service", "motorway"]},
+        geometry=[LineString([(200.2, 200), (300, 200)]), LineString([(0, -50), (200, -50)])],
+        crs="EPSG:32113"
+    )
+    graph = build_graph(pd.concat([roads, extra], ignore_index=True), mode="walk")
+    assert graph.n_nodes == 10
+    assert graph.n_edges == 13
+    assert np.all(np.diff(graph.indptr) >= 1)
+    np.testing.assert_allclose(np.sort(np.unique(graph.weights)), [100 / WALK_SPEED_MPS])
+
+    drive = build_graph(pd.concat([roads, extra], ignore_index=True), mode="drive")
+    assert drive.n_edges == 14
+    with pytest.raises(ValueError, match="Unknown mode"):
+        build_graph(roads, mode="fly")
+
+
+def test_dijkstra_and_parcel_access():
+    roads = _grid_roads(5)
+    graph = build_graph(roads)
+
+    corner = graph.nearest_nodes(shapely.points([[0, 0]]))[0]
+    times = multi_source_dijkstra(graph, corner)
+    distance = np.abs(graph.node_xy).sum(axis=1)
+    np.testing.assert_allclose(times, distance / WALK_SPEED_MPS)
+    cut = multi_source_dijkstra(graph, corner, cutoff=250 / WALK_SPEED_MPS)
+    assert np.isinf(cut[distance > 250]).all() and np.isfinite(cut[distance <= 250]).all()
+
+    parcels = gpd.GeoDataFrame(
+        geometry=[box(390, 390, 400, 400), box(190, 0, 210, 10), box(5000, 5000, 5010, 5010)],
+        crs="EPSG:32113", index=[7, 8, 9]
+    )
+    stores = gpd.GeoDataFrame(geometry=[Point(0, 0), Point(400, 0)], crs="EPSG:32113")
+    access = parcel_access(parcels, graph, {"grocery": stores, "school": stores.iloc[:0]})
+    assert list(access.index) == [7, 8, 9]
+    # (395, 395) -> node (400, 400): 7.07 m walk + 400 m to (400, 0)
+    expected = (400 + np.hypot(5, 5)) / WALK_SPEED_MPS / 60
+    assert access["walk_min_grocery"].iloc[0] == pytest.approx(expected)
+    assert access["walk_min_grocery"].iloc[1] == pytest.approx((200 + 5) / WALK_SPEED_MPS / 60)
+    assert access["walk_min_grocery"].iloc[2] > 60
+    assert access["walk_min_school"].isna().all()
+
+    areas = isochrones(graph, stores.iloc[:1], minutes=[2, 10], buffer=10)
+    assert areas.geometry.iloc[0].contains(Point(100, 0))
+    assert not areas.geometry.iloc[0].contains(Point(200, 0))
+    assert areas.geometry.iloc[1].contains(Point(400, 400))
+
+
+def test_graph_and_access_cached_on_disk(temp_data_dir):
+    roads = _grid_roads(4)
+    pois = gpd.GeoDataFrame(
+        {"feature_type": "poi", "category": ["supermarket", "school"]},
+        geometry=[Point(0, 0), Point(300, 300)], crs="EPSG:32113"
+    )
+    pd.concat([roads, pois], ignore_index=True).to_file(temp_data_dir / "osm_roads_pois.gpkg", driver="GPKG")
+    gpd.GeoDataFrame(
+        {"parcel_id": [1, 2]}, geometry=[box(0, 0, 10, 10), box(290, 290, 300, 300)], crs="EPSG:32113"
+    ).to_file(temp_data_dir / "parcels_zoning.gpkg", driver="GPKG")
+    cache_dir = temp_data_dir / "network"
+
+    graph = load_graph(temp_data_dir, cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("graph_walk_*.npz"))) == 1
+    reloaded = load_graph(temp_data_dir, cache_dir=cache_dir)
+    np.testing.assert_array_equal(graph.indices, reloaded.indices)
+    assert reloaded.crs == graph.crs
+
+    access = access_for_parcels(temp_data_dir, cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("access_walk_*.npz"))) == 1
+    cached = access_for_parcels(temp_data_dir, cache_dir=cache_dir)
+    np.testing.assert_allclose(cached.to_numpy(), access.to_numpy())
+    assert access["walk_min_school"].iloc[1] < access["walk_min_school"].iloc[0]
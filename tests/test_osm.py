@@ -0,0 +1,126 @@
+"""
+Tests for streaming Overpass ingestion.
+"""
+
+import json
+import pytest
+import geopandas as gpd
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data import osm
+from src.data.manifest import get_entry
+from src.data.validation import load_report
+
+
+def _payload():
+    """Small Overpass-style response with roads, POIs and water features."""
+    line = [{"lat": 35.65, "lon": -105.95}, {"lat": 35.66, "lon": -105.94}]
+    ring = [
+        {"lat": 35.65, "lon": -105.95}, {"lat": 35.65, "lon": -105.94},
+        {"lat": 35.66, "lon": -105.94}, {"lat": 35.65, "lon": -105.95},
+    ]
+    return {
+        "version": 0.6,
+        "osm3s": {"copyright": "OpenStreetMap contributors, ODbL"},
+        "elements": [
+            {"type": "node", "id": 1, "lat": 35.65, "lon": -105.95,
+             "tags": {"amenity": "school", "name": "Escuela"}},
+            {"type": "node", "id": 2, "lat": 35.66, "lon": -105.94,
+             "tags": {"shop": "grocery"}},
+            {"type": "node", "id": 3, "lat": 35.66, "lon": -105.94},
+            {"type": "way", "id": 10, "geometry": line,
+             "tags": {"highway": "residential", "name": "Calle [Uno], \"A\""}},
+            {"type": "way", "id": 11, "geometry": line, "tags": {"waterway": "river",
+                                                                 "name": "Santa Fe River"}},
+            {"type": "way", "id": 12, "geometry": ring, "tags": {"natural": "water"}},
+        ],
+    }
+
+
+@pytest.fixture
+def raw_file():
+    """Write the payload to a temporary JSON file."""
+    temp_dir = Path(tempfile.mkdtemp())
+    path = temp_dir / "overpass.json"
+    path.write_text(json.dumps(_payload(), indent=1))
+    yield path
+    shutil.rmtree(temp_dir)
+
+
+def test_iter_elements_small_buffer(raw_file):
+    """Elements are parsed correctly even when reads split every token."""
+    elements = list(osm.iter_overpass_elements(raw_file, buffer_size=7))
+    assert elements == _payload()["elements"]
+    assert osm.count_elements(raw_file) == 6
+
+
+def test_build_osm_batch():
+    """Roads become LineStrings and tagged nodes become POIs."""
+    gdf = osm.build_osm_batch(_payload()["elements"])
+    assert list(gdf["feature_type"]) == ["road", "poi", "poi"]
+    assert list(gdf["category"]) == ["residential", "school", "grocery"]
+    assert list(gdf.geom_type) == ["LineString", "Point", "Point"]
+    assert gdf.crs == "EPSG:4326"
+
+
+def test_build_hydrology_batch():
+    """Waterways are lines; closed natural=water ways are polygons."""
+    gdf = osm.build_hydrology_batch(_payload()["elements"])
+    assert list(gdf["feature_type"]) == ["waterway", "waterbody"]
+    assert list(gdf["waterway_type"]) == ["river", "waterbody"]
+    assert list(gdf.geom_type) == ["LineString", "Polygon"]
+
+
+def test_ingest_overpass_in_batches(raw_file, monkeypatch):
+    """Batches are appended to the processed layer."""
+    output = raw_file.parent / "osm_roads_pois.gpkg"
+    monkeypatch.setattr("src.config.get_data_path", lambda name, processed=True: output)
+    osm.ingest_overpass(raw_file, "osm", clip_to_city=False, batch_size=2)
+
+    gdf = gpd.read_file(output)
+    assert len(gdf) == 3
+    assert gdf.crs == "EPSG:32113"
+    assert sorted(gdf["osm_id"]) == [1, 2, 10]
+
+
+def test_ingest_overpass_records_build(raw_file, monkeypatch, capsys):
+    """Overpass builds get the parquet copy, validation report and manifest entry of other datasets."""
+    output = raw_file.parent / "hydrology.gpkg"
+    monkeypatch.setattr("src.config.get_data_path", lambda name, processed=True: output)
+    osm.ingest_overpass(raw_file, "hydrology", clip_to_city=False, write_parquet=True,
+                        validate=True, incremental=True)
+
+    entry = get_entry(output, "hydrology")
+    assert entry["mode"] == "overpass" and entry["features"] == 2
+    assert output.with_suffix(".parquet").exists()
+    assert load_report(output) is not None
+    assert not list(raw_file.parent.glob("*.partial.gpkg"))
+
+    capsys.readouterr()
+    osm.ingest_overpass(raw_file, "hydrology", clip_to_city=False, write_parquet=True,
+                        validate=True, incremental=True)
+    assert "unchanged, skipping" in capsys.readouterr().out
+
+
+def test_elements_to_geodataframe_flattens_tags():
+    """Generic converter keeps input order and flattens tags to columns."""
+    gdf = osm.elements_to_geodataframe(
+        _payload()["elements"],
+        polygon_tags=lambda tags: tags.get("natural") == "water"
+    )
+    assert list(gdf["osm_id"]) == [1, 2, 3, 10, 11, 12]
+    assert list(gdf["osm_type"]) == ["node"] * 3 + ["way"] * 3
+    assert list(gdf.geom_type) == ["Point"] * 3 + ["LineString", "LineString", "Polygon"]
+    assert list(gdf["amenity"]) == ["school", "", "", "", "", ""]
+    assert {"highway", "waterway", "natural", "shop", "name"} <= set(gdf.columns)
+
+
+def test_elements_to_geodataframe_empty():
+    """No usable elements gives an empty frame with the requested columns."""
+    gdf = osm.elements_to_geodataframe([], tag_keys=["highway"])
+    assert len(gdf) == 0
+    assert list(gdf.columns) == ["osm_type", "osm_id", "highway", "geometry"]
+    assert len(osm.build_osm_batch([])) == 0
+    assert len(osm.build_hydrology_batch([])) == 0
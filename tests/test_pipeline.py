@@ -0,0 +1,118 @@
+"""
+Tests for the dependency-aware dataset pipeline.
+"""
+
+import time
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data.pipeline import Task, run_pipeline
+
+
+@pytest.fixture
+def work_dir():
+    """Create a temporary working directory."""
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def _copy_upper(raw, output_dir, log=None):
+    """Toy processing stage: upper-case the raw file into output_dir."""
+    raw = Path(raw)
+    output = Path(output_dir) / f"{raw.stem}.out"
+    output.write_text(raw.read_text().upper())
+    if log is not None:
+        with open(log, "a") as f:
+            f.write(f"{raw.stem}\n")
+    return output
+
+
+def _make_tasks(work_dir, delay=0.3):
+    calls = []
+
+    def downloader(name):
+        def download():
+            calls.append(name)
+            time.sleep(delay)
+            path = work_dir / f"{name}.raw"
+            if not path.exists():
+                path.write_text(name)
+            return path
+        return download
+
+    kwargs = {"output_dir": str(work_dir), "log": str(work_dir / "process.log")}
+    tasks = {
+        "city_limits": Task("city_limits", downloader("city_limits"), _copy_upper,
+                            process_kwargs=kwargs),
+        "census_tracts": Task("census_tracts", downloader("census_tracts"), _copy_upper,
+                              deps=("city_limits",), process_kwargs=kwargs),
+        "parcels": Task("parcels", downloader("parcels"), _copy_upper,
+                        deps=("city_limits",), process_kwargs=kwargs),
+    }
+    return tasks, calls
+
+
+def test_downloads_run_concurrently_and_respect_deps(work_dir):
+    """Independent downloads overlap; dependents process after their deps."""
+    tasks, calls = _make_tasks(work_dir)
+    start = time.perf_counter()
+    results = run_pipeline(
+        tasks=tasks, state_path=work_dir / "state.json", process_in_threads=True
+    )
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.8
+    assert {r["status"] for r in results.values()} == {"built"}
+    assert (work_dir / "parcels.out").read_text() == "PARCELS"
+    log = (work_dir / "process.log").read_text().split()
+    assert log[0] == "city_limits"
+
+
+def test_unchanged_stages_are_skipped(work_dir):
+    """A second run skips downloads and processing; edits trigger rebuilds."""
+    tasks, calls = _make_tasks(work_dir, delay=0)
+    state = work_dir / "state.json"
+    run_pipeline(tasks=tasks, state_path=state, process_in_threads=True)
+    calls.clear()
+
+    results = run_pipeline(tasks=tasks, state_path=state, process_in_threads=True)
+    assert calls == []
+    assert {r["status"] for r in results.values()} == {"skipped"}
+
+    # Changing the city limits output invalidates its dependents
+    (work_dir / "city_limits.raw").write_text("city limits v2")
+    results = run_pipeline(tasks=tasks, state_path=state, process_in_threads=True)
+    assert {name: r["status"] for name, r in results.items()} == {
+        "city_limits": "built", "census_tracts": "built", "parcels": "built"
+    }
+
+
+def test_failed_dependency_blocks_dependents(work_dir):
+    """A failing dependency marks dependents blocked without running them."""
+    tasks, _ = _make_tasks(work_dir, delay=0)
+
+    def broken():
+        raise RuntimeError("network down")
+
+    tasks["city_limits"].download = broken
+    results = run_pipeline(
+        tasks=tasks, names=["parcels"], state_path=work_dir / "state.json",
+        process_in_threads=True
+    )
+    assert results["city_limits"]["status"] == "failed"
+    assert results["parcels"]["status"] == "blocked"
+    assert "census_tracts" not in results
+
+
+def test_processing_runs_in_process_pool(work_dir):
+    """Processing stages run in worker processes."""
+    tasks, _ = _make_tasks(work_dir, delay=0)
+    results = run_pipeline(
+        tasks=tasks, names=["city_limits"], state_path=work_dir / "state.json",
+        process_workers=1
+    )
+    assert results["city_limits"]["status"] == "built"
+    assert (work_dir / "city_limits.out").read_text() == "CITY_LIMITS"
@@ -0,0 +1,91 @@
+"""
+Tests for parcel proximity to water and amenities.
+"""
+
+import pytest
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely.geometry import LineString
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.analysis import proximity
+from src.analysis.proximity import parcel_proximity, proximity_columns, write_parcel_proximity
+from src.data.cache import clear_cache
+from src.data.loaders import load_parcels
+
+
+def _parcels(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(0, 2000, n), rng.uniform(0, 2000, n)
+    return gpd.GeoDataFrame(
+        {"parcel_id": np.arange(n)}, geometry=shapely.box(x, y, x + 20, y + 20), crs="EPSG:32113"
+    )
+
+
+def _hydrology():
+    return gpd.GeoDataFrame(
+        {"waterway_type": ["river", "ditch"], "name": ["Santa Fe River", "Acequia Madre"]},
+        geometry=[LineString([(0, 1000), (2000, 1100)]), LineString([(1000, 0), (1050, 2000)])],
+        crs="EPSG:32113"
+    )
+
+
+def _pois(n=60, seed=1):
+    rng = np.random.default_rng(seed)
+    return gpd.GeoDataFrame(
+        {"feature_type": ["poi"] * n, "category": ["cafe"] * n},
+        geometry=shapely.points(rng.uniform(0, 2000, (n, 2))), crs="EPSG:32113"
+    )
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = Path(tempfile.mkdtemp())
+    clear_cache()
+    yield temp_dir
+    clear_cache()
+    shutil.rmtree(temp_dir)
+
+
+def test_matches_brute_force():
+    parcels, pois = _parcels(), _pois()
+    result = parcel_proximity(parcels, {"poi": pois.to_crs("EPSG:4326")}, radii=(150, 400))
+
+    assert list(result.columns) == proximity_columns("poi", (150, 400))
+    distances = shapely.distance(
+        np.asarray(parcels.geometry.values)[:, None], np.asarray(pois.geometry.values)[None, :]
+    )
+    np.testing.assert_allclose(result["dist_poi_m"], distances.min(axis=1), atol=1e-3)
+    np.testing.assert_array_equal(result["poi_within_400m"], (distances <= 400).sum(axis=1))
+    assert (result["poi_within_150m"] <= result["poi_within_400m"]).all()
+
+
+def test_process_pool_matches_in_process(monkeypatch):
+    parcels, targets = _parcels(3000), {"water": _hydrology(), "poi": _pois()}
+    serial = parcel_proximity(parcels, targets, workers=1)
+    monkeypatch.setattr(proximity, "MIN_PARALLEL_PARCELS", 0)
+    parallel = parcel_proximity(parcels, targets, workers=2, chunk_size=500)
+    assert serial.equals(parallel)
+
+    empty = parcel_proximity(parcels, {"water": _hydrology().iloc[:0]}, workers=1)
+    assert empty["dist_water_m"].isna().all() and (empty["water_within_100m"] == 0).all()
+
+
+def test_write_parcel_proximity(temp_data_dir):
+    _parcels().to_file(temp_data_dir / "parcels_zoning.gpkg", driver="GPKG")
+    _hydrology().to_file(temp_data_dir / "hydrology.gpkg", driver="GPKG")
+
+    path = write_parcel_proximity(data_dir=temp_data_dir, radii=(100,), workers=1)
+    parcels = load_parcels(data_dir=temp_data_dir)
+    assert path == temp_data_dir / "parcels_zoning.gpkg"
+    for name in ("water", "river", "acequia"):
+        assert set(proximity_columns(name, (100,))) <= set(parcels.columns)
+    assert (parcels["dist_water_m"] <= parcels["dist_river_m"]).all()
+    assert (parcels["dist_water_m"] <= parcels["dist_acequia_m"]).all()
+
+    # Running again replaces rather than duplicates the columns
+    write_parcel_proximity(data_dir=temp_data_dir, radii=(100,), workers=1)
+    assert len(load_parcels(data_dir=temp_data_dir).columns) == len(parcels.columns)
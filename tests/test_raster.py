@@ -0,0 +1,92 @@
+"""
+Tests for rasterized rendering of dense layers.
+"""
+
+import pytest
+import numpy as np
+import geopandas as gpd
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.collections import PatchCollection
+from matplotlib.image import AxesImage
+from shapely.geometry import LineString, box
+
+from src.viz.maps import plot_layer, setup_basemap
+from src.viz.raster import rasterize_layer, should_rasterize
+
+
+@pytest.fixture
+def grid():
+    """10 x 10 grid of unit squares with a numeric attribute."""
+    cells = [box(x, y, x + 1, y + 1) for y in range(10) for x in range(10)]
+    return gpd.GeoDataFrame({"value": np.arange(100.0)}, geometry=cells, crs="EPSG:32113")
+
+
+def _axes(extent=(0, 0, 10, 10)):
+    fig, ax = plt.subplots(figsize=(2, 2))
+    ax.set_aspect("equal")
+    ax.set_xlim(extent[0], extent[2])
+    ax.set_ylim(extent[1], extent[3])
+    return fig, ax
+
+
+def test_rasterize_layer_colors_features(grid):
+    """Each cell gets its own colormap color; the image fills the extent."""
+    fig, ax = _axes()
+    image = rasterize_layer(ax, grid, column="value", cmap="viridis", dpi=50)
+    data = image.get_array()
+
+    assert data.dtype == np.uint8
+    assert data.shape[2] == 4 and (data[..., 3] == 255).all()
+    cmap = matplotlib.colormaps["viridis"]
+    # Top-left pixel is in the cell at x=0, y=9 (value 90)
+    expected = (np.array(cmap(90 / 99)) * 255).round().astype(np.uint8)
+    assert np.abs(data[0, 0].astype(int) - expected.astype(int)).max() <= 1
+    assert image.get_extent() == [0, 10, 0, 10]
+    plt.close(fig)
+
+
+def test_rasterize_layer_outlines_and_lines():
+    """Unfilled polygons draw only their outline; lines are burned directly."""
+    gdf = gpd.GeoDataFrame(
+        geometry=[box(1, 1, 9, 9), LineString([(0, 5), (10, 5)])], crs="EPSG:32113"
+    )
+    fig, ax = _axes()
+    data = rasterize_layer(ax, gdf, color="none", edgecolor="red", dpi=50).get_array()
+    h, w = data.shape[:2]
+
+    assert data[h // 4, w // 4, 3] == 0  # polygon interior stays empty
+    assert data[:, w // 2, 3].any()  # the horizontal line crosses the middle column
+    assert (data[..., 0][data[..., 3] > 0] > 0).any()  # outline is red
+    plt.close(fig)
+
+
+def test_should_rasterize(grid):
+    assert should_rasterize(grid, min_features=50)
+    assert not should_rasterize(grid, min_features=500)
+    assert not should_rasterize(grid.set_geometry(grid.centroid), min_features=50)
+
+
+def test_plot_layer_modes(grid):
+    """Vector mode makes patches; raster mode makes one image."""
+    fig, ax = _axes()
+    plot_layer(ax, grid, render="vector")
+    assert any(isinstance(c, PatchCollection) for c in ax.collections)
+    assert not ax.images
+
+    plot_layer(ax, grid, render="raster", dpi=50)
+    assert len(ax.images) == 1 and isinstance(ax.images[0], AxesImage)
+
+    with pytest.raises(ValueError, match="render mode"):
+        plot_layer(ax, grid, render="svg")
+    plt.close(fig)
+
+
+def test_setup_basemap_raster(grid):
+    fig, ax = setup_basemap(grid, crs="EPSG:32113", add_basemap=False, render="raster",
+                            output_dpi=50, figsize=(3, 3))
+    assert len(ax.images) == 1
+    assert not ax.collections
+    assert tuple(ax.get_xlim()) == (0.0, 10.0)
+    plt.close(fig)
@@ -0,0 +1,136 @@
+"""
+Tests for persisted packed spatial indexes.
+"""
+
+import os
+
+import pytest
+import numpy as np
+import geopandas as gpd
+import shapely
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.analysis.interpolation import intersection_pairs, join_parcels_to_tracts
+from src.data.cache import clear_cache
+from src.data.download import write_geoparquet
+from src.data.loaders import load_census_tracts, load_nearest
+from src.data.spatial_index import (
+    build_spatial_index, index_for_frame, index_path, open_spatial_index, pack
+)
+
+
+def _random_polygons(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(0, 5000, n), rng.uniform(0, 5000, n)
+    geoms = shapely.box(x, y, x + rng.uniform(1, 80, n), y + rng.uniform(1, 80, n))
+    geoms[3] = None
+    return gpd.GeoDataFrame({"feature_id": np.arange(n)}, geometry=geoms, crs="EPSG:32113")
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = Path(tempfile.mkdtemp())
+    clear_cache()
+    yield temp_dir
+    clear_cache()
+    shutil.rmtree(temp_dir)
+
+
+def test_pack_and_bulk_query_match_brute_force(temp_data_dir):
+    gdf = _random_polygons(3000)
+    gdf.to_file(temp_data_dir / "hydrology.gpkg", driver="GPKG")
+    sidecar = build_spatial_index(temp_data_dir / "hydrology.gpkg", node_size=8)
+    assert sidecar == index_path(temp_data_dir / "hydrology.gpkg")
+
+    index = open_spatial_index(temp_data_dir / "hydrology.gpkg")
+    assert index.rows == 3000 and list(index.fids[:3]) == [1, 2, 3]
+
+    rng = np.random.default_rng(1)
+    qx, qy = rng.uniform(0, 5000, 50), rng.uniform(0, 5000, 50)
+    queries = np.column_stack([qx, qy, qx + 300, qy + 300])
+    qi, items = index.query_bulk(queries)
+
+    geoms = np.asarray(gdf.geometry.values)
+    bi, bj = shapely.STRtree(geoms).query(shapely.box(*queries.T))
+    assert set(zip(qi.tolist(), items.tolist())) == set(zip(bi.tolist(), bj.tolist()))
+    assert 3 not in items
+
+    boxes, indices, level_bounds = pack(np.empty((0, 4)))
+    assert len(boxes) == 0
+
+
+def test_stale_index_is_ignored(temp_data_dir):
+    path = temp_data_dir / "hydrology.gpkg"
+    _random_polygons(100).to_file(path, driver="GPKG")
+    build_spatial_index(path)
+    assert open_spatial_index(path) is not None
+
+    _random_polygons(50).to_file(path, driver="GPKG")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert open_spatial_index(path) is None
+
+
+@pytest.mark.parametrize("fmt", ["gpkg", "parquet"])
+def test_load_nearest_matches_brute_force(temp_data_dir, fmt):
+    gdf = _random_polygons(2000)
+    gdf.to_file(temp_data_dir / "hydrology.gpkg", driver="GPKG")
+    if fmt == "parquet":
+        write_geoparquet(gdf, temp_data_dir / "hydrology.parquet", row_group_size=300)
+        build_spatial_index(temp_data_dir / "hydrology.parquet")
+
+    point = shapely.Point(2500, 2500)
+    result = load_nearest("hydrology", point, k=5, data_dir=temp_data_dir)
+    distances = shapely.distance(np.asarray(gdf.geometry.values), point)
+    expected = gdf.loc[np.argsort(distances)[:5], "feature_id"]
+    assert list(result["feature_id"]) == list(expected)
+    assert list(result["distance"]) == pytest.approx(sorted(distances[~np.isnan(distances)])[:5])
+    assert "bbox" not in result.columns
+
+    near = load_nearest("hydrology", (2500, 2500), k=50, max_distance=60, data_dir=temp_data_dir)
+    assert (near["distance"] <= 60).all()
+    assert len(near) == min(50, int((distances <= 60).sum()))
+
+
+def test_analysis_uses_index_of_loaded_frames(temp_data_dir):
+    tracts = _random_polygons(500, seed=2)
+    tracts["GEOID"] = tracts["feature_id"].astype(str)
+    tracts.to_file(temp_data_dir / "census_tracts_acs.gpkg", driver="GPKG")
+    build_spatial_index(temp_data_dir / "census_tracts_acs.gpkg")
+
+    loaded = load_census_tracts(data_dir=temp_data_dir)
+    assert index_for_frame(loaded) is not None
+    assert index_for_frame(loaded.iloc[::-1]) is None
+    assert index_for_frame(load_census_tracts(data_dir=temp_data_dir, bbox=(0, 0, 100, 100))) is None
+    assert index_for_frame(loaded.sort_values("GEOID", ignore_index=True)) is None
+    assert index_for_frame(loaded.to_crs(3857)) is None
+
+    parcels = _random_polygons(1000, seed=3)
+    with_index = intersection_pairs(parcels, loaded, chunk_size=128)
+    relabelled = loaded.set_axis(np.arange(1, len(loaded) + 1))
+    assert index_for_frame(relabelled) is None
+    without = intersection_pairs(parcels, relabelled)
+    key = lambda pairs: sorted(zip(pairs[0].tolist(), pairs[1].tolist()))
+    assert key(with_index) == key(without)
+
+
+def test_join_with_reordered_or_reprojected_loaded_tracts(temp_data_dir):
+    """Sorted and reprojected copies of a loaded layer are joined without its sidecar."""
+    tracts = gpd.GeoDataFrame(
+        {"GEOID": ["B", "A"]},
+        geometry=[shapely.box(100, 0, 200, 100), shapely.box(0, 0, 100, 100)],
+        crs="EPSG:32113",
+    )
+    tracts.to_file(temp_data_dir / "census_tracts_acs.gpkg", driver="GPKG")
+    build_spatial_index(temp_data_dir / "census_tracts_acs.gpkg")
+    loaded = load_census_tracts(data_dir=temp_data_dir)
+    parcels = gpd.GeoDataFrame(
+        geometry=[shapely.box(10, 10, 20, 20), shapely.box(150, 10, 160, 20)], crs="EPSG:32113"
+    )
+
+    sorted_tracts = loaded.sort_values("GEOID", ignore_index=True)
+    assert list(join_parcels_to_tracts(parcels, sorted_tracts)["GEOID"]) == ["A", "B"]
+    joined = join_parcels_to_tracts(parcels.to_crs(3857), loaded.to_crs(3857))
+    assert list(joined["GEOID"]) == ["A", "B"]
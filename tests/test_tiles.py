@@ -0,0 +1,163 @@
+"""
+Tests for the persistent basemap tile cache against a local tile server.
+"""
+
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import numpy as np
+import geopandas as gpd
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from PIL import Image
+from shapely.geometry import Point
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.viz.maps import setup_basemap
+from src.viz.tiles import TileCache, add_cached_basemap, seed_tiles, tile_mosaic
+
+BOUNDS = (-106.0, 35.6, -105.8, 35.8)
+
+
+def _png(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (256, 256), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class _TileHandler(BaseHTTPRequestHandler):
+    """Serves a solid tile for any /z/x/y.png and records the requests."""
+
+    requests_seen = []
+    body = _png((200, 100, 50))
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).requests_seen.append(self.path)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+
+@pytest.fixture
+def tile_server():
+    """Run a local tile server; yields its URL template."""
+    _TileHandler.requests_seen = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _TileHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/{{z}}/{{x}}/{{y}}.png"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache():
+    temp_dir = Path(tempfile.mkdtemp())
+    yield TileCache(temp_dir, max_bytes=10 * 1024**2)
+    shutil.rmtree(temp_dir)
+
+
+def test_seed_then_render_offline(tile_server, cache):
+    """Seeded tiles are fetched once and then rendered with no requests."""
+    counts = seed_tiles(BOUNDS, zooms=[10, 11], source=tile_server, cache=cache)
+    assert counts["downloaded"] == counts["tiles"] > 0
+    assert len(_TileHandler.requests_seen) == counts["tiles"]
+
+    again = seed_tiles(BOUNDS, zooms=[10, 11], source=tile_server, cache=cache)
+    assert again["cached"] == counts["tiles"]
+    assert len(_TileHandler.requests_seen) == counts["tiles"]
+
+    image, extent, missing = tile_mosaic(BOUNDS, 11, tile_server, cache=cache, offline=True)
+    assert missing == 0
+    assert image.shape[0] % 256 == 0 and image.shape[1] % 256 == 0
+    assert (image[..., :3] == (200, 100, 50)).all()
+    assert extent[0] < extent[1] and extent[2] < extent[3]
+    assert len(_TileHandler.requests_seen) == counts["tiles"]
+
+
+def test_offline_render_is_deterministic(tile_server, cache):
+    """Offline renders read only the cache and produce identical images."""
+    seed_tiles(BOUNDS, zooms=[11], source=tile_server, cache=cache)
+    seen = len(_TileHandler.requests_seen)
+    gdf = gpd.GeoDataFrame(
+        geometry=[Point(-105.95, 35.65), Point(-105.85, 35.75)], crs="EPSG:4326"
+    ).to_crs("EPSG:3857")
+
+    renders = []
+    for _ in range(2):
+        fig, ax = plt.subplots()
+        gdf.plot(ax=ax)
+        info = add_cached_basemap(ax, "EPSG:3857", source=tile_server, offline=True, cache=cache)
+        fig.canvas.draw()
+        renders.append(np.asarray(fig.canvas.buffer_rgba()).copy())
+        plt.close(fig)
+
+    assert info == {"zoom": 11, "missing": 0}
+    assert np.array_equal(renders[0], renders[1])
+    assert len(_TileHandler.requests_seen) == seen
+
+
+def test_offline_without_tiles_raises(cache):
+    fig, ax = plt.subplots()
+    ax.set_xlim(-11800000, -11780000)
+    ax.set_ylim(4240000, 4260000)
+    with pytest.raises(FileNotFoundError, match="seed"):
+        add_cached_basemap(ax, "EPSG:3857", source="http://unused/{z}/{x}/{y}.png",
+                           offline=True, cache=cache)
+    plt.close(fig)
+
+
+def test_eviction_drops_least_recently_used(cache):
+    """Over the cap, the oldest-read tiles are evicted first."""
+    import os
+    source = "http://unused/{z}/{x}/{y}.png"
+    data = b"x" * 1000
+    for y in range(5):
+        cache.put(source, 1, 0, y, data)
+        os.utime(cache.path(source, 1, 0, y), ns=(y * 10**9, y * 10**9))
+    cache.get(source, 1, 0, 0)  # tile 0 becomes most recently used
+
+    removed = cache.evict(target_bytes=3000)
+
+    assert removed == 2
+    assert cache.get(source, 1, 0, 0) is not None
+    assert cache.get(source, 1, 0, 1) is None and cache.get(source, 1, 0, 2) is None
+    assert cache.size() == 3000
+
+
+def test_overwriting_a_tile_does_not_grow_the_cache(cache):
+    """Re-storing a tile replaces its bytes rather than adding to the size count."""
+    source = "http://unused/{z}/{x}/{y}.png"
+    cache.max_bytes = 2400
+    cache.put(source, 1, 0, 0, b"x" * 1000)
+    cache.put(source, 1, 0, 1, b"x" * 1000)
+    for _ in range(5):
+        cache.put(source, 1, 0, 0, b"y" * 1200)
+    assert cache.get(source, 1, 0, 1) is not None
+    assert cache.size() == 2200
+
+
+def test_setup_basemap_offline_without_cache_warns(monkeypatch, capsys):
+    """setup_basemap keeps rendering (without tiles) when the cache is empty."""
+    import src.viz.tiles as tiles
+    empty = Path(tempfile.mkdtemp())
+    monkeypatch.setattr(tiles, "TILE_CACHE_DIR", empty)
+    gdf = gpd.GeoDataFrame(
+        geometry=[Point(-105.95, 35.65), Point(-105.94, 35.66)], crs="EPSG:4326"
+    )
+    try:
+        fig, ax = setup_basemap(gdf, crs="EPSG:3857", offline=True)
+    finally:
+        shutil.rmtree(empty)
+    assert "Could not add basemap" in capsys.readouterr().out
+    plt.close(fig)
@@ -0,0 +1,135 @@
+"""
+Tests for the multi-year ACS tract time series.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import box
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data.acs import add_geoid
+from src.data.analytics import SpatialDB
+from src.data.timeseries import (
+    build_acs_timeseries, compute_changes, crosswalk_from_geometries, harmonize,
+    load_acs_timeseries, load_tract_crosswalk
+)
+
+# 2010 tract 000100 was split into 2020 tracts 000101/000102;
+# 2010 tracts 000200 and 000300 were merged into 2020 tract 000400
+RELATIONSHIP = """OID_TRACT_20|GEOID_TRACT_20|NAMELSAD_TRACT_20|AREALAND_TRACT_20|AREAWATER_TRACT_20|MTFCC_TRACT_20|FUNCSTAT_TRACT_20|OID_TRACT_10|GEOID_TRACT_10|NAMELSAD_TRACT_10|AREALAND_TRACT_10|AREAWATER_TRACT_10|MTFCC_TRACT_10|FUNCSTAT_TRACT_10|AREALAND_PART|AREAWATER_PART
+1|35049000101|Census Tract 1.01|300|0|G5020|S|1|35049000100|Census Tract 1|1000|0|G5020|S|300|0
+2|35049000102|Census Tract 1.02|700|0|G5020|S|1|35049000100|Census Tract 1|1000|0|G5020|S|700|0
+3|35049000400|Census Tract 4|900|0|G5020|S|2|35049000200|Census Tract 2|500|0|G5020|S|500|0
+3|35049000400|Census Tract 4|900|0|G5020|S|3|35049000300|Census Tract 3|400|0|G5020|S|400|0
+"""
+
+
+class _StubClient:
+    """Serves ACS responses for a fixed set of tracts; 2010 tracts before 2020."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, variables, year, geography=None):
+        self.calls.append(year)
+        tracts = ["000100", "000200", "000300"] if year < 2020 else ["000101", "000102", "000400"]
+        growth = 1 + 0.1 * (year - 2015)
+        df = pd.DataFrame({"state": "35", "county": "049", "tract": tracts})
+        for i, variable in enumerate(variables):
+            df[variable] = [100.0 * (i + 1) * (j + 1) * growth for j in range(len(tracts))]
+        return add_geoid(df)
+
+
+@pytest.fixture
+def temp_data_dir():
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+@pytest.fixture
+def crosswalk(temp_data_dir):
+    path = temp_data_dir / "tab20_tract20_tract10_st35.txt"
+    path.write_text(RELATIONSHIP)
+    return load_tract_crosswalk(path)
+
+
+def test_harmonize_splits_counts_and_averages_medians(crosswalk):
+    assert crosswalk["weight"].tolist() == pytest.approx([0.3, 0.7, 1.0, 1.0])
+    df = pd.DataFrame({
+        "GEOID": ["35049000100", "35049000200", "35049000300"],
+        "renter_occupied": [100.0, 50.0, np.nan],
+        "total_occupied_units": [200.0, 100.0, 300.0],
+        "median_income": [40000.0, 60000.0, 80000.0],
+    })
+    result = harmonize(df, crosswalk).set_index("GEOID")
+    assert result.loc["35049000101", "renter_occupied"] == pytest.approx(30.0)
+    assert result.loc["35049000102", "renter_occupied"] == pytest.approx(70.0)
+    assert result.loc["35049000400", "renter_occupied"] == pytest.approx(50.0)
+    assert result.loc["35049000400", "total_occupied_units"] == pytest.approx(400.0)
+    assert result.loc["35049000102", "median_income"] == pytest.approx(40000.0)
+    assert result.loc["35049000400", "median_income"] == pytest.approx((60000 * 100 + 80000 * 300) / 400)
+
+    old = gpd.GeoDataFrame({"GEOID": ["a"]}, geometry=[box(0, 0, 10, 10)], crs="EPSG:32113")
+    new = gpd.GeoDataFrame({"GEOID": ["x", "y"]}, geometry=[box(0, 0, 3, 10), box(3, 0, 20, 10)],
+                           crs="EPSG:32113")
+    geometric = crosswalk_from_geometries(old, new).sort_values("target_geoid")
+    assert geometric["weight"].tolist() == pytest.approx([0.3, 0.7])
+
+
+def test_build_load_and_compute_changes(temp_data_dir, crosswalk):
+    client = _StubClient()
+    variables = {"B25003_003E": "renter_occupied", "B25003_001E": "total_occupied_units",
+                 "B19013_001E": "median_income"}
+    path = build_acs_timeseries([2019, 2015, 2021], variables=variables, crosswalk=crosswalk,
+                                client=client, data_dir=temp_data_dir)
+    assert client.calls == [2015, 2019, 2021]
+
+    df = load_acs_timeseries(data_dir=temp_data_dir)
+    assert sorted(df["year"].unique()) == [2015, 2019, 2021]
+    assert set(df["GEOID"]) == {"35049000101", "35049000102", "35049000400"}
+    assert len(df) == 9
+    assert {"pct_renters", "source_vintage"} <= set(df.columns)
+    assert df["pct_renters"].dropna().between(0, 100).all()
+
+    subset = load_acs_timeseries(years=[2015, 2021], geoids=["35049000400"], columns=["renter_occupied"],
+                                 data_dir=temp_data_dir)
+    assert list(subset.columns) == ["GEOID", "year", "renter_occupied"]
+    # 2015: tracts 2 + 3 merged (200 + 300); 2021: 300 * 1.6
+    assert subset["renter_occupied"].tolist() == pytest.approx([500.0, 480.0])
+
+    changes = compute_changes(df, ["renter_occupied", "pct_renters"], 2015, 2021)
+    row = changes.loc["35049000400"]
+    assert row["renter_occupied_change"] == pytest.approx(-20.0)
+    assert row["renter_occupied_pct_change"] == pytest.approx(-4.0)
+    assert row["renter_occupied_annual_rate"] == pytest.approx(((480 / 500) ** (1 / 6) - 1) * 100)
+    assert "pct_renters_annual_rate" not in changes.columns
+    with pytest.raises(ValueError, match="not in time series"):
+        compute_changes(df, ["renter_occupied"], 2010, 2021)
+
+    with SpatialDB(temp_data_dir, spatial=False) as db:
+        trend = db.query("SELECT year, sum(renter_occupied) AS renters FROM acs_timeseries "
+                         "GROUP BY year ORDER BY year")
+    assert trend["year"].tolist() == [2015, 2019, 2021]
+    assert path.name in str(db.datasets["acs_timeseries"]["path"])
+
+
+def test_crosswalk_toward_2010_tracts(temp_data_dir):
+    """Read for a 2010 target, the relationship file maps 2020 tracts onto 2010 tracts."""
+    path = temp_data_dir / "tab20_tract20_tract10_st35.txt"
+    path.write_text(RELATIONSHIP)
+    inverse = load_tract_crosswalk(path, target_vintage=2010)
+    assert set(inverse["source_geoid"]) == {"35049000101", "35049000102", "35049000400"}
+    assert inverse["weight"].tolist() == pytest.approx([1.0, 1.0, 500 / 900, 400 / 900])
+
+    variables = {"B25003_003E": "renter_occupied"}
+    build_acs_timeseries([2015, 2021], variables=variables, crosswalk=inverse, target_vintage=2010,
+                         client=_StubClient(), data_dir=temp_data_dir)
+    df = load_acs_timeseries(years=[2021], data_dir=temp_data_dir).set_index("GEOID")
+    # 2021 tracts 000101 + 000102 (160 + 320) back onto 2010 tract 000100
+    assert df.loc["35049000100", "renter_occupied"] == pytest.approx(480.0)
+    assert df["renter_occupied"].sum() == pytest.approx(160 + 320 + 480)
@@ -0,0 +1,173 @@
+"""
+Tests for resumable, checksum-verified downloads against a local HTTP server.
+"""
+
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.data import transfer
+from src.data.download import download_file
+
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MiB
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with ETag and Range support; can drop one connection or ignore ranges."""
+
+    requests_seen = []
+    drop_after = None
+    ignore_ranges = False
+    etag = '"v1"'
+
+    def log_message(self, *args):
+        pass
+
+    def _headers(self, status, length, extra=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", self.etag)
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        type(self).requests_seen.append(("HEAD", None))
+        self._headers(200, len(PAYLOAD))
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        type(self).requests_seen.append(("GET", range_header))
+        start, end = 0, len(PAYLOAD) - 1
+        status = 200
+        if range_header and not type(self).ignore_ranges:
+            first, last = range_header.split("=")[1].split("-")
+            start = int(first)
+            end = int(last) if last else end
+            status = 206
+        body = PAYLOAD[start:end + 1]
+        extra = {"Content-Range": f"bytes {start}-{end}/{len(PAYLOAD)}"} if status == 206 else None
+        self._headers(status, len(body), extra)
+        if type(self).drop_after is not None:
+            cut = type(self).drop_after
+            type(self).drop_after = None
+            self.wfile.write(body[:cut])
+            self.wfile.flush()
+            self.connection.shutdown(2)
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    """Run a local range-capable HTTP server for the duration of a test."""
+    _RangeHandler.requests_seen = []
+    _RangeHandler.drop_after = None
+    _RangeHandler.ignore_ranges = False
+    _RangeHandler.etag = '"v1"'
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/data.zip"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def out_dir():
+    """Create a temporary output directory."""
+    temp_dir = Path(tempfile.mkdtemp())
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def test_download_writes_sidecar_and_skips_rerun(server, out_dir):
+    """A finished download gets a sidecar; an unchanged re-run is skipped."""
+    target = out_dir / "data.zip"
+    download_file(server, target)
+
+    assert target.read_bytes() == PAYLOAD
+    meta = json.loads((out_dir / "data.zip.sha256").read_text())
+    assert meta["sha256"] == hashlib.sha256(PAYLOAD).hexdigest()
+    assert meta["etag"] == '"v1"'
+    assert not (out_dir / "data.zip.part").exists()
+
+    _RangeHandler.requests_seen = []
+    download_file(server, target)
+    assert [method for method, _ in _RangeHandler.requests_seen] == ["HEAD"]
+
+    # New upstream version is downloaded again
+    _RangeHandler.etag = '"v2"'
+    download_file(server, target)
+    assert ("GET", None) in _RangeHandler.requests_seen
+
+
+def test_download_resumes_after_dropped_connection(server, out_dir):
+    """A dropped connection resumes from the .part file with a Range request."""
+    _RangeHandler.drop_after = 300_000
+    target = out_dir / "data.zip"
+    download_file(server, target, parallel=False)
+
+    assert target.read_bytes() == PAYLOAD
+    resumed = [r for method, r in _RangeHandler.requests_seen if method == "GET" and r]
+    assert len(resumed) == 1
+    assert 0 < int(resumed[0].split("=")[1].rstrip("-")) <= 300_000
+
+
+def test_parallel_range_download(server, out_dir, monkeypatch):
+    """Large files are fetched as concurrent byte ranges."""
+    monkeypatch.setattr(transfer, "PARALLEL_THRESHOLD", 1024)
+    monkeypatch.setattr(transfer, "RANGE_CHUNK_SIZE", 256 * 1024)
+    target = out_dir / "data.zip"
+    download_file(server, target)
+
+    assert target.read_bytes() == PAYLOAD
+    ranges = [r for method, r in _RangeHandler.requests_seen if method == "GET"]
+    assert len(ranges) == 4
+    assert "bytes=0-262143" in ranges
+
+
+def test_ignored_ranges_fall_back_to_single_stream(server, out_dir, monkeypatch):
+    """A server that advertises ranges but answers 200 is downloaded over one connection."""
+    monkeypatch.setattr(transfer, "PARALLEL_THRESHOLD", 1024)
+    monkeypatch.setattr(transfer, "RANGE_CHUNK_SIZE", 256 * 1024)
+    _RangeHandler.ignore_ranges = True
+    target = out_dir / "data.zip"
+    download_file(server, target)
+
+    assert target.read_bytes() == PAYLOAD
+    assert ("GET", None) in _RangeHandler.requests_seen
+    assert not (out_dir / "data.zip.part").exists()
+
+
+def test_ranges_part_is_not_resumed_as_stream(server, out_dir, monkeypatch):
+    """A part left by an interrupted ranged download is discarded by a single-stream fetch."""
+    monkeypatch.setattr(transfer, "PARALLEL_THRESHOLD", 1024)
+    monkeypatch.setattr(transfer, "RANGE_CHUNK_SIZE", 256 * 1024)
+    target = out_dir / "data.zip"
+    part = out_dir / "data.zip.part"
+    with open(part, "wb") as f:
+        f.truncate(len(PAYLOAD))
+    (out_dir / "data.zip.part.json").write_text(json.dumps(
+        {"etag": '"v1"', "mode": "ranges", "size": len(PAYLOAD), "done": [0]}
+    ))
+
+    transfer.fetch(server, target, parallel=False)
+    assert target.read_bytes() == PAYLOAD
+    assert ("GET", None) in _RangeHandler.requests_seen
+
+
+def test_checksum_mismatch_raises(server, out_dir):
+    """expected_sha256 is enforced and the bad file is not kept."""
+    target = out_dir / "data.zip"
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        download_file(server, target, expected_sha256="0" * 64)
+    assert not target.exists()
@@ -0,0 +1,103 @@
+"""
+Tests for data-quality validation and cached reports.
+"""
+
+import os
+
+import pytest
+import numpy as np
+import geopandas as gpd
+import pandas as pd
+import shapely
+from shapely.geometry import Polygon, box
+from pathlib import Path
+import tempfile
+import shutil
+
+from src import config
+from src.data import validation
+from src.data.download import process_downloaded_data
+from src.data.loaders import load_census_tracts
+from src.data.validation import (
+    load_report, repair_geometries, report_issues, report_path, validate_frame
+)
+
+BOWTIE = Polygon([(-105.95, 35.65), (-105.90, 35.70), (-105.90, 35.65), (-105.95, 35.70)])
+
+
+def _tracts():
+    """Raw tracts in lon/lat: one self-intersecting, one duplicate GEOID, one null income."""
+    return gpd.GeoDataFrame(
+        {"GEOID": ["35049000100", "35049000200", "35049000200", "35049000300"],
+         "median_income": [52000.0, 61000.0, np.nan, 48000.0]},
+        geometry=[box(-105.99, 35.61, -105.96, 35.64), BOWTIE,
+                  box(-105.89, 35.71, -105.86, 35.74), box(-105.85, 35.75, -105.82, 35.78)],
+        crs="EPSG:4326"
+    )
+
+
+@pytest.fixture
+def processed_dir(monkeypatch):
+    temp_dir = Path(tempfile.mkdtemp())
+    (temp_dir / "processed").mkdir()
+    monkeypatch.setattr(config, "DATA_PROCESSED", temp_dir / "processed")
+    yield temp_dir
+    shutil.rmtree(temp_dir)
+
+
+def test_checks_and_bulk_repair():
+    # Plus one far-away (e.g. wrong CRS), one empty and one null geometry
+    extra = gpd.GeoDataFrame({"GEOID": ["x", "y", "z"], "median_income": [1.0, 2.0, 3.0]},
+                             geometry=[box(-80.0, 40.0, -79.9, 40.1), Polygon(), None], crs="EPSG:4326")
+    gdf = pd.concat([_tracts(), extra], ignore_index=True)
+
+    report = validate_frame(gdf, bounds=(-106.0, 35.6, -105.8, 35.8), id_columns=["GEOID"])
+    assert report["features"] == 7
+    assert (report["null_geometry"], report["empty_geometry"]) == (1, 1)
+    assert report["invalid_geometry"] == 1 and "Self-intersection" in report["invalid_reasons"]
+    assert report["out_of_bounds"] == 1
+    assert report["duplicate_ids"] == {"GEOID": 1}
+    assert report["null_values"] == {"median_income": 1}
+    assert any("duplicate GEOID" in issue for issue in report_issues(report))
+
+    repaired, n = repair_geometries(gdf)
+    assert n == 1
+    assert shapely.is_valid(repaired.geometry.iloc[1])
+    assert repaired.geometry.iloc[1].geom_type == "MultiPolygon"
+    # Both triangles of the bowtie are kept
+    assert repaired.geometry.iloc[1].area == pytest.approx(2 * 0.05 * 0.025 / 2)
+    assert repaired.geometry.iloc[0].equals(gdf.geometry.iloc[0])
+    assert repaired.geometry.iloc[6] is None
+
+
+def test_processing_writes_cached_report(processed_dir, monkeypatch, capsys):
+    raw = processed_dir / "tracts_raw.gpkg"
+    _tracts().to_file(raw, driver="GPKG")
+    output = process_downloaded_data("census_tracts", raw, clip_to_city=False, write_lod=False,
+                                     write_index=False)
+    out = capsys.readouterr().out
+    assert "repaired 1 invalid geometries" in out and "1 duplicate GEOID values" in out
+
+    processed = gpd.read_file(output)
+    assert processed.geometry.is_valid.all()
+    report = load_report(output)
+    assert report["repaired"] == 1 and report["invalid_geometry"] == 0
+    assert report["duplicate_ids"] == {"GEOID": 1}
+
+    # Loads reuse the report, even after the file is touched
+    def fail(*args, **kwargs):
+        raise AssertionError("validation re-ran")
+    os.utime(output, ns=(output.stat().st_atime_ns, output.stat().st_mtime_ns + 10**9))
+    with monkeypatch.context() as m:
+        m.setattr(validation, "validate_file", fail)
+        tracts = load_census_tracts(data_dir=output.parent, validate=True, use_cache=False)
+    assert len(tracts) == 4
+    assert "1 duplicate GEOID values" in capsys.readouterr().out
+
+    # A changed file is validated again
+    gpd.GeoDataFrame({"GEOID": ["a"]}, geometry=[BOWTIE], crs=processed.crs).to_file(output, driver="GPKG")
+    assert load_report(output) is None
+    tracts = load_census_tracts(data_dir=output.parent, validate=True, use_cache=False)
+    assert tracts.geometry.is_valid.all()
+    assert load_report(output)["invalid_geometry"] == 1
+    assert report_path(output).exists()